@@ -4,13 +4,31 @@
 // ========================================
 
 // Global State
-let allArticles = [];
-let filteredArticles = [];
 let currentPage = 1;
 const itemsPerPage = 50;
 let currentCategory = 'all';
 let currentYear = 'all';
 let searchTerm = '';
+let summary = null;                // { total, categories, years } from the data engine
+let currentTotal = 0;              // articles matching the current filters
+const rowPool = [];                // table rows, created once and refilled per page
+let renderToken = 0;
+
+// Data engine (worker.js): loading, filtering and counting off the main thread
+const ENGINE_SCRIPT = 'worker.js';
+const SEARCH_DEBOUNCE_MS = 200;    // search as you type, once typing pauses
+let engine = null;                 // Promise<Worker, or a stand-in running worker.js here>
+const engineRequests = new Map();  // request id -> { resolve, reject }
+let engineRequestId = 0;
+let searchTimer = null;
+
+// Read API (`arxiv_full_collector.py serve`) instead of the dataset files:
+// index.html?api=http://127.0.0.1:8000/api
+const API_URL = new URLSearchParams(location.search).get('api');
+
+// Related papers (`index-similar`): above this estimated similarity, flagged
+// as a likely duplicate (SIMILAR_DUPLICATE_SCORE in arxiv_full_collector.py)
+const DUPLICATE_SIMILARITY = 0.8;
 
 // Particle Animation Variables
 let canvas, ctx;
@@ -23,61 +41,77 @@ let animationId;
 
 document.addEventListener('DOMContentLoaded', () => {
     initializeCanvas();
-    loadArticles();
+    registerServiceWorker();
+    startEngine();
     setupEventListeners();
     populateYearFilter();
 });
 
 // ========================================
-// DATA LOADING
+// DATA ENGINE
 // ========================================
 
-async function loadArticles() {
-    try {
-        // Try to load from articles.json first
-        const response = await fetch('articles.json');
-        if (response.ok) {
-            allArticles = await response.json();
-        } else {
-            // Load sample data if no JSON file exists
-            allArticles = generateSampleData();
+function startEngine() {
+    engine = new Promise(resolve => {
+        try {
+            const worker = new Worker(ENGINE_SCRIPT);
+            worker.onmessage = (e) => onEngineMessage(e.data);
+            resolve(worker);
+        } catch (error) {
+            // No worker (e.g. a page opened from file://): run the same engine here
+            console.log('Web Worker unavailable, running the data engine on the page...');
+            const script = document.createElement('script');
+            script.src = ENGINE_SCRIPT;
+            script.onload = () => resolve({
+                postMessage: message => handleEngineMessage(message, onEngineMessage)
+            });
+            document.head.appendChild(script);
         }
-        
-        filteredArticles = [...allArticles];
-        updateDisplay();
-        updateHeaderStats();
-    } catch (error) {
-        console.log('Loading sample data...');
-        allArticles = generateSampleData();
-        filteredArticles = [...allArticles];
-        updateDisplay();
-        updateHeaderStats();
+    });
+    
+    engineRequest('load', { api: API_URL }).catch(error => console.error('Failed to load articles:', error));
+}
+
+// sw.js caches the page and the dataset files for the next visits
+function registerServiceWorker() {
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('sw.js').catch(error =>
+            console.log('Service worker unavailable:', error));
     }
 }
 
-function generateSampleData() {
-    const categories = ['math.DG', 'math.SG', 'math-ph', 'math.AG', 'math.QA', 'math.RT'];
-    const sampleArticles = [];
-    
-    for (let i = 0; i < 500; i++) {
-        const year = 2000 + Math.floor(Math.random() * 25);
-        const month = Math.floor(Math.random() * 12) + 1;
-        const day = Math.floor(Math.random() * 28) + 1;
-        const category = categories[Math.floor(Math.random() * categories.length)];
-        
-        sampleArticles.push({
-            id: `${year}${String(month).padStart(2, '0')}${String(day).padStart(2, '0')}.${String(i).padStart(5, '0')}`,
-            title: `Research Article ${i + 1}: Advanced Studies in ${category}`,
-            authors: `Author ${i % 10 + 1}; Collaborator ${i % 5 + 1}; Researcher ${i % 3 + 1}`,
-            abstract: `This paper explores fundamental aspects of ${category} with applications to modern mathematical physics. We present novel approaches and theoretical frameworks.`,
-            category: category,
-            published: `${year}-${String(month).padStart(2, '0')}-${String(day).padStart(2, '0')}`,
-            link: `https://arxiv.org/abs/${year}${String(month).padStart(2, '0')}${String(day).padStart(2, '0')}.${String(i).padStart(5, '0')}`,
-            pdf: `https://arxiv.org/pdf/${year}${String(month).padStart(2, '0')}${String(day).padStart(2, '0')}.${String(i).padStart(5, '0')}.pdf`
-        });
+// Sends a request to the engine, resolves with its reply
+async function engineRequest(type, fields = {}) {
+    const worker = await engine;
+    const id = ++engineRequestId;
+    return new Promise((resolve, reject) => {
+        engineRequests.set(id, { resolve, reject });
+        worker.postMessage({ id, type, ...fields });
+    });
+}
+
+function onEngineMessage(message) {
+    // More articles loaded: refresh the counts and the page shown
+    if (message.type === 'summary') {
+        summary = message.summary;
+        populateYearFilter();
+        updateHeaderStats();
+        updateDisplay();
+        return;
     }
     
-    return sampleArticles.sort((a, b) => b.published.localeCompare(a.published));
+    const request = engineRequests.get(message.id);
+    if (!request) return;
+    engineRequests.delete(message.id);
+    if (message.error) {
+        request.reject(new Error(message.error));
+    } else {
+        request.resolve(message);
+    }
+}
+
+function currentFilters() {
+    return { category: currentCategory, year: currentYear, term: searchTerm };
 }
 
 // ========================================
@@ -93,6 +127,10 @@ function setupEventListeners() {
     document.getElementById('searchInput').addEventListener('keypress', (e) => {
         if (e.key === 'Enter') performSearch();
     });
+    document.getElementById('searchInput').addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(performSearch, SEARCH_DEBOUNCE_MS);
+    });
     
     // Category filters
     document.querySelectorAll('.cat-btn').forEach(btn => {
@@ -107,6 +145,15 @@ function setupEventListeners() {
         setYear(e.target.value);
     });
     
+    // Article details, one listener for every (reused) row
+    document.getElementById('articlesTableBody').addEventListener('click', (e) => {
+        const link = e.target.closest('.details-link');
+        if (link) {
+            e.preventDefault();
+            showArticleDetails(link.dataset.id);
+        }
+    });
+    
     // Pagination - Top
     document.getElementById('firstPageTop').addEventListener('click', () => goToPage(1));
     document.getElementById('prevPageTop').addEventListener('click', () => goToPage(currentPage - 1));
@@ -247,9 +294,12 @@ function stopParticleAnimation() {
 // ========================================
 
 function performSearch() {
-    searchTerm = document.getElementById('searchInput').value.toLowerCase().trim();
+    clearTimeout(searchTimer);
+    const term = document.getElementById('searchInput').value.toLowerCase().trim();
+    if (term === searchTerm) return;
+    searchTerm = term;
     currentPage = 1;
-    applyFilters();
+    updateDisplay();
 }
 
 function setCategory(category) {
@@ -265,38 +315,12 @@ function setCategory(category) {
         }
     });
     
-    applyFilters();
+    updateDisplay();
 }
 
 function setYear(year) {
     currentYear = year;
     currentPage = 1;
-    applyFilters();
-}
-
-function applyFilters() {
-    filteredArticles = allArticles.filter(article => {
-        // Search filter
-        if (searchTerm) {
-            const matchesSearch = 
-                article.title.toLowerCase().includes(searchTerm) ||
-                article.abstract.toLowerCase().includes(searchTerm);
-            if (!matchesSearch) return false;
-        }
-        
-        // Category filter
-        if (currentCategory !== 'all' && article.category !== currentCategory) {
-            return false;
-        }
-        
-        // Year filter
-        if (currentYear !== 'all' && !article.published.startsWith(currentYear)) {
-            return false;
-        }
-        
-        return true;
-    });
-    
     updateDisplay();
 }
 
@@ -304,54 +328,84 @@ function applyFilters() {
 // DISPLAY UPDATE
 // ========================================
 
-function updateDisplay() {
-    const tbody = document.getElementById('articlesTableBody');
-    tbody.innerHTML = '';
-    
-    const totalPages = Math.ceil(filteredArticles.length / itemsPerPage);
+async function updateDisplay() {
+    const token = ++renderToken;
     const start = (currentPage - 1) * itemsPerPage;
     const end = start + itemsPerPage;
-    const pageArticles = filteredArticles.slice(start, end);
     
-    pageArticles.forEach(article => {
-        const row = createArticleRow(article);
-        tbody.appendChild(row);
-    });
+    let pageArticles;
+    try {
+        const page = await engineRequest('query', { filters: currentFilters(), start, end });
+        pageArticles = page.articles;
+        currentTotal = page.total;
+    } catch (error) {
+        console.error('Failed to load page:', error);
+        pageArticles = [];
+        currentTotal = 0;
+    }
+    // Skip pages superseded while the engine was answering
+    if (token !== renderToken) return;
+    
+    // Rows are reused from page to page: only their text and links change
+    pageArticles.forEach((article, slot) => fillArticleRow(articleRow(slot), article));
+    for (let slot = pageArticles.length; slot < rowPool.length; slot++) {
+        rowPool[slot].tr.hidden = true;
+    }
     
     updatePagination();
 }
 
-function createArticleRow(article) {
-    const tr = document.createElement('tr');
-    
+function articleRow(slot) {
+    if (!rowPool[slot]) {
+        const tr = document.createElement('tr');
+        tr.innerHTML = `
+            <td class="article-title"></td>
+            <td class="article-authors"></td>
+            <td class="article-year"></td>
+            <td><span class="article-category"></span></td>
+            <td class="action-links">
+                <a href="#" class="action-link details-link" title="View Details">📄</a>
+                <a class="action-link" target="_blank" title="Open on arXiv">🔗</a>
+                <a class="action-link" target="_blank" title="Download PDF">📥</a>
+            </td>
+        `;
+        const links = tr.querySelectorAll('a');
+        rowPool[slot] = {
+            tr,
+            title: tr.querySelector('.article-title'),
+            authors: tr.querySelector('.article-authors'),
+            year: tr.querySelector('.article-year'),
+            category: tr.querySelector('.article-category'),
+            details: links[0],
+            link: links[1],
+            pdf: links[2]
+        };
+        document.getElementById('articlesTableBody').appendChild(tr);
+    }
+    return rowPool[slot];
+}
+
+function fillArticleRow(row, article) {
     // Get first author
-    const authors = article.authors.split(';');
-    let firstAuthor = authors[0].trim();
+    const authors = article.authors;
+    let firstAuthor = authors[0] || 'Unknown';
     if (authors.length > 1) {
         firstAuthor += ' et al.';
     }
     
-    // Get year
-    const year = article.published.substring(0, 4);
-    
-    tr.innerHTML = `
-        <td class="article-title">${article.title}</td>
-        <td class="article-authors">${firstAuthor}</td>
-        <td class="article-year">${year}</td>
-        <td><span class="article-category">${article.category}</span></td>
-        <td class="action-links">
-            <a href="#" class="action-link" title="View Details" onclick="showArticleDetails('${article.id}'); return false;">📄</a>
-            <a href="${article.link}" class="action-link" target="_blank" title="Open on arXiv">🔗</a>
-            <a href="${article.pdf}" class="action-link" target="_blank" title="Download PDF">📥</a>
-        </td>
-    `;
-    
-    return tr;
+    row.title.textContent = article.title;
+    row.authors.textContent = firstAuthor;
+    row.year.textContent = (article.published || '').substring(0, 4);
+    row.category.textContent = article.category;
+    row.details.dataset.id = article.id;
+    row.link.href = article.link;
+    row.pdf.href = article.pdf;
+    row.tr.hidden = false;
 }
 
 function updatePagination() {
-    const totalPages = Math.ceil(filteredArticles.length / itemsPerPage);
-    const pageInfo = `Page ${currentPage}/${totalPages || 1} | ${filteredArticles.length.toLocaleString()} articles`;
+    const totalPages = Math.ceil(currentTotal / itemsPerPage);
+    const pageInfo = `Page ${currentPage}/${totalPages || 1} | ${currentTotal.toLocaleString()} articles`;
     
     document.getElementById('pageInfoTop').textContent = pageInfo;
     document.getElementById('pageInfoBottom').textContent = pageInfo;
@@ -369,7 +423,7 @@ function updatePagination() {
 }
 
 function goToPage(page) {
-    const totalPages = Math.ceil(filteredArticles.length / itemsPerPage);
+    const totalPages = Math.ceil(currentTotal / itemsPerPage);
     if (page >= 1 && page <= totalPages) {
         currentPage = page;
         updateDisplay();
@@ -378,7 +432,7 @@ function goToPage(page) {
 }
 
 function goToLastPage() {
-    const totalPages = Math.ceil(filteredArticles.length / itemsPerPage);
+    const totalPages = Math.ceil(currentTotal / itemsPerPage);
     goToPage(totalPages);
 }
 
@@ -392,35 +446,39 @@ function updateHeaderStats() {
     document.getElementById('headerStats').textContent = statsText;
 }
 
+// Counts come from the engine's summary (the manifest, or the counts kept
+// while articles.bin / articles.json loaded): nothing is recounted here
 function calculateStats() {
-    const total = allArticles.length;
-    
-    // Categories
-    const categoryCount = {};
-    allArticles.forEach(article => {
-        categoryCount[article.category] = (categoryCount[article.category] || 0) + 1;
-    });
-    
-    // Years
-    const years = allArticles.map(a => parseInt(a.published.substring(0, 4))).filter(y => !isNaN(y));
-    const minYear = Math.min(...years);
-    const maxYear = Math.max(...years);
-    
-    // Year distribution
-    const yearCount = {};
-    years.forEach(year => {
-        yearCount[year] = (yearCount[year] || 0) + 1;
-    });
+    const { total, categories, years } = summary || { total: 0, categories: {}, years: {} };
+    const yearDistribution = Object.entries(years)
+        .filter(([year]) => year !== '0000')
+        .sort((a, b) => b[0] - a[0]);
+    const yearRange = yearDistribution.length ?
+        `${yearDistribution[yearDistribution.length - 1][0]}-${yearDistribution[0][0]}` : 'n/a';
     
     return {
         total,
-        categories: Object.entries(categoryCount).sort((a, b) => b[1] - a[1]),
-        yearRange: `${minYear}-${maxYear}`,
-        yearDistribution: Object.entries(yearCount).sort((a, b) => b[0] - a[0])
+        categories: Object.entries(categories).sort((a, b) => b[1] - a[1]),
+        yearRange,
+        yearDistribution
     };
 }
 
-function showStats() {
+function statBar(label, value, percent) {
+    return `
+            <div style="margin: 10px 0;">
+                <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
+                    <span><strong>${escapeHtml(label)}</strong></span>
+                    <span>${value}</span>
+                </div>
+                <div class="stat-bar">
+                    <div class="stat-bar-fill" style="width: ${percent}%"></div>
+                </div>
+            </div>
+        `;
+}
+
+async function showStats() {
     const stats = calculateStats();
     const modal = document.getElementById('statsModal');
     const body = document.getElementById('statsBody');
@@ -447,71 +505,106 @@ function showStats() {
     html += '<h3>📂 By Category</h3>';
     stats.categories.forEach(([cat, count]) => {
         const percent = (count / stats.total * 100).toFixed(1);
-        html += `
-            <div style="margin: 10px 0;">
-                <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
-                    <span><strong>${cat}</strong></span>
-                    <span>${count.toLocaleString()} (${percent}%)</span>
-                </div>
-                <div class="stat-bar">
-                    <div class="stat-bar-fill" style="width: ${percent}%"></div>
-                </div>
-            </div>
-        `;
+        html += statBar(cat, `${count.toLocaleString()} (${percent}%)`, percent);
     });
     
     // By Year
     html += '<h3>📅 By Year (Recent)</h3>';
+    const maxCount = stats.yearDistribution.reduce((max, [, count]) => Math.max(max, count), 0);
     stats.yearDistribution.slice(0, 10).forEach(([year, count]) => {
-        const maxCount = Math.max(...stats.yearDistribution.map(y => y[1]));
-        const percent = (count / maxCount * 100).toFixed(0);
-        html += `
-            <div style="margin: 10px 0;">
-                <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
-                    <span><strong>${year}</strong></span>
-                    <span>${count.toLocaleString()}</span>
-                </div>
-                <div class="stat-bar">
-                    <div class="stat-bar-fill" style="width: ${percent}%"></div>
-                </div>
-            </div>
-        `;
+        html += statBar(year, count.toLocaleString(), (count / maxCount * 100).toFixed(0));
     });
     
     body.innerHTML = html;
     modal.style.display = 'block';
+    
+    // Monthly counts and cross-lists come with the sharded export and the
+    // read API (precomputed by the collector), not with articles.json
+    let detailed = null;
+    try {
+        ({ stats: detailed } = await engineRequest('stats'));
+    } catch (error) {
+        console.error('Failed to load detailed stats:', error);
+    }
+    if (!detailed || modal.style.display !== 'block') return;
+    
+    html = '';
+    const months = Object.entries(detailed.months || {})
+        .filter(([month]) => !month.startsWith('0000'))
+        .slice(-12)
+        .reverse();
+    if (months.length) {
+        html += '<h3>🗓️ By Month (Recent)</h3>';
+        const maxMonth = months.reduce((max, [, count]) => Math.max(max, count), 0);
+        months.forEach(([month, count]) => {
+            html += statBar(month, count.toLocaleString(), (count / maxMonth * 100).toFixed(0));
+        });
+    }
+    const crossLists = Object.entries(detailed.cross_lists || {}).slice(0, 15);
+    if (crossLists.length) {
+        html += '<h3>🔀 With Cross-lists</h3>';
+        const maxListed = crossLists[0][1][0];
+        crossLists.forEach(([cat, [count, cross]]) => {
+            html += statBar(cat, `${count.toLocaleString()} (${cross.toLocaleString()} cross-lists)`,
+                (count / maxListed * 100).toFixed(0));
+        });
+    }
+    body.insertAdjacentHTML('beforeend', html);
 }
 
 // ========================================
 // ARTICLE DETAILS
 // ========================================
 
-function showArticleDetails(articleId) {
-    const article = allArticles.find(a => a.id === articleId);
+function escapeHtml(text) {
+    return String(text == null ? '' : text).replace(/[&<>"']/g, char => `&#${char.charCodeAt(0)};`);
+}
+
+// Only http(s) links from the dataset end up in an href
+function safeHref(url) {
+    return /^https?:\/\//i.test(url || '') ? escapeHtml(url) : '#';
+}
+
+function relatedHtml(related) {
+    if (!related || !related.length) return '';
+    const items = related.map(({ id, title, similarity, link }) => {
+        const duplicate = similarity >= DUPLICATE_SIMILARITY ? ' ⚠️ likely duplicate' : '';
+        return `<li><a href="${safeHref(link)}" target="_blank">${escapeHtml(title || id)}</a>
+            (${Math.round(similarity * 100)}% similar${duplicate})</li>`;
+    }).join('');
+    return `<h3>🧬 Related Papers</h3><ul>${items}</ul>`;
+}
+
+async function showArticleDetails(articleId) {
+    // The engine fetches the abstract if the dataset keeps it apart
+    const { article } = await engineRequest('article', { articleId });
     if (!article) return;
+    const abstract = article.abstract;
     
     const modal = document.getElementById('detailsModal');
     const body = document.getElementById('modalBody');
     
+    // Every field comes from the dataset: escaped before reaching innerHTML
     const html = `
-        <h2>📄 ${article.title}</h2>
+        <h2>📄 ${escapeHtml(article.title)}</h2>
         
         <h3>✍️ Authors</h3>
-        <p>${article.authors.split(';').join(', ')}</p>
+        <p>${escapeHtml(article.authors.join(', '))}</p>
         
         <h3>🏷️ Metadata</h3>
-        <p><strong>Category:</strong> ${article.category}</p>
-        <p><strong>Published:</strong> ${article.published}</p>
-        <p><strong>arXiv ID:</strong> ${article.id}</p>
+        <p><strong>Category:</strong> ${escapeHtml(article.category)}</p>
+        <p><strong>Published:</strong> ${escapeHtml(article.published)}</p>
+        <p><strong>arXiv ID:</strong> ${escapeHtml(article.id)}</p>
         
         <h3>🔗 Links</h3>
         <p>
-            <a href="${article.link}" target="_blank">View on arXiv →</a><br>
-            <a href="${article.pdf}" target="_blank">Download PDF →</a>
+            <a href="${safeHref(article.link)}" target="_blank">View on arXiv →</a><br>
+            <a href="${safeHref(article.pdf)}" target="_blank">Download PDF →</a>
         </p>
         
         <h3>📝 Abstract</h3>
-        <p>${article.abstract}</p>
+        <p>${escapeHtml(abstract)}</p>
+        ${relatedHtml(article.related)}
     `;
     
     body.innerHTML = html;
@@ -522,8 +615,12 @@ function showArticleDetails(articleId) {
 // EXPORT DATA
 // ========================================
 
-function exportData() {
-    const dataStr = JSON.stringify(filteredArticles, null, 2);
+async function exportData() {
+    const { articles } = await engineRequest('export', { filters: currentFilters() });
+    const records = articles.map(({ id, title, authors, abstract, category, published, link, pdf }) =>
+        ({ id, title, authors: authors.join('; '), abstract, category, published, link, pdf }));
+    
+    const dataStr = JSON.stringify(records, null, 2);
     const dataBlob = new Blob([dataStr], { type: 'application/json' });
     const url = URL.createObjectURL(dataBlob);
     const link = document.createElement('a');
@@ -539,14 +636,36 @@ function exportData() {
 
 function populateYearFilter() {
     const select = document.getElementById('yearFilter');
-    const currentYear = new Date().getFullYear();
+    const thisYear = new Date().getFullYear();
     
-    for (let year = currentYear; year >= 2000; year--) {
+    const years = [];
+    if (summary) {
+        years.push(...Object.keys(summary.years).filter(y => y !== '0000').sort().reverse());
+    } else {
+        for (let year = thisYear; year >= 2000; year--) {
+            years.push(String(year));
+        }
+    }
+    
+    // Summaries keep coming while a dataset loads: only rebuild on new years
+    const shown = Array.from(select.options).slice(1).map(option => option.value);
+    if (shown.join() === years.join()) return;
+    
+    // Keep only the "All" option when repopulating from the loaded counts
+    select.length = 1;
+    
+    years.forEach(year => {
         const option = document.createElement('option');
         option.value = year;
         option.textContent = year;
         select.appendChild(option);
+    });
+    
+    // Keep the selected year if the dataset has it
+    if (currentYear !== 'all' && !years.includes(currentYear)) {
+        setYear('all');
     }
+    select.value = currentYear;
 }
 
 // ========================================
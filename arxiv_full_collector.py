@@ -6,19 +6,3484 @@ Par Yassine Ait Mohamed
 """
 
 import sqlite3
-import requests
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
 import time
 import sys
 import json
+import threading
+import random
+import contextlib
+import cProfile
+import gzip
+import hashlib
+import heapq
+import mmap
+import os
+import pstats
+import queue
+import re
+import shutil
+import socket
+import struct
+import tempfile
+import unicodedata
+import zlib
+from array import array
+from collections import Counter, OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+try:
+    import requests  # Requis pour la collecte seulement: export et lecture s'en passent
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = HTTPAdapter = None
+
+try:
+    import zstandard  # Optionnel: compression plus rapide et plus compacte que gzip
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli  # Optionnel: export précompressé .br
+except ImportError:
+    brotli = None
+
+try:
+    import numpy as np  # Optionnel: colonnes de l'export binaire en tableaux NumPy
+except ImportError:
+    np = None
+
+try:
+    import pyinstrument  # Optionnel: profil échantillonné (--profile rapport.html)
+except ImportError:
+    pyinstrument = None
+
+# Namespaces des flux Atom renvoyés par l'API arXiv
+ATOM_NS = {'atom': 'http://www.w3.org/2005/Atom',
+           'arxiv': 'http://arxiv.org/schemas/atom',
+           'opensearch': 'http://a9.com/-/spec/opensearch/1.1/'}
+
+# Tags complets précalculés (évite les lookups de namespace par entrée)
+ATOM = '{%s}' % ATOM_NS['atom']
+ARXIV = '{%s}' % ATOM_NS['arxiv']
+OPENSEARCH = '{%s}' % ATOM_NS['opensearch']
+TAG_ENTRY = ATOM + 'entry'
+TAG_ID = ATOM + 'id'
+TAG_TITLE = ATOM + 'title'
+TAG_SUMMARY = ATOM + 'summary'
+TAG_AUTHOR = ATOM + 'author'
+TAG_NAME = ATOM + 'name'
+TAG_PUBLISHED = ATOM + 'published'
+TAG_UPDATED = ATOM + 'updated'
+TAG_CATEGORY = ATOM + 'category'
+TAG_PRIMARY_CATEGORY = ARXIV + 'primary_category'
+TAG_DOI = ARXIV + 'doi'
+TAG_JOURNAL_REF = ARXIV + 'journal_ref'
+TAG_COMMENT = ARXIV + 'comment'
+TAG_TOTAL_RESULTS = OPENSEARCH + 'totalResults'
+
+# Réponses OAI-PMH (ListRecords au format arXivRaw)
+OAI_NS = {'oai': 'http://www.openarchives.org/OAI/2.0/',
+          'raw': 'http://arxiv.org/OAI/arXivRaw/'}
+OAI = '{%s}' % OAI_NS['oai']
+RAW = '{%s}' % OAI_NS['raw']
+TAG_OAI_LIST = OAI + 'ListRecords'
+TAG_OAI_RECORD = OAI + 'record'
+TAG_OAI_HEADER = OAI + 'header'
+TAG_OAI_TOKEN = OAI + 'resumptionToken'
+TAG_OAI_ERROR = OAI + 'error'
+TAG_RAW_RECORD = RAW + 'arXivRaw'
+
+# Champs d'un article, dans l'ordre des colonnes de la table articles
+ARTICLE_FIELDS = ('arxiv_id', 'title', 'authors', 'abstract', 'category', 'published',
+                  'updated', 'link', 'pdf_link', 'categories', 'doi', 'journal_ref',
+                  'comment', 'version', 'updated_at')
+
+# Tuple compact, directement utilisable par executemany
+Article = namedtuple('Article', ARTICLE_FIELDS)
+
+VERSION_RE = re.compile(r'v(\d+)$')
+
+# Liens d'un article, sous une seule forme (base, export JSON, colonnaire,
+# API de lecture; worker.js articleLinks): page abs en http comme les <id>
+# des flux Atom, PDF en https
+ABS_URL_PREFIX = 'http://arxiv.org/abs/'
+PDF_URL_PREFIX = 'https://arxiv.org/pdf/'
+
+# Version du schéma (PRAGMA user_version): 1 = articles indexée par
+# l'identifiant arXiv sans suffixe de version (migrate_versioned_ids)
+SCHEMA_VERSION = 1
+
+# Politesse envers l'API arXiv: au plus une requête toutes les 3 secondes,
+# tous workers confondus
+API_REQUEST_INTERVAL = 3
+
+# Nombre de fenêtres (catégorie, mois) collectées en parallèle
+DEFAULT_WORKERS = 4
+
+# Pause max entre deux tentatives (secondes), Retry-After compris
+MAX_BACKOFF = 300
+
+# Nombre de validateurs (ETag, Last-Modified) gardés en mémoire pour les
+# requêtes conditionnelles; le corps des pages reste dans le cache disque
+VALIDATOR_CACHE_SIZE = 256
+
+# Journal d'événements des exécutions (une ligne JSON par événement)
+DEFAULT_EVENTS_PATH = "arxiv_events.jsonl"
+
+# Étapes chronométrées par RunMetrics et compteurs d'une exécution
+RUN_STAGES = ('sleep', 'network', 'cache', 'parse', 'write')
+RUN_COUNTERS = ('requests', 'retries', 'not_modified', 'rate_limited', 'server_errors',
+                'timeouts', 'cache_hits', 'bytes', 'wire_bytes', 'entries', 'bad_entries')
+STAGE_LABELS = {'sleep': 'attente', 'network': 'réseau', 'cache': 'cache',
+                'parse': 'parsing', 'write': 'écriture'}
+
+# Nombre de lignes du profil cProfile affichées en fin de commande
+PROFILE_TOP = 25
+
+# Cache local des réponses brutes de l'API
+DEFAULT_CACHE_PATH = "arxiv_response_cache.db"
+CACHE_TTL_DAYS = 30
+CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+USER_AGENT = "arxiv-collection-pro/1.0 (+https://github.com/yassineaitmohamed/arxiv-collection-pro)"
+
+# Taille des morceaux passés au parser XML incrémental (la page elle-même
+# est déjà entière en mémoire: cache, validateurs 304, totalResults)
+PARSE_CHUNK_SIZE = 64 * 1024
+
+# Nombre de lignes lues par fetchmany pendant l'export
+EXPORT_CHUNK_SIZE = 5000
+
+# Export en colonnes binaire (export --columnar, cf. ColumnarWriter): lisible
+# sans parsing par mmap / NumPy en Python et par typed arrays dans le navigateur
+COLUMNAR_MAGIC = b'ARXC'
+COLUMNAR_VERSION = 1
+COLUMNAR_SUFFIX = '.bin'
+COLUMNAR_EPOCH = datetime(1970, 1, 1)
+COLUMNAR_DATE_MISSING = -2 ** 31
+COLUMNAR_DTYPES = {'I': '<u4', 'i': '<i4', 'H': '<u2'}
+COLUMNAR_TYPECODES = {'<u4': 'I', '<i4': 'i', '<u2': 'H', '|u1': 'B'}
+
+# Export découpé pour le site: un shard par (catégorie, année), les résumés
+# à part, par paquets de ABSTRACT_CHUNK_SIZE (chargés seulement à la demande)
+DEFAULT_SHARD_DIR = "data"
+MANIFEST_VERSION = 4
+# Empreinte de chaque fichier dans le manifest (sha256 tronqué, en hexa): le
+# site demande <fichier>?v=<empreinte> et ne retélécharge que ce qui a changé
+CONTENT_HASH_LENGTH = 16
+SHARD_FIELDS = ('id', 'title', 'authors', 'published')
+ABSTRACT_CHUNK_SIZE = 500
+
+# Export incrémental: fichiers deltas/<de>-<à>.json (articles modifiés entre
+# deux exports), les DELTA_HISTORY derniers sont gardés. Au-delà de
+# DELTA_MAX_RECORDS articles, pas de delta: les clients rechargent tout.
+DELTA_FIELDS = SHARD_FIELDS + ('category', 'abstract')
+DELTA_HISTORY = 30
+DELTA_MAX_RECORDS = 50000
+
+# Index de recherche plein texte du site (dans le même dossier que les shards).
+# Les termes sont triés puis découpés en fichiers d'environ INDEX_SHARD_BYTES,
+# le site ne charge que les fichiers des termes recherchés.
+INDEX_SHARD_BYTES = 256 * 1024
+# Taille max de l'index delta (shards réécrits depuis le dernier export
+# complet), en fraction de l'index de base, avant reconstruction complète
+INDEX_DELTA_RATIO = 0.1
+INDEX_MIN_TOKEN_LENGTH = 2
+# Poids d'une occurrence selon le champ. Le poids total d'un terme dans un
+# article (plafonné à 2**INDEX_WEIGHT_BITS - 1) est rangé dans les bits de
+# poids faible de chaque posting: posting = (delta << INDEX_WEIGHT_BITS) | poids
+INDEX_FIELD_WEIGHTS = {'title': 3, 'authors': 2, 'abstract': 1}
+INDEX_WEIGHT_BITS = 3
+INDEX_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in into is it its of on or
+    that the their these this those to was we which with our via can
+    also show prove study paper results result new give given using
+""".split())
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+# Accents retirés après décomposition NFKD (même règle que app.js)
+COMBINING_RE = re.compile('[\u0300-\u036f]')
+
+# Recherche plein texte en ligne de commande (table FTS5 articles_fts).
+# Poids BM25 des colonnes (titre, résumé, auteurs), comme l'index du site.
+FTS_COLUMN_WEIGHTS = (INDEX_FIELD_WEIGHTS['title'], INDEX_FIELD_WEIGHTS['abstract'],
+                      INDEX_FIELD_WEIGHTS['authors'])
+SEARCH_RESULT_LIMIT = 20
+
+# Nombre max d'identifiants par requête IN (...) (limite de variables SQLite)
+SQL_IN_CHUNK = 500
+
+# Recul par défaut (en jours) pour un premier "update" sans watermark ni données
+DEFAULT_UPDATE_LOOKBACK_DAYS = 30
+
+# Nombre max de résultats que l'API accepte de paginer pour une requête.
+# Au-delà, la fenêtre de dates est découpée en deux.
+API_RESULT_CAP = 10000
+
+# Moissonnage OAI-PMH: alternative à l'API de recherche pour les collectes
+# en masse (pages de ~1000 enregistrements chaînées par resumptionToken,
+# sans offset profond)
+DEFAULT_OAI_URL = "http://export.arxiv.org/oai2"
+DEFAULT_OAI_SET = "math"
+OAI_METADATA_PREFIX = "arXivRaw"
+RAW_AUTHORS_RE = re.compile(r',?\s+and\s+|,\s*')
+
+# Collecte répartie (plan / worker / merge): base principale (qui porte aussi
+# le plan par défaut), bases des workers, durée d'un bail sur une unité de
+# travail et nombre d'essais avant abandon
+DEFAULT_DB_PATH = "arxiv_full_collection.db"
+DEFAULT_SHARD_DB_DIR = "shard_dbs"
+LEASE_SECONDS = 3600
+MAX_UNIT_ATTEMPTS = 3
+
+# API de lecture (serve): adresse, connexions en lecture seule, taille des
+# pages et nombre de réponses gardées en mémoire (LRU)
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8000
+SERVE_POOL_SIZE = 4
+SERVE_PAGE_SIZE = 50
+SERVE_MAX_PAGE_SIZE = 500
+SERVE_CACHE_SIZE = 512
+# Recherche texte paginée par date: si les correspondances sont assez
+# denses pour qu'une page soit trouvée en parcourant moins de ce nombre
+# d'articles par date, chaque article est testé dans FTS5 (EXISTS); sinon
+# l'ensemble des correspondances est calculé d'abord (IN)
+SERVE_PROBE_ROWS = 1000
+
+# Articles voisins (index-similar / related): signature MinHash de
+# SIMILAR_HASHES valeurs sur les paires de mots consécutifs (sans mots vides)
+# du titre et du résumé, dont les SIMILAR_BANDS * SIMILAR_BAND_ROWS premières
+# sont découpées en bandes pour le LSH. Deux articles de similarité de
+# Jaccard s partagent au moins une bande avec une probabilité
+# 1 - (1 - s**2)**16: ~30% à s = 0.15, 98% à s = 0.5, ~100% pour un doublon.
+# La graine fixe les permutations: la changer (ou un de ces paramètres)
+# demande un index-similar --full
+SIMILAR_HASHES = 64
+SIMILAR_BANDS = 16
+SIMILAR_BAND_ROWS = 2
+SIMILAR_SHINGLE_WORDS = 2
+SIMILAR_SEED = 1991
+SIMILAR_BATCH = 1000
+# Articles lus au plus par bucket (un bucket très peuplé ne ralentit pas
+# une requête), candidats comparés par signature, score minimal affiché
+SIMILAR_BUCKET_LIMIT = 1000
+SIMILAR_CANDIDATES = 200
+SIMILAR_MIN_SCORE = 0.05
+# Au-dessus: doublon probable (resoumission, même article dans deux catégories)
+SIMILAR_DUPLICATE_SCORE = 0.8
+SIMILAR_RELATED_LIMIT = 10
+# Articles voisins par article dans l'export découpé (export-shards --related)
+SIMILAR_EXPORT_LIMIT = 5
+# Articles dont l'export calcule les voisins ensemble (plusieurs petits
+# shards par lot: buckets et signatures lus une fois pour tous)
+SIMILAR_EXPORT_BATCH = 5000
+
+
+def format_submitted_date(dt):
+    """Formate une date pour le filtre submittedDate (YYYYMMDDHHMM)"""
+    return dt.strftime('%Y%m%d%H%M')
+
+
+def build_window_query(category, window_start, window_end):
+    """Construit la requête search_query pour une catégorie et une fenêtre (bornes incluses)"""
+    return (f"cat:{category} AND submittedDate:"
+            f"[{format_submitted_date(window_start)} TO {format_submitted_date(window_end)}]")
+
+
+def month_window(year, month):
+    """Retourne la fenêtre [premier jour 00:00, dernier jour 23:59] d'un mois"""
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        next_month = datetime(year, month + 1, 1, tzinfo=timezone.utc)
+    return start, next_month - timedelta(minutes=1)
+
+
+def split_window(window_start, window_end):
+    """Coupe une fenêtre en deux moitiés disjointes (résolution: la minute)"""
+    minutes = int((window_end - window_start).total_seconds() // 60)
+    middle = window_start + timedelta(minutes=minutes // 2)
+    return (window_start, middle), (middle + timedelta(minutes=1), window_end)
+
+
+def parse_api_timestamp(value):
+    """Convertit un timestamp Atom ('2024-01-05T12:34:56Z' ou '2024-01-05') en datetime UTC"""
+    if len(value) <= 10:
+        return datetime.strptime(value[:10], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+
+
+def normalize_params(params):
+    """Forme canonique des paramètres d'une requête (clé de cache)"""
+    return urlencode(sorted((str(k), ' '.join(str(v).split())) for k, v in params.items()))
+
+
+class ResponseCache:
+    """Cache adressé par contenu des réponses Atom brutes, stocké compressé.
+    
+    Les réponses sont indexées par le hash des paramètres normalisés dans une
+    table SQLite (blob zstd si `zstandard` est installé, gzip sinon). Les
+    entrées plus vieilles que ttl_days sont ignorées, et les moins récemment
+    lues sont évincées au-delà de max_bytes.
+    """
+    
+    EVICT_EVERY = 100  # Vérifie la taille du cache toutes les N écritures
+    
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_days=CACHE_TTL_DAYS,
+                 max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl_days * 86400 if ttl_days is not None else None
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.puts = 0
+        
+        conn = sqlite3.connect(self.path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                params TEXT,
+                codec TEXT,
+                body BLOB,
+                size INTEGER,
+                created REAL,
+                last_access REAL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)')
+        conn.commit()
+        conn.close()
+    
+    @staticmethod
+    def make_key(params):
+        return hashlib.sha256(normalize_params(params).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def compress(text):
+        data = text.encode('utf-8')
+        if zstandard is not None:
+            return 'zstd', zstandard.ZstdCompressor(level=10).compress(data)
+        return 'gzip', gzip.compress(data, compresslevel=6)
+    
+    @staticmethod
+    def decompress(codec, body):
+        if codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Entrée zstd en cache mais le module zstandard n'est pas installé")
+            return zstandard.ZstdDecompressor().decompress(body).decode('utf-8')
+        return gzip.decompress(body).decode('utf-8')
+    
+    def get(self, params):
+        """Retourne la réponse en cache (str) ou None si absente/expirée"""
+        key = self.make_key(params)
+        now = time.time()
+        with self.lock:
+            conn = sqlite3.connect(self.path)
+            row = conn.execute("SELECT codec, body, created FROM responses WHERE key = ?",
+                               (key,)).fetchone()
+            if row is None or (self.ttl is not None and now - row[2] > self.ttl):
+                conn.close()
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            conn.close()
+        return self.decompress(row[0], row[1])
+    
+    def put(self, params, text):
+        """Stocke une réponse brute"""
+        key = self.make_key(params)
+        codec, body = self.compress(text)
+        now = time.time()
+        with self.lock:
+            conn = sqlite3.connect(self.path)
+            conn.execute('''
+                INSERT OR REPLACE INTO responses (key, params, codec, body, size, created, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, normalize_params(params), codec, body, len(body), now, now))
+            conn.commit()
+            conn.close()
+            self.puts += 1
+            if self.puts % self.EVICT_EVERY == 0:
+                self.evict()
+    
+    def delete(self, params):
+        """Retire une réponse (page illisible: elle ne doit pas être rejouée)"""
+        key = self.make_key(params)
+        with self.lock:
+            conn = sqlite3.connect(self.path)
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            conn.commit()
+            conn.close()
+    
+    def evict(self):
+        """Supprime les entrées expirées puis les moins récemment lues (LRU)"""
+        conn = sqlite3.connect(self.path)
+        if self.ttl is not None:
+            conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            rows = conn.execute('''
+                SELECT key, size FROM responses ORDER BY last_access LIMIT 100
+            ''').fetchall()
+            if not rows:
+                break
+            conn.executemany("DELETE FROM responses WHERE key = ?", [(r[0],) for r in rows])
+            total -= sum(r[1] for r in rows)
+        conn.commit()
+        conn.close()
+    
+    def iter_responses(self):
+        """Itère sur toutes les réponses en cache, dans l'ordre d'écriture"""
+        conn = sqlite3.connect(self.path)
+        cursor = conn.execute("SELECT params, codec, body FROM responses ORDER BY created")
+        for params, codec, body in cursor:
+            yield params, self.decompress(codec, body)
+        conn.close()
+    
+    def summary(self):
+        """Nombre d'entrées et taille compressée totale"""
+        conn = sqlite3.connect(self.path)
+        count, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        conn.close()
+        return count, size
+
+
+def create_session(pool_size=DEFAULT_WORKERS):
+    """Crée une session HTTP keep-alive avec un pool dimensionné pour les workers"""
+    if requests is None:
+        raise RuntimeError("Le module requests est requis pour la collecte (pip install requests)")
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'User-Agent': USER_AGENT,
+    })
+    return session
+
+
+def format_duration(seconds):
+    """Durée lisible: 4.2s, 12m05s, 3h07m"""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+def parse_retry_after(value):
+    """Convertit un en-tête Retry-After (secondes ou date HTTP) en secondes"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, initial_wait, retry_after=None):
+    """Backoff exponentiel avec jitter; Retry-After du serveur prioritaire"""
+    if retry_after is not None:
+        return min(MAX_BACKOFF, retry_after)
+    delay = initial_wait * (2 ** attempt)
+    return min(MAX_BACKOFF, delay * random.uniform(0.5, 1.5))
+
+
+def iter_xml_events(xml_data, events=('start', 'end')):
+    """Alimente un parser XML incrémental par morceaux et relaie ses événements.
+    
+    xml_data est le corps complet de la réponse (texte déjà en mémoire):
+    seul l'arbre XML est construit au fur et à mesure, pas la lecture réseau.
+    """
+    parser = ET.XMLPullParser(events)
+    for offset in range(0, len(xml_data), PARSE_CHUNK_SIZE):
+        parser.feed(xml_data[offset:offset + PARSE_CHUNK_SIZE])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def parse_total_results(xml_data):
+    """Lit opensearch:totalResults dans une réponse de l'API (None si absent).
+    
+    S'arrête à la première entrée: l'en-tête du flux suffit.
+    """
+    try:
+        for event, elem in iter_xml_events(xml_data):
+            if event == 'end' and elem.tag == TAG_TOTAL_RESULTS:
+                return int(elem.text)
+            if event == 'start' and elem.tag == TAG_ENTRY:
+                return None
+    except (ET.ParseError, ValueError, TypeError):
+        return None
+    return None
+
+
+def split_version(arxiv_id):
+    """'2301.01234v2' -> ('2301.01234', 2); sans suffixe: (arxiv_id, None).
+    
+    Les articles sont indexés par l'identifiant sans version: une nouvelle
+    version remplace la ligne de la précédente au lieu de s'y ajouter.
+    """
+    match = VERSION_RE.search(arxiv_id or '')
+    if match is None:
+        return arxiv_id, None
+    return arxiv_id[:match.start()], int(match.group(1))
+
+
+def article_links(arxiv_id):
+    """(lien de la page abs, lien du PDF) d'un identifiant sans version"""
+    return f"{ABS_URL_PREFIX}{arxiv_id}", f"{PDF_URL_PREFIX}{arxiv_id}.pdf"
+
+
+def unversioned(article):
+    """Article dont l'identifiant (et les liens) n'ont plus de suffixe de
+    version (bases de workers écrites avant migrate_versioned_ids)"""
+    arxiv_id, version = split_version(article.arxiv_id)
+    if version is None:
+        return article
+    link, pdf_link = article_links(arxiv_id)
+    return article._replace(arxiv_id=arxiv_id, version=article.version or version,
+                            link=link, pdf_link=pdf_link)
+
+
+def clean_text(text):
+    """Texte d'un élément sur une seule ligne"""
+    return text.strip().replace('\n', ' ') if text else ''
+
+
+def entry_to_article(entry):
+    """Construit un Article à partir d'un élément <entry>, en un seul passage sur ses enfants"""
+    entry_id = published = updated_at = None
+    title = abstract = ''
+    doi = journal_ref = comment = None
+    category = 'unknown'
+    authors = []
+    categories = []
+    
+    for child in entry:
+        tag = child.tag
+        if tag == TAG_ID:
+            entry_id = (child.text or '').strip()
+        elif tag == TAG_TITLE:
+            title = clean_text(child.text)
+        elif tag == TAG_SUMMARY:
+            abstract = clean_text(child.text)
+        elif tag == TAG_AUTHOR:
+            name = child.find(TAG_NAME)
+            if name is not None and name.text:
+                authors.append(name.text)
+        elif tag == TAG_PUBLISHED:
+            published = (child.text or '').strip()
+        elif tag == TAG_UPDATED:
+            updated_at = (child.text or '').strip()
+        elif tag == TAG_PRIMARY_CATEGORY:
+            category = child.get('term') or 'unknown'
+        elif tag == TAG_CATEGORY:
+            term = child.get('term')
+            if term and term not in categories:
+                categories.append(term)
+        elif tag == TAG_DOI:
+            doi = clean_text(child.text) or None
+        elif tag == TAG_JOURNAL_REF:
+            journal_ref = clean_text(child.text) or None
+        elif tag == TAG_COMMENT:
+            comment = clean_text(child.text) or None
+    
+    # Les erreurs de l'API arrivent sous forme d'entrée sans /abs/
+    if not entry_id or '/abs/' not in entry_id:
+        raise ValueError(f"identifiant invalide: {entry_id or title!r}")
+    if not published or not updated_at:
+        raise ValueError(f"dates manquantes pour {entry_id}")
+    
+    arxiv_id, version = split_version(entry_id.split('/abs/')[-1])
+    link, pdf_link = article_links(arxiv_id)
+    
+    return Article(
+        arxiv_id=arxiv_id,
+        title=title,
+        authors='; '.join(authors),
+        abstract=abstract,
+        category=category,
+        published=published[:10],
+        updated=updated_at[:10],
+        link=link,
+        pdf_link=pdf_link,
+        categories=' '.join(categories) or category,
+        doi=doi,
+        journal_ref=journal_ref,
+        comment=comment,
+        version=version,
+        updated_at=updated_at,
+    )
+
+
+def iter_articles(xml_data, stats=None):
+    """Parse un flux Atom en flux d'Article sans construire l'arbre complet.
+    
+    Chaque <entry> est libérée dès qu'elle est convertie: l'arbre ne garde
+    jamais plus d'une entrée, en plus du texte de la page (chargé en entier
+    par fetch_with_retry, qui le met en cache). Une entrée invalide est
+    comptée dans stats['bad_entries'] et journalisée, sans perdre le reste
+    de la page. Une page tronquée ou mal formée s'arrête à la dernière
+    entrée complète et l'erreur est notée dans stats['parse_error'].
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('entries', 0)
+    stats.setdefault('bad_entries', 0)
+    root = None
+    
+    try:
+        for event, elem in iter_xml_events(xml_data):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            
+            if elem.tag == TAG_TOTAL_RESULTS:
+                stats['total_results'] = int(elem.text)
+            elif elem.tag == TAG_ENTRY:
+                article = None
+                try:
+                    article = entry_to_article(elem)
+                    stats['entries'] += 1
+                except Exception as e:
+                    stats['bad_entries'] += 1
+                    print(f"   ⚠️  Entrée ignorée: {e}")
+                root.remove(elem)
+                if article is not None:
+                    yield article
+    except ET.ParseError as e:
+        # Page tronquée ou mal formée: on garde les entrées déjà lues
+        stats['parse_error'] = str(e)
+        print(f"   ❌ Erreur parsing XML: {e}")
+
+
+def parse_oai_date(value):
+    """Date d'une version arXivRaw ('Mon, 2 Apr 2007 19:18:42 GMT') en datetime UTC"""
+    return parsedate_to_datetime(value).astimezone(timezone.utc)
+
+
+def raw_record_to_article(record):
+    """Construit un Article à partir d'un élément <arXivRaw> (métadonnées OAI-PMH).
+    
+    L'identifiant est celui d'arXiv, sans suffixe de version comme ceux de
+    l'API de recherche (entry_to_article); version = numéro de la dernière
+    version, published = date de la v1, updated = date de la dernière
+    version. La catégorie principale est la première listée.
+    """
+    fields = {}
+    versions = []
+    for child in record:
+        tag = child.tag[len(RAW):] if child.tag.startswith(RAW) else child.tag
+        if tag == 'version':
+            date = child.find(RAW + 'date')
+            versions.append((child.get('version') or '', date.text if date is not None else None))
+        else:
+            fields[tag] = child.text
+    
+    base_id = (fields.get('id') or '').strip()
+    if not base_id or not versions or not all(date for _, date in versions):
+        raise ValueError(f"enregistrement incomplet: {base_id or fields.get('title')!r}")
+    
+    version = VERSION_RE.search(versions[-1][0])
+    version = int(version.group(1)) if version else len(versions)
+    arxiv_id = base_id
+    first = parse_oai_date(versions[0][1])
+    last = parse_oai_date(versions[-1][1])
+    categories = (fields.get('categories') or '').split()
+    authors = [name.strip() for name in RAW_AUTHORS_RE.split(clean_text(fields.get('authors')))]
+    link, pdf_link = article_links(arxiv_id)
+    
+    return Article(
+        arxiv_id=arxiv_id,
+        title=clean_text(fields.get('title')),
+        authors='; '.join(name for name in authors if name),
+        abstract=clean_text(fields.get('abstract')),
+        category=categories[0] if categories else 'unknown',
+        published=first.strftime('%Y-%m-%d'),
+        updated=last.strftime('%Y-%m-%d'),
+        link=link,
+        pdf_link=pdf_link,
+        categories=' '.join(categories) or 'unknown',
+        doi=clean_text(fields.get('doi')) or None,
+        journal_ref=clean_text(fields.get('journal-ref')) or None,
+        comment=clean_text(fields.get('comments')) or None,
+        version=version,
+        updated_at=last.strftime('%Y-%m-%dT%H:%M:%SZ'),
+    )
+
+
+def parse_oai_page(xml_data, categories=None, stats=None):
+    """Parse une page ListRecords: (articles, resumptionToken suivant, code d'erreur OAI).
+    
+    Même principe qu'iter_articles (chaque <record> est libéré après
+    conversion, un enregistrement invalide est compté sans perdre la page).
+    Avec `categories`, seuls les articles listés dans au moins une de ces
+    catégories (cross-lists comprises) sont gardés. Le jeton vaut None sur
+    la dernière page.
+    """
+    if stats is None:
+        stats = {}
+    for key in ('entries', 'bad_entries', 'deleted', 'skipped'):
+        stats.setdefault(key, 0)
+    articles = []
+    token = error = None
+    parent = None
+    
+    try:
+        for event, elem in iter_xml_events(xml_data):
+            if event == 'start':
+                if elem.tag == TAG_OAI_LIST:
+                    parent = elem
+                continue
+            
+            if elem.tag == TAG_OAI_HEADER and elem.get('status') == 'deleted':
+                stats['deleted'] += 1
+            elif elem.tag == TAG_RAW_RECORD:
+                try:
+                    article = raw_record_to_article(elem)
+                    stats['entries'] += 1
+                    if categories is None or not categories.isdisjoint(article.categories.split()):
+                        articles.append(article)
+                    else:
+                        stats['skipped'] += 1
+                except Exception as e:
+                    stats['bad_entries'] += 1
+                    print(f"   ⚠️  Enregistrement ignoré: {e}")
+            elif elem.tag == TAG_OAI_RECORD and parent is not None:
+                parent.remove(elem)
+            elif elem.tag == TAG_OAI_TOKEN:
+                token = (elem.text or '').strip() or None
+                if elem.get('completeListSize'):
+                    stats['complete_list_size'] = int(elem.get('completeListSize'))
+            elif elem.tag == TAG_OAI_ERROR:
+                error = elem.get('code') or 'unknown'
+    except ET.ParseError as e:
+        stats['parse_error'] = str(e)
+        print(f"   ❌ Erreur parsing XML: {e}")
+        error = error or 'parseError'
+    
+    return articles, token, error
+
+
+def ensure_columns(cursor, table, columns):
+    """Ajoute à une table existante les colonnes qui lui manquent"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    for column, column_type in columns:
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+
+def migrate_versioned_ids(conn):
+    """Retire le suffixe de version des identifiants d'une base écrite quand
+    articles était indexée par '2301.01234v2' (SCHEMA_VERSION 0).
+    
+    Pour chaque article, seule la version la plus récente (updated_at, puis
+    numéro de version) est gardée; les autres sont supprimées, et les
+    triggers mettent à jour stats, recherche plein texte et index des
+    voisins. Les anciens et nouveaux identifiants sont notés dans
+    article_changes: le prochain export réécrit les shards concernés.
+    Retourne le nombre d'articles renommés.
+    """
+    conn.create_function('arxiv_base', 1, lambda value: split_version(value)[0],
+                         deterministic=True)
+    conn.create_function('arxiv_version', 1, lambda value: split_version(value)[1],
+                         deterministic=True)
+    versioned = "arxiv_id IS NOT arxiv_base(arxiv_id)"
+    if not conn.execute(f"SELECT EXISTS (SELECT 1 FROM articles WHERE {versioned})").fetchone()[0]:
+        return 0
+    
+    conn.execute('''
+        DELETE FROM articles WHERE rowid IN (
+            SELECT rowid FROM (
+                SELECT rowid, ROW_NUMBER() OVER (
+                    PARTITION BY arxiv_base(arxiv_id)
+                    ORDER BY updated_at DESC, COALESCE(version, arxiv_version(arxiv_id)) DESC
+                ) AS rank
+                FROM articles
+            ) WHERE rank > 1
+        )
+    ''')
+    key = f"{SHARD_CATEGORY_SQL.format('articles')}, {SHARD_YEAR_SQL.format('articles')}"
+    for column in ('arxiv_id', 'arxiv_base(arxiv_id)'):
+        conn.execute(f'''
+            INSERT INTO article_changes (arxiv_id, shard_category, shard_year)
+            SELECT {column}, {key} FROM articles WHERE {versioned}
+        ''')
+    for table in ('article_authors', 'article_categories'):
+        conn.execute(f"UPDATE {table} SET arxiv_id = arxiv_base(arxiv_id) WHERE {versioned}")
+    return conn.execute(f'''
+        UPDATE articles SET
+            arxiv_id = arxiv_base(arxiv_id),
+            version = COALESCE(version, arxiv_version(arxiv_id)),
+            link = '{ABS_URL_PREFIX}' || arxiv_base(arxiv_id),
+            pdf_link = '{PDF_URL_PREFIX}' || arxiv_base(arxiv_id) || '.pdf'
+        WHERE {versioned}
+    ''').rowcount
+
+
+def init_fts(cursor):
+    """Crée la table FTS5 articles_fts (titre, résumé, auteurs) et ses triggers.
+    
+    La table est à contenu externe (content='articles'): elle ne stocke que
+    l'index, les triggers la tiennent à jour à chaque insertion, mise à
+    jour ou suppression dans articles. Une base existante est indexée au
+    moment où la table est créée. Retourne False si SQLite n'a pas FTS5.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'")
+    existed = cursor.fetchone() is not None
+    
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, abstract, authors,
+                content='articles', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"⚠️  FTS5 indisponible ({e}), la commande search est désactivée")
+        return False
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts(rowid, title, abstract, authors)
+            VALUES (new.rowid, new.title, new.abstract, new.authors);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts(articles_fts, rowid, title, abstract, authors)
+            VALUES ('delete', old.rowid, old.title, old.abstract, old.authors);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_update
+        AFTER UPDATE OF title, abstract, authors ON articles BEGIN
+            INSERT INTO articles_fts(articles_fts, rowid, title, abstract, authors)
+            VALUES ('delete', old.rowid, old.title, old.abstract, old.authors);
+            INSERT INTO articles_fts(rowid, title, abstract, authors)
+            VALUES (new.rowid, new.title, new.abstract, new.authors);
+        END
+    ''')
+    
+    if not existed:
+        cursor.execute("SELECT COUNT(*) FROM articles")
+        if cursor.fetchone()[0]:
+            print("🔎 Construction de l'index plein texte (une seule fois)...")
+            cursor.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+    return True
+
+
+# Clés (catégorie, année, mois) d'un article, en SQL, sur la ligne {0}
+# (new / old dans un trigger, articles dans une requête); les mêmes que
+# shard_key pour la catégorie et l'année
+SHARD_CATEGORY_SQL = "COALESCE(NULLIF({0}.category, ''), 'unknown')"
+SHARD_YEAR_SQL = "COALESCE(NULLIF(substr({0}.published, 1, 4), ''), '0000')"
+STATS_MONTH_SQL = "COALESCE(NULLIF(substr({0}.published, 6, 2), ''), '00')"
+
+
+def init_stats(cursor):
+    """Crée les tables de comptes agrégés et les triggers qui les tiennent à jour.
+    
+    stats_by_month compte les articles par (catégorie, année, mois),
+    stats_by_category_year (une vue) par (catégorie, année), et
+    stats_cross_lists les articles listés dans chaque catégorie, cross-lists
+    comprises (table article_categories). Chaque insertion, modification de
+    catégorie ou de date, ou suppression ajuste un compteur: les statistiques
+    se lisent sans parcourir les articles. Les tables sont remplies au moment
+    où elles sont créées (rebuild_stats).
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_by_month'")
+    existed = cursor.fetchone() is not None
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_by_month (
+            category TEXT,
+            year TEXT,
+            month TEXT,
+            articles INTEGER,
+            PRIMARY KEY (category, year, month)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE VIEW IF NOT EXISTS stats_by_category_year AS
+        SELECT category, year, SUM(articles) AS articles
+        FROM stats_by_month GROUP BY category, year
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_cross_lists (
+            category TEXT PRIMARY KEY,
+            articles INTEGER,
+            primary_articles INTEGER
+        ) WITHOUT ROWID
+    ''')
+    
+    def key(row):
+        return ', '.join(sql.format(row) for sql in
+                         (SHARD_CATEGORY_SQL, SHARD_YEAR_SQL, STATS_MONTH_SQL))
+    
+    # Un compteur qui retombe à zéro disparaît
+    add_new = f'''
+        INSERT INTO stats_by_month (category, year, month, articles) VALUES ({key('new')}, 1)
+        ON CONFLICT (category, year, month) DO UPDATE SET articles = articles + 1;
+    '''
+    remove_old = f'''
+        UPDATE stats_by_month SET articles = articles - 1
+        WHERE (category, year, month) = ({key('old')});
+        DELETE FROM stats_by_month
+        WHERE (category, year, month) = ({key('old')}) AND articles <= 0;
+    '''
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS articles_stats_insert AFTER INSERT ON articles BEGIN
+            {add_new}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS articles_stats_update
+        AFTER UPDATE OF category, published ON articles
+        WHEN ({key('old')}) IS NOT ({key('new')}) BEGIN
+            {remove_old}
+            {add_new}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS articles_stats_delete AFTER DELETE ON articles BEGIN
+            {remove_old}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS article_categories_stats_insert
+        AFTER INSERT ON article_categories BEGIN
+            INSERT INTO stats_cross_lists (category, articles, primary_articles)
+            VALUES (new.category, 1, new.is_primary)
+            ON CONFLICT (category) DO UPDATE SET
+                articles = articles + 1,
+                primary_articles = primary_articles + new.is_primary;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS article_categories_stats_delete
+        AFTER DELETE ON article_categories BEGIN
+            UPDATE stats_cross_lists SET
+                articles = articles - 1,
+                primary_articles = primary_articles - old.is_primary
+            WHERE category = old.category;
+            DELETE FROM stats_cross_lists WHERE category = old.category AND articles <= 0;
+        END
+    ''')
+    
+    if not existed:
+        cursor.execute("SELECT COUNT(*) FROM articles")
+        if cursor.fetchone()[0]:
+            print("📊 Calcul des statistiques agrégées (une seule fois)...")
+            rebuild_stats(cursor)
+
+
+def rebuild_stats(cursor):
+    """Recalcule stats_by_month et stats_cross_lists depuis les articles.
+    
+    Les triggers les tiennent à jour; à relancer seulement si les tables ont
+    été modifiées à la main ou si une base a été écrite par un outil qui
+    ne les connaît pas. Retourne le nombre d'articles comptés.
+    """
+    cursor.execute("DELETE FROM stats_by_month")
+    cursor.execute(f'''
+        INSERT INTO stats_by_month (category, year, month, articles)
+        SELECT {SHARD_CATEGORY_SQL.format('articles')}, {SHARD_YEAR_SQL.format('articles')},
+               {STATS_MONTH_SQL.format('articles')}, COUNT(*)
+        FROM articles GROUP BY 1, 2, 3
+    ''')
+    cursor.execute("DELETE FROM stats_cross_lists")
+    cursor.execute('''
+        INSERT INTO stats_cross_lists (category, articles, primary_articles)
+        SELECT category, COUNT(*), SUM(is_primary) FROM article_categories GROUP BY category
+    ''')
+    return cursor.execute("SELECT COALESCE(SUM(articles), 0) FROM stats_by_month").fetchone()[0]
+
+
+def collection_stats(conn):
+    """Comptes de la collection, lus dans les tables de stats (init_stats).
+    
+    Le coût dépend du nombre de (catégorie, année, mois), pas du nombre
+    d'articles. Une base qui n'a pas encore ces tables (ouverte en lecture
+    seule avant toute mise à jour) est comptée en parcourant les articles.
+    
+    Retourne {total, categories, years, months, category_years, cross_lists}:
+    categories par nombre d'articles décroissant, years ('0000' = sans date)
+    et months ('AAAA-MM') dans l'ordre, category_years {catégorie: {année: n}},
+    cross_lists {catégorie: [articles listés, dont cross-lists]}.
+    """
+    exists = conn.execute('''
+        SELECT COUNT(*) FROM sqlite_master
+        WHERE type = 'table' AND name IN ('stats_by_month', 'stats_cross_lists')
+    ''').fetchone()[0] == 2
+    if exists:
+        by_month = "stats_by_month"
+        cross_lists = "stats_cross_lists"
+    else:
+        by_month = f'''(
+            SELECT {SHARD_CATEGORY_SQL.format('articles')} AS category,
+                   {SHARD_YEAR_SQL.format('articles')} AS year,
+                   {STATS_MONTH_SQL.format('articles')} AS month, COUNT(*) AS articles
+            FROM articles GROUP BY 1, 2, 3
+        )'''
+        cross_lists = '''(
+            SELECT category, COUNT(*) AS articles, SUM(is_primary) AS primary_articles
+            FROM article_categories GROUP BY category
+        )'''
+    
+    total = 0
+    categories = {}
+    years = {}
+    months = {}
+    category_years = {}
+    for category, year, month, count in conn.execute(f'''
+        SELECT category, year, month, articles FROM {by_month}
+        WHERE articles > 0 ORDER BY year, month
+    '''):
+        total += count
+        categories[category] = categories.get(category, 0) + count
+        years[year] = years.get(year, 0) + count
+        months[f"{year}-{month}"] = months.get(f"{year}-{month}", 0) + count
+        per_year = category_years.setdefault(category, {})
+        per_year[year] = per_year.get(year, 0) + count
+    
+    try:
+        listed = conn.execute(f'''
+            SELECT category, articles, articles - primary_articles FROM {cross_lists}
+            WHERE articles > 0 ORDER BY articles DESC
+        ''').fetchall()
+    except sqlite3.OperationalError:
+        listed = []  # base antérieure à article_categories
+    
+    return {
+        'total': total,
+        'categories': dict(sorted(categories.items(), key=lambda item: item[1], reverse=True)),
+        'years': years,
+        'months': months,
+        'category_years': category_years,
+        'cross_lists': {category: [count, cross] for category, count, cross in listed},
+    }
+
+
+def date_bound(value, end=False):
+    """'2020' / '2020-05' / '2020-05-17' -> borne comparable à published (YYYY-MM-DD)"""
+    if not re.fullmatch(r'\d{4}(-\d{2}(-\d{2})?)?', value):
+        raise ValueError(f"date invalide: {value} (attendu: AAAA, AAAA-MM ou AAAA-MM-JJ)")
+    if len(value) == 10:
+        return value
+    # Complète avec le début ou la fin de l'année / du mois ('-31' convient
+    # à tous les mois pour une comparaison de chaînes)
+    suffix = '-12-31' if end else '-01-01'
+    return value + suffix[len(value) - 4:]
+
+
+class BrotliSink:
+    """Fichier texte compressé en brotli au fil de l'eau"""
+    
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.compressor = brotli.Compressor(quality=9)
+    
+    def write(self, text):
+        self.file.write(self.compressor.process(text.encode('utf-8')))
+    
+    def close(self):
+        self.file.write(self.compressor.finish())
+        self.file.close()
+
+
+def export_article_record(row):
+    """Ligne SQL -> objet JSON attendu par le site web"""
+    return {
+        'id': row[0],
+        'title': row[1],
+        'authors': row[2] if row[2] else 'Unknown',
+        'abstract': row[3] if row[3] else '',
+        'category': row[4],
+        'published': row[5][:10] if row[5] else None,
+        'link': row[6],
+        'pdf': row[7]
+    }
+
+
+def stream_articles_json(db_path, output_path, compress=(), chunk_size=EXPORT_CHUNK_SIZE,
+                         columnar_path=None):
+    """Exporte la table articles en JSON sans charger tout le corpus en mémoire.
+    
+    Le curseur est lu par morceaux et chaque article est écrit sur sa propre
+    ligne (JSON compact, sans indentation). Les comptes par catégorie et par
+    année (sans les articles non datés) viennent des tables de stats, lues
+    dans la même transaction que les articles. compress peut contenir 'gzip'
+    et/ou 'brotli' pour écrire aussi output_path.gz / output_path.br, et
+    columnar_path reçoit le même export en colonnes (ColumnarWriter).
+    
+    Retourne (total, {catégorie: n}, {année: n}).
+    """
+    sinks = [open(output_path, 'w', encoding='utf-8')]
+    if 'gzip' in compress:
+        sinks.append(gzip.open(f"{output_path}.gz", 'wt', encoding='utf-8', compresslevel=9))
+    if 'brotli' in compress:
+        if brotli is None:
+            print("⚠️  Module brotli non installé, pas de sortie .br")
+        else:
+            sinks.append(BrotliSink(f"{output_path}.br"))
+    columnar = ColumnarWriter(columnar_path) if columnar_path else None
+    
+    conn = sqlite3.connect(db_path)
+    # Un seul instantané pour les comptes et les articles
+    conn.execute("BEGIN")
+    stats = collection_stats(conn)
+    categories = stats['categories']
+    years = {year: count for year, count in stats['years'].items() if year != '0000'}
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT arxiv_id, title, authors, abstract, category, published, link, pdf_link
+        FROM articles 
+        ORDER BY published DESC
+    """)
+    
+    total = 0
+    
+    try:
+        for sink in sinks:
+            sink.write('[')
+        
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            
+            lines = []
+            for row in rows:
+                record = export_article_record(row)
+                lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+                if columnar is not None:
+                    columnar.add(record)
+            
+            chunk = ('\n' if total == 0 else ',\n') + ',\n'.join(lines)
+            for sink in sinks:
+                sink.write(chunk)
+            total += len(rows)
+        
+        for sink in sinks:
+            sink.write('\n]\n')
+        if columnar is not None:
+            columnar.close()
+    finally:
+        for sink in sinks:
+            sink.close()
+        conn.close()
+    
+    return total, categories, years
+
+
+class ColumnarWriter:
+    """Export en colonnes binaire, écrit en un seul passage.
+    
+    Format (petit-boutiste):
+      - COLUMNAR_MAGIC, version (uint32), taille de l'en-tête (uint32)
+      - en-tête JSON: nombre d'articles, liste des catégories, et pour chaque
+        colonne son dtype NumPy, son offset (depuis le début des colonnes,
+        juste après l'en-tête aligné sur 8 octets) et son nombre d'éléments
+      - les colonnes, chacune alignée sur 8 octets:
+        id, title, abstract: tables de chaînes UTF-8, <nom>_offsets (uint32,
+          n + 1 valeurs) et <nom>_data (octets)
+        category: uint16, indice dans la liste des catégories (null comprise)
+        published: int32, jours depuis le 1970-01-01 (COLUMNAR_DATE_MISSING
+          si absent)
+        author_names: table de chaînes des noms distincts; author_offsets
+          (uint32, n + 1) délimite les author_ids (uint32) de chaque article
+    
+    link et pdf ne sont pas stockés, ils se déduisent de l'id. Pendant
+    l'export, les chaînes vont dans des fichiers temporaires: seuls les
+    offsets et les codes restent en mémoire.
+    """
+    
+    STRING_COLUMNS = ('id', 'title', 'abstract', 'author_names')
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.count = 0
+        self.categories = {}  # catégorie -> code
+        self.author_codes = {}  # nom -> indice dans author_names
+        self.offsets = {name: array('I', [0]) for name in self.STRING_COLUMNS}
+        self.data = {name: tempfile.TemporaryFile() for name in self.STRING_COLUMNS}
+        self.category = array('H')
+        self.published = array('i')
+        self.author_offsets = array('I', [0])
+        self.author_ids = array('I')
+    
+    def _append_string(self, name, text):
+        encoded = text.encode('utf-8')
+        self.data[name].write(encoded)
+        offsets = self.offsets[name]
+        # OverflowError au-delà de 4 GB par colonne
+        offsets.append(offsets[-1] + len(encoded))
+    
+    def add(self, record):
+        """Ajoute un article (dict produit par export_article_record)"""
+        self._append_string('id', record['id'])
+        self._append_string('title', record['title'] or '')
+        self._append_string('abstract', record['abstract'])
+        self.category.append(self.categories.setdefault(record['category'], len(self.categories)))
+        try:
+            self.published.append(datetime.fromisoformat(record['published']).toordinal()
+                                  - COLUMNAR_EPOCH.toordinal())
+        except (TypeError, ValueError):
+            self.published.append(COLUMNAR_DATE_MISSING)
+        for name in split_authors(record['authors']):
+            code = self.author_codes.get(name)
+            if code is None:
+                code = self.author_codes[name] = len(self.author_codes)
+                self._append_string('author_names', name)
+            self.author_ids.append(code)
+        self.author_offsets.append(len(self.author_ids))
+        self.count += 1
+    
+    def close(self):
+        """Écrit le fichier (de façon atomique) et supprime les temporaires"""
+        columns = []
+        for name in self.STRING_COLUMNS:
+            columns += [(f'{name}_offsets', self.offsets[name]), (f'{name}_data', self.data[name])]
+        columns += [('category', self.category), ('published', self.published),
+                    ('author_offsets', self.author_offsets), ('author_ids', self.author_ids)]
+        
+        specs = {}
+        offset = 0
+        for name, values in columns:
+            if isinstance(values, array):
+                dtype, count, size = COLUMNAR_DTYPES[values.typecode], len(values), len(values) * values.itemsize
+            else:
+                dtype, count = '|u1', values.tell()
+                size = count
+            specs[name] = {'dtype': dtype, 'offset': offset, 'count': count}
+            offset += -(-size // 8) * 8
+        header = json.dumps({
+            'count': self.count,
+            'categories': list(self.categories),
+            'date_epoch': COLUMNAR_EPOCH.date().isoformat(),
+            'date_missing': COLUMNAR_DATE_MISSING,
+            'columns': specs,
+        }, separators=(',', ':')).encode('utf-8')
+        
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(struct.pack('<4sII', COLUMNAR_MAGIC, COLUMNAR_VERSION, len(header)))
+                f.write(header)
+                for name, values in columns:
+                    f.write(b'\0' * (-f.tell() % 8))
+                    if isinstance(values, array):
+                        if sys.byteorder == 'big':
+                            values = array(values.typecode, values)
+                            values.byteswap()
+                        values.tofile(f)
+                    else:
+                        values.seek(0)
+                        shutil.copyfileobj(values, f)
+                f.write(b'\0' * (-f.tell() % 8))
+            os.replace(tmp_path, self.path)
+        finally:
+            for data in self.data.values():
+                data.close()
+
+
+class ColumnarArticles:
+    """Lecture d'un export en colonnes (ColumnarWriter) par mmap, sans parsing.
+    
+    columns[nom] est un tableau NumPy si NumPy est installé, sinon une
+    memoryview typée; dans les deux cas elle pointe directement dans le
+    fichier, rien n'est copié avant d'être lu.
+    """
+    
+    def __init__(self, path):
+        self.columns = {}
+        self.file = open(path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size = struct.unpack_from('<4sII', self.buffer)
+        if magic != COLUMNAR_MAGIC or version != COLUMNAR_VERSION:
+            self.close()
+            raise ValueError(f"{path}: pas un export en colonnes version {COLUMNAR_VERSION}")
+        self.header = json.loads(self.buffer[12:12 + header_size])
+        self.count = self.header['count']
+        self.categories = self.header['categories']
+        
+        base = -(-(12 + header_size) // 8) * 8
+        self.offsets = {}  # colonne -> position absolue dans le fichier
+        for name, spec in self.header['columns'].items():
+            self.offsets[name] = base + spec['offset']
+            if np is not None:
+                self.columns[name] = np.frombuffer(self.buffer, dtype=spec['dtype'],
+                                                   count=spec['count'], offset=self.offsets[name])
+            else:
+                typecode = COLUMNAR_TYPECODES[spec['dtype']]
+                if sys.byteorder == 'big' and typecode != 'B':
+                    raise ValueError("lecture sans NumPy: machine petit-boutiste requise")
+                size = spec['count'] * struct.calcsize(typecode)
+                view = memoryview(self.buffer)[self.offsets[name]:self.offsets[name] + size]
+                self.columns[name] = view.cast(typecode)
+    
+    def __len__(self):
+        return self.count
+    
+    def string(self, column, i):
+        """i-ème chaîne d'une table de chaînes (id, title, abstract, author_names)"""
+        offsets = self.columns[f'{column}_offsets']
+        data = self.offsets[f'{column}_data']
+        return self.buffer[data + int(offsets[i]):data + int(offsets[i + 1])].decode('utf-8')
+    
+    def authors(self, i):
+        """Liste des auteurs du i-ème article"""
+        offsets = self.columns['author_offsets']
+        ids = self.columns['author_ids']
+        return [self.string('author_names', int(ids[k]))
+                for k in range(int(offsets[i]), int(offsets[i + 1]))]
+    
+    def published(self, i):
+        """Date 'AAAA-MM-JJ' du i-ème article, ou None"""
+        days = int(self.columns['published'][i])
+        if days == COLUMNAR_DATE_MISSING:
+            return None
+        return (COLUMNAR_EPOCH + timedelta(days=days)).strftime('%Y-%m-%d')
+    
+    def article(self, i):
+        """i-ème article, sous la même forme que export_article_record"""
+        arxiv_id = self.string('id', i)
+        link, pdf_link = article_links(arxiv_id)
+        return {
+            'id': arxiv_id,
+            'title': self.string('title', i),
+            'authors': '; '.join(self.authors(i)),
+            'abstract': self.string('abstract', i),
+            'category': self.categories[self.columns['category'][i]],
+            'published': self.published(i),
+            'link': link,
+            'pdf': pdf_link,
+        }
+    
+    def close(self):
+        """Libère les vues puis le mmap (qui refuse de fermer tant qu'une vue existe)"""
+        columns, self.columns = self.columns, {}
+        for name in columns:
+            if isinstance(columns[name], memoryview):
+                columns[name].release()
+        columns.clear()
+        self.buffer.close()
+        self.file.close()
+
+
+def write_json_file(path, data):
+    """Écrit un fichier JSON compact de façon atomique (fichier temporaire + rename).
+    
+    Retourne l'empreinte du contenu écrit (CONTENT_HASH_LENGTH caractères).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    return hashlib.sha256(body).hexdigest()[:CONTENT_HASH_LENGTH]
+
+
+def fold_text(text):
+    """Minuscules, sans accents (décomposition NFKD)"""
+    return COMBINING_RE.sub('', unicodedata.normalize('NFKD', text or '')).lower()
+
+
+def split_authors(authors):
+    """'A; B; C' -> ['A', 'B', 'C']"""
+    return [name.strip() for name in (authors or '').split(';') if name.strip()]
+
+
+def normalize_author(name):
+    """Clé de comparaison d'un nom: 'J.-P. Sérre' -> 'j p serre'"""
+    return ' '.join(TOKEN_RE.findall(fold_text(name)))
+
+
+def tokenize(text):
+    """Découpe un texte en termes d'index (minuscules, sans accents ni mots vides)"""
+    return [token for token in TOKEN_RE.findall(fold_text(text))
+            if len(token) >= INDEX_MIN_TOKEN_LENGTH and token not in INDEX_STOPWORDS]
+
+
+class SearchIndexBuilder:
+    """Index inversé (terme -> articles) construit pendant l'export découpé.
+    
+    Les articles sont numérotés dans l'ordre d'écriture des shards, donc
+    chaque liste de postings est déjà triée: elle est stockée en deltas
+    (écart avec l'article précédent), combinés au poids du terme dans
+    l'article (occurrences dans le titre, les auteurs et le résumé).
+    """
+    
+    def __init__(self):
+        self.postings = {}  # terme -> array de postings (numéro d'article + poids)
+        self.doc_count = 0
+    
+    def add(self, doc, title, authors, abstract):
+        """Indexe l'article numéro doc (numéros croissants)"""
+        weights = {}
+        for field, text in (('title', title), ('authors', authors), ('abstract', abstract)):
+            field_weight = INDEX_FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0) + field_weight
+        
+        max_weight = (1 << INDEX_WEIGHT_BITS) - 1
+        for token, weight in weights.items():
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = array('Q')
+            postings.append((doc << INDEX_WEIGHT_BITS) | min(weight, max_weight))
+        self.doc_count = max(self.doc_count, doc + 1)
+    
+    def write(self, output_dir, prefix='index'):
+        """Écrit <prefix>/<n>.json et retourne la description pour le manifest"""
+        files = []
+        block = {}
+        block_bytes = 0
+        
+        def flush():
+            file = f"{prefix}/{len(files)}.json"
+            content_hash = write_json_file(Path(output_dir) / file, block)
+            files.append({'file': file, 'first': next(iter(block)), 'hash': content_hash})
+        
+        weight_mask = (1 << INDEX_WEIGHT_BITS) - 1
+        for term in sorted(self.postings):
+            # Les poids sont dans les bits de poids faible: la différence de
+            # deux postings donne le delta décalé, on remet le poids courant
+            previous = 0
+            encoded = []
+            for posting in self.postings[term]:
+                encoded.append((posting & ~weight_mask) - (previous & ~weight_mask)
+                               | (posting & weight_mask))
+                previous = posting
+            block[term] = encoded
+            # Estimation grossière de la taille JSON (chiffres + séparateurs)
+            block_bytes += len(term) + 4 * len(encoded)
+            if block_bytes >= INDEX_SHARD_BYTES:
+                flush()
+                block = {}
+                block_bytes = 0
+        if block:
+            flush()
+        
+        return {
+            'docs': self.doc_count,
+            'terms': len(self.postings),
+            'min_token_length': INDEX_MIN_TOKEN_LENGTH,
+            'weight_bits': INDEX_WEIGHT_BITS,
+            'stopwords': sorted(INDEX_STOPWORDS),
+            'files': files,
+        }
+
+
+class WordHashes(dict):
+    """mot -> crc32, calculé à la première rencontre"""
+    
+    def __missing__(self, word):
+        value = self[word] = zlib.crc32(word.encode('utf-8'))
+        return value
+
+
+class MinHasher:
+    """Signatures MinHash et clés LSH des articles.
+    
+    Chaque mot (tokenize) est haché par crc32, chaque suite de
+    SIMILAR_SHINGLE_WORDS mots (la fin complétée par des zéros: un shingle
+    par mot) combinée en un entier x de 64 bits. La i-ème valeur de la
+    signature est le minimum sur les x de l'article de
+    ((a_i * x + b_i) mod 2**64) >> 32 (hachage multiply-shift: une
+    permutation aléatoire par i). Avec NumPy, un lot d'articles est calculé
+    d'un bloc en tableaux; sinon en Python pur, au bit près identique:
+    l'index ne dépend pas de l'installation.
+    """
+    
+    MASK = 2 ** 64 - 1
+    COMBINE = 0x9E3779B97F4A7C15  # impair: combinaison des mots et des bandes
+    ROWS_PER_BLOCK = 8  # permutations calculées ensemble (mémoire du lot NumPy)
+    WORD_CACHE_SIZE = 500000
+    
+    def __init__(self, hashes=SIMILAR_HASHES, seed=SIMILAR_SEED):
+        rng = random.Random(seed)
+        self.hashes = hashes
+        self.a = [rng.getrandbits(64) | 1 for _ in range(hashes)]
+        self.b = [rng.getrandbits(64) for _ in range(hashes)]
+        self.band_salts = [rng.getrandbits(64) for _ in range(SIMILAR_BANDS)]
+        self.word_hashes = WordHashes()
+    
+    def words(self, title, abstract):
+        """crc32 des mots du titre et du résumé"""
+        if len(self.word_hashes) > self.WORD_CACHE_SIZE:
+            self.word_hashes.clear()
+        return list(map(self.word_hashes.__getitem__, tokenize(f"{title or ''} {abstract or ''}")))
+    
+    def shingles(self, words):
+        """Entiers de 64 bits des suites de mots: (((w1 * C + w2) * C + ...) + wk)
+        mod 2**64, un par mot (les derniers complétés par des zéros)"""
+        padded = words + [0] * (SIMILAR_SHINGLE_WORDS - 1)
+        shingles = words
+        for offset in range(1, SIMILAR_SHINGLE_WORDS):
+            shingles = [(x * self.COMBINE + word) & self.MASK
+                        for x, word in zip(shingles, padded[offset:])]
+        return shingles
+    
+    def signatures(self, articles):
+        """[(titre, résumé)] -> signatures (SIMILAR_HASHES uint32 petit-boutistes,
+        b'' pour un article sans mots)"""
+        word_lists = [self.words(title, abstract) for title, abstract in articles]
+        signatures = [b''] * len(word_lists)
+        filled = [i for i, words in enumerate(word_lists) if words]
+        if not filled:
+            return signatures
+        
+        if np is None:
+            for i in filled:
+                shingles = self.shingles(word_lists[i])
+                values = array('I', [min(((a * x + b) & self.MASK) >> 32 for x in shingles)
+                                     for a, b in zip(self.a, self.b)])
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                signatures[i] = values.tobytes()
+            return signatures
+        
+        # Mots de tout le lot bout à bout, chaque article suivi de ses zéros
+        padding = [0] * (SIMILAR_SHINGLE_WORDS - 1)
+        flat = []
+        bounds = []  # [début, fin) des shingles de chaque article
+        for i in filled:
+            bounds += [len(flat), len(flat) + len(word_lists[i])]
+            flat += word_lists[i]
+            flat += padding
+        words = np.array(flat, dtype=np.uint64)
+        # Multiplications modulo 2**64: les uint64 débordent sans erreur
+        combine = np.uint64(self.COMBINE)
+        x = words[:len(words) - len(padding)].copy()
+        for offset in range(1, SIMILAR_SHINGLE_WORDS):
+            x = x * combine + words[offset:offset + len(x)]
+        # Un élément de plus: la fin du dernier article est un indice valide
+        x = np.append(x, np.uint64(0))
+        
+        a = np.array(self.a, dtype=np.uint64)[:, None]
+        b = np.array(self.b, dtype=np.uint64)[:, None]
+        blocks = []
+        for i in range(0, self.hashes, self.ROWS_PER_BLOCK):
+            values = a[i:i + self.ROWS_PER_BLOCK] * x
+            values += b[i:i + self.ROWS_PER_BLOCK]
+            values >>= np.uint64(32)
+            # Minimum sur [début, fin) de chaque article (une colonne sur deux)
+            blocks.append(np.minimum.reduceat(values, bounds, axis=1)[:, ::2])
+        matrix = np.vstack(blocks).T.astype('<u4')
+        for i, row in zip(filled, matrix):
+            signatures[i] = row.tobytes()
+        return signatures
+    
+    @staticmethod
+    def values(signature):
+        values = array('I', signature)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+    
+    def bucket_keys(self, signature):
+        """Une clé (entier signé de 64 bits) par bande de la signature"""
+        if not signature:
+            return []
+        values = self.values(signature)
+        keys = []
+        for band, key in enumerate(self.band_salts):
+            for value in values[band * SIMILAR_BAND_ROWS:(band + 1) * SIMILAR_BAND_ROWS]:
+                key = (key * self.COMBINE + value) & self.MASK
+            keys.append(key - 2 ** 64 if key >= 2 ** 63 else key)
+        return keys
+    
+    def similarities(self, signature, others):
+        """Similarité de Jaccard estimée (part des valeurs égales) entre
+        signature et chacune des signatures de others"""
+        if not others:
+            return []
+        if np is not None:
+            matrix = np.frombuffer(b''.join(others), dtype='<u4').reshape(len(others), self.hashes)
+            return (matrix == np.frombuffer(signature, dtype='<u4')).mean(axis=1).tolist()
+        values = self.values(signature)
+        return [sum(x == y for x, y in zip(values, self.values(other))) / self.hashes
+                for other in others]
+
+
+def init_similar(cursor):
+    """Crée les tables de l'index des articles voisins (SimilarIndex).
+    
+    Elles restent vides tant que index-similar n'a pas été lancé. Les
+    triggers marquent périmée (stale) la signature d'un article dont le
+    titre ou le résumé change, ou qui est supprimé.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS similar_signatures (
+            doc INTEGER PRIMARY KEY,
+            signature BLOB,
+            stale INTEGER DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS similar_buckets (
+            bucket INTEGER,
+            doc INTEGER,
+            PRIMARY KEY (bucket, doc)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_similar_stale
+        ON similar_signatures(doc) WHERE stale = 1
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_similar_update
+        AFTER UPDATE OF title, abstract ON articles
+        WHEN old.title IS NOT new.title OR old.abstract IS NOT new.abstract BEGIN
+            UPDATE similar_signatures SET stale = 1 WHERE doc = new.rowid;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_similar_delete AFTER DELETE ON articles BEGIN
+            UPDATE similar_signatures SET stale = 1 WHERE doc = old.rowid;
+        END
+    ''')
+
+
+class SimilarIndex:
+    """Index des articles voisins: signatures MinHash et buckets LSH en SQLite.
+    
+    similar_signatures garde la signature de chaque article (par rowid),
+    similar_buckets une ligne par (bande, article): les articles qui
+    partagent une bande avec un autre sont ses candidats, classés ensuite
+    par similarité estimée sur la signature entière. Aucune comparaison
+    deux à deux: une requête lit SIMILAR_BANDS buckets et au plus
+    SIMILAR_CANDIDATES signatures, quelle que soit la taille de la base.
+    
+    Les écritures (clear, remove_stale, add) se font dans la transaction de
+    l'appelant (ArticleWriter.index_similar).
+    """
+    
+    QUERY_BLOCK = 128  # articles classés ensemble par related_many (mémoire des paires)
+    COUNT_CELLS = 1 << 22  # grille article x document au-delà de laquelle on trie
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.hasher = MinHasher()
+    
+    def clear(self):
+        self.conn.execute("DELETE FROM similar_buckets")
+        self.conn.execute("DELETE FROM similar_signatures")
+    
+    def remove_stale(self, limit=SIMILAR_BATCH):
+        """Retire un lot de signatures périmées et leurs buckets; retourne
+        leur nombre (l'article, s'il existe encore, sera réindexé)"""
+        rows = self.conn.execute('''
+            SELECT doc, signature FROM similar_signatures WHERE stale = 1 LIMIT ?
+        ''', (limit,)).fetchall()
+        self.conn.executemany("DELETE FROM similar_buckets WHERE bucket = ? AND doc = ?",
+                              [(key, doc) for doc, signature in rows
+                               for key in self.hasher.bucket_keys(signature)])
+        self.conn.executemany("DELETE FROM similar_signatures WHERE doc = ?",
+                              [(doc,) for doc, signature in rows])
+        return len(rows)
+    
+    def missing(self, after=0, limit=SIMILAR_BATCH):
+        """Prochain lot d'articles sans signature: [(rowid, titre, résumé)]"""
+        return self.conn.execute('''
+            SELECT rowid, title, abstract FROM articles
+            WHERE rowid > ?
+              AND NOT EXISTS (SELECT 1 FROM similar_signatures WHERE doc = articles.rowid)
+            ORDER BY rowid
+            LIMIT ?
+        ''', (after, limit)).fetchall()
+    
+    def add(self, docs, signatures):
+        """Enregistre les signatures d'articles (rowid) et leurs buckets"""
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO similar_signatures (doc, signature, stale) VALUES (?, ?, 0)
+        ''', zip(docs, signatures))
+        # Dans l'ordre de la clé primaire: insertions groupées par page
+        self.conn.executemany("INSERT OR IGNORE INTO similar_buckets (bucket, doc) VALUES (?, ?)",
+                              sorted((key, doc) for doc, signature in zip(docs, signatures)
+                                     for key in self.hasher.bucket_keys(signature)))
+    
+    def similar(self, signature, exclude, limit):
+        """[(rowid, similarité)] des articles les plus proches d'une signature"""
+        keys = self.hasher.bucket_keys(signature)
+        if not keys:
+            return []
+        buckets = ' UNION ALL '.join(
+            ["SELECT doc FROM (SELECT doc FROM similar_buckets WHERE bucket = ? LIMIT ?)"] * len(keys))
+        rows = self.conn.execute(f'''
+            SELECT candidate.doc, s.signature
+            FROM (SELECT doc, COUNT(*) AS bands FROM ({buckets})
+                  WHERE doc != ?
+                  GROUP BY doc ORDER BY bands DESC, doc LIMIT ?) AS candidate
+            JOIN similar_signatures s ON s.doc = candidate.doc AND s.stale = 0
+        ''', [value for key in keys for value in (key, SIMILAR_BUCKET_LIMIT)]
+             + [exclude, SIMILAR_CANDIDATES]).fetchall()
+        return self.rank(signature, rows, limit)
+    
+    def rank(self, signature, others, limit):
+        """[(rowid, similarité)] des limit meilleurs candidats others
+        [(rowid, signature)] au-dessus de SIMILAR_MIN_SCORE"""
+        scores = self.hasher.similarities(signature, [other[1] for other in others])
+        ranked = heapq.nsmallest(limit, ((-score, other[0]) for other, score in zip(others, scores)
+                                         if score >= SIMILAR_MIN_SCORE))
+        return [(doc, -score) for score, doc in ranked]
+    
+    def related(self, arxiv_id, limit=SIMILAR_RELATED_LIMIT):
+        """Articles voisins d'un article: [(similarité, arxiv_id, titre,
+        catégorie, published)] par similarité décroissante, None si
+        l'article n'existe pas. Un article pas encore indexé est comparé
+        avec sa signature calculée à la volée."""
+        row = self.conn.execute('''
+            SELECT articles.rowid, title, abstract, signature FROM articles
+            LEFT JOIN similar_signatures ON doc = articles.rowid AND stale = 0
+            WHERE arxiv_id = ?
+        ''', (arxiv_id,)).fetchone()
+        if row is None:
+            return None
+        doc, title, abstract, signature = row
+        if signature is None:
+            signature = self.hasher.signatures([(title, abstract)])[0]
+        
+        scored = self.similar(signature, doc, limit)
+        if not scored:
+            return []
+        details = {row[0]: row[1:] for row in self.conn.execute(f'''
+            SELECT rowid, arxiv_id, title, category, published FROM articles
+            WHERE rowid IN ({', '.join('?' * len(scored))})
+        ''', [doc for doc, score in scored])}
+        return [(score,) + details[doc] for doc, score in scored if doc in details]
+    
+    def related_many(self, arxiv_ids, limit=SIMILAR_EXPORT_LIMIT):
+        """Voisins d'une liste d'articles (un shard de l'export): [[(similarité,
+        arxiv_id)], ...] alignés sur arxiv_ids, [] pour un article inconnu.
+        
+        Même résultat que related() article par article, mais en requêtes
+        groupées (SQL_IN_CHUNK valeurs): signatures des articles, buckets de
+        toutes leurs bandes, signatures des candidats. Les candidats sont
+        comptés et classés en mémoire; avec NumPy, par blocs de
+        QUERY_BLOCK articles en tableaux (paires article x candidat).
+        """
+        rows = {}
+        for start in range(0, len(arxiv_ids), SQL_IN_CHUNK):
+            chunk = arxiv_ids[start:start + SQL_IN_CHUNK]
+            for arxiv_id, *row in self.conn.execute(f'''
+                SELECT arxiv_id, articles.rowid, title, abstract, signature FROM articles
+                LEFT JOIN similar_signatures ON doc = articles.rowid AND stale = 0
+                WHERE arxiv_id IN ({', '.join('?' * len(chunk))})
+            ''', chunk):
+                rows[arxiv_id] = row
+        unsigned = [row for row in rows.values() if row[3] is None]
+        for row, signature in zip(unsigned, self.hasher.signatures(
+                [(title, abstract) for doc, title, abstract, signature in unsigned])):
+            row[3] = signature
+        # Un article sans mots (signature vide) n'a aucun voisin
+        queries = [(arxiv_id, row[0], row[3]) for arxiv_id, row in rows.items() if row[3]]
+        keys = [self.hasher.bucket_keys(signature) for arxiv_id, doc, signature in queries]
+        
+        # Clés triées: des lots successifs lisent des pages voisines
+        pairs = []
+        distinct = sorted({key for row_keys in keys for key in row_keys})
+        for start in range(0, len(distinct), SQL_IN_CHUNK):
+            chunk = distinct[start:start + SQL_IN_CHUNK]
+            pairs += self.conn.execute(f'''
+                SELECT bucket, doc FROM similar_buckets
+                WHERE bucket IN ({', '.join('?' * len(chunk))})
+            ''', chunk).fetchall()
+        
+        found = {}
+        if np is None:
+            self.rank_python(queries, keys, pairs, limit, found)
+        else:
+            self.rank_numpy(queries, keys, pairs, limit, found)
+        return [found.get(arxiv_id, []) for arxiv_id in arxiv_ids]
+    
+    def candidate_signatures(self, docs, cache):
+        """Complète cache {rowid: (signature, arxiv_id)} avec les signatures à
+        jour (non périmées) des articles docs"""
+        docs = [doc for doc in docs if doc not in cache]
+        for start in range(0, len(docs), SQL_IN_CHUNK):
+            chunk = docs[start:start + SQL_IN_CHUNK]
+            for doc, signature, arxiv_id in self.conn.execute(f'''
+                SELECT doc, signature, arxiv_id FROM similar_signatures
+                JOIN articles ON articles.rowid = doc
+                WHERE doc IN ({', '.join('?' * len(chunk))}) AND stale = 0
+            ''', chunk):
+                cache[doc] = (signature, arxiv_id)
+    
+    def rank_python(self, queries, keys, pairs, limit, found):
+        """related_many sans NumPy: comptage des bandes et classement par
+        article, comme similar() et rank()"""
+        buckets = {}
+        for bucket, doc in sorted(pairs):
+            docs = buckets.setdefault(bucket, [])
+            # Les SIMILAR_BUCKET_LIMIT premiers, comme le LIMIT de similar()
+            if len(docs) < SIMILAR_BUCKET_LIMIT:
+                docs.append(doc)
+        candidates = []
+        for (arxiv_id, doc, signature), row_keys in zip(queries, keys):
+            bands = Counter()
+            for key in row_keys:
+                bands.update(buckets.get(key, ()))
+            bands.pop(doc, None)
+            candidates.append(sorted(bands, key=lambda other: (-bands[other], other))[
+                :SIMILAR_CANDIDATES])
+        cache = {}
+        self.candidate_signatures(sorted({doc for docs in candidates for doc in docs}), cache)
+        for (arxiv_id, doc, signature), docs in zip(queries, candidates):
+            others = [(other, cache[other][0]) for other in docs if other in cache]
+            found[arxiv_id] = [(score, cache[other][1])
+                               for other, score in self.rank(signature, others, limit)]
+    
+    def rank_numpy(self, queries, keys, pairs, limit, found):
+        """related_many avec NumPy: pour QUERY_BLOCK articles à la fois, les
+        paires (article, membre d'un de ses buckets) sont dépliées en
+        tableaux, comptées (bandes partagées), classées puis comparées à la
+        matrice des signatures candidates"""
+        if not pairs:
+            return
+        pairs = np.array(pairs, dtype=np.int64)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+        # Les SIMILAR_BUCKET_LIMIT premiers de chaque bucket, comme le LIMIT de similar()
+        pairs = pairs[self.group_ranks(pairs[:, 0]) < SIMILAR_BUCKET_LIMIT]
+        bucket_ids, bucket_docs = pairs[:, 0], pairs[:, 1]
+        stride = int(bucket_docs.max()) + 1
+        universe, bucket_local = np.unique(bucket_docs, return_inverse=True)
+        cache = {}
+        
+        def top(rows, counts, most, docs, count):
+            """Indices des count premiers éléments de chaque article, par counts
+            décroissants (au plus most) puis rowid: un seul tri, sur une clé
+            entière (article, most - counts, rowid)"""
+            order = np.argsort((rows * (most + 1) + most - counts) * stride + docs)
+            return order[self.group_ranks(rows[order]) < count]
+        
+        for start in range(0, len(queries), self.QUERY_BLOCK):
+            block = queries[start:start + self.QUERY_BLOCK]
+            block_keys = keys[start:start + self.QUERY_BLOCK]
+            query_keys = np.array([key for row_keys in block_keys for key in row_keys],
+                                  dtype=np.int64)
+            query_rows = np.repeat(np.arange(len(block)), [len(row_keys) for row_keys in block_keys])
+            low = np.searchsorted(bucket_ids, query_keys, 'left')
+            sizes = np.searchsorted(bucket_ids, query_keys, 'right') - low
+            # Chaque clé dépliée en ses membres: positions low .. low + size - 1
+            pair_rows = np.repeat(query_rows, sizes)
+            offsets = np.arange(len(pair_rows)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            pair_positions = np.repeat(low, sizes) + offsets
+            own = np.array([doc for arxiv_id, doc, signature in block], dtype=np.int64)
+            others = bucket_docs[pair_positions] != own[pair_rows]
+            pair_rows, pair_positions = pair_rows[others], pair_positions[others]
+            cells = len(block) * len(universe)
+            if cells <= min(self.COUNT_CELLS, 16 * len(pair_rows)):
+                # Buckets très remplis: comptage direct dans la grille, sans tri
+                cells = np.bincount(pair_rows * len(universe) + bucket_local[pair_positions],
+                                    minlength=cells)
+                combined = np.flatnonzero(cells)
+                bands = cells[combined]
+                rows, docs = combined // len(universe), universe[combined % len(universe)]
+            else:
+                combined, bands = np.unique(pair_rows * stride + bucket_docs[pair_positions],
+                                            return_counts=True)
+                rows, docs = combined // stride, combined % stride
+            kept = top(rows, bands, SIMILAR_BANDS, docs, SIMILAR_CANDIDATES)
+            rows, docs = rows[kept], docs[kept]
+            
+            needed = np.unique(docs).tolist()
+            self.candidate_signatures(needed, cache)
+            known = np.array([doc for doc in needed if doc in cache], dtype=np.int64)
+            if not len(known):
+                continue
+            positions = np.minimum(np.searchsorted(known, docs), len(known) - 1)
+            indexed = known[positions] == docs
+            rows, docs, positions = rows[indexed], docs[indexed], positions[indexed]
+            matrix = np.frombuffer(b''.join([cache[doc][0] for doc in known.tolist()]),
+                                   dtype='<u4').reshape(len(known), self.hasher.hashes)
+            signatures = np.frombuffer(b''.join([signature for arxiv_id, doc, signature in block]),
+                                       dtype='<u4').reshape(len(block), self.hasher.hashes)
+            # Valeurs égales: la similarité de MinHasher.similarities est
+            # matches / hashes, classée comme dans rank()
+            hashes = self.hasher.hashes
+            matches = (matrix[positions] == signatures[rows]).sum(axis=1)
+            above = matches / hashes >= SIMILAR_MIN_SCORE
+            rows, docs, matches = rows[above], docs[above], matches[above]
+            kept = top(rows, matches, hashes, docs, limit)
+            for row, doc, score in zip(rows[kept].tolist(), docs[kept].tolist(),
+                                       (matches[kept] / hashes).tolist()):
+                found.setdefault(block[row][0], []).append((score, cache[doc][1]))
+    
+    @staticmethod
+    def group_ranks(groups):
+        """Rang de chaque élément dans son groupe (groups trié: 0, 1, 2... à
+        chaque nouveau groupe)"""
+        positions = np.arange(len(groups))
+        starts = np.empty(len(groups), dtype=bool)
+        starts[:1] = True
+        np.not_equal(groups[1:], groups[:-1], out=starts[1:])
+        return positions - np.maximum.accumulate(np.where(starts, positions, 0))
+
+
+def shard_key(category, published):
+    """(catégorie, année) du shard d'un article"""
+    return category or 'unknown', published[:4] if published else '0000'
+
+
+def shard_row(arxiv_id, title, authors, published):
+    """Ligne compacte d'un shard, dans l'ordre de SHARD_FIELDS"""
+    return [arxiv_id, title, split_authors(authors) or ['Unknown'],
+            published[:10] if published else None]
+
+
+def shard_conditions(category, year):
+    """Clause WHERE (et paramètres) des articles d'un shard, comme shard_key.
+    
+    Les bornes sur published passent par idx_category_published_id.
+    """
+    if category == 'unknown':
+        conditions = ["(category IS NULL OR category IN ('', 'unknown'))"]
+        params = []
+    else:
+        conditions = ["category = ?"]
+        params = [category]
+    if year == '0000':
+        conditions.append("(published IS NULL OR published = '')")
+    else:
+        # 'AAAA-' et non 'AAAA': published a l'affinité NUMERIC, une borne
+        # qui ressemble à un nombre serait comparée comme un nombre
+        conditions.append("published >= ? AND published < ?")
+        params += [f"{year}-", f"{int(year) + 1:04d}-"]
+    return ' AND '.join(conditions), params
+
+
+def shard_files(shard):
+    """Fichiers d'une entrée de shard du manifest (shard, résumés, voisins)"""
+    return [shard['file']] + shard['abstracts'] + ([shard['related']] if 'related' in shard else [])
+
+
+def write_shard(output_dir, category, year, rows, abstracts, doc_base=0, related=None):
+    """Écrit un shard (catégorie, année) et ses paquets de résumés.
+    
+    doc_base est le numéro (dans l'index de recherche) de la première
+    ligne du shard. Avec related (RelatedLists), les articles voisins de
+    chaque ligne seront écrits au prochain lot (related.flush()).
+    Retourne l'entrée correspondante du manifest, avec l'empreinte du shard
+    (hash) et celles des paquets de résumés (abstract_hashes, dans l'ordre
+    de abstracts); related / related_hash y sont ajoutés par RelatedLists.
+    """
+    shard_file = f"shards/{category}/{year}.json"
+    shard_hash = write_json_file(Path(output_dir) / shard_file, rows)
+    
+    abstract_files = []
+    abstract_hashes = []
+    for index, start in enumerate(range(0, len(abstracts), ABSTRACT_CHUNK_SIZE)):
+        abstract_file = f"abstracts/{category}/{year}-{index}.json"
+        abstract_hashes.append(write_json_file(Path(output_dir) / abstract_file,
+                                               abstracts[start:start + ABSTRACT_CHUNK_SIZE]))
+        abstract_files.append(abstract_file)
+    
+    entry = {'category': category, 'year': year, 'count': len(rows), 'doc_base': doc_base,
+             'file': shard_file, 'hash': shard_hash,
+             'abstracts': abstract_files, 'abstract_hashes': abstract_hashes}
+    if related is not None:
+        related.add(entry, [row[0] for row in rows])
+    return entry
+
+
+class RelatedLists:
+    """Fichiers related/<catégorie>/<année>.json de l'export découpé: les
+    SIMILAR_EXPORT_LIMIT voisins de chaque ligne d'un shard, [[id,
+    similarité], ...] alignés sur le shard.
+    
+    Les shards s'accumulent jusqu'à SIMILAR_EXPORT_BATCH articles, dont les
+    voisins sont calculés d'un coup (SimilarIndex.related_many): des petits
+    shards qui partagent des buckets ne les relisent pas chacun.
+    """
+    
+    def __init__(self, output_dir, similar):
+        self.output_dir = output_dir
+        self.similar = similar
+        self.pending = []  # (entrée du manifest, identifiants des lignes)
+        self.count = 0
+    
+    def add(self, entry, arxiv_ids):
+        self.pending.append((entry, arxiv_ids))
+        self.count += len(arxiv_ids)
+        if self.count >= SIMILAR_EXPORT_BATCH:
+            self.flush()
+    
+    def flush(self):
+        """Calcule et écrit les voisins des shards en attente"""
+        lists = iter(self.similar.related_many(
+            [arxiv_id for entry, arxiv_ids in self.pending for arxiv_id in arxiv_ids]))
+        for entry, arxiv_ids in self.pending:
+            related = [[[other_id, round(score, 2)] for score, other_id in next(lists)]
+                       for _ in arxiv_ids]
+            entry['related'] = f"related/{entry['category']}/{entry['year']}.json"
+            entry['related_hash'] = write_json_file(Path(self.output_dir) / entry['related'],
+                                                    related)
+        self.pending = []
+        self.count = 0
+
+
+def shard_manifest(shards):
+    """Manifest (sans index ni journal) d'une liste d'entrées de shards"""
+    categories = {}
+    years = {}
+    for shard in shards:
+        categories[shard['category']] = categories.get(shard['category'], 0) + shard['count']
+        years[shard['year']] = years.get(shard['year'], 0) + shard['count']
+    shards.sort(key=lambda shard: (shard['year'], shard['category']), reverse=True)
+    
+    return {
+        'version': MANIFEST_VERSION,
+        'generated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'total': sum(categories.values()),
+        'fields': list(SHARD_FIELDS),
+        'abstract_chunk_size': ABSTRACT_CHUNK_SIZE,
+        'categories': categories,
+        'years': years,
+        'shards': shards,
+    }
+
+
+def load_manifest(output_dir):
+    """Manifest d'un export précédent, None s'il n'existe pas ou est illisible"""
+    try:
+        with open(Path(output_dir) / 'manifest.json', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def manifest_compatible(manifest, build_index, build_related=False):
+    """Vrai si un export précédent a le même format que celui qu'on écrirait"""
+    if (manifest.get('version') != MANIFEST_VERSION
+            or manifest.get('fields') != list(SHARD_FIELDS)
+            or manifest.get('abstract_chunk_size') != ABSTRACT_CHUNK_SIZE
+            or ('index' in manifest) != build_index
+            or manifest.get('related') != (related_meta() if build_related else None)):
+        return False
+    if not build_index:
+        return True
+    index = manifest['index']
+    return (index.get('weight_bits') == INDEX_WEIGHT_BITS
+            and index.get('min_token_length') == INDEX_MIN_TOKEN_LENGTH
+            and index.get('stopwords') == sorted(INDEX_STOPWORDS)
+            and 'base_docs' in index)
+
+
+def related_meta():
+    """Entrée 'related' du manifest d'un export avec les articles voisins"""
+    return {'limit': SIMILAR_EXPORT_LIMIT, 'min_score': SIMILAR_MIN_SCORE}
+
+
+def change_log_bounds(conn):
+    """(plus petit numéro encore dans article_changes, dernier numéro attribué)"""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'article_changes'").fetchone()
+    last_seq = row[0] if row else 0
+    first_seq = conn.execute("SELECT MIN(seq) FROM article_changes").fetchone()[0]
+    return (last_seq + 1 if first_seq is None else first_seq), last_seq
+
+
+def export_all_shards(conn, output_dir, chunk_size, build_index, stats, similar=None):
+    """Export complet: tous les shards et l'index de base, en un seul parcours"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT arxiv_id, title, authors, abstract, category, published
+        FROM articles
+        ORDER BY category, published DESC, arxiv_id
+    """)
+    
+    shards = []
+    current = None
+    rows = []
+    abstracts = []
+    doc = 0
+    index = SearchIndexBuilder() if build_index else None
+    related = RelatedLists(output_dir, similar) if similar is not None else None
+    
+    while True:
+        chunk = cursor.fetchmany(chunk_size)
+        if not chunk:
+            break
+        
+        for arxiv_id, title, authors, abstract, category, published in chunk:
+            key = shard_key(category, published)
+            if key != current:
+                if rows:
+                    shards.append(write_shard(output_dir, *current, rows, abstracts,
+                                              doc - len(rows), related))
+                current, rows, abstracts = key, [], []
+            rows.append(shard_row(arxiv_id, title, authors, published))
+            abstracts.append(abstract or '')
+            if index is not None:
+                index.add(doc, title, authors, abstract)
+            doc += 1
+    
+    if rows:
+        shards.append(write_shard(output_dir, *current, rows, abstracts, doc - len(rows), related))
+    if related is not None:
+        related.flush()
+    
+    stats['written'] += [f for shard in shards for f in shard_files(shard)]
+    manifest = shard_manifest(shards)
+    if index is not None:
+        manifest['index'] = index.write(output_dir)
+        manifest['index']['base_docs'] = manifest['index']['docs']
+        stats['written'] += [f['file'] for f in manifest['index']['files']]
+    return manifest
+
+
+def update_shards(conn, output_dir, previous, since, stats, similar=None):
+    """Export incrémental: réécrit seulement les shards touchés depuis since.
+    
+    Les articles des shards réécrits reçoivent de nouveaux numéros, après
+    ceux de l'index de base (base_docs), et sont indexés dans un petit
+    index delta (index/delta/) reconstruit à chaque passage avec les shards
+    déjà renumérotés auparavant. L'index de base n'est pas touché: ses
+    postings vers les anciens numéros ne correspondent plus à aucun shard.
+    
+    Les voisins (similar) ne sont recalculés que pour les shards réécrits:
+    ceux des autres shards ne voient pas les nouveaux articles avant le
+    prochain export complet.
+    
+    Retourne le manifest, ou None si le delta dépasserait INDEX_DELTA_RATIO
+    de l'index de base (un export complet le réintègre alors).
+    """
+    changed = set(conn.execute('''
+        SELECT DISTINCT shard_category, shard_year FROM article_changes WHERE seq > ?
+    ''', (since,)))
+    index_meta = previous.get('index')
+    base_docs = index_meta['base_docs'] if index_meta else 0
+    
+    shards = []
+    delta = {}  # (catégorie, année) -> entrée précédente (None si nouveau shard)
+    for shard in previous['shards']:
+        key = (shard['category'], shard['year'])
+        if key in changed or (index_meta and shard['doc_base'] >= base_docs):
+            delta[key] = shard
+        else:
+            shards.append(shard)
+    delta.update((key, delta.get(key)) for key in changed)
+    
+    counts = {}
+    for key in delta:
+        if key in changed:
+            # Lu dans les tables de stats, sans parcourir le shard
+            counts[key] = conn.execute('''
+                SELECT COALESCE(SUM(articles), 0) FROM stats_by_month
+                WHERE category = ? AND year = ?
+            ''', key).fetchone()[0]
+        else:
+            counts[key] = delta[key]['count']
+    if index_meta and sum(counts.values()) > INDEX_DELTA_RATIO * base_docs:
+        return None
+    
+    index = SearchIndexBuilder() if index_meta else None
+    related = RelatedLists(output_dir, similar) if similar is not None else None
+    rewritten = []
+    doc = base_docs
+    for key in sorted(delta):
+        if not counts[key]:
+            continue  # shard vidé: ses fichiers seront supprimés
+        
+        if index is not None or key in changed:
+            where, params = shard_conditions(*key)
+            articles = conn.execute(f"""
+                SELECT arxiv_id, title, authors, abstract, published
+                FROM articles
+                WHERE {where}
+                ORDER BY published DESC, arxiv_id
+            """, params).fetchall()
+        
+        if key in changed:
+            entry = write_shard(output_dir, *key,
+                                [shard_row(arxiv_id, title, authors, published)
+                                 for arxiv_id, title, authors, abstract, published in articles],
+                                [abstract or '' for arxiv_id, title, authors, abstract, published
+                                 in articles], doc, related)
+            rewritten.append(entry)
+        else:
+            entry = dict(delta[key], doc_base=doc)
+        
+        if index is not None:
+            for offset, (arxiv_id, title, authors, abstract, published) in enumerate(articles):
+                index.add(doc + offset, title, authors, abstract)
+        shards.append(entry)
+        doc += entry['count']
+    if related is not None:
+        related.flush()
+    stats['written'] += [f for entry in rewritten for f in shard_files(entry)]
+    stats['shards'] += len(rewritten)
+    
+    manifest = shard_manifest(shards)
+    if index is not None:
+        delta_meta = index.write(output_dir, 'index/delta')
+        manifest['index'] = dict(index_meta, docs=doc, delta={
+            'first_doc': base_docs, 'terms': delta_meta['terms'], 'files': delta_meta['files']})
+        stats['written'] += [f['file'] for f in delta_meta['files']]
+    return manifest
+
+
+def write_delta(conn, output_dir, since, last_seq):
+    """Écrit deltas/<since>-<last_seq>.json: les articles modifiés entre deux exports.
+    
+    upserts: lignes complètes (DELTA_FIELDS) des articles ajoutés ou modifiés,
+    removed: identifiants des articles supprimés. Un client qui a une copie
+    en cache l'applique au lieu de tout retélécharger. Retourne l'entrée du
+    manifest, ou None si le delta dépasse DELTA_MAX_RECORDS.
+    """
+    ids = [row[0] for row in conn.execute('''
+        SELECT DISTINCT arxiv_id FROM article_changes WHERE seq > ? AND seq <= ?
+    ''', (since, last_seq))]
+    if len(ids) > DELTA_MAX_RECORDS:
+        return None
+    
+    upserts = []
+    for start in range(0, len(ids), SQL_IN_CHUNK):
+        chunk = ids[start:start + SQL_IN_CHUNK]
+        for arxiv_id, title, authors, abstract, category, published in conn.execute(f'''
+            SELECT arxiv_id, title, authors, abstract, category, published FROM articles
+            WHERE arxiv_id IN ({', '.join('?' * len(chunk))})
+        ''', chunk):
+            upserts.append(shard_row(arxiv_id, title, authors, published)
+                           + [shard_key(category, published)[0], abstract or ''])
+    found = {row[0] for row in upserts}
+    
+    file = f"deltas/{since}-{last_seq}.json"
+    content_hash = write_json_file(Path(output_dir) / file, {
+        'from': since,
+        'to': last_seq,
+        'fields': list(DELTA_FIELDS),
+        'upserts': upserts,
+        'removed': [arxiv_id for arxiv_id in ids if arxiv_id not in found],
+    })
+    return {'from': since, 'to': last_seq, 'file': file, 'count': len(ids), 'hash': content_hash}
+
+
+def export_shards(db_path, output_dir=DEFAULT_SHARD_DIR, chunk_size=EXPORT_CHUNK_SIZE,
+                  build_index=True, full=False, stats=None, related=False):
+    """Exporte la base en dataset statique découpé pour le site web.
+    
+    Écrit dans output_dir:
+      - manifest.json: comptes par catégorie et par année + liste des shards;
+        chaque fichier y a son empreinte (hash), inchangée tant que son
+        contenu ne change pas
+      - shards/<catégorie>/<année>.json: lignes compactes [id, titre, [auteurs], date],
+        triées par date décroissante puis par identifiant (un shard réécrit
+        sans changement garde la même empreinte)
+      - abstracts/<catégorie>/<année>-<n>.json: résumés alignés sur les lignes
+        du shard, par paquets de ABSTRACT_CHUNK_SIZE
+      - index/<n>.json: index inversé de recherche (si build_index), découpé
+        par plages de termes, et index/delta/<n>.json pour les shards réécrits
+        depuis le dernier export complet
+      - deltas/<de>-<à>.json: articles modifiés depuis l'export précédent
+      - stats.json: comptes détaillés de collection_stats (par mois, par
+        catégorie et année, cross-lists) pour la fenêtre de statistiques
+      - related/<catégorie>/<année>.json (si related): les SIMILAR_EXPORT_LIMIT
+        articles voisins de chaque ligne du shard (index-similar)
+    
+    L'export est incrémental dès qu'un export précédent existe dans
+    output_dir: le journal article_changes (rempli par triggers) donne les
+    shards touchés depuis son change_seq, et seuls ceux-ci sont relus et
+    réécrits. Sinon (premier export, format changé, journal incomplet,
+    index delta trop gros, ou full=True), les articles sont lus dans l'ordre
+    (catégorie, date), un seul shard en mémoire à la fois (l'index, lui,
+    grossit avec le corpus). Les fichiers qui ne servent plus sont supprimés.
+    
+    stats (dict optionnel) reçoit le mode ('full', 'incremental' ou
+    'unchanged'), le nombre de shards réécrits et les fichiers écrits.
+    
+    Retourne le manifest.
+    """
+    stats = {} if stats is None else stats
+    stats.update(mode='incremental', shards=0, written=[])
+    conn = sqlite3.connect(db_path)
+    try:
+        # Lu avant les articles: un changement arrivé pendant l'export a un
+        # numéro plus grand et sera réexporté au prochain passage
+        first_seq, last_seq = change_log_bounds(conn)
+        summary = collection_stats(conn)
+        previous = load_manifest(output_dir) or {}
+        since = previous.get('change_seq')
+        # Le journal contient-il tout ce qui a changé depuis l'export précédent?
+        logged = since is not None and first_seq <= since + 1 and since <= last_seq
+        
+        similar = SimilarIndex(conn) if related else None
+        manifest = None
+        if logged and not full and manifest_compatible(previous, build_index, related):
+            if since == last_seq and 'stats' in previous:
+                stats['mode'] = 'unchanged'
+                return previous
+            manifest = update_shards(conn, output_dir, previous, since, stats, similar)
+        if manifest is None:
+            stats.update(mode='full', written=[])
+            manifest = export_all_shards(conn, output_dir, chunk_size, build_index, stats, similar)
+            stats['shards'] = len(manifest['shards'])
+        
+        deltas = previous.get('deltas', []) if logged else []
+        if logged and since < last_seq:
+            delta = write_delta(conn, output_dir, since, last_seq)
+            # Trop de changements: les clients rechargent tout
+            deltas = deltas + [delta] if delta else []
+            if delta:
+                stats['written'].append(delta['file'])
+        manifest['change_seq'] = last_seq
+        manifest['deltas'] = deltas[-DELTA_HISTORY:]
+        if related:
+            manifest['related'] = related_meta()
+        manifest['stats'] = {'file': 'stats.json',
+                             'hash': write_json_file(Path(output_dir) / 'stats.json', summary)}
+        stats['written'].append('stats.json')
+        write_json_file(Path(output_dir) / 'manifest.json', manifest)
+        stats['written'].append('manifest.json')
+        
+        # Nettoyage des fichiers qui n'existent plus (shard disparu, index
+        # plus court, delta trop ancien)
+        index = manifest.get('index', {})
+        written = {f for shard in manifest['shards'] for f in shard_files(shard)}
+        written.update(f['file'] for f in index.get('files', []))
+        written.update(f['file'] for f in index.get('delta', {}).get('files', []))
+        written.update(delta['file'] for delta in manifest['deltas'])
+        for subdir in ('shards', 'abstracts', 'related', 'index', 'deltas'):
+            for path in (Path(output_dir) / subdir).rglob('*.json'):
+                if path.relative_to(output_dir).as_posix() not in written:
+                    path.unlink()
+        
+        # Les changements exportés ne servent plus
+        with conn:
+            conn.execute("DELETE FROM article_changes WHERE seq <= ?", (last_seq,))
+    finally:
+        conn.close()
+    
+    return manifest
+
+
+class ArticleWriter:
+    """Écrivain unique de la base: une connexion longue durée en mode WAL.
+    
+    Les articles sont écrits par executemany dans une seule transaction par
+    lot, avec un upsert qui ne remplace une ligne que par une version plus
+    récente (updated_at): une v4 remplace la v3 du même identifiant, une
+    réponse plus ancienne (cache, fusion) ne revient pas en arrière, et une
+    ligne dont updated_at n'a pas changé n'est pas réécrite. Pour les
+    articles nouveaux ou modifiés, les tables normalisées
+    article_authors / article_categories sont réécrites dans la même
+    transaction. Le checkpoint de progression éventuel est commité avec les
+    articles. Partagé par tous les workers (verrou).
+    """
+    
+    UPSERT_SQL = f'''
+        INSERT INTO articles ({', '.join(ARTICLE_FIELDS)}, last_fetched)
+        VALUES ({', '.join('?' * (len(ARTICLE_FIELDS) + 1))})
+        ON CONFLICT(arxiv_id) DO UPDATE SET
+            {', '.join(f'{field} = excluded.{field}' for field in ARTICLE_FIELDS[1:])},
+            last_fetched = excluded.last_fetched
+        WHERE articles.updated_at IS NULL OR excluded.updated_at > articles.updated_at
+    '''
+    
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA cache_size=-65536')  # 64 MB
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.lock = threading.Lock()
+        self.stats = {'rows': 0, 'changed': 0, 'seconds': 0.0}
+        self.author_ids = {}  # nom normalisé -> authors.id
+    
+    def write_articles(self, articles, progress=None):
+        """Upsert d'un lot d'articles (+ checkpoint) en une transaction"""
+        fetched_at = datetime.now().isoformat()
+        rows = [(*article, fetched_at) for article in articles]
+        
+        with self.lock:
+            started = time.perf_counter()
+            changed = self._changed_articles(articles)
+            try:
+                with self.conn:
+                    self.conn.executemany(self.UPSERT_SQL, rows)
+                    self._write_links([(article.arxiv_id, article.authors, article.category,
+                                        article.categories) for article in changed])
+                    if progress is not None:
+                        self._upsert_progress(*progress)
+            except sqlite3.Error as e:
+                # Lot refusé: on isole la ou les lignes fautives
+                print(f"   ⚠️  Erreur écriture du lot ({e}), reprise ligne par ligne")
+                # Les auteurs créés pendant la transaction annulée n'existent plus
+                self.author_ids.clear()
+                written = set()
+                with self.conn:
+                    for row in rows:
+                        try:
+                            self.conn.execute(self.UPSERT_SQL, row)
+                            written.add(row[0])
+                        except sqlite3.Error as row_error:
+                            print(f"   ⚠️  Erreur sauvegarde {row[0]}: {row_error}")
+                    changed = [article for article in changed if article.arxiv_id in written]
+                    self._write_links([(article.arxiv_id, article.authors, article.category,
+                                        article.categories) for article in changed])
+                    if progress is not None:
+                        self._upsert_progress(*progress)
+            
+            self.stats['rows'] += len(rows)
+            self.stats['changed'] += len(changed)
+            self.stats['seconds'] += time.perf_counter() - started
+        
+        return len(rows)
+    
+    def replace_articles(self, batches):
+        """Vide la table articles et la réécrit depuis `batches` (itérable de
+        listes d'Article), en une seule transaction: si la reconstruction
+        échoue, l'ancienne table est conservée."""
+        fetched_at = datetime.now().isoformat()
+        total = 0
+        with self.lock:
+            started = time.perf_counter()
+            changed_count = 0
+            with self.conn:
+                self.conn.execute("DELETE FROM articles")
+                for articles in batches:
+                    changed = self._changed_articles(articles)
+                    self.conn.executemany(self.UPSERT_SQL,
+                                          [(*article, fetched_at) for article in articles])
+                    self._write_links([(article.arxiv_id, article.authors, article.category,
+                                        article.categories) for article in changed])
+                    total += len(articles)
+                    changed_count += len(changed)
+            self.stats['rows'] += total
+            self.stats['changed'] += changed_count
+            self.stats['seconds'] += time.perf_counter() - started
+        return total
+    
+    def _changed_articles(self, articles):
+        """Articles absents de la base ou plus récents (updated_at) que la
+        version stockée: ceux que l'upsert écrit. Un identifiant présent
+        plusieurs fois dans le lot n'y figure qu'une fois, dans sa version
+        la plus récente."""
+        newest = {}
+        for article in articles:
+            kept = newest.get(article.arxiv_id)
+            if kept is None or (article.updated_at or '') > (kept.updated_at or ''):
+                newest[article.arxiv_id] = article
+        known = {}
+        ids = list(newest)
+        for start in range(0, len(ids), SQL_IN_CHUNK):
+            chunk = ids[start:start + SQL_IN_CHUNK]
+            known.update(self.conn.execute(f'''
+                SELECT arxiv_id, updated_at FROM articles
+                WHERE arxiv_id IN ({', '.join('?' * len(chunk))})
+            ''', chunk))
+        return [article for article in newest.values()
+                if article.arxiv_id not in known
+                or (article.updated_at or '') > (known[article.arxiv_id] or '')]
+    
+    def newer_articles(self, articles):
+        """Articles absents de la base ou plus récents que la version
+        stockée: ceux qu'une fusion doit écrire"""
+        with self.lock:
+            return self._changed_articles(articles)
+    
+    def _author_id(self, name):
+        """Identifiant de l'auteur (créé au besoin), None si le nom est vide"""
+        key = normalize_author(name)
+        if not key:
+            return None
+        author_id = self.author_ids.get(key)
+        if author_id is None:
+            self.conn.execute('''
+                INSERT INTO authors (name, name_key, surname) VALUES (?, ?, ?)
+                ON CONFLICT(name_key) DO NOTHING
+            ''', (name, key, key.split()[-1]))
+            author_id = self.conn.execute(
+                "SELECT id FROM authors WHERE name_key = ?", (key,)).fetchone()[0]
+            self.author_ids[key] = author_id
+        return author_id
+    
+    def _write_links(self, links):
+        """Réécrit article_authors et article_categories.
+        
+        links: tuples (arxiv_id, authors, category, categories) des articles
+        concernés (un même article présent deux fois n'est relié qu'une fois).
+        """
+        links = {link[0]: link for link in links}
+        if not links:
+            return
+        ids = [(arxiv_id,) for arxiv_id in links]
+        self.conn.executemany("DELETE FROM article_authors WHERE arxiv_id = ?", ids)
+        self.conn.executemany("DELETE FROM article_categories WHERE arxiv_id = ?", ids)
+        
+        author_rows = []
+        category_rows = []
+        for arxiv_id, authors, primary, categories in links.values():
+            for position, name in enumerate(split_authors(authors)):
+                author_id = self._author_id(name)
+                if author_id is not None:
+                    author_rows.append((arxiv_id, position, author_id))
+            # La catégorie principale d'abord, puis les cross-lists
+            for category in dict.fromkeys([primary] + (categories or '').split()):
+                category_rows.append((category, arxiv_id, int(category == primary)))
+        
+        self.conn.executemany('''
+            INSERT INTO article_authors (arxiv_id, position, author_id) VALUES (?, ?, ?)
+        ''', author_rows)
+        self.conn.executemany('''
+            INSERT INTO article_categories (category, arxiv_id, is_primary) VALUES (?, ?, ?)
+        ''', category_rows)
+    
+    def links_missing(self):
+        """Vrai si la base a des articles mais pas encore de tables normalisées remplies"""
+        with self.lock:
+            return self.conn.execute('''
+                SELECT EXISTS (SELECT 1 FROM articles)
+                   AND NOT EXISTS (SELECT 1 FROM article_categories)
+            ''').fetchone()[0] == 1
+    
+    def rebuild_links(self, chunk_size=EXPORT_CHUNK_SIZE):
+        """Reconstruit article_authors / article_categories depuis la table articles"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM article_authors")
+            self.conn.execute("DELETE FROM article_categories")
+            cursor = self.conn.execute('''
+                SELECT arxiv_id, authors, category, categories FROM articles
+            ''')
+            total = 0
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                self._write_links(rows)
+                total += len(rows)
+        return total
+    
+    def rebuild_stats(self):
+        """Recalcule les tables de stats agrégées (rebuild_stats)"""
+        with self.lock, self.conn:
+            return rebuild_stats(self.conn)
+    
+    def similar_indexed(self):
+        """Vrai si index-similar a déjà été lancé sur cette base"""
+        with self.lock:
+            return self.conn.execute("SELECT EXISTS (SELECT 1 FROM similar_signatures)").fetchone()[0] == 1
+    
+    def index_similar(self, full=False, on_batch=None):
+        """Complète l'index des articles voisins (SimilarIndex).
+        
+        Les signatures d'un lot sont calculées hors du verrou et écrites
+        dans une transaction par lot: une collecte en cours continue
+        d'écrire entre deux lots. on_batch(n) reçoit le nombre d'articles
+        indexés jusque-là. Retourne (articles indexés, signatures retirées).
+        """
+        similar = SimilarIndex(self.conn)
+        if full:
+            with self.lock, self.conn:
+                similar.clear()
+        
+        removed = 0
+        while True:
+            with self.lock, self.conn:
+                count = similar.remove_stale()
+            if not count:
+                break
+            removed += count
+        
+        indexed = 0
+        after = 0
+        while True:
+            with self.lock:
+                rows = similar.missing(after)
+            if not rows:
+                break
+            signatures = similar.hasher.signatures([(title, abstract) for doc, title, abstract in rows])
+            with self.lock, self.conn:
+                similar.add([row[0] for row in rows], signatures)
+            after = rows[-1][0]
+            indexed += len(rows)
+            if on_batch is not None:
+                on_batch(indexed)
+        return indexed, removed
+    
+    def _upsert_progress(self, category, year, month, articles_count, status,
+                         window_start, window_end, next_offset, resumption_token=None):
+        row = self.conn.execute('''
+            SELECT id FROM collection_progress
+            WHERE category = ? AND year = ? AND month = ?
+            ORDER BY id DESC
+            LIMIT 1
+        ''', (category, year, month)).fetchone()
+        
+        if row is None:
+            self.conn.execute('''
+                INSERT INTO collection_progress
+                (category, year, month, articles_count, status, window_start, window_end,
+                 next_offset, resumption_token)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (category, year, month, articles_count, status,
+                  window_start, window_end, next_offset, resumption_token))
+        else:
+            self.conn.execute('''
+                UPDATE collection_progress
+                SET articles_count = ?, status = ?, window_start = ?, window_end = ?,
+                    next_offset = ?, resumption_token = ?, timestamp = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (articles_count, status, window_start, window_end, next_offset,
+                  resumption_token, row[0]))
+    
+    def save_progress(self, *progress):
+        """Écrit un checkpoint seul (sans articles)"""
+        with self.lock, self.conn:
+            self._upsert_progress(*progress)
+    
+    def execute(self, sql, params=()):
+        """Petite écriture isolée (journaux, watermarks), commitée aussitôt"""
+        with self.lock, self.conn:
+            self.conn.execute(sql, params)
+    
+    def ingest_rate(self):
+        """Débit d'écriture en lignes par seconde"""
+        if not self.stats['seconds']:
+            return 0.0
+        return self.stats['rows'] / self.stats['seconds']
+    
+    def close(self):
+        """Rapatrie le WAL dans la base et ferme la connexion"""
+        with self.lock:
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self.conn.close()
+
+
+class RateLimiter:
+    """Token bucket partagé par tous les workers.
+    
+    acquire() bloque jusqu'à ce qu'un jeton soit disponible; penalize() gèle
+    le bucket pour tout le monde après un 429/503 au lieu d'endormir un seul
+    worker.
+    """
+    
+    def __init__(self, rate, capacity=1):
+        self.rate = rate  # Jetons par seconde
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Attend et consomme un jeton"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.blocked_until:
+                    elapsed = max(0.0, now - self.updated)
+                    self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    wait = self.blocked_until - now
+            time.sleep(wait)
+    
+    def penalize(self, seconds):
+        """Suspend toutes les requêtes pendant `seconds` secondes"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.updated = self.blocked_until
+
+
+class RunMetrics:
+    """Compteurs et chronomètres d'une exécution (collect, update, reparse).
+    
+    stage(nom) cumule le temps passé dans une étape de RUN_STAGES, tous
+    threads confondus: avec plusieurs workers, la somme des étapes dépasse
+    la durée réelle. event() ajoute une ligne JSON au journal d'événements
+    si un fichier est configuré.
+    """
+    
+    def __init__(self, events_path=None, command=None, params=None):
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.run_id = f"{self.started_at:%Y%m%dT%H%M%S}-{os.getpid()}"
+        self.command = command
+        self.params = params or {}
+        self.counters = dict.fromkeys(RUN_COUNTERS, 0)
+        self.stages = dict.fromkeys(RUN_STAGES, 0.0)
+        self.backoff = 0.0  # Pauses demandées après 429 / 5xx / timeout
+        self.lock = threading.Lock()
+        self.events = open(events_path, 'a', encoding='utf-8') if events_path else None
+    
+    def add(self, **counts):
+        """Incrémente des compteurs: add(requests=1, bytes=1234)"""
+        with self.lock:
+            for name, value in counts.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+    
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Chronomètre un bloc et l'ajoute au temps de l'étape `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+    
+    def add_backoff(self, seconds):
+        with self.lock:
+            self.backoff += seconds
+    
+    def event(self, kind, **fields):
+        """Écrit un événement dans le journal JSON lines (flush immédiat: un
+        processus tué garde tout ce qui précède)"""
+        if self.events is None:
+            return
+        record = {'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+                  'run': self.run_id, 'event': kind, **fields}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            self.events.write(line + '\n')
+            self.events.flush()
+    
+    def summary(self, rows=0, changed=0, status=None):
+        """Bilan de l'exécution (une ligne de la table runs)"""
+        seconds = time.perf_counter() - self.started
+        with self.lock:
+            counters = dict(self.counters)
+            stages = {name: round(value, 3) for name, value in self.stages.items()}
+            backoff = round(self.backoff, 3)
+        return {
+            'run_id': self.run_id,
+            'command': self.command,
+            'params': self.params,
+            'status': status,
+            'started': self.started_at.isoformat(timespec='seconds'),
+            'finished': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'seconds': round(seconds, 3),
+            **counters,
+            'rows': rows,
+            'changed': changed,
+            'rows_per_second': round(rows / seconds, 1) if seconds else 0.0,
+            'backoff_seconds': backoff,
+            'stages': stages,
+        }
+    
+    def close(self):
+        if self.events is not None:
+            self.events.close()
+            self.events = None
+
+
+class Profiler:
+    """Profil d'une commande (--profile FICHIER).
+    
+    cProfile par défaut: un profil par thread (workers compris, via
+    threading.setprofile), fusionnés dans FICHIER (lisible par pstats ou
+    snakeviz). Avec un FICHIER .html et pyinstrument installé: rapport
+    pyinstrument, échantillonné, du thread principal seulement (à combiner
+    avec --workers 1).
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.sampler = None
+        self.profiles = []
+        self.lock = threading.Lock()
+    
+    def start(self):
+        if self.path.endswith('.html') and pyinstrument is not None:
+            self.sampler = pyinstrument.Profiler()
+            self.sampler.start()
+            return
+        if self.path.endswith('.html'):
+            print("⚠️  pyinstrument non installé: profil cProfile à la place")
+        threading.setprofile(self._start_thread)
+        self._start_thread()
+    
+    def _start_thread(self, *args):
+        # Appelé au démarrage de chaque thread: le profil remplace ce hook
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Un profileur par interpréteur (Python 3.12+): il voit déjà tous les threads
+            sys.setprofile(None)
+            return
+        with self.lock:
+            self.profiles.append(profile)
+    
+    def stop(self):
+        """Arrête le profil, l'écrit dans self.path et affiche le haut du classement"""
+        if self.sampler is not None:
+            self.sampler.stop()
+            Path(self.path).write_text(self.sampler.output_html(), encoding='utf-8')
+            print(f"\n🔬 Profil pyinstrument: {self.path}")
+            return
+        threading.setprofile(None)
+        with self.lock:
+            profiles = list(self.profiles)
+        for profile in profiles:
+            profile.disable()
+        stats = pstats.Stats(*profiles)
+        stats.dump_stats(self.path)
+        print(f"\n🔬 Profil cProfile ({len(profiles)} thread(s)): {self.path}")
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+
+
+class ApiSource:
+    """Source par défaut: l'API de recherche (export.arxiv.org/api/query).
+    
+    Une unité de collecte = (catégorie, mois): fenêtre submittedDate paginée
+    par offset, découpée au-delà d'API_RESULT_CAP (voir collect_window).
+    """
+    
+    name = 'api'
+    
+    def __init__(self, collector):
+        self.collector = collector
+    
+    def unit_keys(self):
+        """Clés des unités (colonne category de collection_progress)"""
+        return list(self.collector.categories)
+    
+    def harvest_month(self, key, year, month, on_page, progress=None, errors=None,
+                      refresh=False):
+        """Collecte un mois; on_page(articles, **checkpoint) après chaque page.
+        
+        progress: checkpoint 'in_progress' d'une collecte interrompue (ou None).
+        refresh: recollecte forcée, le cache des réponses n'est pas rejoué.
+        """
+        resume = None
+        if progress is not None:
+            resume = (progress['window_start'], progress['window_end'], progress['next_offset'])
+        
+        def on_window_page(window_start, window_end, next_offset, articles):
+            on_page(articles, window_start=window_start, window_end=window_end,
+                    next_offset=next_offset)
+        
+        self.collector.collect_by_month(key, year, month, on_page=on_window_page,
+                                        resume=resume, errors=errors, refresh=refresh)
+    
+    def update(self, key):
+        """Mise à jour incrémentale d'une clé depuis son watermark"""
+        return self.collector.update_category(key)
+
+
+class OaiPmhSource:
+    """Moissonnage OAI-PMH (export.arxiv.org/oai2) pour les collectes en masse.
+    
+    Une unité = (set, mois de datestamp): ListRecords avec from / until, au
+    format arXivRaw, pages chaînées par resumptionToken (pas d'offset
+    profond, pas de découpage par catégorie). Le jeton de la page suivante
+    est commité avec chaque page (collection_progress.resumption_token):
+    un mois interrompu reprend là où il s'était arrêté.
+    
+    Le datestamp OAI est la date de dernière modification d'un
+    enregistrement, pas sa date de soumission: l'union des mois couvre
+    chaque article une fois, à sa dernière version. Seuls les articles de
+    collector.categories (cross-lists comprises) sont gardés.
+    """
+    
+    name = 'oai'
+    
+    def __init__(self, collector, url=None, set_spec=DEFAULT_OAI_SET):
+        self.collector = collector
+        self.url = url or os.environ.get('ARXIV_OAI_URL', DEFAULT_OAI_URL)
+        self.set_spec = set_spec
+    
+    def unit_keys(self):
+        return [f"oai:{self.set_spec}"]
+    
+    def list_records(self, key, from_date, until_date, on_page, token=None, errors=None):
+        """Enchaîne les pages ListRecords d'un set; on_page(articles, jeton_suivant).
+        
+        Retourne True si la liste a été lue jusqu'au bout.
+        """
+        set_spec = key.split(':', 1)[1]
+        restarted = False
+        
+        while True:
+            if token:
+                params = {'verb': 'ListRecords', 'resumptionToken': token}
+            else:
+                params = {'verb': 'ListRecords', 'metadataPrefix': OAI_METADATA_PREFIX,
+                          'set': set_spec, 'from': from_date}
+                if until_date:
+                    params['until'] = until_date
+            
+            label = f"      {key} {from_date} → {until_date or '…'}"
+            xml_data, success = self.collector.fetch_with_retry(params, url=self.url,
+                                                                use_cache=False)
+            if not success or not xml_data:
+                print(f"{label} ❌")
+                if errors is not None:
+                    errors.append((key, from_date, until_date))
+                return False
+            
+            articles, next_token, error = self.collector.parse_oai_response(xml_data)
+            
+            if error == 'badResumptionToken' and token and not restarted:
+                # Jeton expiré: on repart du début de la plage (l'upsert est idempotent)
+                print(f"{label} ⚠️  Jeton de reprise expiré, reprise au début")
+                token = None
+                restarted = True
+                continue
+            if error not in (None, 'noRecordsMatch'):
+                print(f"{label} ❌ Erreur OAI-PMH: {error}")
+                self.collector.discard_response(params)
+                if errors is not None:
+                    errors.append((key, from_date, until_date))
+                return False
+            
+            print(f"{label} ✅ {len(articles)} articles")
+            on_page(articles, next_token)
+            if not next_token:
+                return True
+            token = next_token
+    
+    def harvest_month(self, key, year, month, on_page, progress=None, errors=None,
+                      refresh=False):
+        # Pas de cache pour OAI-PMH: chaque moissonnage relit le réseau
+        window_start, window_end = month_window(year, month)
+        token = progress['resumption_token'] if progress is not None else None
+        self.list_records(key, window_start.strftime('%Y-%m-%d'),
+                          window_end.strftime('%Y-%m-%d'),
+                          lambda articles, next_token: on_page(articles,
+                                                               resumption_token=next_token),
+                          token, errors)
+    
+    def update(self, key):
+        """Enregistrements modifiés depuis le watermark (granularité: le jour).
+        
+        Le watermark avance à la date du début du moissonnage, seulement si
+        la liste a été lue jusqu'au bout; relire un jour déjà vu est sans effet.
+        """
+        collector = self.collector
+        watermark = collector.get_watermark(key)
+        started = datetime.now(timezone.utc)
+        print(f"   🔖 Watermark: {watermark}")
+        
+        saved = 0
+        
+        def on_page(articles, next_token):
+            nonlocal saved
+            saved += collector.save_articles(articles)
+        
+        if self.list_records(key, watermark[:10], None, on_page):
+            collector.set_watermark(key, started.strftime('%Y-%m-%dT00:00:00Z'))
+        return saved
+
+
+SOURCES = {source.name: source for source in (ApiSource, OaiPmhSource)}
+
+
+class WorkPlan:
+    """Plan d'une collecte répartie: unités (source, clé, année, mois) dans
+    une table work_units partagée par les workers.
+    
+    Un worker réclame une unité par un bail (LEASE_SECONDS): une unité dont
+    le bail a expiré (worker tué) redevient disponible. Les réclamations se
+    font dans une transaction BEGIN IMMEDIATE, sûre entre processus d'une
+    même machine. Pour des machines sans fichier partagé (runners CI), chaque
+    machine reçoit une copie du plan et une tranche fixe des unités
+    (part = (k, n): unités dont id % n == k).
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS work_units (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT,
+                unit_key TEXT,
+                year INTEGER,
+                month INTEGER,
+                status TEXT DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER DEFAULT 0,
+                articles_count INTEGER,
+                shard_path TEXT,
+                error TEXT,
+                updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (source, unit_key, year, month)
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_work_units_status ON work_units(status)')
+    
+    def add_units(self, source, keys, start_year, end_year):
+        """Ajoute les unités manquantes (mois futurs exclus); retourne le
+        nombre d'unités ajoutées"""
+        now = datetime.now(timezone.utc)
+        before = self.conn.total_changes
+        with self.transaction():
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO work_units (source, unit_key, year, month)
+                VALUES (?, ?, ?, ?)
+            ''', [(source, key, year, month)
+                  for key in keys
+                  for year in range(start_year, end_year + 1)
+                  for month in range(1, 13)
+                  if month_window(year, month)[0] <= now])
+        return self.conn.total_changes - before
+    
+    @contextlib.contextmanager
+    def transaction(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+    
+    def claim(self, worker, part=None):
+        """Réclame la prochaine unité libre (ou au bail expiré): dict ou None"""
+        now = time.time()
+        condition = "(status = 'pending' OR (status = 'leased' AND lease_until < ?))"
+        params = [now]
+        if part is not None:
+            condition += " AND id % ? = ?"
+            params += [part[1], part[0]]
+        with self.transaction():
+            row = self.conn.execute(f'''
+                SELECT id, source, unit_key, year, month, attempts FROM work_units
+                WHERE {condition}
+                ORDER BY id
+                LIMIT 1
+            ''', params).fetchone()
+            if row is None:
+                return None
+            self.conn.execute('''
+                UPDATE work_units
+                SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1,
+                    updated = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (worker, now + LEASE_SECONDS, row[0]))
+        return dict(zip(('id', 'source', 'key', 'year', 'month', 'attempts'),
+                        (*row[:5], row[5] + 1)))
+    
+    def finish(self, unit, articles_count, shard_path):
+        """Marque une unité terminée (et la base qui contient ses articles)"""
+        self.conn.execute('''
+            UPDATE work_units
+            SET status = 'done', lease_until = NULL, articles_count = ?, shard_path = ?,
+                error = NULL, updated = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (articles_count, shard_path, unit['id']))
+    
+    def release(self, unit, error):
+        """Rend une unité en échec: de nouveau disponible, ou 'failed' après
+        MAX_UNIT_ATTEMPTS essais"""
+        status = 'failed' if unit['attempts'] >= MAX_UNIT_ATTEMPTS else 'pending'
+        self.conn.execute('''
+            UPDATE work_units
+            SET status = ?, lease_until = NULL, error = ?, updated = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (status, error, unit['id']))
+        return status
+    
+    def summary(self):
+        """Nombre d'unités et d'articles par statut"""
+        return {status: (count, articles or 0) for status, count, articles in self.conn.execute('''
+            SELECT status, COUNT(*), SUM(articles_count) FROM work_units GROUP BY status
+        ''')}
+    
+    def close(self):
+        self.conn.close()
+
+
+class ReadPool:
+    """Connexions SQLite en lecture seule (mode=ro), partagées par les
+    threads du serveur: une connexion par requête en cours, rendue après"""
+    
+    def __init__(self, path, size=SERVE_POOL_SIZE):
+        self.connections = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(f"file:{Path(path).resolve()}?mode=ro", uri=True,
+                                   check_same_thread=False)
+            self.connections.put(conn)
+        self.size = size
+    
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+    
+    def close(self):
+        for _ in range(self.size):
+            self.connections.get().close()
+
+
+class ReadApi:
+    """Requêtes de l'API de lecture (commande serve), sans HTTP.
+    
+    Les listes sont paginées par clé (published, arxiv_id) décroissante,
+    pas par OFFSET: une page coûte le même temps au début ou au millionième
+    article (index idx_published_id et idx_category_published_id). Le
+    curseur d'une page est 'published|arxiv_id' de sa première ou dernière
+    ligne.
+    
+    Les réponses (corps JSON, ETag) et les totaux sont gardés dans un LRU.
+    Le cache est vidé dès que le dernier numéro de article_changes bouge:
+    les triggers en attribuent un à chaque article écrit, donc au premier
+    commit d'une collecte, d'un update, d'un merge ou d'un reparse. Il
+    l'est aussi quand index-similar indexe de nouveaux articles (les
+    voisins de /api/articles/<id> changent sans qu'aucun article change).
+    """
+    
+    def __init__(self, db_path, pool_size=SERVE_POOL_SIZE, cache_size=SERVE_CACHE_SIZE):
+        self.pool = ReadPool(db_path, pool_size)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()   # requête normalisée -> (statut, corps, ETag)
+        self.totals = OrderedDict()  # filtres -> nombre d'articles
+        self.version = None
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'hits': 0, 'invalidations': 0}
+    
+    @staticmethod
+    def data_version(conn):
+        """Dernier numéro attribué dans article_changes, et dernier article
+        de l'index des voisins"""
+        row = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'article_changes'").fetchone()
+        try:
+            indexed = conn.execute("SELECT MAX(doc) FROM similar_signatures").fetchone()[0]
+        except sqlite3.OperationalError:
+            indexed = None
+        return (row[0] if row else 0, indexed)
+    
+    def remember(self, store, key, value):
+        with self.lock:
+            store[key] = value
+            store.move_to_end(key)
+            while len(store) > self.cache_size:
+                store.popitem(last=False)
+    
+    def respond(self, route, params):
+        """(statut HTTP, corps JSON en octets, ETag) pour une route
+        ('articles', 'article', 'stats') et ses paramètres"""
+        key = f"{route}?{normalize_params(params)}"
+        with self.pool.connection() as conn:
+            version = self.data_version(conn)
+            with self.lock:
+                self.stats['requests'] += 1
+                if version != self.version:
+                    if self.version is not None:
+                        self.stats['invalidations'] += 1
+                    self.cache.clear()
+                    self.totals.clear()
+                    self.version = version
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.cache.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return cached
+            
+            try:
+                if route == 'articles':
+                    status, payload = 200, self.list_articles(conn, params)
+                elif route == 'article':
+                    payload = self.article(conn, params['id'])
+                    status = 200 if payload is not None else 404
+                    payload = payload or {'error': f"article inconnu: {params['id']}"}
+                elif route == 'stats':
+                    status, payload = 200, self.summary(conn)
+                else:
+                    status, payload = 404, {'error': f"route inconnue: {route}"}
+            except (ValueError, sqlite3.OperationalError) as e:
+                status, payload = 400, {'error': str(e)}
+        
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        response = (status, body, f'"{hashlib.sha256(body).hexdigest()[:CONTENT_HASH_LENGTH]}"')
+        if status != 400:
+            self.remember(self.cache, key, response)
+        return response
+    
+    @staticmethod
+    def filters(params, probe=False):
+        """Clause WHERE (et paramètres) des filtres category / year / q"""
+        conditions = ["published IS NOT NULL"]
+        args = []
+        if params.get('category'):
+            conditions.append("category = ?")
+            args.append(params['category'])
+        if params.get('year'):
+            if not re.fullmatch(r'\d{4}', params['year']):
+                raise ValueError(f"année invalide: {params['year']}")
+            # Bornes en AAAA-MM-JJ: published a l'affinité NUMERIC, '2022' serait
+            # comparé comme un nombre
+            conditions.append("published >= ? AND published < ?")
+            args += [f"{params['year']}-01-01", f"{int(params['year']) + 1}-01-01"]
+        if params.get('q'):
+            # Syntaxe FTS5, comme la commande search
+            if probe:
+                conditions.append('''EXISTS (SELECT 1 FROM articles_fts
+                                      WHERE articles_fts MATCH ? AND rowid = articles.rowid)''')
+            else:
+                conditions.append("rowid IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)")
+            args.append(params['q'])
+        return ' AND '.join(conditions), args
+    
+    @staticmethod
+    def cursor(row):
+        return f"{row[4]}|{row[0]}"
+    
+    @staticmethod
+    def parse_cursor(value):
+        published, separator, arxiv_id = value.partition('|')
+        if not separator or not arxiv_id:
+            raise ValueError(f"curseur invalide: {value}")
+        return [published, arxiv_id]
+    
+    def list_articles(self, conn, params):
+        """Une page de la liste filtrée, par date de soumission décroissante.
+        
+        after=curseur: la page suivante; before=curseur: la précédente;
+        last=1: la dernière; abstract=1: avec les résumés. Retourne {total,
+        articles, next, prev}: next / prev sont les curseurs à passer en
+        after / before (None au bout de la liste).
+        """
+        limit = int(params.get('limit') or SERVE_PAGE_SIZE)
+        if not 0 < limit <= SERVE_MAX_PAGE_SIZE:
+            raise ValueError(f"limit doit être entre 1 et {SERVE_MAX_PAGE_SIZE}")
+        where, args = self.filters(params)
+        
+        total_key = normalize_params({name: params.get(name) or ''
+                                      for name in ('category', 'year', 'q')})
+        with self.lock:
+            total = self.totals.get(total_key)
+        if total is None:
+            total = conn.execute(f"SELECT COUNT(*) FROM articles WHERE {where}", args).fetchone()[0]
+            self.remember(self.totals, total_key, total)
+        
+        if params.get('q') and total:
+            # Correspondances denses: parcourir par date en testant chaque article
+            rows = conn.execute("SELECT MAX(rowid) FROM articles").fetchone()[0] or 0
+            if limit * rows / total <= SERVE_PROBE_ROWS:
+                where, args = self.filters(params, probe=True)
+        
+        # before / last: lecture dans l'ordre croissant, puis la page est retournée
+        backward = bool(params.get('before') or params.get('last'))
+        if params.get('after'):
+            where += " AND (published, arxiv_id) < (?, ?)"
+            args += self.parse_cursor(params['after'])
+        elif params.get('before'):
+            where += " AND (published, arxiv_id) > (?, ?)"
+            args += self.parse_cursor(params['before'])
+        order = 'ASC' if backward else 'DESC'
+        columns = ['arxiv_id', 'title', 'authors', 'category', 'published', 'link', 'pdf_link']
+        if params.get('abstract'):
+            columns.append('abstract')
+        rows = conn.execute(f'''
+            SELECT {', '.join(columns)} FROM articles
+            WHERE {where}
+            ORDER BY published {order}, arxiv_id {order}
+            LIMIT ?
+        ''', args + [limit + 1]).fetchall()
+        
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if backward:
+            rows.reverse()
+            first_page, last_page = not more, not params.get('before')
+        else:
+            first_page, last_page = not params.get('after'), not more
+        
+        return {
+            'total': total,
+            'articles': [self.record(row) for row in rows],
+            'next': self.cursor(rows[-1]) if rows and not last_page else None,
+            'prev': self.cursor(rows[0]) if rows and not first_page else None,
+        }
+    
+    @staticmethod
+    def record(row):
+        """Ligne SQL -> article tel que le site l'affiche (auteurs en liste)"""
+        record = {
+            'id': row[0],
+            'title': row[1],
+            'authors': split_authors(row[2]) or ['Unknown'],
+            'category': row[3],
+            'published': row[4][:10] if row[4] else None,
+            'link': row[5],
+            'pdf': row[6],
+        }
+        if len(row) > 7:
+            record['abstract'] = row[7] or ''
+        return record
+    
+    def article(self, conn, arxiv_id):
+        """Un article complet (résumé, catégories, DOI..., articles voisins), ou None"""
+        # '2301.01234v2' (lien arXiv copié tel quel) désigne le même article
+        arxiv_id = split_version(arxiv_id)[0]
+        row = conn.execute('''
+            SELECT arxiv_id, title, authors, category, published, link, pdf_link, abstract,
+                   categories, doi, journal_ref, comment, version, updated
+            FROM articles WHERE arxiv_id = ?
+        ''', (arxiv_id,)).fetchone()
+        if row is None:
+            return None
+        record = self.record(row[:8])
+        record.update(zip(('categories', 'doi', 'journal_ref', 'comment', 'version', 'updated'),
+                          row[8:]))
+        record['categories'] = (record['categories'] or record['category'] or '').split()
+        try:
+            related = SimilarIndex(conn).related(arxiv_id, SIMILAR_EXPORT_LIMIT)
+        except sqlite3.OperationalError:
+            related = []  # base antérieure à l'index des voisins
+        record['related'] = [{'id': other_id, 'title': title, 'similarity': round(score, 2),
+                              'link': article_links(other_id)[0]}
+                             for score, other_id, title, category, published in related]
+        return record
+    
+    def summary(self, conn):
+        """collection_stats: {total, categories, years} comme le manifest de
+        l'export découpé, plus le détail de stats.json"""
+        return collection_stats(conn)
+    
+    def close(self):
+        self.pool.close()
+
+
+class ReadApiHandler(BaseHTTPRequestHandler):
+    """Routes HTTP de l'API de lecture:
+        
+        GET /api/articles?category=&year=&q=&limit=&after=&before=&last=1
+        GET /api/articles/<arxiv_id>
+        GET /api/stats
+    
+    ETag sur chaque réponse (If-None-Match -> 304), CORS ouvert pour que le
+    site puisse l'interroger depuis une autre origine.
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        path = url.path.rstrip('/')
+        route = None
+        if path == '/api/articles':
+            route = 'articles'
+        elif path.startswith('/api/articles/'):
+            route = 'article'
+            params = {'id': unquote(path[len('/api/articles/'):])}
+        elif path == '/api/stats':
+            route = 'stats'
+        
+        if route is None:
+            status, body, etag = 404, b'{"error":"not found"}', None
+        else:
+            status, body, etag = self.server.api.respond(route, params)
+        
+        if etag is not None and etag == self.headers.get('If-None-Match'):
+            self.send_response(304)
+            self.send_common_headers(etag)
+            self.end_headers()
+            return
+        
+        gzipped = len(body) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            body = gzip.compress(body, 1)
+        self.send_response(status)
+        self.send_common_headers(etag)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_common_headers(self, etag):
+        """En-têtes des réponses 200 et 304"""
+        if etag is not None:
+            self.send_header('ETag', etag)
+        # Le navigateur garde la réponse mais la revalide (304 si rien n'a changé)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_api(db_path, host=SERVE_HOST, port=SERVE_PORT, pool_size=SERVE_POOL_SIZE):
+    """Sert l'API de lecture de db_path jusqu'à Ctrl+C"""
+    server = ThreadingHTTPServer((host, port), ReadApiHandler)
+    server.daemon_threads = True
+    server.api = ReadApi(db_path, pool_size)
+    url = f"http://{host}:{server.server_address[1]}/api"
+    print(f"🌐 API de lecture sur {url} ({db_path}, {pool_size} connexions en lecture seule)")
+    print(f"   Site: index.html?api={url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.api.close()
+    
+    stats = server.api.stats
+    print(f"\n🌐 {stats['requests']:,} requêtes, {stats['hits']:,} servies par le cache, "
+          f"{stats['invalidations']:,} invalidation(s)")
+
 
 class ArxivFullCollector:
-    def __init__(self, db_path="arxiv_full_collection.db"):
+    def __init__(self, db_path=DEFAULT_DB_PATH, cache_path=DEFAULT_CACHE_PATH,
+                 base_url=None, offline=False, events_path=None):
         self.db_path = db_path
-        self.base_url = "http://export.arxiv.org/api/query"
+        # base_url permet de pointer vers un serveur local qui imite l'API
+        self.base_url = base_url or os.environ.get('ARXIV_API_URL',
+                                                   "http://export.arxiv.org/api/query")
+        # offline: rejoue uniquement depuis le cache, sans aucune requête réseau
+        self.offline = offline
+        self.cache = ResponseCache(cache_path) if cache_path else None
+        self.rate_limiter = RateLimiter(1 / API_REQUEST_INTERVAL)
+        self.session = create_session(DEFAULT_WORKERS)
+        self.validators = OrderedDict()  # params -> (etag, last_modified)
+        self.stats_lock = threading.Lock()
+        # Backend de collecte (ApiSource, ou OaiPmhSource pour les collectes en masse)
+        self.source = ApiSource(self)
+        # Métriques de l'exécution en cours (remplacées par begin_run)
+        self.events_path = events_path
+        self.metrics = RunMetrics()
+        self.run_writer_stats = None
+        self.last_run = None
         self.init_database()
+        self.writer = ArticleWriter(self.db_path)
+        if self.writer.links_missing():
+            print("👥 Remplissage des tables auteurs / catégories (une seule fois)...")
+            print(f"✅ {self.writer.rebuild_links():,} articles liés")
         
         # Catégories à collecter (ajoute les tiennes ici)
         self.categories = [
@@ -66,374 +3531,1490 @@ class ArxivFullCollector:
             )
         ''')
         
+        # Colonnes ajoutées après coup (migration des anciennes bases)
+        ensure_columns(cursor, 'articles', [
+            ('categories', 'TEXT'), ('doi', 'TEXT'), ('journal_ref', 'TEXT'),
+            ('comment', 'TEXT'), ('version', 'INTEGER'), ('updated_at', 'TEXT')])
+        ensure_columns(cursor, 'collection_progress', [
+            ('window_start', 'TEXT'), ('window_end', 'TEXT'), ('next_offset', 'INTEGER'),
+            ('resumption_token', 'TEXT')])
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_progress_unit
+            ON collection_progress(category, year, month)
+        ''')
+        
+        # Journal des fenêtres de requête (combien de requêtes par fenêtre)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS query_windows (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category TEXT,
+                window_start TEXT,
+                window_end TEXT,
+                total_results INTEGER,
+                requests INTEGER,
+                articles_count INTEGER,
+                split INTEGER DEFAULT 0,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Journal HTTP: latence et volume de chaque requête
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS fetch_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT,
+                status INTEGER,
+                attempt INTEGER,
+                latency_ms REAL,
+                bytes INTEGER,
+                wire_bytes INTEGER,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Bilan de chaque exécution (collect, update, reparse): volumes,
+        # erreurs et temps par étape (JSON), pour régler les longues collectes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT,
+                command TEXT,
+                params TEXT,
+                status TEXT,
+                started TEXT,
+                finished TEXT,
+                seconds REAL,
+                requests INTEGER,
+                retries INTEGER,
+                not_modified INTEGER,
+                rate_limited INTEGER,
+                server_errors INTEGER,
+                timeouts INTEGER,
+                cache_hits INTEGER,
+                bytes INTEGER,
+                wire_bytes INTEGER,
+                entries INTEGER,
+                bad_entries INTEGER,
+                rows INTEGER,
+                changed INTEGER,
+                rows_per_second REAL,
+                backoff_seconds REAL,
+                stages TEXT
+            )
+        ''')
+        
+        # High-water mark par catégorie pour la mise à jour incrémentale
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS harvest_watermarks (
+                category TEXT PRIMARY KEY,
+                last_updated TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Tables normalisées: auteurs et catégories (cross-lists comprises),
+        # remplies par ArticleWriter pour des recherches par index
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS authors (
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                name_key TEXT UNIQUE,
+                surname TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_authors (
+                arxiv_id TEXT,
+                position INTEGER,
+                author_id INTEGER,
+                PRIMARY KEY (arxiv_id, position)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_categories (
+                category TEXT,
+                arxiv_id TEXT,
+                is_primary INTEGER,
+                PRIMARY KEY (category, arxiv_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_authors_surname ON authors(surname)')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_article_authors_author
+            ON article_authors(author_id, arxiv_id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_article_categories_article
+            ON article_categories(arxiv_id)
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_links_delete AFTER DELETE ON articles BEGIN
+                DELETE FROM article_authors WHERE arxiv_id = old.arxiv_id;
+                DELETE FROM article_categories WHERE arxiv_id = old.arxiv_id;
+            END
+        ''')
+        
+        # Journal des changements pour l'export incrémental: chaque insertion,
+        # modification ou suppression note le shard (catégorie, année) touché,
+        # ancien et nouveau si l'article change de shard (cf. shard_key)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                arxiv_id TEXT,
+                shard_category TEXT,
+                shard_year TEXT
+            )
+        ''')
+        new_key = f"{SHARD_CATEGORY_SQL.format('new')}, {SHARD_YEAR_SQL.format('new')}"
+        old_key = f"{SHARD_CATEGORY_SQL.format('old')}, {SHARD_YEAR_SQL.format('old')}"
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS articles_changes_insert AFTER INSERT ON articles BEGIN
+                INSERT INTO article_changes (arxiv_id, shard_category, shard_year)
+                VALUES (new.arxiv_id, {new_key});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS articles_changes_update
+            AFTER UPDATE OF title, authors, abstract, category, published ON articles BEGIN
+                INSERT INTO article_changes (arxiv_id, shard_category, shard_year)
+                VALUES (new.arxiv_id, {new_key});
+                INSERT INTO article_changes (arxiv_id, shard_category, shard_year)
+                SELECT old.arxiv_id, {old_key}
+                WHERE ({old_key}) IS NOT ({new_key});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS articles_changes_delete AFTER DELETE ON articles BEGIN
+                INSERT INTO article_changes (arxiv_id, shard_category, shard_year)
+                VALUES (old.arxiv_id, {old_key});
+            END
+        ''')
+        
+        # Comptes par (catégorie, année, mois) et par catégorie listée, tenus
+        # à jour par triggers: stats, summaries des exports, stats.json
+        init_stats(cursor)
+        
+        # Index des articles voisins (MinHash / LSH), rempli par index-similar
+        init_similar(cursor)
+        
+        # Journal des recherches: latence suivie au fil de la croissance de la base
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS search_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT,
+                filters TEXT,
+                results INTEGER,
+                latency_ms REAL,
+                articles INTEGER,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         # Index pour recherche rapide
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_published ON articles(published)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_category ON articles(category)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_title ON articles(title)')
+        # Ordre de lecture de l'export découpé (catégorie, date) et pagination
+        # par clé (published, arxiv_id) de l'API de lecture; remplacent les
+        # index sur (published) et (category, published) des anciennes bases
+        cursor.execute('DROP INDEX IF EXISTS idx_published')
+        cursor.execute('DROP INDEX IF EXISTS idx_category_published')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_published_id
+            ON articles(published, arxiv_id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_category_published_id
+            ON articles(category, published, arxiv_id)
+        ''')
+        
+        # Recherche plein texte, synchronisée par triggers
+        self.fts_enabled = init_fts(cursor)
+        
+        # Après les triggers: les suppressions de la migration les déclenchent
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            migrated = migrate_versioned_ids(conn)
+            if migrated:
+                print(f"🔖 {migrated:,} identifiants sans suffixe de version (vN)")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         
         conn.commit()
         conn.close()
         print("✅ Base de données initialisée")
     
-    def fetch_with_retry(self, params, max_retries=5, initial_wait=3):
-        """Fetch avec retry automatique"""
-        wait_time = initial_wait
+    def close(self):
+        """Ferme la connexion d'écriture et la session HTTP"""
+        self.writer.close()
+        self.session.close()
+    
+    def configure_pool(self, pool_size):
+        """Redimensionne le pool de connexions au niveau de concurrence"""
+        self.session.close()
+        self.session = create_session(pool_size)
+    
+    def record_fetch(self, query, status, attempt, latency, body_bytes, wire_bytes):
+        """Enregistre latence et volume d'une requête (métriques, journal
+        d'événements et fetch_log)"""
+        self.metrics.add(requests=1, retries=1 if attempt > 0 else 0,
+                         not_modified=1 if status == 304 else 0,
+                         rate_limited=1 if status == 429 else 0,
+                         server_errors=1 if status >= 500 else 0,
+                         timeouts=1 if status == 0 else 0,
+                         bytes=body_bytes, wire_bytes=wire_bytes)
+        self.metrics.event('fetch', query=query, status=status, attempt=attempt,
+                           latency_ms=round(latency * 1000, 1), bytes=body_bytes,
+                           wire_bytes=wire_bytes)
+        
+        self.writer.execute('''
+            INSERT INTO fetch_log (query, status, attempt, latency_ms, bytes, wire_bytes)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (query, status, attempt, latency * 1000, body_bytes, wire_bytes))
+    
+    def remember_validators(self, key, response):
+        """Garde ETag/Last-Modified d'une réponse pour les requêtes conditionnelles
+        (inutiles sans cache: un 304 doit y retrouver le corps de la page)"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if self.cache is None or (not etag and not last_modified):
+            return
+        with self.stats_lock:
+            self.validators[key] = (etag, last_modified)
+            self.validators.move_to_end(key)
+            while len(self.validators) > VALIDATOR_CACHE_SIZE:
+                self.validators.popitem(last=False)
+    
+    def fetch_with_retry(self, params, max_retries=5, initial_wait=3, use_cache=True, url=None):
+        """Fetch avec retry automatique.
+        
+        Les réponses 200 sont écrites dans le cache local, et en sont retirées
+        par l'appelant (discard_response) si elles ne se parsent pas; avec
+        use_cache, une réponse en cache est rejouée sans toucher au réseau (à
+        désactiver pour les fenêtres dont le contenu peut encore changer).
+        
+        Utilise la session keep-alive (gzip/deflate, requêtes conditionnelles
+        si le serveur fournit ETag/Last-Modified et que la page est encore
+        dans le cache, qui sert le corps d'un 304). Chaque tentative consomme
+        un jeton du rate limiter partagé; un 429/503 suspend le limiter pour
+        tous les workers, selon Retry-After ou un backoff exponentiel avec
+        jitter.
+        
+        url: autre endpoint que self.base_url (OAI-PMH).
+        """
+        key = normalize_params(params)
+        
+        if self.cache is not None and (use_cache or self.offline):
+            with self.metrics.stage('cache'):
+                cached_text = self.cache.get(params)
+            if cached_text is not None:
+                self.metrics.add(cache_hits=1)
+                return cached_text, True
+        
+        if self.offline:
+            print("   ❌ Absent du cache (mode hors ligne)")
+            return None, False
+        
+        with self.stats_lock:
+            validators = self.validators.get(key)
+        cached_text = None
+        if validators is not None and self.cache is not None:
+            with self.metrics.stage('cache'):
+                cached_text = self.cache.get(params)
         
         for attempt in range(max_retries):
+            headers = {}
+            if cached_text is not None:
+                etag, last_modified = validators
+                if etag:
+                    headers['If-None-Match'] = etag
+                if last_modified:
+                    headers['If-Modified-Since'] = last_modified
+            
+            with self.metrics.stage('sleep'):
+                self.rate_limiter.acquire()
+            started = time.perf_counter()
             try:
-                response = requests.get(self.base_url, params=params, timeout=30)
+                with self.metrics.stage('network'):
+                    response = self.session.get(url or self.base_url, params=params,
+                                                headers=headers, timeout=30)
+                    body_bytes = len(response.content)
+                latency = time.perf_counter() - started
+                wire_bytes = int(response.headers.get('Content-Length', body_bytes))
+                self.record_fetch(key, response.status_code, attempt, latency,
+                                  body_bytes, wire_bytes)
                 
                 if response.status_code == 200:
+                    self.remember_validators(key, response)
+                    if self.cache is not None:
+                        with self.metrics.stage('cache'):
+                            self.cache.put(params, response.text)
                     return response.text, True
                 
+                elif response.status_code == 304 and cached_text is not None:
+                    return cached_text, True
+                
                 elif response.status_code == 429:
-                    print(f"   ⚠️  Rate limit, attente {wait_time}s...")
-                    time.sleep(wait_time)
-                    wait_time *= 2
+                    wait_time = backoff_delay(attempt, initial_wait,
+                                              parse_retry_after(response.headers.get('Retry-After')))
+                    print(f"   ⚠️  Rate limit, pause globale {wait_time:.1f}s...")
+                    self.backoff(response.status_code, attempt, wait_time)
                     continue
                 
-                elif response.status_code in [500, 503]:
-                    print(f"   ⚠️  Erreur serveur, attente {wait_time}s...")
-                    time.sleep(wait_time)
-                    wait_time *= 2
+                elif response.status_code in [500, 502, 503, 504]:
+                    wait_time = backoff_delay(attempt, initial_wait,
+                                              parse_retry_after(response.headers.get('Retry-After')))
+                    print(f"   ⚠️  Erreur serveur, pause globale {wait_time:.1f}s...")
+                    self.backoff(response.status_code, attempt, wait_time)
                     continue
                 
                 else:
                     print(f"   ❌ Erreur HTTP {response.status_code}")
                     return None, False
                     
-            except requests.exceptions.Timeout:
-                print(f"   ⚠️  Timeout, tentative {attempt + 1}/{max_retries}")
-                time.sleep(wait_time)
-                wait_time *= 2
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                self.record_fetch(key, 0, attempt, time.perf_counter() - started, 0, 0)
+                wait_time = backoff_delay(attempt, initial_wait)
+                print(f"   ⚠️  Timeout/connexion, tentative {attempt + 1}/{max_retries}")
+                self.backoff(0, attempt, wait_time)
                 continue
                 
             except Exception as e:
                 print(f"   ❌ Erreur: {e}")
                 return None, False
         
-        return None, False
+        return None, False
+    
+    def backoff(self, status, attempt, wait_time):
+        """Suspend le rate limiter après un 429 / 5xx / timeout (status 0)"""
+        self.metrics.add_backoff(wait_time)
+        self.metrics.event('backoff', status=status, attempt=attempt, wait=round(wait_time, 3))
+        self.rate_limiter.penalize(wait_time)
+    
+    def begin_run(self, command, **params):
+        """Démarre une exécution: métriques neuves et événement run_start"""
+        self.metrics.close()
+        self.metrics = RunMetrics(self.events_path, command, params)
+        self.run_writer_stats = dict(self.writer.stats)
+        self.metrics.event('run_start', command=command, params=params)
+    
+    def end_run(self, status='completed'):
+        """Termine l'exécution: bilan dans la table runs, le journal et la console"""
+        before = self.run_writer_stats or dict.fromkeys(self.writer.stats, 0)
+        written = {name: self.writer.stats[name] - before[name] for name in before}
+        summary = self.metrics.summary(written['rows'], written['changed'], status)
+        
+        columns = [name for name in summary if name != 'run_id'] + ['run_id']
+        values = [json.dumps(summary[name]) if name in ('params', 'stages') else summary[name]
+                  for name in columns]
+        self.writer.execute(f'''
+            INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})
+        ''', values)
+        self.metrics.event('run_end', **summary)
+        self.metrics.close()
+        
+        self.last_run = summary
+        self.print_run_summary(summary, written['seconds'])
+        return summary
+    
+    @contextlib.contextmanager
+    def run(self, command, **params):
+        """begin_run / end_run autour d'un bloc; une exécution interrompue
+        (Ctrl+C, exception) est enregistrée avec son statut"""
+        self.begin_run(command, **params)
+        status = 'failed'
+        try:
+            yield
+            status = 'completed'
+        except KeyboardInterrupt:
+            status = 'interrupted'
+            raise
+        finally:
+            self.end_run(status)
+    
+    def print_run_summary(self, summary, write_seconds=0.0):
+        """Affiche le bilan réseau, écriture et temps par étape d'une exécution"""
+        if summary['rows']:
+            rate = summary['rows'] / write_seconds if write_seconds else 0.0
+            print(f"\n💾 {summary['rows']:,} lignes écrites "
+                  f"({summary['changed']:,} nouvelles ou modifiées) "
+                  f"à {rate:,.0f} lignes/s")
+        
+        if summary['requests']:
+            average = summary['stages']['network'] / summary['requests'] * 1000
+            print(f"\n🌐 {summary['requests']:,} requêtes ({summary['retries']:,} retries, "
+                  f"{summary['not_modified']:,} non modifiées), "
+                  f"{summary['wire_bytes'] / 1024 / 1024:.1f} MB transférés "
+                  f"({summary['bytes'] / 1024 / 1024:.1f} MB décompressés), "
+                  f"latence moyenne {average:.0f} ms")
+            if summary['rate_limited'] or summary['server_errors'] or summary['timeouts']:
+                print(f"   ⚠️  {summary['rate_limited']:,} × 429, "
+                      f"{summary['server_errors']:,} × 5xx, {summary['timeouts']:,} timeouts: "
+                      f"{summary['backoff_seconds']:.0f}s de pause demandées")
+        
+        stages = ' · '.join(f"{STAGE_LABELS[name]} {format_duration(seconds)}"
+                            for name, seconds in summary['stages'].items() if seconds >= 0.05)
+        if stages and sum(summary['stages'].values()) > summary['seconds']:
+            stages += " (cumulés sur tous les workers)"
+        print(f"\n⏱️  {format_duration(summary['seconds'])} au total"
+              + (f" — {stages}" if stages else ""))
+    
+    def parse_response(self, xml_data):
+        """Parse la réponse XML d'arXiv: (liste d'Article, erreur de parsing).
+        
+        L'erreur est None pour une page complète. Sinon (page tronquée ou mal
+        formée) la liste ne contient que les entrées lues avant l'erreur: la
+        page ne doit pas être prise pour la dernière d'une fenêtre.
+        """
+        stats = {}
+        with self.metrics.stage('parse'):
+            articles = list(iter_articles(xml_data, stats))
+        self.metrics.add(entries=stats['entries'], bad_entries=stats['bad_entries'])
+        return articles, stats.get('parse_error')
+    
+    def parse_oai_response(self, xml_data):
+        """Parse une page OAI-PMH: (articles de self.categories, jeton suivant, erreur)"""
+        stats = {}
+        with self.metrics.stage('parse'):
+            page = parse_oai_page(xml_data, set(self.categories), stats)
+        self.metrics.add(entries=stats['entries'], bad_entries=stats['bad_entries'])
+        return page
+    
+    def discard_response(self, params):
+        """Oublie une page illisible (cache et validateurs): elle sera
+        redemandée au prochain passage au lieu d'être rejouée"""
+        if self.cache is not None:
+            self.cache.delete(params)
+        with self.stats_lock:
+            self.validators.pop(normalize_params(params), None)
+    
+    def save_articles(self, articles, progress=None):
+        """Sauvegarde les articles dans la base (un lot = une transaction).
+        
+        progress: checkpoint (voir progress_row) commité avec les articles.
+        """
+        if not articles and progress is None:
+            return 0
+        with self.metrics.stage('write'):
+            return self.writer.write_articles(articles, progress)
+    
+    def log_window(self, category, window_start, window_end, total_results,
+                   requests_count, articles_count, split=False):
+        """Enregistre le coût (en requêtes) d'une fenêtre de collecte"""
+        self.metrics.event('window', category=category,
+                           window_start=format_submitted_date(window_start),
+                           window_end=format_submitted_date(window_end),
+                           total_results=total_results, requests=requests_count,
+                           articles=articles_count, split=split)
+        self.writer.execute('''
+            INSERT INTO query_windows
+            (category, window_start, window_end, total_results, requests, articles_count, split)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (category, format_submitted_date(window_start), format_submitted_date(window_end),
+              total_results, requests_count, articles_count, int(split)))
+    
+    def collect_window(self, category, window_start, window_end, batch_size=1000,
+                       on_page=None, resume=None, errors=None, refresh=False):
+        """Collecte une fenêtre de dates, filtrée côté serveur par submittedDate.
+        
+        Si la fenêtre dépasse API_RESULT_CAP résultats, elle est coupée en deux
+        et chaque moitié est collectée récursivement.
+        
+        on_page(window_start, window_end, next_offset, articles) est appelé après
+        chaque page. resume = (window_start, window_end, offset) reprend une
+        collecte interrompue: les fenêtres antérieures sont sautées et la
+        fenêtre correspondante repart de l'offset enregistré. Les fenêtres
+        interrompues par une erreur réseau ou une page illisible sont
+        ajoutées à la liste errors.
+        refresh=True (--force, --refresh-older-than) ne rejoue pas le cache,
+        même pour une fenêtre terminée.
+        """
+        query = build_window_query(category, window_start, window_end)
+        
+        all_articles = []
+        start = 0
+        
+        if resume is not None:
+            resume_start, resume_end, resume_offset = resume
+            # Fenêtre entièrement collectée avant l'interruption
+            if format_submitted_date(window_end) < resume_start:
+                return all_articles
+            if (format_submitted_date(window_start) == resume_start
+                    and format_submitted_date(window_end) == resume_end):
+                start = resume_offset
+        
+        requests_count = 0
+        total_results = None
+        
+        while True:
+            params = {
+                'search_query': query,
+                'start': start,
+                'max_results': batch_size,
+                'sortBy': 'submittedDate',
+                'sortOrder': 'ascending'
+            }
+            
+            label = f"      {category} {format_submitted_date(window_start)[:8]} batch {start//batch_size + 1} (offset {start})"
+            
+            # Une fenêtre pas encore terminée peut recevoir de nouveaux articles
+            closed = window_end < datetime.now(timezone.utc)
+            xml_data, success = self.fetch_with_retry(params, use_cache=closed and not refresh)
+            requests_count += 1
+            
+            if not success or not xml_data:
+                print(f"{label} ❌")
+                if errors is not None:
+                    errors.append((category, window_start, window_end))
+                break
+            
+            if total_results is None:
+                total_results = parse_total_results(xml_data)
+                
+                # Trop de résultats pour une seule fenêtre: on découpe
+                if (total_results is not None and total_results > API_RESULT_CAP
+                        and window_end > window_start):
+                    print(f"{label} ✂️  {total_results:,} résultats, découpage de la fenêtre")
+                    self.log_window(category, window_start, window_end, total_results,
+                                    requests_count, 0, split=True)
+                    for half_start, half_end in split_window(window_start, window_end):
+                        all_articles.extend(
+                            self.collect_window(category, half_start, half_end, batch_size,
+                                                on_page, resume, errors, refresh))
+                    return all_articles
+            
+            articles, parse_error = self.parse_response(xml_data)
+            
+            if parse_error is not None:
+                # Page tronquée: ni sauvegardée ni prise pour la dernière page,
+                # le mois reste en cours et repart de cet offset
+                print(f"{label} ❌ Page illisible: {parse_error}")
+                self.discard_response(params)
+                if errors is not None:
+                    errors.append((category, window_start, window_end))
+                break
+            
+            if not articles:
+                print(f"{label} ✅ Terminé")
+                break
+            
+            all_articles.extend(articles)
+            print(f"{label} ✅ {len(articles)} articles")
+            
+            start += batch_size
+            
+            if on_page is not None:
+                on_page(window_start, window_end, start, articles)
+            
+            # Page incomplète ou total atteint: la fenêtre est finie
+            if len(articles) < batch_size or (total_results is not None and start >= total_results):
+                break
+        
+        self.log_window(category, window_start, window_end, total_results,
+                        requests_count, len(all_articles))
+        return all_articles
+    
+    def collect_by_month(self, category, year, month, on_page=None, resume=None, errors=None,
+                         refresh=False):
+        """Collecte les articles pour un mois donné (filtre de date côté serveur)"""
+        window_start, window_end = month_window(year, month)
+        return self.collect_window(category, window_start, window_end,
+                                   on_page=on_page, resume=resume, errors=errors,
+                                   refresh=refresh)
+    
+    def get_progress(self, category, year, month):
+        """Retourne le dernier checkpoint d'un mois (dict) ou None"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, articles_count, status, timestamp, window_start, window_end, next_offset,
+                   resumption_token
+            FROM collection_progress
+            WHERE category = ? AND year = ? AND month = ?
+            ORDER BY id DESC
+            LIMIT 1
+        ''', (category, year, month))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row is None:
+            return None
+        
+        return {
+            'id': row[0],
+            'articles_count': row[1] or 0,
+            'status': row[2],
+            'timestamp': row[3],
+            'window_start': row[4],
+            'window_end': row[5],
+            'next_offset': row[6] or 0,
+            'resumption_token': row[7]
+        }
+    
+    @staticmethod
+    def progress_row(category, year, month, articles_count, status,
+                     window_start=None, window_end=None, next_offset=None, resumption_token=None):
+        """Checkpoint d'un mois au format de collection_progress"""
+        return (category, year, month, articles_count, status,
+                format_submitted_date(window_start) if window_start else None,
+                format_submitted_date(window_end) if window_end else None,
+                next_offset, resumption_token)
+    
+    def save_progress(self, category, year, month, articles_count, status,
+                      window_start=None, window_end=None, next_offset=None):
+        """Écrit (ou met à jour) le checkpoint d'un mois"""
+        self.writer.save_progress(*self.progress_row(
+            category, year, month, articles_count, status, window_start, window_end, next_offset))
+    
+    def is_month_done(self, progress, force=False, refresh_before=None):
+        """Indique si un mois déjà collecté peut être sauté"""
+        if force or progress is None or progress['status'] != 'completed':
+            return False
+        
+        if refresh_before is not None and progress['timestamp']:
+            collected_at = datetime.strptime(progress['timestamp'][:19], '%Y-%m-%d %H:%M:%S')
+            if collected_at.replace(tzinfo=timezone.utc) < refresh_before:
+                return False
+        
+        return True
+    
+    def collect_month(self, category, year, month, force=False, refresh_before=None,
+                      errors=None):
+        """Collecte un mois d'une catégorie (unité de travail des workers).
+        
+        `category` est une clé d'unité de self.source (une catégorie pour
+        l'API, 'oai:<set>' pour OAI-PMH). Les mois marqués 'completed' dans
+        collection_progress sont sautés (sauf force ou checkpoint antérieur à
+        refresh_before). Chaque page est sauvegardée dès réception et la
+        position en cours (offset ou resumptionToken) est enregistrée, pour
+        qu'un mois interrompu reprenne là où il s'était arrêté. Les erreurs
+        réseau sont ajoutées à la liste errors si elle est fournie.
+        """
+        label = f"      📆 {category} {year}-{month:02d}"
+        progress = self.get_progress(category, year, month)
+        
+        if self.is_month_done(progress, force, refresh_before):
+            print(f"{label} ⏭️  Déjà collecté ({progress['articles_count']} articles)")
+            return 0
+        
+        # Mois déjà terminé mais recollecté (--force ou checkpoint trop ancien)
+        refresh = force or (progress is not None and progress['status'] == 'completed')
+        
+        resume = None
+        saved = 0
+        if progress is not None and progress['status'] == 'in_progress' and not force:
+            resume = progress
+            saved = progress['articles_count']
+            if progress['resumption_token']:
+                print(f"{label} ↩️  Reprise au jeton {progress['resumption_token']}")
+            else:
+                print(f"{label} ↩️  Reprise à l'offset {progress['next_offset']}")
+        
+        def on_page(articles, **checkpoint):
+            nonlocal saved
+            # Articles et checkpoint dans la même transaction
+            progress = self.progress_row(category, year, month, saved + len(articles),
+                                         'in_progress', **checkpoint)
+            saved += self.save_articles(articles, progress)
+        
+        if errors is None:
+            errors = []
+        errors_before = len(errors)
+        self.source.harvest_month(category, year, month, on_page, resume, errors, refresh)
+        
+        # Un mois en cours (ou une erreur réseau) reste repris au prochain passage
+        failed = len(errors) - errors_before
+        _, month_end = month_window(year, month)
+        if not failed and month_end < datetime.now(timezone.utc):
+            self.save_progress(category, year, month, saved, 'completed')
+        
+        self.metrics.event('month', category=category, year=year, month=month,
+                           articles=saved, errors=failed)
+        if saved:
+            print(f"{label} ✅ {saved} articles sauvegardés")
+        else:
+            print(f"{label} ⚠️  Aucun article")
+        
+        return saved
+    
+    def collect_year(self, category, year, force=False, refresh_before=None):
+        """Collecte tous les articles d'une année, mois par mois"""
+        print(f"\n   📅 Année {year}")
+        total_articles = 0
+        
+        for month in range(1, 13):
+            total_articles += self.collect_month(category, year, month, force, refresh_before)
+        
+        return total_articles
     
-    def parse_response(self, xml_data):
-        """Parse la réponse XML d'arXiv"""
-        try:
-            root = ET.fromstring(xml_data)
-            ns = {'atom': 'http://www.w3.org/2005/Atom',
-                  'arxiv': 'http://arxiv.org/schemas/atom'}
+    def collect_all(self, start_year=1986, end_year=2025, force=False, refresh_older_than=None,
+                    workers=DEFAULT_WORKERS):
+        """Collecte TOUT depuis 1986 jusqu'à 2025.
+        
+        Reprend là où une collecte précédente s'est arrêtée. force=True
+        recollecte tout; refresh_older_than (en jours) recollecte les mois
+        dont le checkpoint est plus ancien.
+        
+        Avec workers > 1, les mois (catégorie, année, mois) sont collectés en
+        parallèle; le rate limiter partagé garde le débit global de requêtes
+        sous la limite de l'API.
+        """
+        refresh_before = None
+        if refresh_older_than is not None:
+            refresh_before = datetime.now(timezone.utc) - timedelta(days=refresh_older_than)
+        
+        print("\n" + "="*80)
+        print("🚀 COLLECTION COMPLÈTE arXiv 1986-2025")
+        print("="*80)
+        
+        with self.run('collect', start_year=start_year, end_year=end_year, force=force,
+                      refresh_older_than=refresh_older_than, workers=workers,
+                      source=self.source.name):
+            if workers > 1:
+                return self.collect_all_parallel(start_year, end_year, force, refresh_before,
+                                                 workers)
+            return self.collect_all_sequential(start_year, end_year, force, refresh_before)
+    
+    def collect_all_sequential(self, start_year, end_year, force, refresh_before):
+        """Collecte catégorie par catégorie, année par année, sans workers"""
+        total_all = 0
+        
+        for category in self.source.unit_keys():
+            print(f"\n📂 Catégorie: {category}")
+            category_total = 0
             
-            articles = []
-            entries = root.findall('atom:entry', ns)
+            for year in range(start_year, end_year + 1):
+                year_total = self.collect_year(category, year, force, refresh_before)
+                category_total += year_total
+                print(f"   ✅ {year}: {year_total:,} articles")
             
-            for entry in entries:
-                # ID arXiv
-                arxiv_id = entry.find('atom:id', ns).text.split('/abs/')[-1]
-                
-                # Titre
-                title = entry.find('atom:title', ns).text.strip().replace('\n', ' ')
-                
-                # Auteurs
-                authors = []
-                for author in entry.findall('atom:author', ns):
-                    name = author.find('atom:name', ns).text
-                    authors.append(name)
-                authors_str = '; '.join(authors)
-                
-                # Abstract
-                abstract = entry.find('atom:summary', ns).text.strip().replace('\n', ' ')
-                
-                # Catégorie principale
-                primary_cat = entry.find('arxiv:primary_category', ns)
-                category = primary_cat.get('term') if primary_cat is not None else 'unknown'
-                
-                # Dates
-                published = entry.find('atom:published', ns).text[:10]
-                updated = entry.find('atom:updated', ns).text[:10]
-                
-                # Liens
-                link = entry.find('atom:id', ns).text
-                pdf_link = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
-                
-                articles.append({
-                    'arxiv_id': arxiv_id,
-                    'title': title,
-                    'authors': authors_str,
-                    'abstract': abstract,
-                    'category': category,
-                    'published': published,
-                    'updated': updated,
-                    'link': link,
-                    'pdf_link': pdf_link
-                })
-            
-            return articles
-            
-        except Exception as e:
-            print(f"   ❌ Erreur parsing XML: {e}")
-            return []
+            total_all += category_total
+            print(f"\n   📊 Total pour {category}: {category_total:,} articles")
+        
+        print("\n" + "="*80)
+        print(f"🎉 COLLECTION TERMINÉE: {total_all:,} articles au total!")
+        print("="*80)
+        
+        return total_all
     
-    def save_articles(self, articles):
-        """Sauvegarde les articles dans la base"""
-        if not articles:
-            return 0
+    def collect_all_parallel(self, start_year, end_year, force, refresh_before, workers):
+        """Collecte les unités (catégorie, année, mois) avec un pool de threads"""
+        keys = self.source.unit_keys()
+        units = [(category, year, month)
+                 for category in keys
+                 for year in range(start_year, end_year + 1)
+                 for month in range(1, 13)]
+        
+        print(f"\n⚙️  {len(units):,} mois à traiter avec {workers} workers")
+        self.configure_pool(workers)
+        
+        category_totals = {category: 0 for category in keys}
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.collect_month, category, year, month, force, refresh_before):
+                    category
+                for category, year, month in units
+            }
+            for future in as_completed(futures):
+                category_totals[futures[future]] += future.result()
+        
+        for category, category_total in category_totals.items():
+            print(f"   📊 Total pour {category}: {category_total:,} articles")
+        
+        total_all = sum(category_totals.values())
+        
+        print("\n" + "="*80)
+        print(f"🎉 COLLECTION TERMINÉE: {total_all:,} articles au total!")
+        print("="*80)
+        
+        return total_all
+    
+    def get_watermark(self, category):
+        """Retourne le dernier timestamp 'updated' connu pour une catégorie.
         
+        Sans watermark enregistré, on repart de la date 'updated' la plus
+        récente en base, ou à défaut de DEFAULT_UPDATE_LOOKBACK_DAYS jours.
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
+        cursor.execute("SELECT last_updated FROM harvest_watermarks WHERE category = ?", (category,))
+        row = cursor.fetchone()
+        if row is None or not row[0]:
+            cursor.execute("SELECT MAX(updated) FROM articles WHERE category = ?", (category,))
+            row = cursor.fetchone()
+        conn.close()
         
-        saved = 0
-        for article in articles:
-            try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO articles 
-                    (arxiv_id, title, authors, abstract, category, published, updated, link, pdf_link, last_fetched)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    article['arxiv_id'],
-                    article['title'],
-                    article['authors'],
-                    article['abstract'],
-                    article['category'],
-                    article['published'],
-                    article['updated'],
-                    article['link'],
-                    article['pdf_link'],
-                    datetime.now().isoformat()
-                ))
-                saved += 1
-            except Exception as e:
-                print(f"   ⚠️  Erreur sauvegarde {article['arxiv_id']}: {e}")
+        if row and row[0]:
+            return parse_api_timestamp(row[0]).strftime('%Y-%m-%dT%H:%M:%SZ')
         
-        conn.commit()
-        conn.close()
-        return saved
+        since = datetime.now(timezone.utc) - timedelta(days=DEFAULT_UPDATE_LOOKBACK_DAYS)
+        return since.strftime('%Y-%m-%dT%H:%M:%SZ')
     
-    def collect_by_month(self, category, year, month):
-        """Collecte les articles pour un mois donné"""
-        # Dates du mois
-        start_date = datetime(year, month, 1, tzinfo=timezone.utc)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
-        else:
-            end_date = datetime(year, month + 1, 1, tzinfo=timezone.utc)
+    def set_watermark(self, category, last_updated):
+        """Enregistre le high-water mark d'une catégorie"""
+        self.writer.execute('''
+            INSERT OR REPLACE INTO harvest_watermarks (category, last_updated, timestamp)
+            VALUES (?, ?, ?)
+        ''', (category, last_updated, datetime.now().isoformat()))
+    
+    def update_category(self, category, batch_size=1000):
+        """Collecte les entrées nouvelles ou révisées depuis le dernier passage.
         
-        # Requête arXiv avec filtres de date
-        query = f"cat:{category}"
+        Les résultats sont triés par lastUpdatedDate décroissant: on s'arrête dès
+        qu'on atteint une entrée plus ancienne que le watermark.
+        """
+        watermark = self.get_watermark(category)
+        since = parse_api_timestamp(watermark)
+        now = datetime.now(timezone.utc)
+        query = (f"cat:{category} AND lastUpdatedDate:"
+                 f"[{format_submitted_date(since)} TO {format_submitted_date(now)}]")
+        
+        print(f"   🔖 Watermark: {watermark}")
         
         all_articles = []
+        newest = watermark
         start = 0
-        batch_size = 1000
+        complete = False
         
         while True:
             params = {
                 'search_query': query,
                 'start': start,
                 'max_results': batch_size,
-                'sortBy': 'submittedDate',
-                'sortOrder': 'ascending'
+                'sortBy': 'lastUpdatedDate',
+                'sortOrder': 'descending'
             }
             
             print(f"      Batch {start//batch_size + 1} (offset {start})...", end=' ')
             
-            xml_data, success = self.fetch_with_retry(params)
+            xml_data, success = self.fetch_with_retry(params, use_cache=False)
             
             if not success or not xml_data:
                 print("❌")
                 break
             
-            articles = self.parse_response(xml_data)
-            
-            if not articles:
-                print("✅ Terminé")
+            articles, parse_error = self.parse_response(xml_data)
+            if parse_error is not None:
+                print(f"❌ Page illisible: {parse_error}")
+                self.discard_response(params)
                 break
             
-            # Filtrer par date (car l'API ne filtre pas toujours parfaitement)
-            filtered = [a for a in articles 
-                       if start_date.isoformat()[:10] <= a['published'] < end_date.isoformat()[:10]]
+            fresh = [a for a in articles if a.updated_at >= watermark]
+            all_articles.extend(fresh)
+            print(f"✅ {len(fresh)} articles")
             
-            if filtered:
-                all_articles.extend(filtered)
-                print(f"✅ {len(filtered)} articles")
-            else:
-                print("✅ 0 articles (hors période)")
+            for article in fresh:
+                newest = max(newest, article.updated_at)
             
-            # Si on a moins d'articles que demandé, c'est fini
-            if len(articles) < batch_size:
-                print("      ✅ Fin de la collection")
+            # Données déjà connues atteintes, ou plus rien à paginer
+            if len(fresh) < len(articles) or len(articles) < batch_size:
+                complete = True
                 break
             
             start += batch_size
-            time.sleep(3)  # Respecter l'API
-            
-            # Si on dépasse la date de fin, arrêter
-            if articles and articles[-1]['published'] >= end_date.isoformat()[:10]:
-                break
         
-        return all_articles
+        saved = self.save_articles(all_articles)
+        
+        # On n'avance le watermark que si la collecte est allée jusqu'au bout
+        if complete:
+            self.set_watermark(category, newest)
+        
+        return saved
     
-    def collect_year(self, category, year):
-        """Collecte tous les articles d'une année"""
-        print(f"\n   📅 Année {year}")
-        total_articles = 0
+    def update_all(self):
+        """Mise à jour incrémentale de toutes les catégories"""
+        print("\n" + "="*80)
+        print("🔄 MISE À JOUR INCRÉMENTALE")
+        print("="*80)
         
-        for month in range(1, 13):
-            print(f"      📆 {year}-{month:02d}...", end=' ')
-            
-            articles = self.collect_by_month(category, year, month)
-            
-            if articles:
-                saved = self.save_articles(articles)
-                total_articles += saved
-                print(f"✅ {saved} articles sauvegardés")
-                
-                # Log du progrès
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO collection_progress (category, year, month, articles_count, status)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (category, year, month, saved, 'completed'))
-                conn.commit()
-                conn.close()
-            else:
-                print("⚠️  Aucun article")
+        total_all = 0
+        
+        with self.run('update', source=self.source.name):
+            for category in self.source.unit_keys():
+                print(f"\n📂 Catégorie: {category}")
+                saved = self.source.update(category)
+                total_all += saved
+                self.metrics.event('category', category=category, articles=saved)
+                print(f"   ✅ {saved:,} articles nouveaux ou mis à jour")
             
-            time.sleep(2)  # Pause entre les mois
+            print("\n" + "="*80)
+            print(f"🎉 MISE À JOUR TERMINÉE: {total_all:,} articles")
+            print("="*80)
         
-        return total_articles
+        return total_all
     
-    def collect_all(self, start_year=1986, end_year=2025):
-        """Collecte TOUT depuis 1986 jusqu'à 2025"""
+    def reparse(self, reset=False):
+        """Reconstruit la table articles à partir du cache, sans requête réseau.
+        
+        reset=True vide la table et la reconstruit dans la même transaction
+        (refusé si le cache est vide). Les réponses illisibles sont retirées
+        du cache; leurs entrées complètes sont tout de même gardées.
+        """
         print("\n" + "="*80)
-        print("🚀 COLLECTION COMPLÈTE arXiv 1986-2025")
+        print("♻️  RECONSTRUCTION DEPUIS LE CACHE")
         print("="*80)
         
-        total_all = 0
+        if self.cache is None:
+            print("❌ Cache désactivé, rien à reparser")
+            return 0
         
-        for category in self.categories:
-            print(f"\n📂 Catégorie: {category}")
-            category_total = 0
+        count, size = self.cache.summary()
+        print(f"\n📦 {count:,} réponses en cache ({size / 1024 / 1024:.1f} MB compressés)")
+        
+        if reset and count == 0:
+            print("❌ Cache vide: la table articles n'est pas vidée")
+            return 0
+        
+        unreadable = []
+        
+        def pages():
+            for params, xml_data in self.cache.iter_responses():
+                if params.startswith('verb=') or '&verb=' in params:
+                    articles, _, error = self.parse_oai_response(xml_data)
+                    if error == 'noRecordsMatch':
+                        error = None
+                else:
+                    articles, error = self.parse_response(xml_data)
+                if error is not None:
+                    unreadable.append(params)
+                yield articles
+        
+        total = 0
+        with self.run('reparse', reset=reset):
+            if reset:
+                print("🗑️  Table articles vidée et reconstruite en une transaction")
+                with self.metrics.stage('write'):
+                    total = self.writer.replace_articles(pages())
+            else:
+                for articles in pages():
+                    total += self.save_articles(articles)
             
-            for year in range(start_year, end_year + 1):
-                year_total = self.collect_year(category, year)
-                category_total += year_total
-                print(f"   ✅ {year}: {year_total:,} articles")
+            # Après le parcours: iter_responses garde le cache ouvert en lecture
+            for params in unreadable:
+                self.discard_response(dict(parse_qsl(params)))
+            if unreadable:
+                print(f"⚠️  {len(unreadable):,} réponses illisibles retirées du cache")
+            print(f"✅ {total:,} articles réinsérés")
+        return total
+    
+    def rebuild_stats(self):
+        """Recalcule les statistiques agrégées depuis la table articles"""
+        print("\n📊 Recalcul des statistiques agrégées...")
+        start = time.time()
+        total = self.writer.rebuild_stats()
+        print(f"✅ {total:,} articles comptés en {time.time() - start:.1f}s")
+        return total
+    
+    def plan(self, plan_path, start_year, end_year):
+        """Découpe (clé de self.source × mois) en unités de travail dans le
+        plan partagé plan_path (table work_units), puis affiche son état"""
+        plan = WorkPlan(plan_path)
+        added = plan.add_units(self.source.name, self.source.unit_keys(), start_year, end_year)
+        print(f"\n🗂️  {added:,} unités ajoutées au plan {plan_path} "
+              f"({self.source.name}, {start_year}-{end_year})")
+        self.show_plan(plan)
+        plan.close()
+    
+    @staticmethod
+    def show_plan(plan):
+        """Unités et articles par statut"""
+        summary = plan.summary()
+        total = sum(count for count, _ in summary.values())
+        print(f"\n📋 {total:,} unités:")
+        for status in ('pending', 'leased', 'done', 'failed'):
+            if status in summary:
+                count, articles = summary[status]
+                print(f"   {status:<8} {count:>7,}" + (f"  ({articles:,} articles)" if articles else ""))
+    
+    def run_worker(self, plan_path, part=None, max_units=None):
+        """Réclame des unités du plan une par une et les collecte dans sa
+        propre base (self.db_path), jusqu'à ce que le plan soit épuisé.
+        
+        part = (k, n): ne traite que les unités dont id % n == k (une copie du
+        plan par machine, sans fichier partagé). max_units borne le nombre
+        d'unités traitées (runners CI à durée limitée).
+        """
+        worker = f"{socket.gethostname()}-{os.getpid()}"
+        plan = WorkPlan(plan_path)
+        sources = {self.source.name: self.source}
+        processed = 0
+        
+        print("\n" + "="*80)
+        print(f"👷 WORKER {worker} → {self.db_path}")
+        print("="*80)
+        
+        with self.run('worker', plan=plan_path, shard=self.db_path, worker=worker,
+                      part=f"{part[0]}/{part[1]}" if part else None):
+            while max_units is None or processed < max_units:
+                unit = plan.claim(worker, part)
+                if unit is None:
+                    break
+                if unit['source'] not in sources:
+                    sources[unit['source']] = SOURCES[unit['source']](self)
+                self.source = sources[unit['source']]
+                
+                errors = []
+                self.collect_month(unit['key'], unit['year'], unit['month'], errors=errors)
+                progress = self.get_progress(unit['key'], unit['year'], unit['month'])
+                if not errors:
+                    # Mois en cours: terminé pour ce plan, la suite viendra par update
+                    plan.finish(unit, progress['articles_count'] if progress else 0,
+                                str(Path(self.db_path).resolve()))
+                    status = 'done'
+                else:
+                    status = plan.release(unit, f"{len(errors)} fenêtre(s) en erreur")
+                    print(f"   ⚠️  Unité {unit['key']} {unit['year']}-{unit['month']:02d} "
+                          f"rendue au plan ({status})")
+                self.metrics.event('unit', unit=unit['id'], key=unit['key'], year=unit['year'],
+                                   month=unit['month'], status=status)
+                processed += 1
             
-            total_all += category_total
-            print(f"\n   📊 Total pour {category}: {category_total:,} articles")
+            print(f"\n👷 {processed:,} unités traitées")
+            self.show_plan(plan)
+        
+        plan.close()
+        return processed
+    
+    def merge_shards(self, paths):
+        """Fusionne des bases de workers dans cette base.
         
+        Dédoublonnage sur arxiv_id (sans suffixe de version): un article
+        n'est écrit que s'il est absent ou plus récent (updated_at) que la
+        version déjà en base, quel que soit le numéro de version. Les mois
+        terminés par les workers sont reportés dans collection_progress, pour
+        qu'un collect ultérieur les saute.
+        """
         print("\n" + "="*80)
-        print(f"🎉 COLLECTION TERMINÉE: {total_all:,} articles au total!")
+        print(f"🔀 FUSION DE {len(paths)} BASE(S)")
         print("="*80)
         
-        return total_all
+        total = 0
+        with self.run('merge', shards=paths):
+            for path in paths:
+                if Path(path).resolve() == Path(self.db_path).resolve():
+                    continue
+                source = sqlite3.connect(f"file:{Path(path).resolve()}?mode=ro", uri=True)
+                cursor = source.execute(f"SELECT {', '.join(ARTICLE_FIELDS)} FROM articles")
+                read = written = 0
+                while True:
+                    rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+                    if not rows:
+                        break
+                    # Bases de workers d'avant migrate_versioned_ids: identifiants 'vN'
+                    articles = [unversioned(Article(*row)) for row in rows]
+                    read += len(articles)
+                    written += self.save_articles(self.writer.newer_articles(articles))
+                
+                months = source.execute('''
+                    SELECT category, year, month, articles_count FROM collection_progress AS p
+                    WHERE status = 'completed' AND id = (
+                        SELECT MAX(id) FROM collection_progress
+                        WHERE category = p.category AND year = p.year AND month = p.month)
+                ''').fetchall()
+                for category, year, month, articles_count in months:
+                    self.save_progress(category, year, month, articles_count, 'completed')
+                source.close()
+                
+                total += written
+                self.metrics.event('shard', path=str(path), read=read, written=written,
+                                   months=len(months))
+                print(f"   🔀 {path}: {read:,} articles lus, {written:,} nouveaux ou plus "
+                      f"récents, {len(months):,} mois terminés")
+        
+        return total
     
-    def export_to_json(self, output_path="articles.json"):
-        """Exporte la base de données vers JSON pour le site web"""
+    def export_to_json(self, output_path="articles.json", compress=(), columnar=False):
+        """Exporte la base de données vers JSON pour le site web (en streaming).
+        
+        columnar=True écrit aussi l'export en colonnes binaire (même nom,
+        extension COLUMNAR_SUFFIX).
+        """
         print("\n" + "="*80)
         print("📤 EXPORT VERS JSON")
         print("="*80)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        print("\n📥 Exportation en cours...")
+        columnar_path = str(Path(output_path).with_suffix(COLUMNAR_SUFFIX)) if columnar else None
+        total, categories, years = stream_articles_json(self.db_path, output_path, compress,
+                                                        columnar_path=columnar_path)
         
-        # Compter le total
-        cursor.execute("SELECT COUNT(*) FROM articles")
-        total = cursor.fetchone()[0]
         print(f"\n📊 Total d'articles: {total:,}")
         
         if total == 0:
             print("⚠️  Aucun article à exporter!")
-            conn.close()
             return False
         
-        # Exporter par batch pour économiser la mémoire
-        print("\n📥 Exportation en cours...")
+        file_size = Path(output_path).stat().st_size / 1024 / 1024
         
-        cursor.execute("""
-            SELECT arxiv_id, title, authors, abstract, category, published, link, pdf_link
-            FROM articles 
-            ORDER BY published DESC
-        """)
-        
-        articles = []
-        for row in cursor.fetchall():
-            articles.append({
-                'id': row[0],
-                'title': row[1],
-                'authors': row[2] if row[2] else 'Unknown',
-                'abstract': row[3] if row[3] else '',
-                'category': row[4],
-                'published': row[5][:10] if row[5] else None,
-                'link': row[6],
-                'pdf': row[7]
-            })
+        print(f"✅ Exporté {total:,} articles vers {output_path}")
+        print(f"📦 Taille du fichier: {file_size:.2f} MB")
+        for codec, suffix in (('gzip', '.gz'), ('brotli', '.br')):
+            compressed = Path(output_path + suffix)
+            if codec in compress and compressed.exists():
+                print(f"📦 {compressed.name}: {compressed.stat().st_size / 1024 / 1024:.2f} MB")
+        if columnar_path:
+            print(f"📦 {Path(columnar_path).name} (colonnes): "
+                  f"{Path(columnar_path).stat().st_size / 1024 / 1024:.2f} MB")
         
-        conn.close()
+        print(f"\n📂 {len(categories)} catégories")
+        if years:
+            print(f"📅 Période: {min(years.keys())} - {max(years.keys())}")
         
-        # Sauvegarder
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(articles, f, ensure_ascii=False, indent=2)
+        return True
+    
+    def serve(self, host=SERVE_HOST, port=SERVE_PORT):
+        """Sert la base en API JSON (lecture seule), à côté des collectes"""
+        print("\n" + "="*80)
+        print("🌐 API DE LECTURE")
+        print("="*80 + "\n")
+        serve_api(self.db_path, host, port)
+    
+    def export_shards(self, output_dir=DEFAULT_SHARD_DIR, full=False, related=False):
+        """Exporte la base en dataset découpé (manifest + shards) pour le site web.
         
-        file_size = Path(output_path).stat().st_size / 1024 / 1024
+        Incrémental par défaut (seuls les shards modifiés sont réécrits),
+        full=True force un export complet. related=True complète l'index
+        des voisins puis écrit leurs listes à côté des shards.
+        """
+        if related:
+            self.index_similar()
         
-        print(f"✅ Exporté {len(articles):,} articles vers {output_path}")
-        print(f"📦 Taille du fichier: {file_size:.2f} MB")
+        print("\n" + "="*80)
+        print("📤 EXPORT DÉCOUPÉ (SHARDS)")
+        print("="*80)
         
-        # Stats
-        categories = {}
-        years = {}
-        for article in articles:
-            cat = article['category']
-            categories[cat] = categories.get(cat, 0) + 1
-            
-            if article['published']:
-                year = article['published'][:4]
-                years[year] = years.get(year, 0) + 1
+        print(f"\n📥 Exportation vers {output_dir}/ ...")
+        start = time.perf_counter()
+        stats = {}
+        manifest = export_shards(self.db_path, output_dir, full=full, stats=stats, related=related)
+        elapsed = time.perf_counter() - start
         
-        print(f"\n📂 {len(categories)} catégories")
-        print(f"📅 Période: {min(years.keys())} - {max(years.keys())}")
+        if manifest['total'] == 0:
+            print("⚠️  Aucun article à exporter!")
+            return False
+        
+        if stats['mode'] == 'unchanged':
+            print(f"✅ Aucun changement depuis le dernier export ({manifest['total']:,} articles)")
+            return True
+        
+        written_bytes = sum((Path(output_dir) / f).stat().st_size for f in stats['written'])
+        label = 'complet' if stats['mode'] == 'full' else 'incrémental'
+        print(f"✅ Export {label} en {elapsed:.1f}s: {stats['shards']:,} shards réécrits "
+              f"sur {len(manifest['shards']):,}, {manifest['total']:,} articles")
+        print(f"📦 Écrit: {len(stats['written']):,} fichiers, {written_bytes / 1024 / 1024:.2f} MB")
+        if manifest['deltas'] and manifest['deltas'][-1]['to'] == manifest['change_seq']:
+            print(f"🧩 Delta: {manifest['deltas'][-1]['count']:,} articles modifiés "
+                  f"({manifest['deltas'][-1]['file']})")
+        if 'index' in manifest:
+            index = manifest['index']
+            index_bytes = sum((Path(output_dir) / f['file']).stat().st_size for f in index['files'])
+            print(f"🔎 Index de recherche: {index['terms']:,} termes, "
+                  f"{len(index['files'])} fichiers, {index_bytes / 1024 / 1024:.2f} MB")
+            if 'delta' in index:
+                print(f"🔎 Index delta: {index['docs'] - index['base_docs']:,} articles, "
+                      f"{len(index['delta']['files'])} fichiers "
+                      f"(reconstruction complète au-delà de {INDEX_DELTA_RATIO:.0%} de la base)")
+        
+        print(f"\n📂 {len(manifest['categories'])} catégories")
+        print(f"📅 Période: {min(manifest['years'])} - {max(manifest['years'])}")
         
         return True
     
+    def search(self, query, category=None, date_from=None, date_to=None,
+               limit=SEARCH_RESULT_LIMIT):
+        """Recherche plein texte classée par BM25.
+        
+        query utilise la syntaxe FTS5: mots (ET implicite), "phrase exacte",
+        préfixe*, OR / NOT, colonne:mot (title, abstract, authors).
+        Les filtres catégorie / dates passent par les index de la table
+        articles (idx_category_published_id, idx_published_id).
+        
+        Retourne la liste des résultats, ou None si la requête est invalide.
+        """
+        if not self.fts_enabled:
+            print("❌ FTS5 indisponible dans cette version de SQLite")
+            return None
+        
+        conditions = []
+        params = []
+        if category:
+            conditions.append("category = ?")
+            params.append(category)
+        if date_from:
+            conditions.append("published >= ?")
+            params.append(date_bound(date_from))
+        if date_to:
+            conditions.append("published <= ?")
+            params.append(date_bound(date_to, end=True))
+        
+        sql = f'''
+            SELECT a.arxiv_id, a.title, a.authors, a.category, a.published,
+                   bm25(articles_fts, {', '.join(str(float(w)) for w in FTS_COLUMN_WEIGHTS)}) AS score,
+                   snippet(articles_fts, 1, '[', ']', '…', 12)
+            FROM articles_fts
+            JOIN articles a ON a.rowid = articles_fts.rowid
+            WHERE articles_fts MATCH ?
+        '''
+        if conditions:
+            # La sous-requête est résolue par index, FTS5 fait le reste
+            sql += f"AND a.rowid IN (SELECT rowid FROM articles WHERE {' AND '.join(conditions)})\n"
+        sql += "ORDER BY score LIMIT ?"
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            start = time.perf_counter()
+            results = conn.execute(sql, [query] + params + [limit]).fetchall()
+            latency_ms = (time.perf_counter() - start) * 1000
+            articles = conn.execute("SELECT MAX(rowid) FROM articles").fetchone()[0] or 0
+        except sqlite3.OperationalError as e:
+            print(f"❌ Requête invalide: {e}")
+            return None
+        finally:
+            conn.close()
+        
+        filters = json.dumps({'category': category, 'from': date_from, 'to': date_to})
+        self.writer.execute('''
+            INSERT INTO search_log (query, filters, results, latency_ms, articles)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (query, filters, len(results), latency_ms, articles))
+        
+        print(f"\n🔎 {query}")
+        for rank, (arxiv_id, title, authors, cat, published, score, snippet) in enumerate(results, 1):
+            first_author = (authors or 'Unknown').split(';')[0]
+            print(f"\n{rank:>3}. {title}")
+            print(f"     {arxiv_id} | {cat} | {published} | {first_author} | score {-score:.2f}")
+            print(f"     {snippet}")
+        
+        print(f"\n⏱️  {latency_ms:.1f} ms, {len(results)} résultats (limite {limit}), "
+              f"~{articles:,} articles indexés")
+        return results
+    
+    def find_authors(self, conn, name):
+        """Auteurs correspondant à un nom: nom complet, sinon nom de famille,
+        sinon début du nom. Retourne [(id, nom, nb articles)] par nb décroissant."""
+        key = normalize_author(name)
+        if not key:
+            return []
+        lookups = (("name_key = ?", (key,)),
+                   ("surname = ?", (key,)),
+                   ("name_key >= ? AND name_key < ?", (key, key + '\uffff')))
+        for condition, params in lookups:
+            rows = conn.execute(f'''
+                SELECT au.id, au.name,
+                       (SELECT COUNT(*) FROM article_authors aa WHERE aa.author_id = au.id) AS papers
+                FROM authors au
+                WHERE {condition}
+                ORDER BY papers DESC
+                LIMIT 20
+            ''', params).fetchall()
+            if rows:
+                return rows
+        return []
+    
+    def index_similar(self, full=False):
+        """Calcule les signatures MinHash des articles pas encore indexés
+        (toutes avec full=True) et leurs buckets LSH"""
+        print("\n" + "="*80)
+        print("🧬 INDEX DES ARTICLES VOISINS (MinHash / LSH)")
+        print("="*80)
+        if np is None:
+            print("⚠️  NumPy non installé: signatures calculées en Python (plus lent)")
+        
+        start = time.time()
+        
+        def on_batch(indexed):
+            print(f"   {indexed:,} articles indexés ({indexed / (time.time() - start):,.0f}/s)",
+                  flush=True)
+        
+        indexed, removed = self.writer.index_similar(full, on_batch)
+        if removed:
+            print(f"🗑️  {removed:,} signatures périmées retirées (article modifié ou supprimé)")
+        print(f"✅ {indexed:,} articles indexés en {time.time() - start:.1f}s")
+        return indexed
+    
+    def refresh_similar(self):
+        """Complète l'index des voisins après une collecte, s'il existe déjà"""
+        if self.writer.similar_indexed():
+            indexed, removed = self.writer.index_similar()
+            if indexed or removed:
+                print(f"🧬 Index des voisins: {indexed:,} articles ajoutés, {removed:,} retirés")
+    
+    def show_related(self, arxiv_id, limit=SIMILAR_RELATED_LIMIT):
+        """Articles voisins d'un article (index-similar), doublons probables signalés"""
+        arxiv_id = split_version(arxiv_id)[0]
+        conn = sqlite3.connect(self.db_path)
+        try:
+            start = time.perf_counter()
+            related = SimilarIndex(conn).related(arxiv_id, limit)
+            latency_ms = (time.perf_counter() - start) * 1000
+            title = conn.execute("SELECT title FROM articles WHERE arxiv_id = ?",
+                                 (arxiv_id,)).fetchone()
+        finally:
+            conn.close()
+        
+        if related is None:
+            print(f"\n❌ Article inconnu: {arxiv_id}")
+            return None
+        
+        print(f"\n🧬 Voisins de {arxiv_id}: {title[0]}")
+        for score, other_id, other_title, category, published in related:
+            flag = " ⚠️  doublon probable" if score >= SIMILAR_DUPLICATE_SCORE else ""
+            print(f"   {score:.2f} | {(published or '')[:10]} | {other_id:<16} | {category:<8} | "
+                  f"{other_title}{flag}")
+        if not related:
+            print(f"   Aucun article voisin au-dessus de {SIMILAR_MIN_SCORE:.0%} de similarité "
+                  f"(index-similar a-t-il été lancé?)")
+        print(f"\n⏱️  {latency_ms:.1f} ms")
+        return related
+    
+    def show_author(self, name, limit=SEARCH_RESULT_LIMIT):
+        """Articles d'un auteur (via article_authors, sans scan de la table articles)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            start = time.perf_counter()
+            matches = self.find_authors(conn, name)
+            if not matches:
+                print(f"\n❌ Aucun auteur trouvé pour: {name}")
+                return None
+            
+            author_id, author_name, papers = matches[0]
+            rows = conn.execute('''
+                SELECT a.arxiv_id, a.title, a.category, a.published
+                FROM article_authors aa
+                JOIN articles a ON a.arxiv_id = aa.arxiv_id
+                WHERE aa.author_id = ?
+                ORDER BY a.published DESC
+                LIMIT ?
+            ''', (author_id, limit)).fetchall()
+            latency_ms = (time.perf_counter() - start) * 1000
+        finally:
+            conn.close()
+        
+        print(f"\n👤 {author_name} ({papers:,} articles)")
+        for arxiv_id, title, category, published in rows:
+            print(f"   {published} | {arxiv_id:<16} | {category:<8} | {title}")
+        if len(matches) > 1:
+            print("\n   Autres auteurs correspondants:")
+            for _, other_name, other_papers in matches[1:]:
+                print(f"   - {other_name} ({other_papers:,})")
+        print(f"\n⏱️  {latency_ms:.1f} ms")
+        return rows
+    
+    def show_coauthors(self, name, limit=SEARCH_RESULT_LIMIT):
+        """Co-auteurs d'un auteur, par nombre d'articles en commun"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            start = time.perf_counter()
+            matches = self.find_authors(conn, name)
+            if not matches:
+                print(f"\n❌ Aucun auteur trouvé pour: {name}")
+                return None
+            
+            author_id, author_name, papers = matches[0]
+            rows = conn.execute('''
+                SELECT co.name, COUNT(*) AS shared
+                FROM article_authors mine
+                JOIN article_authors theirs
+                     ON theirs.arxiv_id = mine.arxiv_id AND theirs.author_id != mine.author_id
+                JOIN authors co ON co.id = theirs.author_id
+                WHERE mine.author_id = ?
+                GROUP BY theirs.author_id
+                ORDER BY shared DESC, co.name
+                LIMIT ?
+            ''', (author_id, limit)).fetchall()
+            latency_ms = (time.perf_counter() - start) * 1000
+        finally:
+            conn.close()
+        
+        print(f"\n👥 Co-auteurs de {author_name} ({papers:,} articles)")
+        for coauthor, shared in rows:
+            print(f"   {shared:>5}  {coauthor}")
+        print(f"\n⏱️  {latency_ms:.1f} ms")
+        return rows
+    
     def show_stats(self):
-        """Affiche les statistiques de collection"""
+        """Affiche les statistiques de collection (tables de stats agrégées)"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        try:
+            stats = collection_stats(conn)
+        finally:
+            conn.close()
         
         print("\n" + "="*80)
         print("📊 STATISTIQUES")
         print("="*80)
         
         # Total
-        cursor.execute("SELECT COUNT(*) FROM articles")
-        total = cursor.fetchone()[0]
-        print(f"\n📚 Total: {total:,} articles")
+        print(f"\n📚 Total: {stats['total']:,} articles")
         
         # Par catégorie
         print("\n📂 Par catégorie:")
-        cursor.execute("""
-            SELECT category, COUNT(*) as count 
-            FROM articles 
-            GROUP BY category 
-            ORDER BY count DESC
-        """)
-        for cat, count in cursor.fetchall():
+        for cat, count in stats['categories'].items():
             print(f"   {cat}: {count:,}")
         
+        # Avec les cross-lists (table article_categories)
+        if stats['cross_lists']:
+            print("\n🔀 Avec les cross-lists (top 15):")
+            for cat, (count, cross) in list(stats['cross_lists'].items())[:15]:
+                print(f"   {cat}: {count:,} ({cross:,} cross-lists)")
+        
         # Par année
         print("\n📅 Par année (top 10):")
-        cursor.execute("""
-            SELECT strftime('%Y', published) as year, COUNT(*) as count 
-            FROM articles 
-            WHERE year IS NOT NULL
-            GROUP BY year 
-            ORDER BY year DESC
-            LIMIT 10
-        """)
-        for year, count in cursor.fetchall():
+        dated_years = [(year, count) for year, count in stats['years'].items() if year != '0000']
+        for year, count in dated_years[::-1][:10]:
             print(f"   {year}: {count:,}")
         
-        conn.close()
+        # Par mois
+        print("\n🗓️  Derniers mois:")
+        dated_months = [(month, count) for month, count in stats['months'].items()
+                        if not month.startswith('0000')]
+        for month, count in dated_months[::-1][:12]:
+            print(f"   {month}: {count:,}")
+        
         print("\n" + "="*80)
+    
+    def show_runs(self, limit=10):
+        """Affiche le bilan des dernières exécutions (table runs)"""
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute('''
+            SELECT started, command, status, seconds, requests, rate_limited, server_errors,
+                   timeouts, rows, rows_per_second, stages
+            FROM runs
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (limit,)).fetchall()
+        conn.close()
+        
+        if not rows:
+            print("ℹ️  Aucune exécution enregistrée")
+            return
+        
+        print(f"\n📈 {len(rows)} dernière(s) exécution(s):\n")
+        for (started, command, status, seconds, requests_count, rate_limited, server_errors,
+             timeouts, rows_count, rows_per_second, stages) in rows:
+            print(f"   {started[:19]}  {command:<8} {status:<12} {format_duration(seconds):>8}  "
+                  f"{requests_count:,} requêtes ({rate_limited} × 429, {server_errors} × 5xx, "
+                  f"{timeouts} timeouts)  {rows_count:,} lignes ({rows_per_second:,.1f}/s)")
+            stages = json.loads(stages or '{}')
+            busy = sum(stages.values())
+            if busy:
+                print("      " + ' · '.join(
+                    f"{STAGE_LABELS.get(name, name)} {value / busy:.0%}"
+                    for name, value in stages.items() if value))
+
+
+def pop_option(args, name, takes_value=False, default=None):
+    """Retire une option (--flag ou --option valeur) de la liste d'arguments"""
+    if name not in args:
+        return default
+    index = args.index(name)
+    if not takes_value:
+        del args[index]
+        return True
+    if index + 1 >= len(args):
+        print(f"❌ L'option {name} attend une valeur")
+        sys.exit(1)
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
 
 
 def main():
@@ -448,34 +5029,178 @@ def main():
 ╚═══════════════════════════════════════════════════════════════╝
     """)
     
-    collector = ArxivFullCollector()
+    # Options communes
+    args = sys.argv[1:]
+    force = pop_option(args, '--force', default=False)
+    refresh_older_than = pop_option(args, '--refresh-older-than', takes_value=True)
+    if refresh_older_than is not None:
+        refresh_older_than = int(refresh_older_than)
+    workers = int(pop_option(args, '--workers', takes_value=True, default=DEFAULT_WORKERS))
+    cache_path = pop_option(args, '--cache', takes_value=True, default=DEFAULT_CACHE_PATH)
+    if pop_option(args, '--no-cache', default=False):
+        cache_path = None
+    offline = pop_option(args, '--offline', default=False)
+    base_url = pop_option(args, '--base-url', takes_value=True)
+    events_path = pop_option(args, '--events', takes_value=True, default=DEFAULT_EVENTS_PATH)
+    if pop_option(args, '--no-events', default=False):
+        events_path = None
+    profile_path = pop_option(args, '--profile', takes_value=True)
+    reset = pop_option(args, '--reset', default=False)
+    full_export = pop_option(args, '--full', default=False)
+    compress = [codec for codec in ('gzip', 'brotli') if pop_option(args, f'--{codec}', default=False)]
+    columnar = pop_option(args, '--columnar', default=False)
+    export_related = pop_option(args, '--related', default=False)
+    category = pop_option(args, '--category', takes_value=True)
+    date_from = pop_option(args, '--from', takes_value=True)
+    date_to = pop_option(args, '--to', takes_value=True)
+    limit = pop_option(args, '--limit', takes_value=True)
+    if limit is not None:
+        limit = int(limit)
+    host = pop_option(args, '--host', takes_value=True, default=SERVE_HOST)
+    source = pop_option(args, '--source', takes_value=True, default='api')
+    oai_url = pop_option(args, '--oai-url', takes_value=True)
+    oai_set = pop_option(args, '--oai-set', takes_value=True, default=DEFAULT_OAI_SET)
+    plan_path = pop_option(args, '--plan', takes_value=True, default=DEFAULT_DB_PATH)
+    shard_path = pop_option(args, '--shard', takes_value=True)
+    part = pop_option(args, '--slice', takes_value=True)
+    if part is not None:
+        part = tuple(int(value) for value in part.split('/'))
+    max_units = pop_option(args, '--max-units', takes_value=True)
+    if max_units is not None:
+        max_units = int(max_units)
+    interval = float(pop_option(args, '--interval', takes_value=True, default=API_REQUEST_INTERVAL))
+    if source not in SOURCES:
+        print(f"❌ Source inconnue: {source} ({', '.join(SOURCES)})")
+        sys.exit(1)
+    
+    # Un worker écrit dans sa propre base, fusionnée ensuite par merge
+    db_path = DEFAULT_DB_PATH
+    if args and args[0].lower() == 'worker':
+        db_path = shard_path or str(Path(DEFAULT_SHARD_DB_DIR) / f"{socket.gethostname()}-{os.getpid()}.db")
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    
+    collector = ArxivFullCollector(db_path, cache_path=cache_path, base_url=base_url,
+                                   offline=offline, events_path=events_path)
+    collector.rate_limiter = RateLimiter(1 / interval)
+    if source == 'oai':
+        collector.source = OaiPmhSource(collector, oai_url, oai_set)
+    profiler = Profiler(profile_path) if profile_path else None
+    if profiler is not None:
+        profiler.start()
     
     # Menu
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    if len(args) > 0:
+        command = args[0].lower()
         
         if command == 'collect':
             # Collection complète
-            start_year = int(sys.argv[2]) if len(sys.argv) > 2 else 1986
-            end_year = int(sys.argv[3]) if len(sys.argv) > 3 else 2025
-            collector.collect_all(start_year, end_year)
+            start_year = int(args[1]) if len(args) > 1 else 1986
+            end_year = int(args[2]) if len(args) > 2 else 2025
+            collector.collect_all(start_year, end_year, force, refresh_older_than, workers)
+            collector.refresh_similar()
+            collector.show_stats()
+            
+        elif command == 'update':
+            # Mise à jour incrémentale depuis le dernier passage
+            collector.update_all()
+            collector.refresh_similar()
             collector.show_stats()
             
         elif command == 'export':
             # Export seulement
-            output = sys.argv[2] if len(sys.argv) > 2 else 'articles.json'
-            collector.export_to_json(output)
+            output = args[1] if len(args) > 1 else 'articles.json'
+            collector.export_to_json(output, compress, columnar)
+        
+        elif command == 'export-shards':
+            # Dataset découpé pour le site web
+            output_dir = args[1] if len(args) > 1 else DEFAULT_SHARD_DIR
+            collector.export_shards(output_dir, full_export, export_related)
+            
+        elif command == 'search':
+            # Recherche plein texte dans la base
+            if len(args) < 2:
+                print("❌ Usage: search <requête> [--category CAT] [--from DATE] [--to DATE]")
+            else:
+                try:
+                    collector.search(' '.join(args[1:]), category, date_from, date_to,
+                                     limit or SEARCH_RESULT_LIMIT)
+                except ValueError as e:
+                    print(f"❌ {e}")
+        
+        elif command in ('author', 'coauthors'):
+            # Articles / co-auteurs d'un auteur
+            if len(args) < 2:
+                print(f"❌ Usage: {command} <nom>")
+            elif command == 'author':
+                collector.show_author(' '.join(args[1:]), limit or SEARCH_RESULT_LIMIT)
+            else:
+                collector.show_coauthors(' '.join(args[1:]), limit or SEARCH_RESULT_LIMIT)
+        
+        elif command == 'index-similar':
+            # Signatures MinHash / buckets LSH des articles pas encore indexés
+            collector.index_similar(full_export)
+        
+        elif command == 'related':
+            # Articles voisins (et doublons probables) d'un article
+            if len(args) < 2:
+                print("❌ Usage: related <arxiv_id> [--limit N]")
+            else:
+                collector.show_related(args[1], limit or SIMILAR_RELATED_LIMIT)
+        
+        elif command == 'plan':
+            # Découpe la collecte en unités pour des workers
+            start_year = int(args[1]) if len(args) > 1 else 1986
+            end_year = int(args[2]) if len(args) > 2 else 2025
+            collector.plan(plan_path, start_year, end_year)
+        
+        elif command == 'worker':
+            # Traite des unités du plan dans sa propre base
+            collector.run_worker(plan_path, part, max_units)
+        
+        elif command == 'merge':
+            # Fusionne les bases des workers dans la base principale
+            paths = []
+            for path in (args[1:] or [DEFAULT_SHARD_DB_DIR]):
+                if Path(path).is_dir():
+                    paths.extend(sorted(str(p) for p in Path(path).glob('*.db')))
+                else:
+                    paths.append(path)
+            if not paths:
+                print("❌ Aucune base à fusionner")
+            else:
+                collector.merge_shards(paths)
+                collector.refresh_similar()
+                collector.show_stats()
+        
+        elif command == 'reparse':
+            # Reconstruit la base depuis le cache des réponses brutes
+            collector.reparse(reset)
+            collector.show_stats()
             
         elif command == 'stats':
             # Stats seulement
             collector.show_stats()
+        
+        elif command == 'rebuild-stats':
+            # Recalcule les comptes agrégés (normalement tenus à jour par triggers)
+            collector.rebuild_stats()
+            collector.show_stats()
+        
+        elif command == 'serve':
+            # API JSON de lecture pour le site
+            collector.serve(host, int(args[1]) if len(args) > 1 else SERVE_PORT)
+        
+        elif command == 'runs':
+            # Bilan des dernières exécutions
+            collector.show_runs(int(args[1]) if len(args) > 1 else 10)
             
         elif command == 'full':
             # Tout: collect + export
-            start_year = int(sys.argv[2]) if len(sys.argv) > 2 else 1986
-            end_year = int(sys.argv[3]) if len(sys.argv) > 3 else 2025
-            collector.collect_all(start_year, end_year)
-            collector.export_to_json('articles.json')
+            start_year = int(args[1]) if len(args) > 1 else 1986
+            end_year = int(args[2]) if len(args) > 2 else 2025
+            collector.collect_all(start_year, end_year, force, refresh_older_than, workers)
+            collector.export_to_json('articles.json', compress)
+            collector.export_shards()
             collector.show_stats()
             
         else:
@@ -483,6 +5208,10 @@ def main():
             print_usage()
     else:
         print_usage()
+    
+    if profiler is not None:
+        profiler.stop()
+    collector.close()
 
 
 def print_usage():
@@ -495,13 +5224,137 @@ Commandes:
     collect [start_year] [end_year]  - Collecte les articles
                                       Défaut: 1986 2025
     
+    update                           - Collecte seulement les articles nouveaux
+                                      ou révisés depuis le dernier passage
+    
     export [output.json]             - Exporte la DB vers JSON
                                       Défaut: articles.json
+                                      --gzip / --brotli: écrit aussi
+                                      output.json.gz / output.json.br
+                                      --columnar: écrit aussi output.bin,
+                                      colonnes binaires (mmap / NumPy,
+                                      typed arrays JS)
+    
+    export-shards [dossier]          - Exporte la DB en dataset découpé pour
+                                      le site: manifest.json + un shard par
+                                      (catégorie, année), résumés à part,
+                                      index de recherche plein texte
+                                      Défaut: data
+                                      Incrémental: ne réécrit que les shards
+                                      modifiés depuis le dernier export, et
+                                      écrit deltas/<de>-<à>.json
+                                      --full: réécrit tout
+                                      --related: complète l'index des voisins
+                                      et écrit related/ (5 voisins par article)
+    
+    stats                            - Affiche les statistiques (lues dans
+                                      les comptes agrégés stats_by_month /
+                                      stats_cross_lists, tenus à jour par
+                                      triggers: temps constant)
+    
+    rebuild-stats                    - Recalcule ces comptes depuis la table
+                                      articles
+    
+    runs [N]                         - Bilan des N dernières exécutions
+                                      (collect, update, reparse): requêtes,
+                                      429 / 5xx, lignes/s, part du temps par
+                                      étape (attente, réseau, parsing...)
+    
+    search <requête>                 - Recherche plein texte (titre, résumé,
+                                      auteurs), classée par pertinence (BM25)
+                                      Syntaxe: mots, "phrase exacte", préfixe*,
+                                      OR / NOT, title:mot, authors:nom
+                                      --category CAT: une seule catégorie
+                                      --from / --to DATE: AAAA[-MM[-JJ]]
+                                      --limit N: nombre de résultats (défaut 20)
+    
+    author <nom>                     - Articles d'un auteur (nom complet, nom
+                                      de famille ou début du nom, sans accents
+                                      ni majuscules requis)
+    
+    coauthors <nom>                  - Co-auteurs d'un auteur, par nombre
+                                      d'articles en commun (--limit N)
     
-    stats                            - Affiche les statistiques
+    index-similar                    - Index des articles voisins: signatures
+                                      MinHash (titre + résumé) et buckets LSH,
+                                      seulement pour les articles nouveaux ou
+                                      modifiés (--full: tout recalculer).
+                                      Une fois créé, collect / update / merge
+                                      le complètent
     
-    full [start_year] [end_year]     - Collecte + Export + Stats
+    related <arxiv_id>               - Articles voisins d'un article, par
+                                      similarité estimée; doublons probables
+                                      (resoumissions, cross-lists) signalés
+                                      (--limit N, défaut 10)
+    
+    serve [port]                     - API JSON en lecture seule sur la base
+                                      (défaut: 127.0.0.1:8000, --host ADRESSE)
+                                      /api/articles?category=&year=&q=
+                                      (pages par curseur: after / before /
+                                      last=1), /api/articles/<id>, /api/stats
+                                      Le site l'utilise avec index.html?api=URL
+    
+    reparse [--reset]                - Reconstruit la table articles depuis le
+                                      cache des réponses brutes (sans réseau)
+                                      --reset vide la table et la reconstruit
+                                      en une transaction (cache non vide)
+    
+    full [start_year] [end_year]     - Collecte + Export (JSON et shards) + Stats
                                       Défaut: 1986 2025
+    
+    plan [start_year] [end_year]     - Découpe la collecte en unités (clé ×
+                                      mois) dans la table work_units du plan
+                                      (--plan, défaut: la base principale)
+    
+    worker                           - Réclame des unités du plan (bail de 1 h,
+                                      3 essais) et les collecte dans sa propre
+                                      base (--shard, défaut:
+                                      shard_dbs/<machine>-<pid>.db)
+                                      --slice K/N: seulement les unités
+                                      id % N == K (une copie du plan par
+                                      machine, sans disque partagé)
+                                      --max-units N: s'arrête après N unités
+    
+    merge [bases ou dossiers...]     - Fusionne les bases des workers dans la
+                                      base principale (la version la plus
+                                      récente d'un article gagne)
+                                      Défaut: shard_dbs/
+
+Options (collect, full):
+    --force                          - Recollecte même les mois déjà terminés
+    --refresh-older-than JOURS       - Recollecte les mois terminés il y a
+                                      plus de JOURS jours
+    --workers N                      - Nombre de mois collectés en parallèle
+                                      Défaut: 4 (le débit global reste limité
+                                      à 1 requête / 3 s)
+
+Options (toutes les commandes):
+    --cache FICHIER                  - Cache des réponses brutes (compressées)
+                                      Défaut: arxiv_response_cache.db
+    --no-cache                       - Désactive le cache
+    --offline                        - Rejoue uniquement depuis le cache
+    --base-url URL                   - Autre endpoint (ex: serveur local qui
+                                      imite l'API, pour tests et benchmarks)
+                                      Aussi via la variable ARXIV_API_URL
+    --events FICHIER                 - Journal d'événements JSON lines (requêtes,
+                                      pauses, fenêtres, bilan de l'exécution)
+                                      Défaut: arxiv_events.jsonl
+    --no-events                      - Désactive le journal d'événements
+    --profile FICHIER                - Profil cProfile de la commande (tous les
+                                      threads), lisible par pstats / snakeviz;
+                                      FICHIER.html: rapport pyinstrument si
+                                      installé (thread principal seulement)
+    --source api|oai                 - api: requêtes search_query par catégorie
+                                      (défaut); oai: moissonnage OAI-PMH
+                                      ListRecords (arXivRaw), plus adapté aux
+                                      collectes en masse
+    --oai-set SET                    - Set OAI moissonné (défaut: math)
+    --oai-url URL                    - Autre endpoint OAI-PMH
+                                      Aussi via la variable ARXIV_OAI_URL
+    --interval SECONDES              - Pause minimale entre deux requêtes
+                                      (défaut: 3). Plusieurs workers sur la
+                                      même machine partagent la même adresse:
+                                      augmenter en conséquence
 
 Exemples:
     # Collecte TOUT depuis 1986
@@ -510,17 +5363,48 @@ Exemples:
     # Collecte seulement 2020-2025
     python arxiv_full_collector.py collect 2020 2025
     
+    # Rafraîchir les mois collectés il y a plus de 90 jours
+    python arxiv_full_collector.py collect 2020 2025 --refresh-older-than 90
+    
+    # Mise à jour quotidienne (quelques requêtes seulement)
+    python arxiv_full_collector.py update
+    
+    # Chercher une expression dans math.SG depuis 2020
+    python arxiv_full_collector.py search '"mirror symmetry" fukaya*' --category math.SG --from 2020
+    
+    # Articles et co-auteurs d'un auteur
+    python arxiv_full_collector.py author kontsevich
+    python arxiv_full_collector.py coauthors "Maxim Kontsevich"
+    
+    # Articles voisins et doublons probables
+    python arxiv_full_collector.py index-similar
+    python arxiv_full_collector.py related 2401.01234
+    
+    # Servir la base au site pendant qu'une collecte tourne
+    python arxiv_full_collector.py serve 8000
+    
     # Juste exporter ce qui est déjà collecté
     python arxiv_full_collector.py export
     
     # Voir les stats
     python arxiv_full_collector.py stats
+    
+    # Collecte répartie: un plan, des workers (machines ou runners CI), une fusion
+    python arxiv_full_collector.py plan 1992 2025 --source oai
+    python arxiv_full_collector.py worker --plan arxiv_full_collection.db
+    python arxiv_full_collector.py merge shard_dbs/
+    
+    # Où passe le temps d'une collecte (profil des 4 workers)
+    python arxiv_full_collector.py collect 2024 2024 --profile collect.prof
+    python arxiv_full_collector.py runs
 
 IMPORTANT:
     - La collection complète peut prendre PLUSIEURS JOURS!
     - L'API arXiv a des limites de taux
-    - Le script fait des pauses automatiques
-    - Tu peux l'arrêter et reprendre (il skip les déjà collectés)
+    - Le script fait des pauses automatiques (rate limiter partagé
+      entre les workers, pause globale après un 429/503)
+    - Tu peux l'arrêter et reprendre (il skip les mois déjà collectés
+      et reprend un mois interrompu à l'offset où il s'était arrêté)
 
 Catégories collectées:
     math.DG, math.SG, math-ph, math.AG, math.QA, math.RT, etc.
@@ -23,6 +23,7 @@ echo -e "${NC}\n"
 # Configuration
 DB_FILE="arxiv_full_collection.db"
 JSON_FILE="articles.json"
+DATA_DIR="data"
 COLLECTOR_SCRIPT="arxiv_full_collector.py"
 
 # Fonction: afficher menu
@@ -30,7 +31,7 @@ show_menu() {
     echo -e "${YELLOW}Que veux-tu faire?${NC}\n"
     echo "1. 🚀 Collection COMPLÈTE (1986-2025) + Export + Stats"
     echo "2. 📅 Collection d'une période spécifique"
-    echo "3. 🔄 Mise à jour (collecter seulement 2025)"
+    echo "3. 🔄 Mise à jour (nouveaux articles depuis le dernier passage)"
     echo "4. 📤 Exporter DB existante vers JSON"
     echo "5. 📊 Voir les statistiques"
     echo "6. 🌐 Déployer sur GitHub Pages"
@@ -80,12 +81,13 @@ period_collection() {
 
 # Fonction: mise à jour
 update_collection() {
-    echo -e "\n${CYAN}🔄 Mise à jour avec les articles de 2025${NC}\n"
-    python3 "$COLLECTOR_SCRIPT" collect 2025 2025
+    echo -e "\n${CYAN}🔄 Mise à jour avec les articles nouveaux ou révisés${NC}\n"
+    python3 "$COLLECTOR_SCRIPT" update
     
     if [ $? -eq 0 ]; then
         echo -e "\n${CYAN}📤 Export vers JSON...${NC}"
         python3 "$COLLECTOR_SCRIPT" export "$JSON_FILE"
+        python3 "$COLLECTOR_SCRIPT" export-shards "$DATA_DIR"
         echo -e "${GREEN}✅ Mise à jour terminée!${NC}"
     else
         echo -e "\n${RED}❌ Erreur pendant la mise à jour${NC}"
@@ -100,7 +102,8 @@ export_to_json() {
     fi
     
     echo -e "\n${CYAN}📤 Export de la base de données vers JSON...${NC}\n"
-    python3 "$COLLECTOR_SCRIPT" export "$JSON_FILE"
+    python3 "$COLLECTOR_SCRIPT" export "$JSON_FILE" && \
+        python3 "$COLLECTOR_SCRIPT" export-shards "$DATA_DIR"
     
     if [ $? -eq 0 ]; then
         size=$(du -h "$JSON_FILE" | cut -f1)
@@ -176,7 +179,8 @@ do_everything() {
     
     # Export
     echo -e "\n${CYAN}═══ ÉTAPE 2/3: Export ═══${NC}"
-    python3 "$COLLECTOR_SCRIPT" export "$JSON_FILE"
+    python3 "$COLLECTOR_SCRIPT" export "$JSON_FILE" && \
+        python3 "$COLLECTOR_SCRIPT" export-shards "$DATA_DIR"
     
     if [ $? -ne 0 ]; then
         echo -e "${RED}❌ Erreur pendant l'export${NC}"
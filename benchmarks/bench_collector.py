@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks du collecteur sur un corpus synthétique (fake_arxiv.py):
+parse_response, save_articles, export_to_json et un collect_all complet
+contre le serveur local (pagination, 429 et 503 compris), par l'API de
+recherche puis par OAI-PMH, la pagination de l'API de lecture (serve) et
+l'index des articles voisins (index-similar, related).
+
+Chaque taille est mesurée dans une base neuve. Les résultats sont écrits en
+JSON (un fichier par exécution, avec commit git et environnement) pour
+comparer deux exécutions: --compare <ancien.json>.
+
+Usage:
+    python benchmarks/bench_collector.py [--sizes 10k,100k,1m] [--years 2020-2024]
+                                         [--workers 4] [--fault-every 50]
+                                         [--output resultats.json] [--compare ancien.json]
+                                         [--verbose]
+"""
+
+import sys
+import contextlib
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from arxiv_full_collector import (ArxivFullCollector, OaiPmhSource, RateLimiter, ReadApi,
+                                  SERVE_PAGE_SIZE, SIMILAR_RELATED_LIMIT, SimilarIndex, np)
+from bench_export import peak_rss_kb
+from fake_arxiv import CATEGORIES, SyntheticCorpus, pop_option
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+RESULTS_VERSION = 1
+PAGE_SIZE = 1000
+
+
+def parse_size(value):
+    """'10k' / '1m' / '2500' -> nombre d'articles"""
+    value = value.strip().lower()
+    for suffix, factor in (('k', 1000), ('m', 1000000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+def git_revision():
+    """(commit, arbre modifié) du dépôt, ou (None, None) hors git"""
+    root = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=root, capture_output=True, text=True, check=True).stdout
+        return commit, bool(dirty.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def result(name, count, seconds, **extra):
+    """Une ligne de résultat (articles/s et pic RSS du processus inclus)"""
+    return {'benchmark': name, 'articles': count, 'seconds': round(seconds, 4),
+            'per_second': round(count / seconds, 1) if seconds else None,
+            'peak_rss_mb': round(peak_rss_kb() / 1024, 1), **extra}
+
+
+def bench_parse_save_export(corpus, tmp, quiet):
+    """parse_response et save_articles page par page, puis export_to_json"""
+    db_path = str(Path(tmp) / 'parse.db')
+    collector = ArxivFullCollector(db_path, cache_path=None)
+    parse_seconds = save_seconds = 0.0
+    feed_bytes = parsed = 0
+    
+    for page in corpus.pages(PAGE_SIZE):
+        feed_bytes += len(page)
+        started = time.perf_counter()
+        articles, _ = collector.parse_response(page)
+        parse_seconds += time.perf_counter() - started
+        parsed += len(articles)
+        
+        started = time.perf_counter()
+        collector.save_articles(articles)
+        save_seconds += time.perf_counter() - started
+    
+    output_path = str(Path(tmp) / 'articles.json')
+    started = time.perf_counter()
+    with quiet():
+        collector.export_to_json(output_path)
+    export_seconds = time.perf_counter() - started
+    export_bytes = Path(output_path).stat().st_size
+    collector.close()
+    
+    return [
+        result('parse_response', parsed, parse_seconds, feed_mb=round(feed_bytes / 1024 / 1024, 1)),
+        result('save_articles', parsed, save_seconds, batch_size=PAGE_SIZE),
+        result('export_to_json', parsed, export_seconds,
+               output_mb=round(export_bytes / 1024 / 1024, 1)),
+    ]
+
+
+def bench_serve(tmp):
+    """Toutes les pages de l'API de lecture, par curseur, sur la base de
+    bench_parse_save_export: la latence ne doit pas dépendre de la profondeur"""
+    api = ReadApi(str(Path(tmp) / 'parse.db'))
+    latencies = []
+    params = {'limit': str(SERVE_PAGE_SIZE)}
+    walked = 0
+    while True:
+        started = time.perf_counter()
+        status, body, _ = api.respond('articles', params)
+        latencies.append(time.perf_counter() - started)
+        page = json.loads(body)
+        walked += len(page['articles'])
+        if not page['next']:
+            break
+        params['after'] = page['next']
+    api.close()
+    
+    # Premier et dernier dixième des pages: même latence attendue
+    tenth = len(latencies) // 10 or 1
+    head_ms = sum(latencies[:tenth]) / tenth * 1000
+    tail_ms = sum(latencies[-tenth:]) / tenth * 1000
+    ordered = sorted(latencies)
+    return [result('serve_pages', walked, sum(latencies), pages=len(latencies),
+                   p50_ms=round(ordered[len(ordered) // 2] * 1000, 2),
+                   p99_ms=round(ordered[int(len(ordered) * 0.99)] * 1000, 2),
+                   head_ms=round(head_ms, 2), tail_ms=round(tail_ms, 2))]
+
+
+def bench_similar(tmp, quiet, samples=200):
+    """index-similar complet sur la base de bench_parse_save_export, puis
+    la latence des voisins d'articles tirés sur toute la base"""
+    db_path = str(Path(tmp) / 'parse.db')
+    with quiet():
+        collector = ArxivFullCollector(db_path, cache_path=None)
+    started = time.perf_counter()
+    indexed, _ = collector.writer.index_similar(full=True)
+    index_seconds = time.perf_counter() - started
+    collector.close()
+    
+    conn = sqlite3.connect(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    step = max(total // samples, 1)
+    ids = [row[0] for row in conn.execute(
+        "SELECT arxiv_id FROM articles WHERE rowid % ? = 0 LIMIT ?", (step, samples))]
+    index = SimilarIndex(conn)
+    latencies = []
+    for arxiv_id in ids:
+        started = time.perf_counter()
+        index.related(arxiv_id, SIMILAR_RELATED_LIMIT)
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+    
+    ordered = sorted(latencies) or [0]
+    return [result('index_similar', indexed, index_seconds, numpy=np is not None),
+            result('related', len(latencies), sum(latencies),
+                   p50_ms=round(ordered[len(ordered) // 2] * 1000, 2),
+                   p99_ms=round(ordered[int(len(ordered) * 0.99)] * 1000, 2))]
+
+
+def start_server(count, years, fault_every):
+    """Lance fake_arxiv.py dans un processus séparé (pas de GIL partagé avec
+    le collecteur) et retourne (processus, URL)"""
+    server = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve().parent / 'fake_arxiv.py'), str(count),
+         '--years', f"{years[0]}-{years[1]}", '--port', '0', '--fault-every', str(fault_every)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return server, server.stdout.readline().strip()
+
+
+def bench_collect_all(count, years, workers, fault_every, tmp, quiet, source='api'):
+    """collect_all complet contre le serveur local, rate limiter désactivé"""
+    server, url = start_server(count, years, fault_every)
+    try:
+        db_path = str(Path(tmp) / f'collect-{source}.db')
+        collector = ArxivFullCollector(db_path, cache_path=None, base_url=url)
+        collector.categories = list(CATEGORIES)
+        collector.rate_limiter = RateLimiter(1000000, capacity=1000)
+        end_year = years[1]
+        if source == 'oai':
+            collector.source = OaiPmhSource(collector, url.replace('/api/query', '/oai2'))
+            # Datestamp = dernière version: les révisions débordent sur l'année suivante
+            end_year += 1
+        
+        started = time.perf_counter()
+        with quiet():
+            collector.collect_all(years[0], end_year, workers=workers)
+        elapsed = time.perf_counter() - started
+        
+        run = collector.last_run
+        collector.close()
+    finally:
+        server.terminate()
+        server.wait()
+    
+    conn = sqlite3.connect(db_path)
+    stored = conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+    splits = conn.execute('SELECT COUNT(*) FROM query_windows WHERE split = 1').fetchone()[0]
+    conn.close()
+    if stored != count:
+        print(f"   ⚠️  collect_all ({source}): {stored:,} articles en base pour {count:,} servis")
+    
+    name = 'collect_all' if source == 'api' else f'collect_all_{source}'
+    return [result(name, stored, elapsed, workers=workers,
+                   requests=run['requests'], retries=run['retries'], split_windows=splits,
+                   wire_mb=round(run['wire_bytes'] / 1024 / 1024, 1),
+                   stages=run['stages'], complete=stored == count)]
+
+
+def compare(previous, current):
+    """Tableau des temps: exécution précédente contre exécution courante"""
+    before = {(r['benchmark'], r['articles']): r for r in previous['results']}
+    print(f"\n📊 Comparaison avec {previous.get('git', {}).get('commit')} "
+          f"({previous.get('started', '?')})\n")
+    print(f"{'benchmark':<16} {'articles':>10} {'avant':>10} {'après':>10} {'ratio':>8}")
+    for row in current['results']:
+        old = before.get((row['benchmark'], row['articles']))
+        if old is None or not old['seconds']:
+            continue
+        ratio = row['seconds'] / old['seconds']
+        flag = ' ⚠️' if ratio > 1.1 else ''
+        print(f"{row['benchmark']:<16} {row['articles']:>10,} {old['seconds']:>9.2f}s "
+              f"{row['seconds']:>9.2f}s {ratio:>7.2f}x{flag}")
+
+
+def main():
+    args = sys.argv[1:]
+    verbose = '--verbose' in args
+    if verbose:
+        args.remove('--verbose')
+    sizes = [parse_size(size) for size in pop_option(args, '--sizes', '10k,100k,1m').split(',')]
+    years = tuple(map(int, pop_option(args, '--years', '2020-2024').split('-')))
+    workers = int(pop_option(args, '--workers', '4'))
+    fault_every = int(pop_option(args, '--fault-every', '50'))
+    output = pop_option(args, '--output')
+    previous = pop_option(args, '--compare')
+    
+    @contextlib.contextmanager
+    def quiet():
+        """Coupe les prints du collecteur (une ligne par page) sauf --verbose"""
+        if verbose:
+            yield
+            return
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    
+    commit, dirty = git_revision()
+    started = datetime.now(timezone.utc)
+    run = {
+        'version': RESULTS_VERSION,
+        'started': started.isoformat(timespec='seconds'),
+        'git': {'commit': commit, 'dirty': dirty},
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'cpus': os.cpu_count(), 'sqlite': sqlite3.sqlite_version},
+        'options': {'sizes': sizes, 'years': list(years), 'workers': workers,
+                    'fault_every': fault_every, 'page_size': PAGE_SIZE},
+        'results': [],
+    }
+    
+    for count in sizes:
+        print(f"\n📚 {count:,} articles synthétiques ({years[0]}-{years[1]})")
+        corpus = SyntheticCorpus(count, *years)
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = bench_parse_save_export(corpus, tmp, quiet)
+            rows += bench_serve(tmp)
+            rows += bench_similar(tmp, quiet)
+            rows += bench_collect_all(count, years, workers, fault_every, tmp, quiet)
+            rows += bench_collect_all(count, years, workers, fault_every, tmp, quiet, 'oai')
+        for row in rows:
+            print(f"   {row['benchmark']:<16} {row['seconds']:>9.2f}s "
+                  f"{row['per_second'] or 0:>12,.0f} articles/s")
+        run['results'].extend(rows)
+    
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{started:%Y%m%d-%H%M%S}-{commit or 'nogit'}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    print(f"\n💾 Résultats: {output}")
+    
+    if previous:
+        with open(previous, encoding='utf-8') as f:
+            compare(json.load(f), run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark des formats d'export: articles.json (stream_articles_json) contre
+l'export en colonnes binaire (ColumnarWriter / ColumnarArticles).
+
+Mesure la taille des fichiers (brute et gzip), puis le temps de chargement
+et le pic mémoire (RSS) de chaque lecture, chacune dans un processus neuf.
+
+Usage:
+    python benchmarks/bench_export.py [articles]
+"""
+
+import sys
+import gzip
+import json
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import arxiv_full_collector
+from arxiv_full_collector import (Article, ArticleWriter, ArxivFullCollector, ColumnarArticles,
+                                  stream_articles_json)
+
+CATEGORIES = ['math.DG', 'math.SG', 'math-ph', 'math.AG', 'math.QA', 'math.RT', 'math.GT']
+WORDS = ('manifold symplectic cohomology quantum sheaf group operator bundle moduli '
+         'space curvature category functor invariant knot lattice algebra').split()
+
+
+def make_articles(count, seed=0):
+    """Articles synthétiques déterministes (auteurs tirés d'un vivier commun)"""
+    rng = random.Random(seed)
+    authors = [f"Author{i} Surname{i % 7919}" for i in range(count // 3 + 1)]
+    for i in range(count):
+        arxiv_id = f"{10 + i % 15}{i % 12 + 1:02d}.{i:05d}"
+        published = f"{2010 + i % 15}-{i % 12 + 1:02d}-{i % 28 + 1:02d}"
+        yield Article(
+            arxiv_id=arxiv_id,
+            title=' '.join(rng.choices(WORDS, k=8)).capitalize(),
+            authors='; '.join(rng.sample(authors, rng.randint(1, 4))),
+            abstract=' '.join(rng.choices(WORDS, k=150)),
+            category=rng.choice(CATEGORIES),
+            published=published,
+            updated=published,
+            link=f"http://arxiv.org/abs/{arxiv_id}",
+            pdf_link=f"https://arxiv.org/pdf/{arxiv_id}.pdf",
+            categories=None,
+            doi=None,
+            journal_ref=None,
+            comment=None,
+            version=1,
+            updated_at=f"{published}T00:00:00Z",
+        )
+
+
+def load(kind, path):
+    """Lecture mesurée (dans un processus dédié): retourne le nombre d'articles"""
+    if kind == 'json':
+        with open(path, encoding='utf-8') as f:
+            articles = json.load(f)
+        Counter(article['category'] for article in articles)
+        return len(articles)
+    
+    table = ColumnarArticles(path)
+    if arxiv_full_collector.np is not None:
+        arxiv_full_collector.np.bincount(table.columns['category'])
+    else:
+        Counter(table.columns['category'])
+    if kind == 'columnar-titles':
+        for i in range(len(table)):
+            table.string('title', i)
+    count = len(table)
+    table.close()
+    return count
+
+
+def peak_rss_kb():
+    """Pic RSS du processus. ru_maxrss survit à exec() sous Linux (il
+    garderait la taille du parent), VmHWM non."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(kind, path):
+    """Lance load() dans un sous-processus: (secondes, pic RSS en MB)"""
+    output = subprocess.run([sys.executable, __file__, '--load', kind, str(path)],
+                            capture_output=True, text=True, check=True).stdout
+    elapsed, peak_kb = output.split()
+    return float(elapsed), int(peak_kb) / 1024
+
+
+def main():
+    if sys.argv[1:2] == ['--load']:
+        started = time.perf_counter()
+        if sys.argv[2] != 'none':
+            load(sys.argv[2], sys.argv[3])
+        elapsed = time.perf_counter() - started
+        print(elapsed, peak_rss_kb())
+        return
+    
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'bench.db')
+        ArxivFullCollector(db_path, cache_path=None).close()
+        writer = ArticleWriter(db_path)
+        batch = []
+        for article in make_articles(count):
+            batch.append(article)
+            if len(batch) == 5000:
+                writer.write_articles(batch)
+                batch = []
+        writer.write_articles(batch)
+        writer.close()
+        
+        json_path = Path(tmp) / 'articles.json'
+        columnar_path = Path(tmp) / 'articles.bin'
+        started = time.perf_counter()
+        stream_articles_json(db_path, str(json_path), columnar_path=str(columnar_path))
+        print(f"\n📤 Export JSON + colonnes de {count:,} articles: "
+              f"{time.perf_counter() - started:.1f}s\n")
+        
+        for name, path in (('json', json_path), ('colonnes', columnar_path)):
+            data = path.read_bytes()
+            print(f"{name:<10} {len(data) / 1024 / 1024:8.1f} MB   "
+                  f"gzip {len(gzip.compress(data, 6)) / 1024 / 1024:8.1f} MB")
+        
+        _, baseline = measure('none', json_path)
+        numpy = 'NumPy' if arxiv_full_collector.np is not None else 'memoryview'
+        print(f"\n{'lecture':<28} {'temps':>8}   pic RSS (dont {baseline:.0f} MB d'interpréteur)")
+        for label, kind, path in (('json.load + comptage', 'json', json_path),
+                                  (f'mmap ({numpy}) + comptage', 'columnar', columnar_path),
+                                  ('  + décodage des titres', 'columnar-titles', columnar_path)):
+            elapsed, peak = measure(kind, path)
+            print(f"{label:<28} {elapsed * 1000:>6.0f} ms   {peak:6.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
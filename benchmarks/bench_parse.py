@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark du parser Atom: parser incrémental (iter_articles) contre
+l'ancien parse_response basé sur ET.fromstring + find() par champ.
+
+Usage:
+    python benchmarks/bench_parse.py [entrées_par_page] [pages]
+"""
+
+import sys
+import time
+import random
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from arxiv_full_collector import iter_articles
+
+
+def make_feed(entries, seed=0):
+    """Génère une page Atom synthétique et déterministe"""
+    rng = random.Random(seed)
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<feed xmlns="http://www.w3.org/2005/Atom" '
+             'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+             'xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+             f'<opensearch:totalResults>{entries}</opensearch:totalResults>\n']
+    for i in range(entries):
+        words = ' '.join(rng.choice(['manifold', 'symplectic', 'cohomology', 'quantum',
+                                     'sheaf', 'group', 'operator', 'bundle'])
+                         for _ in range(120))
+        authors = ''.join(f'<author><name>Author {rng.randint(1, 5000)}</name></author>'
+                          for _ in range(rng.randint(1, 6)))
+        parts.append(
+            f'<entry><id>http://arxiv.org/abs/2401.{i:05d}v{rng.randint(1, 3)}</id>'
+            f'<updated>2024-01-{rng.randint(1, 28):02d}T12:00:00Z</updated>'
+            f'<published>2024-01-{rng.randint(1, 28):02d}T10:00:00Z</published>'
+            f'<title>On the {words[:60]}\n  of things</title>'
+            f'<summary>  {words}\n</summary>{authors}'
+            f'<arxiv:comment>{rng.randint(5, 60)} pages</arxiv:comment>'
+            f'<link href="http://arxiv.org/abs/2401.{i:05d}" rel="alternate" type="text/html"/>'
+            f'<arxiv:primary_category term="math.DG"/>'
+            f'<category term="math.DG"/><category term="math.SG"/></entry>\n')
+    parts.append('</feed>\n')
+    return ''.join(parts)
+
+
+def legacy_parse(xml_data):
+    """Ancien parse_response (arbre complet, find() avec namespaces par champ)"""
+    root = ET.fromstring(xml_data)
+    ns = {'atom': 'http://www.w3.org/2005/Atom',
+          'arxiv': 'http://arxiv.org/schemas/atom'}
+    articles = []
+    for entry in root.findall('atom:entry', ns):
+        arxiv_id = entry.find('atom:id', ns).text.split('/abs/')[-1]
+        title = entry.find('atom:title', ns).text.strip().replace('\n', ' ')
+        authors = '; '.join(a.find('atom:name', ns).text for a in entry.findall('atom:author', ns))
+        abstract = entry.find('atom:summary', ns).text.strip().replace('\n', ' ')
+        primary_cat = entry.find('arxiv:primary_category', ns)
+        category = primary_cat.get('term') if primary_cat is not None else 'unknown'
+        articles.append({
+            'arxiv_id': arxiv_id,
+            'title': title,
+            'authors': authors,
+            'abstract': abstract,
+            'category': category,
+            'published': entry.find('atom:published', ns).text[:10],
+            'updated': entry.find('atom:updated', ns).text[:10],
+            'link': entry.find('atom:id', ns).text,
+            'pdf_link': f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+        })
+    return articles
+
+
+def measure(name, parse, feed, pages):
+    """Temps total et pic mémoire pour parser `pages` fois la même page"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = 0
+    for _ in range(pages):
+        count += len(parse(feed))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12} {count / elapsed:>10,.0f} entrées/s   pic mémoire {peak / 1024 / 1024:6.1f} MB")
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    
+    feed = make_feed(entries)
+    print(f"📄 Page synthétique: {entries:,} entrées, {len(feed) / 1024 / 1024:.1f} MB\n")
+    
+    measure("legacy", legacy_parse, feed, pages)
+    measure("iterparse", lambda data: list(iter_articles(data)), feed, pages)
+    
+    # Isolation des erreurs: une entrée cassée ne doit pas vider la page
+    broken = feed.replace('<published>', '<published_x>', 1).replace('</published>', '</published_x>', 1)
+    stats = {}
+    kept = len(list(iter_articles(broken, stats)))
+    print(f"\n🧪 Page avec une entrée invalide: {kept:,} gardées, {stats['bad_entries']} ignorée(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark d'écriture: ArticleWriter (WAL, executemany, upsert) contre
+l'ancien save_articles (connexion par lot, INSERT OR REPLACE ligne par ligne).
+
+Usage:
+    python benchmarks/bench_writer.py [articles] [taille_lot]
+"""
+
+import sys
+import time
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from arxiv_full_collector import ARTICLE_FIELDS, Article, ArticleWriter, ArxivFullCollector
+
+
+def make_articles(count):
+    """Articles synthétiques déterministes"""
+    for i in range(count):
+        arxiv_id = f"{2000 + i % 25}{i % 12 + 1:02d}.{i:06d}"
+        yield Article(
+            arxiv_id=arxiv_id,
+            title=f"On the geometry of object {i}",
+            authors=f"Author {i % 997}; Author {i % 13}",
+            abstract="We study symplectic manifolds and their quantum cohomology. " * 8,
+            category=['math.DG', 'math.SG', 'math-ph', 'math.AG'][i % 4],
+            published=f"{2000 + i % 25}-{i % 12 + 1:02d}-15",
+            updated=f"{2000 + i % 25}-{i % 12 + 1:02d}-20",
+            link=f"http://arxiv.org/abs/{arxiv_id}",
+            pdf_link=f"https://arxiv.org/pdf/{arxiv_id}.pdf",
+            categories='math.DG math.SG',
+            doi=None,
+            journal_ref=None,
+            comment='12 pages',
+            version=1,
+            updated_at=f"{2000 + i % 25}-{i % 12 + 1:02d}-20T10:00:00Z",
+        )
+
+
+def legacy_save(db_path, articles):
+    """Ancien save_articles: nouvelle connexion, une requête par ligne"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for article in articles:
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO articles ({', '.join(ARTICLE_FIELDS)}, last_fetched)
+            VALUES ({', '.join('?' * (len(ARTICLE_FIELDS) + 1))})
+        ''', (*article, datetime.now().isoformat()))
+    conn.commit()
+    conn.close()
+
+
+def batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = str(Path(tmp) / 'legacy.db')
+        ArxivFullCollector(legacy_db, cache_path=None).close()
+        started = time.perf_counter()
+        for batch in batches(make_articles(count), batch_size):
+            legacy_save(legacy_db, batch)
+        legacy_elapsed = time.perf_counter() - started
+        print(f"legacy       {count / legacy_elapsed:>10,.0f} lignes/s")
+        
+        writer_db = str(Path(tmp) / 'writer.db')
+        ArxivFullCollector(writer_db, cache_path=None).close()
+        writer = ArticleWriter(writer_db)
+        started = time.perf_counter()
+        for batch in batches(make_articles(count), batch_size):
+            writer.write_articles(batch)
+        writer_elapsed = time.perf_counter() - started
+        print(f"writer       {count / writer_elapsed:>10,.0f} lignes/s")
+        
+        # Deuxième passage: rien n'a changé, l'upsert ne réécrit aucune ligne
+        started = time.perf_counter()
+        changed_before = writer.stats['changed']
+        for batch in batches(make_articles(count), batch_size):
+            writer.write_articles(batch)
+        rewrite_elapsed = time.perf_counter() - started
+        print(f"writer (2e)  {count / rewrite_elapsed:>10,.0f} lignes/s, "
+              f"{writer.stats['changed'] - changed_before:,} lignes réécrites")
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Serveur local qui imite export.arxiv.org/api/query et export.arxiv.org/oai2,
+sur un corpus synthétique et déterministe.
+
+L'article k (0 <= k < count) ne dépend que de k et de la graine: catégorie
+CATEGORIES[k % len(CATEGORIES)], date de soumission répartie uniformément
+sur les années demandées. Une requête (catégorie, fenêtre submittedDate,
+start, max_results) se résout donc en une tranche d'indices, sans
+matérialiser le corpus.
+
+Le serveur pagine comme l'API (opensearch:totalResults, tri par date de
+soumission croissante), compresse en gzip si le client l'accepte et
+injecte des 429 / 503 (Retry-After) à intervalle fixe.
+
+/oai2 répond à ListRecords (set math, format arXivRaw, from / until au jour):
+le datestamp d'un article est la date de sa dernière version, les pages de
+OAI_PAGE_SIZE enregistrements sont chaînées par resumptionToken.
+
+Usage:
+    python benchmarks/fake_arxiv.py [articles] [--years 2020-2024] [--port 8080]
+                                    [--fault-every 50] [--retry-after 0]
+    ARXIV_API_URL=http://127.0.0.1:8080/api/query python3 arxiv_full_collector.py collect
+    ARXIV_OAI_URL=http://127.0.0.1:8080/oai2 python3 arxiv_full_collector.py collect --source oai
+"""
+
+import sys
+import gzip
+import random
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+CATEGORIES = ['math.DG', 'math.SG', 'math-ph', 'math.AG', 'math.QA', 'math.RT', 'math.GT']
+WORDS = ('manifold symplectic cohomology quantum sheaf group operator bundle moduli '
+         'space curvature category functor invariant knot lattice algebra').split()
+FIRST_NAMES = ['Jane', 'Jean', 'Łukasz', 'Amélie', 'Hiroshi', 'Søren', 'Ana', 'Yassine',
+               'Chen', 'Olga', 'Pierre', 'Maria']
+LAST_NAMES = ['Doe', 'Dupont', 'Müller', 'Nakamura', 'Kowalski', 'García', 'Ait Mohamed',
+              'Ivanova', 'Li', "O'Neil", 'Petit', 'Rossi', 'Smith', 'Weiß']
+
+OAI_SET = 'math'
+OAI_PAGE_SIZE = 1000
+# Plus grand écart entre soumission et dernière version (v4: +90 jours)
+MAX_REVISION_DAYS = 90
+
+QUERY_RE = re.compile(r'cat:(\S+) AND submittedDate:\[(\d{12}) TO (\d{12})\]')
+
+FEED_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+               '  <link href="http://arxiv.org/api/query" rel="self" type="application/atom+xml"/>\n'
+               '  <title type="html">ArXiv Query: {query}</title>\n'
+               '  <id>http://arxiv.org/api/synthetic</id>\n'
+               '  <updated>{updated}</updated>\n'
+               '  <opensearch:totalResults xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+               '{total}</opensearch:totalResults>\n'
+               '  <opensearch:startIndex xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+               '{start}</opensearch:startIndex>\n'
+               '  <opensearch:itemsPerPage xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+               '{per_page}</opensearch:itemsPerPage>\n')
+
+OAI_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">\n'
+              '<responseDate>{now}</responseDate>\n'
+              '<request verb="ListRecords">http://export.arxiv.org/oai2</request>\n')
+
+
+class SyntheticCorpus:
+    """Corpus de `count` articles soumis entre start_year et end_year (inclus)"""
+    
+    def __init__(self, count, start_year=2020, end_year=2024, seed=0):
+        self.count = count
+        self.seed = seed
+        self.start = datetime(start_year, 1, 1, tzinfo=timezone.utc)
+        self.span = int((datetime(end_year + 1, 1, 1, tzinfo=timezone.utc)
+                         - self.start).total_seconds())
+        rng = random.Random(seed)
+        self.authors = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}-{i}"
+                        for i in range(max(1, count // 3))]
+    
+    def submitted(self, k):
+        """Date de soumission de l'article k (secondes entières, croissante en k)"""
+        return self.start + timedelta(seconds=k * self.span // self.count)
+    
+    def index_range(self, low, high):
+        """Indices [first, last) des articles soumis entre low et high
+        secondes (inclus) après le début du corpus"""
+        # s(k) = k * span // count est croissant: bornes en arithmétique entière
+        first = max(0, -(-low * self.count // self.span))
+        last = min(self.count, -(-(high + 1) * self.count // self.span))
+        return first, max(first, last)
+    
+    def matching(self, category, window_start, window_end):
+        """Indices des articles de `category` soumis dans la fenêtre (minutes
+        incluses, comme submittedDate), par date croissante"""
+        if category not in CATEGORIES or window_end < window_start:
+            return range(0)
+        first, last = self.index_range(int((window_start - self.start).total_seconds()),
+                                       int((window_end - self.start).total_seconds()) + 59)
+        position = CATEGORIES.index(category)
+        first += (position - first) % len(CATEGORIES)
+        return range(first, last, len(CATEGORIES))
+    
+    def version(self, k):
+        """Dernière version de l'article k (mêmes tirages que record)"""
+        rng = random.Random(self.seed * 1000003 + k)
+        return 1 if rng.random() < 0.7 else rng.randint(2, 4)
+    
+    def modified(self, from_date, until_date):
+        """Indices des articles dont la dernière version date de from_date à
+        until_date (jours inclus, comme le datestamp OAI), par indice croissant"""
+        low = int((datetime.combine(from_date, datetime.min.time(), timezone.utc)
+                   - self.start).total_seconds()) - MAX_REVISION_DAYS * 86400
+        high = int((datetime.combine(until_date, datetime.max.time(), timezone.utc)
+                    - self.start).total_seconds())
+        first, last = self.index_range(max(0, low), high)
+        return [k for k in range(first, last)
+                if from_date <= (self.submitted(k)
+                                 + timedelta(days=30 * (self.version(k) - 1))).date() <= until_date]
+    
+    def record(self, k):
+        """Métadonnées de l'article k, communes aux formats Atom et arXivRaw"""
+        rng = random.Random(self.seed * 1000003 + k)
+        submitted = self.submitted(k)
+        version = 1 if rng.random() < 0.7 else rng.randint(2, 4)
+        category = CATEGORIES[k % len(CATEGORIES)]
+        others = rng.sample(CATEGORIES, rng.randint(0, 2))
+        
+        title = ' '.join(rng.choices(WORDS, k=rng.randint(5, 12))).capitalize()
+        if rng.random() < 0.2:
+            title += ' & $\\mathbb{R}^n$ <invariants>'
+        # Résumé sur plusieurs lignes, comme ceux de l'API
+        lines = [' '.join(rng.choices(WORDS, k=12)) for _ in range(rng.randint(6, 14))]
+        authors = rng.sample(self.authors, min(len(self.authors), rng.randint(1, 5)))
+        doi = f"10.1000/synthetic.{k}" if rng.random() < 0.3 else None
+        comment = (f"{rng.randint(5, 60)} pages, {rng.randint(0, 9)} figures"
+                   if rng.random() < 0.5 else None)
+        journal_ref = (f"J. Synthetic Math. {rng.randint(1, 99)} ({submitted.year})"
+                       if rng.random() < 0.2 else None)
+        
+        return {
+            'id': f"{submitted:%y%m}.{k:07d}",
+            'version': version,
+            'dates': [submitted + timedelta(days=30 * n) for n in range(version)],
+            'categories': [category] + [other for other in others if other != category],
+            'title': title,
+            'abstract': '\n'.join(lines),
+            'authors': authors,
+            'doi': doi,
+            'comment': comment,
+            'journal_ref': journal_ref,
+        }
+    
+    def entry(self, k):
+        """Élément <entry> Atom de l'article k"""
+        record = self.record(k)
+        arxiv_id = f"{record['id']}v{record['version']}"
+        published = record['dates'][0].strftime('%Y-%m-%dT%H:%M:%SZ')
+        updated = record['dates'][-1].strftime('%Y-%m-%dT%H:%M:%SZ')
+        
+        parts = [f'  <entry>\n    <id>http://arxiv.org/abs/{arxiv_id}</id>\n'
+                 f'    <updated>{updated}</updated>\n'
+                 f'    <published>{published}</published>\n'
+                 f'    <title>{escape(record["title"])}</title>\n'
+                 f'    <summary>  {escape(record["abstract"])}\n</summary>\n']
+        for name in record['authors']:
+            parts.append(f'    <author>\n      <name>{escape(name)}</name>\n    </author>\n')
+        if record['doi']:
+            parts.append(f'    <arxiv:doi xmlns:arxiv="http://arxiv.org/schemas/atom">'
+                         f'{record["doi"]}</arxiv:doi>\n')
+        if record['comment']:
+            parts.append(f'    <arxiv:comment xmlns:arxiv="http://arxiv.org/schemas/atom">'
+                         f'{record["comment"]}</arxiv:comment>\n')
+        if record['journal_ref']:
+            parts.append(f'    <arxiv:journal_ref xmlns:arxiv="http://arxiv.org/schemas/atom">'
+                         f'{record["journal_ref"]}</arxiv:journal_ref>\n')
+        parts.append(f'    <link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>\n'
+                     f'    <link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}" rel="related" '
+                     f'type="application/pdf"/>\n'
+                     f'    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" '
+                     f'term={quoteattr(record["categories"][0])} scheme="http://arxiv.org/schemas/atom"/>\n')
+        for term in record['categories']:
+            parts.append(f'    <category term={quoteattr(term)} scheme="http://arxiv.org/schemas/atom"/>\n')
+        parts.append('  </entry>\n')
+        return ''.join(parts)
+    
+    def raw_record(self, k):
+        """Élément <record> OAI-PMH (métadonnées arXivRaw) de l'article k"""
+        record = self.record(k)
+        authors = record['authors']
+        if len(authors) > 1:
+            authors = [', '.join(authors[:-1]), authors[-1]]
+        parts = [f'<record><header><identifier>oai:arXiv.org:{record["id"]}</identifier>'
+                 f'<datestamp>{record["dates"][-1]:%Y-%m-%d}</datestamp>'
+                 f'<setSpec>{OAI_SET}</setSpec></header>\n'
+                 f'<metadata><arXivRaw xmlns="http://arxiv.org/OAI/arXivRaw/">\n'
+                 f'<id>{record["id"]}</id><submitter>{escape(record["authors"][0])}</submitter>\n']
+        for number, date in enumerate(record['dates'], 1):
+            parts.append(f'<version version="v{number}"><date>'
+                         f'{date:%a, %d %b %Y %H:%M:%S} GMT</date><size>42kb</size></version>\n')
+        parts.append(f'<title>{escape(record["title"])}</title>\n'
+                     f'<authors>{escape(" and ".join(authors))}</authors>\n'
+                     f'<categories>{" ".join(record["categories"])}</categories>\n')
+        for tag, key in (('comments', 'comment'), ('journal-ref', 'journal_ref'), ('doi', 'doi')):
+            if record[key]:
+                parts.append(f'<{tag}>{escape(record[key])}</{tag}>\n')
+        parts.append(f'<abstract>  {escape(record["abstract"])}\n</abstract>\n'
+                     '</arXivRaw></metadata></record>\n')
+        return ''.join(parts)
+    
+    def feed(self, indices, total, start=0, query=''):
+        """Page Atom complète pour une tranche d'indices"""
+        header = FEED_HEADER.format(query=escape(query), total=total, start=start,
+                                    per_page=len(indices),
+                                    updated=self.start.strftime('%Y-%m-%dT%H:%M:%SZ'))
+        return header + ''.join(self.entry(k) for k in indices) + '</feed>\n'
+    
+    def pages(self, page_size=1000):
+        """Tout le corpus en pages de page_size entrées (sans passer par le serveur)"""
+        for start in range(0, self.count, page_size):
+            yield self.feed(range(start, min(self.count, start + page_size)), self.count, start)
+
+
+def oai_page(body):
+    """Réponse OAI-PMH complète autour de `body`"""
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    return OAI_HEADER.format(now=now) + body + '</OAI-PMH>\n'
+
+
+def parse_submitted(value):
+    """YYYYMMDDHHMM -> datetime UTC"""
+    return datetime.strptime(value, '%Y%m%d%H%M').replace(tzinfo=timezone.utc)
+
+
+class FakeArxivServer(ThreadingHTTPServer):
+    """Stand-in de /api/query et /oai2. Une requête sur fault_every reçoit
+    une erreur (429 puis 503 en alternance) avec l'en-tête Retry-After."""
+    
+    daemon_threads = True
+    
+    def __init__(self, corpus, port=0, fault_every=0, retry_after=0):
+        super().__init__(('127.0.0.1', port), FakeArxivHandler)
+        self.corpus = corpus
+        self.fault_every = fault_every
+        self.retry_after = retry_after
+        self.stats = {'requests': 0, 'faults': 0, 'entries': 0}
+        self.lock = threading.Lock()
+        # Listes OAI (from, until) -> indices, pour paginer sans tout refiltrer
+        self.oai_lists = OrderedDict()
+    
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/query"
+    
+    def next_fault(self):
+        """Statut d'erreur à injecter pour la requête courante (ou None)"""
+        with self.lock:
+            self.stats['requests'] += 1
+            if not self.fault_every or self.stats['requests'] % self.fault_every:
+                return None
+            self.stats['faults'] += 1
+            return 429 if self.stats['faults'] % 2 else 503
+    
+    def oai_list(self, from_date, until_date):
+        """Indices de la liste ListRecords (from, until), gardés pour ses pages"""
+        key = (from_date, until_date)
+        with self.lock:
+            if key in self.oai_lists:
+                self.oai_lists.move_to_end(key)
+                return self.oai_lists[key]
+        indices = self.corpus.modified(from_date, until_date)
+        with self.lock:
+            self.oai_lists[key] = indices
+            while len(self.oai_lists) > 64:
+                self.oai_lists.popitem(last=False)
+        return indices
+
+
+class FakeArxivHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path not in ('/api/query', '/oai2'):
+            self.send_body(404, b'not found', 'text/plain')
+            return
+        
+        status = self.server.next_fault()
+        if status is not None:
+            self.send_body(status, b'retry later', 'text/plain',
+                           {'Retry-After': str(self.server.retry_after)})
+            return
+        
+        params = parse_qs(url.query)
+        if url.path == '/oai2':
+            self.list_records({name: values[0] for name, values in params.items()})
+            return
+        
+        query = params.get('search_query', [''])[0]
+        start = int(params.get('start', ['0'])[0])
+        max_results = int(params.get('max_results', ['10'])[0])
+        
+        match = QUERY_RE.fullmatch(query.strip())
+        corpus = self.server.corpus
+        if match is None:
+            indices = range(0)
+        else:
+            indices = corpus.matching(match.group(1), parse_submitted(match.group(2)),
+                                      parse_submitted(match.group(3)))
+        page = indices[start:start + max_results]
+        with self.server.lock:
+            self.server.stats['entries'] += len(page)
+        
+        body = corpus.feed(page, len(indices), start, query).encode('utf-8')
+        self.send_body(200, body, 'application/atom+xml; charset=utf-8')
+    
+    def list_records(self, params):
+        """ListRecords: jeton de reprise 'from|until|offset'"""
+        corpus = self.server.corpus
+        if params.get('verb') != 'ListRecords':
+            self.send_oai_error('badVerb', 'only ListRecords is implemented')
+            return
+        try:
+            if 'resumptionToken' in params:
+                from_value, until_value, offset = params['resumptionToken'].split('|')
+                offset = int(offset)
+            else:
+                if params.get('metadataPrefix') != 'arXivRaw':
+                    self.send_oai_error('cannotDisseminateFormat', 'only arXivRaw')
+                    return
+                if params.get('set', OAI_SET) != OAI_SET:
+                    self.send_oai_error('noRecordsMatch', 'unknown set')
+                    return
+                from_value = params.get('from', f"{corpus.start:%Y-%m-%d}")
+                until_value = params.get('until', '9999-12-31')
+                offset = 0
+            from_date = datetime.strptime(from_value, '%Y-%m-%d').date()
+            until_date = datetime.strptime(until_value, '%Y-%m-%d').date()
+        except ValueError:
+            code = 'badResumptionToken' if 'resumptionToken' in params else 'badArgument'
+            self.send_oai_error(code, 'malformed request')
+            return
+        
+        indices = self.server.oai_list(from_date, until_date)
+        if not indices:
+            self.send_oai_error('noRecordsMatch', 'no records')
+            return
+        if offset >= len(indices):
+            self.send_oai_error('badResumptionToken', 'offset out of range')
+            return
+        
+        page = indices[offset:offset + OAI_PAGE_SIZE]
+        with self.server.lock:
+            self.server.stats['entries'] += len(page)
+        following = offset + len(page)
+        token = f"{from_value}|{until_value}|{following}" if following < len(indices) else ''
+        body = ('<ListRecords>\n' + ''.join(corpus.raw_record(k) for k in page)
+                + f'<resumptionToken cursor="{offset}" completeListSize="{len(indices)}">'
+                + f'{token}</resumptionToken>\n</ListRecords>\n')
+        self.send_body(200, oai_page(body).encode('utf-8'), 'text/xml; charset=utf-8')
+    
+    def send_oai_error(self, code, message):
+        body = oai_page(f'<error code="{code}">{escape(message)}</error>\n')
+        self.send_body(200, body.encode('utf-8'), 'text/xml; charset=utf-8')
+    
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if status == 200 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, 1)
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def pop_option(args, name, default=None):
+    """Retire `name valeur` de args et retourne la valeur"""
+    if name in args:
+        index = args.index(name)
+        value = args[index + 1]
+        del args[index:index + 2]
+        return value
+    return default
+
+
+def main():
+    args = sys.argv[1:]
+    start_year, end_year = map(int, pop_option(args, '--years', '2020-2024').split('-'))
+    port = int(pop_option(args, '--port', '8080'))
+    fault_every = int(pop_option(args, '--fault-every', '50'))
+    retry_after = pop_option(args, '--retry-after', '0')
+    count = int(args[0]) if args else 100000
+    
+    corpus = SyntheticCorpus(count, start_year, end_year)
+    server = FakeArxivServer(corpus, port, fault_every, retry_after)
+    # Première ligne lue par bench_collector.py pour trouver le port
+    print(server.url, flush=True)
+    print(f"📚 {count:,} articles synthétiques {start_year}-{end_year}, "
+          f"catégories {', '.join(CATEGORIES)}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
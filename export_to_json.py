@@ -5,70 +5,36 @@ By Yassine Ait Mohamed
 """
 
 import sqlite3
-import json
 import sys
 from pathlib import Path
 
-def export_to_json(db_path="arxiv_collection.db", output_path="articles.json"):
+from arxiv_full_collector import stream_articles_json
+
+def export_to_json(db_path="arxiv_collection.db", output_path="articles.json", compress=()):
     """
-    Export SQLite database to JSON format for web display
+    Export SQLite database to JSON format for web display.
+    Streams the articles table in chunks, so memory stays constant
+    regardless of the size of the collection.
     """
     try:
-        # Connect to database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Get total count
-        cursor.execute("SELECT COUNT(*) FROM articles")
-        total = cursor.fetchone()[0]
-        print(f"📊 Found {total:,} articles in database")
-        
-        # Fetch all articles
         print("📥 Exporting articles...")
-        cursor.execute("""
-            SELECT arxiv_id, title, authors, abstract, category, published, link, pdf_link
-            FROM articles 
-            ORDER BY published DESC
-        """)
-        
-        articles = []
-        for row in cursor.fetchall():
-            articles.append({
-                'id': row[0],
-                'title': row[1],
-                'authors': row[2] if row[2] else 'Unknown',
-                'abstract': row[3] if row[3] else '',
-                'category': row[4],
-                'published': row[5][:10] if row[5] else None,
-                'link': row[6],
-                'pdf': row[7]
-            })
-        
-        conn.close()
-        
-        # Save to JSON
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(articles, f, ensure_ascii=False, indent=2)
+        total, categories, years = stream_articles_json(db_path, output_path, compress)
+        print(f"📊 Found {total:,} articles in database")
         
-        print(f"✅ Successfully exported {len(articles):,} articles to {output_path}")
+        print(f"✅ Successfully exported {total:,} articles to {output_path}")
         print(f"📦 File size: {Path(output_path).stat().st_size / 1024 / 1024:.2f} MB")
+        for codec, suffix in (('gzip', '.gz'), ('brotli', '.br')):
+            compressed = Path(output_path + suffix)
+            if codec in compress and compressed.exists():
+                print(f"📦 {compressed.name}: {compressed.stat().st_size / 1024 / 1024:.2f} MB")
         
         # Show some stats
-        categories = {}
-        years = {}
-        for article in articles:
-            cat = article['category']
-            categories[cat] = categories.get(cat, 0) + 1
-            
-            if article['published']:
-                year = article['published'][:4]
-                years[year] = years.get(year, 0) + 1
-        
         print(f"\n📂 Categories: {len(categories)}")
         for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
             print(f"   {cat}: {count:,}")
         
-        print(f"\n📅 Year range: {min(years.keys())} - {max(years.keys())}")
+        if years:
+            print(f"\n📅 Year range: {min(years.keys())} - {max(years.keys())}")
         
         return True
         
@@ -81,8 +47,11 @@ def export_to_json(db_path="arxiv_collection.db", output_path="articles.json"):
 
 if __name__ == "__main__":
     # Get database path from command line or use default
-    db_path = sys.argv[1] if len(sys.argv) > 1 else "arxiv_collection.db"
-    output_path = sys.argv[2] if len(sys.argv) > 2 else "articles.json"
+    args = sys.argv[1:]
+    compress = [codec for codec in ('gzip', 'brotli') if f'--{codec}' in args]
+    args = [arg for arg in args if arg not in ('--gzip', '--brotli')]
+    db_path = args[0] if len(args) > 0 else "arxiv_collection.db"
+    output_path = args[1] if len(args) > 1 else "articles.json"
     
     print("="*80)
     print("🔄 arXiv Database to JSON Exporter")
@@ -90,10 +59,10 @@ if __name__ == "__main__":
     
     if not Path(db_path).exists():
         print(f"❌ Database file not found: {db_path}")
-        print("\nUsage: python export_to_json.py [db_path] [output_path]")
+        print("\nUsage: python export_to_json.py [db_path] [output_path] [--gzip] [--brotli]")
         sys.exit(1)
     
-    success = export_to_json(db_path, output_path)
+    success = export_to_json(db_path, output_path, compress)
     
     if success:
         print("\n" + "="*80)
@@ -0,0 +1,94 @@
+// ========================================
+// arXiv Collection Pro - Service Worker
+// ========================================
+
+// Offline-first cache for the site:
+// - data files requested as <file>?v=<hash> (hashes from data/manifest.json)
+//   never change under that URL: served from the cache, fetched once
+// - data/manifest.json, articles.bin, articles.json: network first (a
+//   revalidation, a small 304 when nothing changed), the cache when offline
+// - the page itself: served from the cache and refreshed in the background,
+//   so an update shows on the next visit
+// - the read API (`arxiv_full_collector.py serve`) is left to the browser,
+//   which revalidates its answers with their ETag
+const SHELL_CACHE = 'arxiv-shell-v1';
+const DATA_CACHE = 'arxiv-data-v1';
+const SHELL_FILES = ['./', 'index.html', 'styles.css', 'app.js', 'worker.js'];
+
+self.addEventListener('install', (e) => {
+    e.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then(cache => cache.addAll(SHELL_FILES))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', (e) => {
+    // Caches left by older versions of this file
+    e.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys
+                .filter(key => key !== SHELL_CACHE && key !== DATA_CACHE)
+                .map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', (e) => {
+    const url = new URL(e.request.url);
+    if (e.request.method !== 'GET' || url.origin !== self.location.origin) return;
+    if (url.pathname.includes('/api/')) return;
+    
+    const path = url.pathname.slice(new URL(self.registration.scope).pathname.length);
+    if (url.searchParams.has('v')) {
+        e.respondWith(cacheFirst(e.request));
+    } else if (path === '' || SHELL_FILES.includes(path)) {
+        e.respondWith(staleWhileRevalidate(e));
+    } else {
+        e.respondWith(networkFirst(e));
+    }
+});
+
+async function cacheFirst(request) {
+    const cache = await caches.open(DATA_CACHE);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    
+    const response = await fetch(request);
+    if (response.ok) {
+        // Older versions of the same file are of no use anymore
+        await cache.delete(request.url.split('?')[0], { ignoreSearch: true });
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function networkFirst(e) {
+    const cache = await caches.open(DATA_CACHE);
+    try {
+        const response = await fetch(e.request);
+        if (response.ok) {
+            // Not awaited: articles.json streams to the page while it is stored
+            e.waitUntil(cache.put(e.request, response.clone()));
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(e.request);
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+async function staleWhileRevalidate(e) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(e.request);
+    const refresh = fetch(e.request).then(async response => {
+        if (response.ok) await cache.put(e.request, response.clone());
+        return response;
+    });
+    if (cached) {
+        e.waitUntil(refresh.catch(() => {}));
+        return cached;
+    }
+    return refresh;
+}
@@ -0,0 +1,19 @@
+import pytest
+
+from support import make_collector
+
+
+@pytest.fixture
+def collector(tmp_path):
+    """Collecteur sur une base temporaire, sans cache de réponses"""
+    collector = make_collector(tmp_path / 'arxiv.db')
+    yield collector
+    collector.close()
+
+
+@pytest.fixture
+def cached_collector(tmp_path):
+    """Collecteur avec un cache de réponses temporaire"""
+    collector = make_collector(tmp_path / 'arxiv.db', tmp_path / 'cache.db')
+    yield collector
+    collector.close()
@@ -0,0 +1,121 @@
+// Runs the data engine of worker.js under Node for tests/test_engine.py:
+//   node tests/engine.js <site directory> '<JSON array of messages>' [cache.json]
+// fetch() serves the files of the site directory in small chunks, as a slow
+// network would, so that downloads are parsed as they stream in. The messages are handled
+// one after the other; their replies, each with the summaries posted before
+// it, are printed as a JSON array along with the URLs fetched. With a cache
+// file, indexedDB is an in-memory stand-in loaded from it and saved back on
+// exit, so that successive runs are successive visits of the site.
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+
+const [siteDir, messages, cacheFile] = process.argv.slice(2);
+const fetched = [];
+const CHUNK_BYTES = 61;   // odd on purpose: chunks cut strings and UTF-8 characters
+
+globalThis.fetch = async (url) => {
+    fetched.push(url);
+    const file = path.join(siteDir, url.split('?')[0]);
+    if (!fs.existsSync(file)) return new Response('', { status: 404 });
+    const body = fs.readFileSync(file);
+    let offset = 0;
+    return new Response(new ReadableStream({
+        pull(controller) {
+            if (offset >= body.length) {
+                controller.close();
+                return;
+            }
+            controller.enqueue(body.subarray(offset, offset += CHUNK_BYTES));
+        }
+    }));
+};
+
+// Just what worker.js uses of IndexedDB: one store of { hash, data } records
+// by file, its 'hash' index walked with a key cursor. Requests succeed on a
+// later tick, as in a browser.
+function idbRequest(getResult) {
+    const listeners = [];
+    const request = {
+        addEventListener: (type, listener) => listeners.push(listener),
+        succeed: result => {
+            request.result = result;
+            listeners.forEach(listener => listener());
+            if (request.onsuccess) request.onsuccess();
+        }
+    };
+    setImmediate(() => request.succeed(getResult()));
+    return request;
+}
+
+function fakeIndexedDB(records) {
+    const store = {
+        get: key => idbRequest(() => records.get(key)),
+        put: (value, key) => idbRequest(() => {
+            records.set(key, value);
+            return key;
+        }),
+        delete: key => idbRequest(() => {
+            records.delete(key);
+        }),
+        index: () => ({
+            openKeyCursor: () => {
+                const entries = [...records].sort((a, b) => a[1].hash.localeCompare(b[1].hash));
+                let position = 0;
+                const request = idbRequest(() => cursor());
+                const cursor = () => position < entries.length ? {
+                    key: entries[position][1].hash,
+                    primaryKey: entries[position][0],
+                    continue: () => {
+                        position++;
+                        setImmediate(() => request.succeed(cursor()));
+                    }
+                } : null;
+                return request;
+            }
+        })
+    };
+    const db = {
+        createObjectStore: () => ({ createIndex: () => {} }),
+        transaction: () => ({ objectStore: () => store })
+    };
+    return {
+        open: () => {
+            const request = {};
+            setImmediate(() => {
+                request.result = db;
+                if (!fs.existsSync(cacheFile)) request.onupgradeneeded();
+                request.onsuccess();
+            });
+            return request;
+        }
+    };
+}
+
+if (cacheFile) {
+    const records = new Map(fs.existsSync(cacheFile) ?
+        Object.entries(JSON.parse(fs.readFileSync(cacheFile, 'utf-8'))) : []);
+    globalThis.indexedDB = fakeIndexedDB(records);
+    process.on('exit', () => fs.writeFileSync(cacheFile, JSON.stringify(Object.fromEntries(records))));
+}
+
+// worker.js logs its fallbacks; stdout only carries the replies
+console.log = () => {};
+
+// As a plain script: its functions become globals, as when app.js loads it
+vm.runInThisContext(fs.readFileSync(path.join(__dirname, '..', 'worker.js'), 'utf-8'),
+                    { filename: 'worker.js' });
+
+(async () => {
+    const replies = [];
+    for (const [id, message] of JSON.parse(messages).entries()) {
+        const posted = [];
+        await handleEngineMessage({ ...message, id }, reply => posted.push(reply));
+        const reply = posted.pop();
+        reply.summaries = posted.map(summary => summary.summary);
+        replies.push(reply);
+    }
+    process.stdout.write(JSON.stringify({ replies, fetched }));
+})();
@@ -0,0 +1,123 @@
+"""
+Outils communs aux tests: articles et corpus synthétiques, collecteur et
+requêtes sur une base temporaire, session HTTP simulée.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from arxiv_full_collector import Article, ArxivFullCollector, RateLimiter
+from fake_arxiv import QUERY_RE, parse_submitted
+
+
+CATEGORIES = ['math.AG', 'math.DG', 'math-ph', 'math.QA']
+WORDS = ['lattice', 'symplectic', 'moduli', 'quantum', 'cohomology', 'knot',
+         'operator', 'bundle', 'curvature', 'invariant', 'category', 'functor']
+
+
+def make_article(arxiv_id, category='math.AG', published='2023-01-05', updated_at=None,
+                 title=None, categories=None, version=1):
+    """Article synthétique (mêmes formats que entry_to_article)"""
+    updated_at = updated_at or f"{published}T10:00:00Z"
+    return Article(
+        arxiv_id=arxiv_id,
+        title=title or f"On the {WORDS[int(arxiv_id[-2:]) % len(WORDS)]} of {arxiv_id}",
+        authors=f"Alice Martin; Author {arxiv_id[-2:]}",
+        abstract=f"We study {' '.join(WORDS[int(arxiv_id[-1]) % 6:][:6])} for {arxiv_id}.",
+        category=category,
+        published=published,
+        updated=updated_at[:10],
+        link=f"http://arxiv.org/abs/{arxiv_id}",
+        pdf_link=f"https://arxiv.org/pdf/{arxiv_id}.pdf",
+        categories=categories or category,
+        doi=None,
+        journal_ref=None,
+        comment=None,
+        version=version,
+        updated_at=updated_at,
+    )
+
+
+def make_corpus(count, start=0):
+    """count articles répartis sur plusieurs catégories, années et mois,
+    avec des dates de soumission en double (départage par identifiant)"""
+    articles = []
+    for i in range(start, start + count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        articles.append(make_article(
+            f"{21 + i % 3}{i % 12 + 1:02d}.{i:05d}",
+            category=category,
+            published=f"{2021 + i % 3}-{i % 12 + 1:02d}-{1 + i % 5:02d}",
+            categories=f"{category} {CATEGORIES[(i + 1) % len(CATEGORIES)]}" if i % 3 else None,
+        ))
+    return articles
+
+
+def make_collector(path, cache_path=None):
+    """Collecteur sur la base `path`, sans pause entre les requêtes (les
+    tests n'interrogent qu'une FakeSession)"""
+    collector = ArxivFullCollector(db_path=str(path),
+                                   cache_path=str(cache_path) if cache_path else None)
+    collector.rate_limiter = RateLimiter(10 ** 6)
+    return collector
+
+
+def query(collector, sql, params=()):
+    """Lignes d'une requête sur la base du collecteur (connexion séparée)"""
+    conn = sqlite3.connect(collector.db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+class FakeSession:
+    """Remplace collector.session: handler(url, params, headers) retourne
+    (statut, corps, en-têtes). Les requêtes reçues sont gardées dans
+    self.requests, les réponses sont de vrais requests.Response."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        params = dict(params or {})
+        headers = dict(headers or {})
+        self.requests.append((url, params, headers))
+        status, body, response_headers = self.handler(url, params, headers)
+        response = requests.models.Response()
+        response.status_code = status
+        response._content = body.encode('utf-8')
+        response.encoding = 'utf-8'
+        response.headers.update(response_headers or {})
+        response.url = url
+        return response
+
+    def close(self):
+        pass
+
+
+def corpus_handler(corpus, page_hook=None):
+    """Handler de FakeSession qui répond comme l'API de recherche sur un
+    SyntheticCorpus; page_hook(params, corps) peut altérer une page"""
+    def handler(url, params, headers):
+        match = QUERY_RE.fullmatch(params.get('search_query', '').strip())
+        if match is None:
+            indices = range(0)
+        else:
+            indices = corpus.matching(match.group(1), parse_submitted(match.group(2)),
+                                      parse_submitted(match.group(3)))
+        start = int(params.get('start', 0))
+        page = indices[start:start + int(params.get('max_results', 10))]
+        body = corpus.feed(page, len(indices), start, params.get('search_query', ''))
+        if page_hook is not None:
+            body = page_hook(params, body)
+        return 200, body, {}
+    return handler
@@ -0,0 +1,67 @@
+"""Tables normalisées authors / article_authors / article_categories"""
+
+from support import make_article, make_corpus, query
+
+from arxiv_full_collector import normalize_author, split_authors
+
+
+def paper(arxiv_id, authors, published='2023-01-05', **fields):
+    return make_article(arxiv_id, published=published, **fields)._replace(authors=authors)
+
+
+def test_author_names_are_normalized():
+    assert normalize_author('J.-P. Sérre') == 'j p serre'
+    assert normalize_author('  ') == ''
+    assert split_authors('Jean-Pierre Serre;  Alexander Grothendieck; ') == [
+        'Jean-Pierre Serre', 'Alexander Grothendieck']
+
+
+def test_links_follow_articles(collector):
+    collector.save_articles([
+        paper('2301.00001', 'Jean-Pierre Serre; Alexander Grothendieck',
+              category='math.AG', categories='math.AG math.NT'),
+        paper('2301.00002', 'Jean-Pierre Sérre', published='2023-02-01'),
+        paper('2301.00003', 'Pierre Deligne; Jean-Pierre Serre', published='2023-03-01'),
+    ])
+
+    # Une orthographe accentuée désigne le même auteur; l'ordre est gardé
+    assert query(collector, "SELECT COUNT(*) FROM authors") == [(3,)]
+    assert query(collector, '''
+        SELECT aa.arxiv_id, aa.position, au.name_key FROM article_authors aa
+        JOIN authors au ON au.id = aa.author_id ORDER BY 1, 2
+    ''') == [('2301.00001', 0, 'jean pierre serre'), ('2301.00001', 1, 'alexander grothendieck'),
+             ('2301.00002', 0, 'jean pierre serre'),
+             ('2301.00003', 0, 'pierre deligne'), ('2301.00003', 1, 'jean pierre serre')]
+    assert query(collector, "SELECT category, is_primary FROM article_categories "
+                            "WHERE arxiv_id = '2301.00001' ORDER BY 1") == [
+        ('math.AG', 1), ('math.NT', 0)]
+
+    # Nom complet, nom de famille ou début du nom; plus récents d'abord
+    assert [row[0] for row in collector.show_author('Jean-Pierre Serre')] == [
+        '2301.00003', '2301.00002', '2301.00001']
+    assert len(collector.show_author('serre')) == 3
+    assert [row[0] for row in collector.show_author('alex')] == ['2301.00001']
+    assert collector.show_author('Noether') is None
+    assert collector.show_coauthors('serre') == [('Alexander Grothendieck', 1),
+                                                 ('Pierre Deligne', 1)]
+
+    # Suppression: les liens partent avec l'article
+    collector.writer.execute("DELETE FROM articles WHERE arxiv_id = '2301.00001'")
+    assert query(collector, "SELECT COUNT(*) FROM article_authors "
+                            "WHERE arxiv_id = '2301.00001'") == [(0,)]
+    assert query(collector, "SELECT COUNT(*) FROM article_categories "
+                            "WHERE arxiv_id = '2301.00001'") == [(0,)]
+
+
+def test_rebuild_links_matches_incremental_links(collector):
+    collector.save_articles(make_corpus(50))
+    tables = ("SELECT arxiv_id, position, author_id FROM article_authors ORDER BY 1, 2",
+              "SELECT category, arxiv_id, is_primary FROM article_categories ORDER BY 1, 2")
+    before = [query(collector, sql) for sql in tables]
+
+    collector.writer.execute("DELETE FROM article_authors")
+    collector.writer.execute("DELETE FROM article_categories")
+    assert collector.writer.links_missing()
+    assert collector.writer.rebuild_links(chunk_size=7) == 50
+    assert [query(collector, sql) for sql in tables] == before
+    assert not collector.writer.links_missing()
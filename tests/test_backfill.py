@@ -0,0 +1,106 @@
+"""Collecte répartie: plan de travail partagé, workers et fusion de leurs bases"""
+
+import sqlite3
+
+from support import FakeSession, corpus_handler, make_article, make_collector, query
+
+from arxiv_full_collector import MAX_UNIT_ATTEMPTS, Article, WorkPlan
+from fake_arxiv import SyntheticCorpus
+
+
+def test_units_are_leased_once_and_split_in_parts(tmp_path):
+    plan = WorkPlan(str(tmp_path / 'plan.db'))
+    try:
+        assert plan.add_units('api', ['math.DG', 'math.SG'], 2020, 2020) == 24
+        assert plan.add_units('api', ['math.DG', 'math.SG'], 2020, 2020) == 0
+
+        # Tranches fixes: id % n == k
+        first = plan.claim('a', part=(1, 3))
+        assert (first['id'] % 3, first['key'], first['year'], first['month']) == (
+            1, 'math.DG', 2020, 1)
+        second = plan.claim('b', part=(1, 3))
+        assert second['id'] == first['id'] + 3
+
+        # Bail expiré (worker tué): l'unité est réclamée de nouveau
+        plan.conn.execute("UPDATE work_units SET lease_until = 0 WHERE id = ?", (first['id'],))
+        again = plan.claim('c')
+        assert (again['id'], again['attempts']) == (first['id'], 2)
+
+        plan.finish(second, 12, 'w1.db')
+        assert plan.release(again, 'boom') == 'pending'
+        for _ in range(MAX_UNIT_ATTEMPTS - 2):
+            unit = plan.claim('c')
+            assert unit['id'] == first['id']
+        assert plan.release(unit, 'boom') == 'failed'
+        assert plan.summary() == {'pending': (22, 0), 'done': (1, 12), 'failed': (1, 0)}
+    finally:
+        plan.close()
+
+
+def test_workers_and_merge_match_one_collection(collector, tmp_path):
+    corpus = SyntheticCorpus(3000, 2020, 2020)
+    categories = ['math.DG', 'math-ph']
+    plan_path = tmp_path / 'plan.db'
+    collector.categories = categories
+    collector.plan(str(plan_path), 2020, 2020)
+
+    # Deux machines, chacune sa copie du plan et sa tranche d'unités
+    shards = []
+    for k in range(2):
+        copy = tmp_path / f'plan-{k}.db'
+        copy.write_bytes(plan_path.read_bytes())
+        worker = make_collector(tmp_path / f'worker-{k}.db')
+        worker.session = FakeSession(corpus_handler(corpus))
+        assert worker.run_worker(str(copy), part=(k, 2)) == 12
+        worker.close()
+        plan = WorkPlan(str(copy))
+        assert plan.summary()['done'][0] == 12
+        plan.close()
+        shards.append(str(tmp_path / f'worker-{k}.db'))
+
+    collector.merge_shards(shards)
+    served = [(category, len(corpus.matching(category, corpus.start, corpus.submitted(2999))))
+              for category in sorted(categories)]
+    assert query(collector, "SELECT category, COUNT(*) FROM articles GROUP BY 1 ORDER BY 1") == served
+    assert query(collector, "SELECT COUNT(*) FROM collection_progress "
+                            "WHERE status = 'completed'") == [(24,)]
+
+
+def test_merge_keeps_the_newest_row(collector, tmp_path):
+    article = make_article('2302.00042', title='v1', updated_at='2023-02-01T00:00:00Z')
+    collector.save_articles([article])
+
+    workers = []
+    for name, title, version, updated_at in (('newer', 'v3', 3, '2023-06-01T00:00:00Z'),
+                                             ('older', 'v2', 2, '2023-04-01T00:00:00Z')):
+        worker = make_collector(tmp_path / f'{name}.db')
+        worker.save_articles([article._replace(title=title, version=version,
+                                               updated_at=updated_at),
+                              make_article(f'2302.0010{version}', updated_at=updated_at)])
+        worker.save_progress('math.AG', 2023, 2, 2, 'completed')
+        worker.close()
+        workers.append(str(tmp_path / f'{name}.db'))
+
+    # La base plus ancienne est fusionnée en dernier: elle ne doit rien écraser
+    # (v2 n'est même pas réécrite; seul son autre article est nouveau)
+    assert collector.merge_shards(workers) == 3
+    assert query(collector, "SELECT title, version FROM articles WHERE arxiv_id = ?",
+                 (article.arxiv_id,)) == [('v3', 3)]
+    assert query(collector, "SELECT COUNT(*) FROM articles") == [(3,)]
+    assert collector.get_progress('math.AG', 2023, 2)['status'] == 'completed'
+
+    # Base d'un worker d'avant migrate_versioned_ids: identifiant 'vN'
+    legacy = tmp_path / 'legacy.db'
+    conn = sqlite3.connect(legacy)
+    conn.execute(f"CREATE TABLE articles ({', '.join(Article._fields)})")
+    conn.execute("CREATE TABLE collection_progress (id, category, year, month, "
+                 "articles_count, status)")
+    conn.execute(f"INSERT INTO articles VALUES ({', '.join('?' * len(Article._fields))})",
+                 article._replace(arxiv_id='2302.00042v9', title='v9', version=9,
+                                  updated_at='2024-01-01T00:00:00Z'))
+    conn.commit()
+    conn.close()
+    assert collector.merge_shards([str(legacy)]) == 1
+    assert query(collector, "SELECT arxiv_id, title, link FROM articles WHERE title = 'v9'") == [
+        ('2302.00042', 'v9', 'http://arxiv.org/abs/2302.00042')]
+    assert query(collector, "SELECT COUNT(*) FROM articles") == [(3,)]
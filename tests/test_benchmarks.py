@@ -0,0 +1,88 @@
+"""Corpus synthétique, serveur local (fake_arxiv.py) et suite de benchmarks"""
+
+import json
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+from support import ROOT, make_collector
+
+from bench_collector import compare
+from fake_arxiv import CATEGORIES, FakeArxivServer, SyntheticCorpus
+
+
+def test_matching_is_a_scan_of_the_corpus():
+    corpus = SyntheticCorpus(5000, 2020, 2021)
+    start = datetime(2020, 3, 14, 9, 26, tzinfo=timezone.utc)
+    end = datetime(2020, 11, 2, 17, 45, tzinfo=timezone.utc)
+    for category in ('math.DG', 'math.GT'):
+        assert list(corpus.matching(category, start, end)) == [
+            k for k in range(corpus.count) if CATEGORIES[k % len(CATEGORIES)] == category
+            and start <= corpus.submitted(k) < end + timedelta(minutes=1)]
+    assert not corpus.matching('math.XX', start, end)
+
+    # Déterministe: même graine, mêmes articles
+    assert SyntheticCorpus(5000, 2020, 2021).entry(1234) == corpus.entry(1234)
+    assert SyntheticCorpus(5000, 2020, 2021, seed=1).entry(1234) != corpus.entry(1234)
+
+
+@pytest.fixture
+def server():
+    server = FakeArxivServer(SyntheticCorpus(700, 2020, 2020), fault_every=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_server_pages_like_the_api_and_injects_faults(server):
+    params = {'search_query': 'cat:math.SG AND submittedDate:[202001010000 TO 202012312359]',
+              'start': 40, 'max_results': 30}
+    answers = [requests.get(server.url, params=params, headers={'Accept-Encoding': 'gzip'})
+               for _ in range(4)]
+
+    assert [answer.status_code for answer in answers] == [200, 200, 200, 429]
+    assert answers[3].headers['Retry-After'] == '0'
+    assert answers[0].headers['Content-Encoding'] == 'gzip'
+    assert answers[0].text == answers[1].text
+    assert '<opensearch:totalResults xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">100<' \
+        in answers[0].text
+    assert answers[0].text.count('<entry>') == 30
+
+
+def test_collector_gets_the_whole_corpus_through_the_faults(server, tmp_path):
+    collector = make_collector(tmp_path / 'arxiv.db')
+    collector.base_url = server.url
+    collector.categories = ['math.DG', 'math-ph']
+    try:
+        assert collector.collect_all(2020, 2020) == 200
+    finally:
+        collector.close()
+    assert server.stats['faults'] > 0
+    assert collector.metrics.counters['rate_limited'] > 0
+
+
+def test_bench_suite_writes_comparable_results(tmp_path, capsys):
+    output = tmp_path / 'results.json'
+    command = [sys.executable, str(ROOT / 'benchmarks' / 'bench_collector.py'),
+               '--sizes', '300', '--years', '2020-2020', '--workers', '2',
+               '--fault-every', '7', '--output', str(output)]
+    result = subprocess.run(command, capture_output=True, encoding='utf-8', timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    run = json.loads(output.read_text('utf-8'))
+    assert run['options']['sizes'] == [300]
+    rows = {row['benchmark']: row for row in run['results']}
+    assert {'parse_response', 'save_articles', 'export_to_json', 'collect_all',
+            'collect_all_oai'} <= set(rows)
+    assert rows['collect_all']['complete'] and rows['collect_all_oai']['complete']
+    assert rows['collect_all']['retries'] > 0
+
+    compare(run, run)
+    table = capsys.readouterr().out
+    assert 'collect_all_oai' in table and '1.00x' in table
@@ -0,0 +1,93 @@
+"""Cache des réponses brutes (ResponseCache) et reconstruction par reparse"""
+
+import time
+
+import pytest
+
+from support import FakeSession, corpus_handler, make_corpus, query
+
+from arxiv_full_collector import ResponseCache, month_window
+from fake_arxiv import SyntheticCorpus
+
+
+def test_cache_roundtrip_ttl_and_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    params = {'search_query': 'cat:math.DG  AND  all:knot', 'start': 0}
+    cache.put(params, '<feed>é</feed>')
+    # Paramètres normalisés: ordre et espaces ne changent pas la clé
+    assert cache.get({'start': '0', 'search_query': 'cat:math.DG AND all:knot'}) == '<feed>é</feed>'
+    assert cache.get({**params, 'start': 10}) is None
+
+    cache.delete(params)
+    assert cache.get(params) is None
+    assert cache.summary() == (0, 0)
+
+    expired = ResponseCache(str(tmp_path / 'expired.db'), ttl_days=0)
+    expired.put(params, '<feed/>')
+    time.sleep(0.01)
+    assert expired.get(params) is None
+
+    small = ResponseCache(str(tmp_path / 'small.db'), max_bytes=1)
+    for start in range(3):
+        small.put({**params, 'start': start}, '<feed/>' * 100)
+    small.evict()
+    assert small.summary()[0] == 0
+
+
+def collect(collector, corpus, month=3, page_hook=None):
+    collector.session = FakeSession(corpus_handler(corpus, page_hook))
+    collector.collect_month('math.DG', 2020, month)
+    return query(collector, "SELECT arxiv_id, title, version FROM articles ORDER BY 1")
+
+
+def test_reparse_rebuilds_the_table_from_the_cache(cached_collector):
+    corpus = SyntheticCorpus(3000, 2020, 2020)
+    collect(cached_collector, corpus, 3)
+    collected = collect(cached_collector, corpus, 4)
+    assert len(collected) > 50
+
+    cached_collector.writer.execute("DELETE FROM articles")
+    assert cached_collector.reparse() == len(collected)
+    assert query(cached_collector, "SELECT arxiv_id, title, version FROM articles "
+                                   "ORDER BY 1") == collected
+
+    # Une réponse illisible en cache: ses entrées complètes sont gardées,
+    # elle-même est retirée du cache
+    window_start, window_end = month_window(2020, 5)
+    indices = corpus.matching('math.DG', window_start, window_end)
+    page = corpus.feed(indices, len(indices))
+    bad = {'search_query': 'cat:math.DG broken', 'start': 0}
+    cached_collector.cache.put(bad, page[:page.index('<entry>', page.index('</entry>')) + 50])
+    count = cached_collector.cache.summary()[0]
+
+    assert cached_collector.reparse(reset=True) == len(collected) + 1
+    assert cached_collector.cache.get(bad) is None
+    assert cached_collector.cache.summary()[0] == count - 1
+
+
+def test_reset_keeps_the_articles_when_the_cache_is_empty(cached_collector):
+    cached_collector.save_articles(make_corpus(10))
+    assert cached_collector.reparse(reset=True) == 0
+    assert query(cached_collector, "SELECT COUNT(*) FROM articles") == [(10,)]
+
+
+def test_reset_keeps_the_articles_when_the_rebuild_fails(cached_collector, monkeypatch):
+    corpus = SyntheticCorpus(3000, 2020, 2020)
+    collect(cached_collector, corpus, 3)
+    collect(cached_collector, corpus, 4)
+    before = query(cached_collector, "SELECT arxiv_id FROM articles ORDER BY 1")
+
+    calls = []
+    parse_response = cached_collector.parse_response
+
+    def failing_parse(xml_data):
+        calls.append(xml_data)
+        if len(calls) == 2:
+            raise RuntimeError("parse interrompu")
+        return parse_response(xml_data)
+    monkeypatch.setattr(cached_collector, 'parse_response', failing_parse)
+
+    with pytest.raises(RuntimeError):
+        cached_collector.reparse(reset=True)
+    assert query(cached_collector, "SELECT arxiv_id FROM articles ORDER BY 1") == before
+    assert query(cached_collector, "SELECT COUNT(*) FROM article_categories")[0][0] >= len(before)
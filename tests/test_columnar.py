@@ -0,0 +1,42 @@
+"""Export en colonnes (articles.bin): mêmes articles que l'export JSON"""
+
+import json
+
+import pytest
+
+from support import make_article, make_corpus
+
+import arxiv_full_collector
+from arxiv_full_collector import ColumnarArticles, stream_articles_json, unversioned
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_columnar_export_matches_the_json_export(collector, tmp_path, monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(arxiv_full_collector, 'np', None)
+    collector.save_articles(make_corpus(60) + [
+        make_article('2305.00001', published=None, updated_at='2023-05-02T10:00:00Z',
+                     title='Sans date — “unicode” ∂'),
+        # Base de worker d'avant migrate_versioned_ids: liens recalculés
+        unversioned(make_article('math/0601001', title='Ancien identifiant')._replace(
+            arxiv_id='math/0601001v2', link='https://arxiv.org/abs/math/0601001v2',
+            pdf_link=None))])
+
+    json_path = tmp_path / 'articles.json'
+    columnar_path = tmp_path / 'articles.bin'
+    total, _, _ = stream_articles_json(collector.db_path, str(json_path),
+                                       columnar_path=str(columnar_path))
+    expected = json.loads(json_path.read_text('utf-8'))
+    assert total == len(expected) == 62
+
+    columnar = ColumnarArticles(str(columnar_path))
+    try:
+        assert columnar.count == total
+        assert [columnar.article(i) for i in range(columnar.count)] == expected
+    finally:
+        columnar.close()
+
+    # Liens sous la même forme que la base (article_links)
+    legacy = next(article for article in expected if article['id'] == 'math/0601001')
+    assert legacy['link'] == 'http://arxiv.org/abs/math/0601001'
+    assert legacy['pdf'] == 'https://arxiv.org/pdf/math/0601001.pdf'
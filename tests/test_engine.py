@@ -0,0 +1,214 @@
+"""Moteur de données du site (worker.js), exécuté sous Node sur de vrais exports"""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from support import ROOT, make_article, make_corpus
+from support import query as sql
+
+from arxiv_full_collector import export_shards, stream_articles_json, tokenize
+
+NODE = shutil.which('node')
+pytestmark = pytest.mark.skipif(NODE is None, reason="Node.js absent")
+
+
+def engine(site, *messages, cache=None):
+    """Réponses du moteur aux messages, et les URL qu'il a lues (cache: fichier
+    gardant l'IndexedDB simulée d'une visite à la suivante)"""
+    result = subprocess.run([NODE, str(ROOT / 'tests' / 'engine.js'), str(site),
+                             json.dumps(messages)] + ([str(cache)] if cache else []),
+                            capture_output=True, encoding='utf-8', timeout=60)
+    assert result.returncode == 0, result.stderr
+    output = json.loads(result.stdout)
+    for reply in output['replies']:
+        assert 'error' not in reply, reply['error']
+    return output['replies'], output['fetched']
+
+
+def query(category='all', year='all', term='', start=0, end=50):
+    return {'type': 'query', 'filters': {'category': category, 'year': year, 'term': term},
+            'start': start, 'end': end}
+
+
+@pytest.fixture
+def legacy_site(collector, tmp_path):
+    """Site avec le seul articles.json, et ses articles dans l'ordre du fichier"""
+    collector.save_articles(make_corpus(120))
+    site = tmp_path / 'site'
+    site.mkdir()
+    stream_articles_json(collector.db_path, str(site / 'articles.json'))
+    return site, json.loads((site / 'articles.json').read_text('utf-8'))
+
+
+def matching(articles, category='all', year='all', term=''):
+    return [article['id'] for article in articles
+            if category in ('all', article['category'])
+            and year in ('all', (article['published'] or '0000')[:4])
+            and (term.lower() in article['title'].lower()
+                 or term.lower() in article['abstract'].lower())]
+
+
+def test_filters_and_memoized_searches_match_a_full_scan(legacy_site):
+    site, articles = legacy_site
+    # Chaque terme réduit les résultats mémoïsés du précédent, pour les mêmes filtres
+    searches = [('all', 'all', 'sym'), ('all', 'all', 'symp'), ('all', 'all', 'symplectic'),
+                ('all', 'all', 'qua'), ('math.DG', 'all', 'quan'), ('math.DG', '2022', 'quantum'),
+                ('all', 'all', 'sym'), ('all', '2023', ''), ('math-ph', 'all', '')]
+    (_, *replies), _ = engine(site, {'type': 'load'},
+                              *(query(*filters, end=1000) for filters in searches))
+    for filters, reply in zip(searches, replies):
+        expected = matching(articles, *filters)
+        assert expected
+        assert reply['total'] == len(expected)
+        assert [article['id'] for article in reply['articles']] == expected
+
+
+def test_summary_pages_and_article_details(legacy_site):
+    site, articles = legacy_site
+    wanted = articles[37]
+    (load, page, details, missing), _ = engine(
+        site, {'type': 'load'}, query(start=30, end=40),
+        {'type': 'article', 'articleId': wanted['id']}, {'type': 'article', 'articleId': 'nope'})
+
+    summary = load['summaries'][-1]
+    assert summary['total'] == len(articles)
+    assert sum(summary['categories'].values()) == sum(summary['years'].values()) == len(articles)
+    assert summary['categories']['math.AG'] == len(matching(articles, 'math.AG'))
+
+    assert [article['id'] for article in page['articles']] == [a['id'] for a in articles[30:40]]
+    assert 'abstract' not in page['articles'][0]
+    assert details['article']['abstract'] == wanted['abstract']
+    assert details['article']['authors'] == [name.strip() for name in wanted['authors'].split(';')]
+    assert missing['article'] is None
+
+
+def test_streamed_json_keeps_strings_cut_between_chunks(collector, tmp_path):
+    tricky = ['Braces {a} and brackets [b]', 'One " quote }], one back\\slash', 'Accents é ∂ — “∞”']
+    collector.save_articles(make_corpus(30) + [
+        make_article(f'2302.9000{n}', published=f'2023-02-0{n + 1}', title=title)
+        for n, title in enumerate(tricky)])
+    site = tmp_path / 'site'
+    site.mkdir()
+    stream_articles_json(collector.db_path, str(site / 'articles.json'))
+    articles = json.loads((site / 'articles.json').read_text('utf-8'))
+    
+    (load, page), fetched = engine(site, {'type': 'load'}, query(end=1000))
+    assert load['summaries'][-1]['total'] == len(articles) == 33
+    assert [article['title'] for article in page['articles']] == [a['title'] for a in articles]
+    assert fetched == ['data/manifest.json', 'articles.bin', 'articles.json']
+
+
+def test_columnar_export_is_read_instead_of_the_json(collector, legacy_site):
+    site, articles = legacy_site
+    stream_articles_json(collector.db_path, str(site / 'articles.json'),
+                         columnar_path=str(site / 'articles.bin'))
+    
+    (_, page, search), fetched = engine(site, {'type': 'load'}, query(end=1000),
+                                        query('math.QA', 'all', 'bundle', end=1000))
+    assert 'articles.json' not in fetched
+    assert [article['id'] for article in page['articles']] == [a['id'] for a in articles]
+    assert [article['id'] for article in search['articles']] == matching(
+        articles, 'math.QA', 'all', 'bundle')
+
+
+@pytest.fixture
+def sharded_site(collector, tmp_path):
+    """Site avec l'export découpé (manifest, shards, index)"""
+    collector.save_articles(make_corpus(150))
+    site = tmp_path / 'site'
+    export_shards(collector.db_path, site / 'data', build_index=True)
+    return site
+
+
+def test_sharded_pages_cover_every_article_once(collector, sharded_site):
+    pages = [query(start=start, end=start + 17) for start in range(0, 150, 17)]
+    (load, *replies, dg), fetched = engine(sharded_site, {'type': 'load'}, *pages,
+                                           query('math.DG', '2022'))
+    assert load['summaries'][-1]['total'] == 150
+    # Seuls le manifest et les shards sont lus, pas les résumés
+    assert all(url.startswith('data/manifest.json') or url.startswith('data/shards/')
+               for url in fetched)
+    
+    rows = [article for reply in replies for article in reply['articles']]
+    assert {reply['total'] for reply in replies} == {150}
+    assert sorted(article['id'] for article in rows) == sorted(
+        row[0] for row in sql(collector, "SELECT arxiv_id FROM articles"))
+    dates = [article['published'] for article in rows]
+    assert dates == sorted(dates, reverse=True)
+    assert sorted(article['id'] for article in dg['articles']) == sorted(
+        row[0] for row in sql(collector, "SELECT arxiv_id FROM articles WHERE category = "
+                                         "'math.DG' AND published LIKE '2022%'"))
+
+
+def test_index_search_and_details_load_on_demand(collector, sharded_site):
+    matches = {arxiv_id: category for arxiv_id, category, title, authors, abstract in sql(
+        collector, "SELECT arxiv_id, category, title, authors, abstract FROM articles")
+        if 'symplectic' in tokenize(f'{title} {authors} {abstract}')}
+    wanted = next(iter(matches))
+    (_, found, filtered, details), fetched = engine(
+        sharded_site, {'type': 'load'}, query(term='Symplectic', end=1000),
+        query('math-ph', 'all', 'symplectic', end=1000),
+        {'type': 'article', 'articleId': wanted})
+    
+    assert sorted(article['id'] for article in found['articles']) == sorted(matches)
+    assert found['total'] == len(matches)
+    assert sorted(article['id'] for article in filtered['articles']) == sorted(
+        arxiv_id for arxiv_id, category in matches.items() if category == 'math-ph')
+    assert any(url.startswith('data/index/') for url in fetched)
+    (abstract,), = sql(collector, "SELECT abstract FROM articles WHERE arxiv_id = ?", (wanted,))
+    assert details['article']['abstract'] == abstract
+
+
+def manifest_files(manifest):
+    """{fichier: empreinte} de tout ce que le manifest référence"""
+    files = {}
+    for shard in manifest['shards']:
+        files[shard['file']] = shard['hash']
+        files.update(zip(shard['abstracts'], shard['abstract_hashes']))
+    index = manifest['index']
+    for entry in index['files'] + (index['delta']['files'] if index.get('delta') else []):
+        files[entry['file']] = entry['hash']
+    files[manifest['stats']['file']] = manifest['stats']['hash']
+    return files
+
+
+def test_repeat_visits_fetch_only_the_manifest_and_changed_files(collector, sharded_site,
+                                                                 tmp_path):
+    cache = tmp_path / 'indexeddb.json'
+    data = sharded_site / 'data'
+    (_, page), _ = engine(sharded_site, {'type': 'load'}, query(end=10))
+    wanted = page['articles'][0]
+    visit = [{'type': 'load'}, query(end=10), query(term='symplectic', end=1000),
+             {'type': 'article', 'articleId': wanted['id']}, {'type': 'stats'}]
+    
+    first, fetched = engine(sharded_site, *visit, cache=cache)
+    assert any('?v=' in url for url in fetched)
+    # Visite suivante: tout vient d'IndexedDB, sauf le manifest revalidé
+    again, fetched = engine(sharded_site, *visit, cache=cache)
+    assert again == first
+    assert fetched == ['data/manifest.json']
+    
+    # Un article modifié: seuls les fichiers dont l'empreinte change sont relus
+    before = manifest_files(json.loads((data / 'manifest.json').read_text('utf-8')))
+    collector.save_articles([make_article(
+        wanted['id'], category=wanted['category'], published=wanted['published'],
+        title='Renamed after the first visit', updated_at='2030-01-01T00:00:00Z')])
+    after = manifest_files(export_shards(collector.db_path, data, build_index=True))
+    changed = {f'data/{file}?v={digest}' for file, digest in after.items()
+               if before.get(file) != digest}
+    # ... et un fichier que le manifest ne cite plus
+    records = json.loads(cache.read_text('utf-8'))
+    records['shards/math.XX/1999.json'] = {'hash': '0' * 12, 'data': []}
+    cache.write_text(json.dumps(records), 'utf-8')
+    
+    third, fetched = engine(sharded_site, *visit, cache=cache)
+    assert third[1]['articles'][0]['title'] == 'Renamed after the first visit'
+    assert fetched[0] == 'data/manifest.json'
+    assert fetched[1:] and set(fetched[1:]) <= changed
+    # Les versions périmées sont retirées du cache
+    records = json.loads(cache.read_text('utf-8'))
+    assert 'shards/math.XX/1999.json' not in records
+    assert all(after.get(file) == record['hash'] for file, record in records.items())
@@ -0,0 +1,28 @@
+"""export_to_json.py: export autonome, sans les dépendances de la collecte"""
+
+import json
+import os
+import subprocess
+import sys
+
+from support import ROOT, make_corpus
+
+# requests rendu introuvable avant d'exécuter le script
+RUN_WITHOUT_REQUESTS = ("import runpy, sys; sys.modules['requests'] = None; "
+                        "sys.argv = sys.argv[1:]; runpy.run_path(sys.argv[0], run_name='__main__')")
+
+
+def test_export_runs_without_requests(collector, tmp_path):
+    collector.save_articles(make_corpus(25))
+    output = tmp_path / 'articles.json'
+    result = subprocess.run([sys.executable, '-c', RUN_WITHOUT_REQUESTS,
+                             str(ROOT / 'export_to_json.py'), collector.db_path, str(output),
+                             '--gzip'],
+                            cwd=ROOT, capture_output=True, encoding='utf-8',
+                            env={**os.environ, 'PYTHONIOENCODING': 'utf-8'})
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    articles = json.loads(output.read_text('utf-8'))
+    assert sorted(article['id'] for article in articles) == sorted(
+        article.arxiv_id for article in make_corpus(25))
+    assert (tmp_path / 'articles.json.gz').exists()
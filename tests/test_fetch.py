@@ -0,0 +1,49 @@
+"""Requêtes conditionnelles de fetch_with_retry (ETag / Last-Modified, 304)"""
+
+from support import FakeSession
+
+from arxiv_full_collector import normalize_params
+
+PARAMS = {'search_query': 'cat:math.DG', 'start': 0, 'max_results': 10}
+HEADERS = {'ETag': '"v1"', 'Last-Modified': 'Mon, 02 Jan 2023 10:00:00 GMT'}
+
+
+def etag_handler(body):
+    """Répond 304 si le client présente l'ETag courant, sinon 200 + validateurs"""
+    def handler(url, params, headers):
+        if headers.get('If-None-Match') == HEADERS['ETag']:
+            return 304, '', HEADERS
+        return 200, body, HEADERS
+    return handler
+
+
+def test_not_modified_reads_the_body_from_the_cache(cached_collector):
+    cached_collector.session = FakeSession(etag_handler('<feed>page</feed>'))
+    assert cached_collector.fetch_with_retry(PARAMS, use_cache=False) == ('<feed>page</feed>', True)
+    # Seuls les validateurs restent en mémoire, le corps est dans le cache
+    assert cached_collector.validators[normalize_params(PARAMS)] == (
+        HEADERS['ETag'], HEADERS['Last-Modified'])
+
+    assert cached_collector.fetch_with_retry(PARAMS, use_cache=False) == ('<feed>page</feed>', True)
+    _, _, headers = cached_collector.session.requests[-1]
+    assert headers == {'If-None-Match': HEADERS['ETag'],
+                       'If-Modified-Since': HEADERS['Last-Modified']}
+    assert cached_collector.metrics.counters['not_modified'] == 1
+
+
+def test_no_conditional_request_without_the_cached_body(cached_collector):
+    cached_collector.session = FakeSession(etag_handler('<feed>page</feed>'))
+    cached_collector.fetch_with_retry(PARAMS, use_cache=False)
+    cached_collector.cache.delete(PARAMS)
+
+    assert cached_collector.fetch_with_retry(PARAMS, use_cache=False) == ('<feed>page</feed>', True)
+    _, _, headers = cached_collector.session.requests[-1]
+    assert headers == {}
+
+
+def test_no_validators_without_cache(collector):
+    collector.session = FakeSession(etag_handler('<feed>page</feed>'))
+    collector.fetch_with_retry(PARAMS)
+    collector.fetch_with_retry(PARAMS)
+    assert not collector.validators
+    assert [headers for _, _, headers in collector.session.requests] == [{}, {}]
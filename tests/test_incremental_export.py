@@ -0,0 +1,81 @@
+"""Export découpé incrémental: seuls les shards modifiés sont réécrits"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from support import make_corpus
+
+import arxiv_full_collector
+from arxiv_full_collector import export_shards
+
+
+def read_tree(path, subdirs=('shards', 'abstracts')):
+    """{chemin relatif: contenu JSON} des fichiers d'un export"""
+    files = {}
+    for subdir in subdirs:
+        for file in sorted((Path(path) / subdir).rglob('*.json')):
+            files[file.relative_to(path).as_posix()] = json.loads(file.read_text('utf-8'))
+    return files
+
+
+@pytest.mark.parametrize('build_index, related', [(False, False), (True, True)])
+def test_incremental_export_matches_full_export(collector, tmp_path, monkeypatch,
+                                                build_index, related):
+    # Petit corpus: l'index delta dépasserait INDEX_DELTA_RATIO et forcerait
+    # un export complet
+    monkeypatch.setattr(arxiv_full_collector, 'INDEX_DELTA_RATIO', 1.0)
+    options = {'build_index': build_index, 'related': related}
+    articles = make_corpus(80)
+    collector.save_articles(articles)
+    if related:
+        collector.index_similar()
+    incremental = tmp_path / 'incremental'
+    stats = {}
+    export_shards(collector.db_path, incremental, stats=stats, **options)
+    assert stats['mode'] == 'full'
+
+    # Ajouts, article déplacé vers un autre shard, suppression
+    collector.save_articles(make_corpus(5, start=500))
+    collector.save_articles([articles[3]._replace(category='math.KT', published='2019-02-02',
+                                                  updated_at='2024-01-01T00:00:00Z'),
+                             articles[4]._replace(title='Retitled',
+                                                  updated_at='2024-01-01T00:00:00Z')])
+    collector.writer.execute("DELETE FROM articles WHERE arxiv_id = ?", (articles[5].arxiv_id,))
+    if related:
+        collector.index_similar()
+
+    stats = {}
+    manifest = export_shards(collector.db_path, incremental, stats=stats, **options)
+    assert stats['mode'] == 'incremental'
+    assert 0 < stats['shards'] < len(manifest['shards'])
+
+    rewritten = stats['written']
+
+    full = tmp_path / 'full'
+    expected = export_shards(collector.db_path, full, full=True, **options)
+    assert read_tree(incremental) == read_tree(full)
+    for key in ('total', 'categories', 'years'):
+        assert manifest[key] == expected[key]
+
+    # doc_base reste stable pour l'index delta, et seuls les shards réécrits
+    # ont des listes de voisins à jour (export-shards --related --full)
+    def strip(shard):
+        return {name: value for name, value in shard.items()
+                if name not in ('doc_base', 'related_hash')}
+    assert [strip(shard) for shard in manifest['shards']] == [
+        strip(shard) for shard in expected['shards']]
+    related_files = [file for file in rewritten if file.startswith('related/')]
+    assert bool(related_files) == related
+    for file in related_files:
+        assert (incremental / file).read_text('utf-8') == (full / file).read_text('utf-8')
+
+    # Le delta liste l'article supprimé
+    delta = json.loads((incremental / manifest['deltas'][-1]['file']).read_text('utf-8'))
+    assert articles[5].arxiv_id in delta['removed']
+
+    # Rien de neuf: l'export suivant ne réécrit rien
+    stats = {}
+    export_shards(collector.db_path, incremental, stats=stats, **options)
+    assert stats['mode'] == 'unchanged'
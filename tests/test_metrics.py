@@ -0,0 +1,70 @@
+"""Métriques d'exécution: journal d'événements JSON lines, table runs, profil"""
+
+import json
+import pstats
+
+import pytest
+
+from support import FakeSession, corpus_handler, query
+
+import arxiv_full_collector
+from arxiv_full_collector import RUN_STAGES, Profiler
+from fake_arxiv import SyntheticCorpus
+
+
+def test_collect_run_is_logged_and_summarized(collector, tmp_path, monkeypatch):
+    events_path = tmp_path / 'events.jsonl'
+    collector.events_path = str(events_path)
+    collector.categories = ['math.DG']
+    answer = corpus_handler(SyntheticCorpus(2000, 2020, 2020))
+
+    def handler(url, params, headers):
+        # Première requête refusée une fois
+        if len(session.requests) == 1:
+            return 429, '', {'Retry-After': '0'}
+        return answer(url, params, headers)
+
+    session = collector.session = FakeSession(handler)
+    # configure_pool recrée la session: on garde la FakeSession
+    monkeypatch.setattr(arxiv_full_collector, 'create_session', lambda pool_size: session)
+
+    total = collector.collect_all(2020, 2020)
+    requests_sent = len(session.requests)
+
+    events = [json.loads(line) for line in events_path.read_text('utf-8').splitlines()]
+    assert events[0]['event'] == 'run_start' and events[0]['command'] == 'collect'
+    assert events[-1]['event'] == 'run_end'
+    assert {event['run'] for event in events} == {events[0]['run']}
+    assert [event['status'] for event in events if event['event'] == 'backoff'] == [429]
+
+    summary = events[-1]
+    assert summary == {'ts': summary['ts'], 'run': summary['run'], 'event': 'run_end',
+                       **json.loads(json.dumps(collector.last_run))}
+    assert (summary['status'], summary['rows'], summary['requests'], summary['rate_limited'],
+            summary['retries']) == ('completed', total, requests_sent, 1, 1)
+    assert set(summary['stages']) == set(RUN_STAGES)
+    assert summary['stages']['network'] > 0 and summary['stages']['write'] > 0
+
+    (command, status, rows, requests_count, stages), = query(
+        collector, "SELECT command, status, rows, requests, stages FROM runs")
+    assert (command, status, rows, requests_count) == ('collect', 'completed', total, requests_sent)
+    assert json.loads(stages) == summary['stages']
+
+
+def test_failed_run_keeps_its_status(collector):
+    with pytest.raises(RuntimeError):
+        with collector.run('update', source='api'):
+            collector.metrics.add(requests=3)
+            raise RuntimeError('network down')
+    assert query(collector, "SELECT command, status, requests, params FROM runs") == [
+        ('update', 'failed', 3, '{"source": "api"}')]
+
+
+def test_profile_is_written_for_pstats(tmp_path, capsys):
+    path = tmp_path / 'collect.prof'
+    profiler = Profiler(str(path))
+    profiler.start()
+    sorted(str(n) for n in range(20000))
+    profiler.stop()
+    assert 'Profil cProfile' in capsys.readouterr().out
+    assert pstats.Stats(str(path)).total_calls > 0
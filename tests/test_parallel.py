@@ -0,0 +1,76 @@
+"""Collecte parallèle et rate limiter partagé (token bucket)"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from support import FakeSession, corpus_handler, make_collector, query
+
+import arxiv_full_collector
+from arxiv_full_collector import MAX_BACKOFF, RateLimiter, backoff_delay, parse_retry_after
+from fake_arxiv import SyntheticCorpus
+
+
+def test_rate_limiter_spaces_requests_across_threads():
+    limiter = RateLimiter(50)
+    started = time.monotonic()
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Un jeton disponible d'emblée, puis un toutes les 20 ms
+    assert time.monotonic() - started >= 5 / 50 * 0.9
+
+    limiter.penalize(0.1)
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.1 * 0.9
+
+
+def test_retry_after_and_backoff():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+    assert backoff_delay(0, 3, retry_after=12.0) == 12.0
+    assert 1.5 <= backoff_delay(0, 3) <= 4.5
+    assert backoff_delay(20, 3) == MAX_BACKOFF
+
+
+def test_rate_limited_request_is_retried(collector):
+    answers = iter([(429, '', {'Retry-After': '0'}), (200, '<feed/>', {})])
+    collector.session = FakeSession(lambda url, params, headers: next(answers))
+    assert collector.fetch_with_retry({'search_query': 'cat:math.DG'}) == ('<feed/>', True)
+    assert collector.metrics.counters['rate_limited'] == 1
+    assert collector.metrics.counters['requests'] == 2
+
+
+def test_parallel_collection_matches_sequential(tmp_path, monkeypatch):
+    corpus = SyntheticCorpus(4000, 2020, 2020)
+    categories = ['math.DG', 'math.SG', 'math-ph']
+    results = {}
+    for workers in (1, 4):
+        collector = make_collector(tmp_path / f'{workers}.db')
+        session = FakeSession(corpus_handler(corpus))
+        collector.session = session
+        # configure_pool recrée la session: on garde la FakeSession
+        monkeypatch.setattr(arxiv_full_collector, 'create_session', lambda pool_size: session)
+        collector.categories = categories
+        total = collector.collect_all(2020, 2020, workers=workers)
+        results[workers] = (
+            total,
+            query(collector, "SELECT arxiv_id, title, version FROM articles ORDER BY 1"),
+            query(collector, "SELECT category, year, month, articles_count, status "
+                             "FROM collection_progress ORDER BY 1, 2, 3"),
+        )
+        collector.close()
+
+    assert results[1] == results[4]
+    total, articles, progress = results[4]
+    assert total == len(articles) > 0
+    assert len(progress) == 3 * 12
+    assert {row[4] for row in progress} == {'completed'}
@@ -0,0 +1,96 @@
+"""Parsing incrémental des pages Atom et pages tronquées pendant une collecte"""
+
+import pytest
+
+from support import FakeSession, corpus_handler
+
+from arxiv_full_collector import iter_articles, month_window, normalize_params
+from fake_arxiv import SyntheticCorpus
+
+
+def test_iter_articles_reads_every_entry():
+    corpus = SyntheticCorpus(50, 2021, 2021)
+    stats = {}
+    articles = list(iter_articles(corpus.feed(range(20), 50), stats))
+
+    assert stats == {'entries': 20, 'bad_entries': 0, 'total_results': 50}
+    assert [article.arxiv_id for article in articles] == [corpus.record(k)['id'] for k in range(20)]
+    assert all('v' not in article.arxiv_id for article in articles)
+    assert [article.version for article in articles] == [corpus.version(k) for k in range(20)]
+
+
+def test_iter_articles_skips_a_bad_entry():
+    corpus = SyntheticCorpus(50, 2021, 2021)
+    page = corpus.feed(range(5), 5)
+    # Entrée d'erreur de l'API: pas d'identifiant /abs/
+    bad_id = f"http://arxiv.org/abs/{corpus.record(2)['id']}v{corpus.version(2)}"
+    page = page.replace(f"<id>{bad_id}</id>", "<id>http://arxiv.org/api/errors#bad</id>")
+    stats = {}
+    articles = list(iter_articles(page, stats))
+
+    assert len(articles) == 4
+    assert stats['entries'] == 4 and stats['bad_entries'] == 1
+    assert 'parse_error' not in stats
+
+
+def test_iter_articles_stops_at_a_truncated_entry():
+    corpus = SyntheticCorpus(50, 2021, 2021)
+    page = corpus.feed(range(10), 10)
+    cut = page.index('<entry>', page.index('</entry>'))
+    stats = {}
+    articles = list(iter_articles(page[:cut + 120], stats))
+
+    assert len(articles) == 1
+    assert 'parse_error' in stats
+
+
+def truncate_at(offset):
+    """page_hook qui coupe la page `offset` au milieu de sa deuxième entrée"""
+    def hook(params, body):
+        if int(params['start']) != offset:
+            return body
+        return body[:body.index('<entry>', body.index('</entry>')) + 120]
+    return hook
+
+
+@pytest.mark.parametrize('offset', [0, 1000])
+def test_truncated_page_leaves_the_month_in_progress(cached_collector, offset):
+    # ~1190 articles de math.DG par mois: deux pages de 1000
+    corpus = SyntheticCorpus(100_000, 2020, 2020)
+    window_start, window_end = month_window(2020, 3)
+    expected = len(corpus.matching('math.DG', window_start, window_end))
+    assert 1000 < expected < 2000
+
+    cached_collector.session = FakeSession(corpus_handler(corpus, page_hook=truncate_at(offset)))
+    errors = []
+    cached_collector.collect_month('math.DG', 2020, 3, errors=errors)
+
+    assert len(errors) == 1
+    progress = cached_collector.get_progress('math.DG', 2020, 3)
+    if offset == 0:
+        assert progress is None
+    else:
+        assert progress['status'] == 'in_progress'
+        assert progress['next_offset'] == offset
+
+    # La page illisible n'est pas gardée en cache, les précédentes si
+    truncated, = [params for _, params, _ in cached_collector.session.requests
+                  if int(params['start']) == offset]
+    assert cached_collector.cache.get(truncated) is None
+    assert normalize_params(truncated) not in cached_collector.validators
+    if offset:
+        first, = [params for _, params, _ in cached_collector.session.requests
+                  if int(params['start']) == 0]
+        assert cached_collector.cache.get(first) is not None
+
+    # Passage suivant: la page est redemandée et le mois se termine
+    cached_collector.session = FakeSession(corpus_handler(corpus))
+    errors = []
+    cached_collector.collect_month('math.DG', 2020, 3, errors=errors)
+
+    assert errors == []
+    assert [int(params['start']) for _, params, _ in cached_collector.session.requests] == [
+        offset] + ([1000] if offset == 0 else [])
+    progress = cached_collector.get_progress('math.DG', 2020, 3)
+    assert progress['status'] == 'completed'
+    assert progress['articles_count'] == expected
@@ -0,0 +1,114 @@
+"""API de lecture (serve): pagination par clé, cache LRU des réponses, ETag"""
+
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+from support import make_article, make_corpus, query
+
+from arxiv_full_collector import ReadApi, ReadApiHandler
+
+
+def walk(api, params, direction, max_pages):
+    """Parcourt toutes les pages dans un sens ('next' ou 'prev')"""
+    pages = []
+    cursor = None
+    while len(pages) < max_pages:
+        page_params = dict(params)
+        if cursor is not None:
+            page_params['after' if direction == 'next' else 'before'] = cursor
+        elif direction == 'prev':
+            page_params['last'] = '1'
+        status, body, _ = api.respond('articles', page_params)
+        assert status == 200
+        page = json.loads(body)
+        pages.append([article['id'] for article in page['articles']])
+        cursor = page[direction]
+        if cursor is None:
+            return pages
+    pytest.fail(f"plus de {max_pages} pages")
+
+
+@pytest.mark.parametrize('params', [{}, {'category': 'math.AG'}, {'year': '2022'}])
+def test_keyset_pages_neither_overlap_nor_skip(collector, params):
+    collector.save_articles(make_corpus(97))
+    where, args = ReadApi.filters(params)
+    expected = [row[0] for row in query(collector, f'''
+        SELECT arxiv_id FROM articles WHERE {where}
+        ORDER BY published DESC, arxiv_id DESC
+    ''', args)]
+    # Dates en double: le départage par identifiant est exercé
+    assert query(collector, "SELECT COUNT(DISTINCT published) FROM articles")[0][0] < 97
+
+    api = ReadApi(collector.db_path, pool_size=1)
+    try:
+        for limit in (1, 7, 10, len(expected)):
+            max_pages = len(expected) // limit + 1
+            forward = walk(api, {**params, 'limit': str(limit)}, 'next', max_pages)
+            assert [arxiv_id for page in forward for arxiv_id in page] == expected
+            assert all(len(page) == limit for page in forward[:-1])
+
+            backward = walk(api, {**params, 'limit': str(limit)}, 'prev', max_pages)
+            assert [arxiv_id for page in reversed(backward) for arxiv_id in page] == expected
+    finally:
+        api.close()
+
+
+def test_cached_answers_are_dropped_when_a_harvest_commits(collector):
+    collector.save_articles(make_corpus(30))
+    api = ReadApi(collector.db_path, pool_size=1, cache_size=2)
+    try:
+        first = api.respond('articles', {'category': 'math.AG', 'limit': '5'})
+        # Mêmes paramètres dans un autre ordre: même entrée du cache
+        assert api.respond('articles', {'limit': '5', 'category': 'math.AG'}) == first
+        assert api.stats['hits'] == 1
+
+        # LRU: la réponse la moins récente sort
+        api.respond('stats', {})
+        api.respond('article', {'id': 'nope'})
+        assert len(api.cache) == 2
+        api.respond('articles', {'category': 'math.AG', 'limit': '5'})
+        assert api.stats['hits'] == 1
+
+        # Une requête invalide n'est pas gardée
+        assert api.respond('articles', {'year': '20x2'})[0] == 400
+        assert len(api.cache) == 2
+
+        collector.save_articles([make_article('2312.99999', category='math.AG',
+                                              published='2030-01-01')])
+        status, body, etag = api.respond('articles', {'category': 'math.AG', 'limit': '5'})
+        assert api.stats['invalidations'] == 1
+        assert etag != first[2]
+        assert json.loads(body)['articles'][0]['id'] == '2312.99999'
+    finally:
+        api.close()
+
+
+def test_http_answers_carry_etags(collector):
+    collector.save_articles(make_corpus(30))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ReadApiHandler)
+    server.api = ReadApi(collector.db_path, pool_size=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/api"
+    try:
+        answer = requests.get(f"{base}/articles", params={'limit': '3'})
+        assert answer.status_code == 200
+        assert answer.headers['Access-Control-Allow-Origin'] == '*'
+        assert len(answer.json()['articles']) == 3
+
+        again = requests.get(f"{base}/articles", params={'limit': '3'},
+                             headers={'If-None-Match': answer.headers['ETag']})
+        assert (again.status_code, again.content) == (304, b'')
+
+        arxiv_id = answer.json()['articles'][0]['id']
+        assert requests.get(f"{base}/articles/{arxiv_id}").json()['id'] == arxiv_id
+        assert requests.get(f"{base}/articles/9999.99999").status_code == 404
+        assert requests.get(f"{base}/nothing").status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.api.close()
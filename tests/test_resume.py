@@ -0,0 +1,73 @@
+"""Reprise d'une collecte interrompue depuis collection_progress"""
+
+from datetime import datetime, timedelta, timezone
+
+from support import FakeSession, corpus_handler, query
+
+from arxiv_full_collector import month_window
+from fake_arxiv import SyntheticCorpus
+
+
+def failing_at(handler, offset):
+    """Handler qui répond 400 pour la page `offset`"""
+    def wrapped(url, params, headers):
+        if int(params['start']) == offset:
+            return 400, 'Bad Request', {}
+        return handler(url, params, headers)
+    return wrapped
+
+
+def offsets(session):
+    return [int(params['start']) for _, params, _ in session.requests]
+
+
+def test_interrupted_month_resumes_at_its_checkpoint(cached_collector):
+    collector = cached_collector
+    corpus = SyntheticCorpus(100_000, 2020, 2020)
+    window_start, window_end = month_window(2020, 3)
+    expected = len(corpus.matching('math.DG', window_start, window_end))
+
+    collector.session = FakeSession(failing_at(corpus_handler(corpus), 1000))
+    errors = []
+    collector.collect_month('math.DG', 2020, 3, errors=errors)
+    assert errors == [('math.DG', window_start, window_end)]
+
+    # Première page et checkpoint écrits ensemble
+    progress = collector.get_progress('math.DG', 2020, 3)
+    assert progress['status'] == 'in_progress'
+    assert progress['next_offset'] == 1000
+    assert progress['articles_count'] == 1000
+    assert query(collector, "SELECT COUNT(*) FROM articles") == [(1000,)]
+
+    collector.session = FakeSession(corpus_handler(corpus))
+    collector.collect_month('math.DG', 2020, 3)
+    assert offsets(collector.session) == [1000]
+    progress = collector.get_progress('math.DG', 2020, 3)
+    assert progress['status'] == 'completed'
+    assert progress['articles_count'] == expected
+    assert query(collector, "SELECT COUNT(*) FROM articles") == [(expected,)]
+
+
+def test_completed_month_is_skipped_unless_forced_or_stale(cached_collector):
+    collector = cached_collector
+    corpus = SyntheticCorpus(3000, 2020, 2020)
+    collector.session = FakeSession(corpus_handler(corpus))
+    collector.collect_month('math.DG', 2020, 3)
+    assert collector.get_progress('math.DG', 2020, 3)['status'] == 'completed'
+
+    collector.session = FakeSession(corpus_handler(corpus))
+    assert collector.collect_month('math.DG', 2020, 3) == 0
+    assert collector.session.requests == []
+
+    # Checkpoint plus récent que refresh_before: toujours sauté
+    collector.collect_month('math.DG', 2020, 3,
+                            refresh_before=datetime.now(timezone.utc) - timedelta(days=1))
+    assert collector.session.requests == []
+
+    # --force et --refresh-older-than relisent le réseau, pas le cache
+    collector.collect_month('math.DG', 2020, 3, force=True)
+    assert offsets(collector.session) == [0]
+    collector.collect_month('math.DG', 2020, 3,
+                            refresh_before=datetime.now(timezone.utc) + timedelta(days=1))
+    assert offsets(collector.session) == [0, 0]
+    assert collector.metrics.counters['cache_hits'] == 0
@@ -0,0 +1,57 @@
+"""Recherche plein texte FTS5 (commande search)"""
+
+import pytest
+
+from support import make_article, make_corpus, query
+
+
+@pytest.fixture
+def searchable(collector):
+    if not collector.fts_enabled:
+        pytest.skip("SQLite sans FTS5")
+    collector.save_articles(make_corpus(40) + [
+        make_article('2304.00001', category='math.DG', published='2023-04-02',
+                     title='Gromov capacities of ellipsoids'),
+        make_article('2304.00002', category='math.SG', published='2023-04-03',
+                     title='Ellipsoid embeddings', categories='math.SG math.DG')._replace(
+                         authors='Dusa McDuff; Felix Schlenk',
+                         abstract='We compute the Gromov width.'),
+        make_article('2201.00003', category='math.DG', published='2022-01-10',
+                     title='Pseudoholomorphic curves and ellipsoïds')._replace(
+                         authors='Dusa McDuff'),
+    ])
+    return collector
+
+
+def ids(results):
+    return sorted(row[0] for row in results)
+
+
+def test_search_matches_title_abstract_and_authors(searchable):
+    # Accents ignorés, préfixe, colonne
+    assert ids(searchable.search('ellipsoid*')) == ['2201.00003', '2304.00001', '2304.00002']
+    assert ids(searchable.search('title:gromov')) == ['2304.00001']
+    assert ids(searchable.search('authors:mcduff')) == ['2201.00003', '2304.00002']
+    assert searchable.search('ellipsoid*', limit=1)[0][0] in ('2304.00001', '2304.00002')
+    # Titre pondéré plus fort que le résumé
+    assert [row[0] for row in searchable.search('gromov')] == ['2304.00001', '2304.00002']
+
+
+def test_search_filters_and_invalid_queries(searchable):
+    assert ids(searchable.search('ellipsoid*', category='math.DG')) == ['2201.00003', '2304.00001']
+    assert ids(searchable.search('ellipsoid*', date_from='2023')) == ['2304.00001', '2304.00002']
+    assert ids(searchable.search('ellipsoid*', date_to='2022-12')) == ['2201.00003']
+    assert searchable.search('title:(') is None
+    assert query(searchable, "SELECT query, results FROM search_log ORDER BY id") == [
+        ('ellipsoid*', 2), ('ellipsoid*', 2), ('ellipsoid*', 1)]
+
+
+def test_index_follows_updates_and_deletes(searchable):
+    article = make_article('2304.00001', category='math.DG', published='2023-04-02',
+                           title='Capacities of polydisks', updated_at='2024-01-01T00:00:00Z')
+    searchable.save_articles([article])
+    assert ids(searchable.search('title:gromov')) == []
+    assert ids(searchable.search('polydisks')) == ['2304.00001']
+
+    searchable.writer.execute("DELETE FROM articles WHERE arxiv_id = '2304.00001'")
+    assert searchable.search('polydisks') == []
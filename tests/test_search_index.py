@@ -0,0 +1,62 @@
+"""Index de recherche du site écrit par export-shards (SearchIndexBuilder)"""
+
+import json
+
+from support import make_corpus, query
+
+import arxiv_full_collector
+from arxiv_full_collector import INDEX_FIELD_WEIGHTS, INDEX_WEIGHT_BITS, export_shards, tokenize
+
+
+def test_tokenize_folds_accents_and_drops_stopwords():
+    assert tokenize("The Sérre–Tate theory of a K3 surface, revisited") == [
+        'serre', 'tate', 'theory', 'k3', 'surface', 'revisited']
+
+
+def read_index(data, index):
+    """{terme: {numéro d'article: poids}} depuis les fichiers de l'index"""
+    weight_mask = (1 << index['weight_bits']) - 1
+    terms = {}
+    firsts = []
+    for entry in index['files']:
+        block = json.loads((data / entry['file']).read_text('utf-8'))
+        assert next(iter(block)) == entry['first']
+        firsts.append(entry['first'])
+        for term, encoded in block.items():
+            doc = 0
+            postings = terms[term] = {}
+            for value in encoded:
+                doc += value >> index['weight_bits']
+                postings[doc] = value & weight_mask
+    assert firsts == sorted(firsts)
+    return terms
+
+
+def test_index_maps_every_term_to_its_articles(collector, tmp_path, monkeypatch):
+    monkeypatch.setattr(arxiv_full_collector, 'INDEX_SHARD_BYTES', 200)
+    collector.save_articles(make_corpus(40))
+    data = tmp_path / 'data'
+    manifest = export_shards(collector.db_path, data, build_index=True)
+    index = manifest['index']
+    assert len(index['files']) > 1
+    assert index['docs'] == 40
+
+    # Numéro d'article = doc_base du shard + position dans le shard
+    expected = {}
+    for shard in manifest['shards']:
+        rows = json.loads((data / shard['file']).read_text('utf-8'))
+        for position, row in enumerate(rows):
+            (title, authors, abstract), = query(
+                collector, "SELECT title, authors, abstract FROM articles WHERE arxiv_id = ?",
+                (row[0],))
+            weights = {}
+            for field, text in (('title', title), ('authors', authors), ('abstract', abstract)):
+                for token in tokenize(text):
+                    weights[token] = weights.get(token, 0) + INDEX_FIELD_WEIGHTS[field]
+            for token, weight in weights.items():
+                expected.setdefault(token, {})[shard['doc_base'] + position] = min(
+                    weight, (1 << INDEX_WEIGHT_BITS) - 1)
+
+    terms = read_index(data, index)
+    assert terms == expected
+    assert index['terms'] == len(terms)
@@ -0,0 +1,46 @@
+"""Export découpé (export-shards): manifest, shards et résumés"""
+
+import hashlib
+import json
+
+from support import make_article, make_corpus, query
+
+from arxiv_full_collector import CONTENT_HASH_LENGTH, export_shards
+
+
+def test_manifest_lists_every_article_once(collector, tmp_path):
+    articles = make_corpus(75) + [make_article('2309.00001', published=None,
+                                               updated_at='2023-09-01T10:00:00Z')]
+    collector.save_articles(articles)
+    data = tmp_path / 'data'
+    manifest = export_shards(collector.db_path, data)
+
+    assert json.loads((data / 'manifest.json').read_text('utf-8')) == manifest
+    assert manifest['total'] == len(articles)
+    assert manifest['categories'] == dict(query(
+        collector, "SELECT category, COUNT(*) FROM articles GROUP BY category"))
+    # Les articles non datés vont dans l'année '0000'
+    assert manifest['years']['0000'] == 1
+    assert sum(manifest['years'].values()) == len(articles)
+
+    seen = []
+    for shard in manifest['shards']:
+        body = (data / shard['file']).read_bytes()
+        assert hashlib.sha256(body).hexdigest()[:CONTENT_HASH_LENGTH] == shard['hash']
+        rows = json.loads(body)
+        assert len(rows) == shard['count']
+        abstracts = [abstract for file in shard['abstracts']
+                     for abstract in json.loads((data / file).read_text('utf-8'))]
+        assert len(abstracts) == len(rows)
+
+        for (arxiv_id, title, authors, published), abstract in zip(rows, abstracts):
+            assert query(collector, "SELECT category, title, abstract FROM articles "
+                                    "WHERE arxiv_id = ?", (arxiv_id,)) == [
+                (shard['category'], title, abstract)]
+            assert (published or '0000')[:4] == shard['year']
+            seen.append(arxiv_id)
+        # Plus récents d'abord
+        dates = [row[3] or '' for row in rows]
+        assert dates == sorted(dates, reverse=True)
+
+    assert sorted(seen) == sorted(article.arxiv_id for article in articles)
@@ -0,0 +1,87 @@
+"""Index des articles voisins (MinHash / LSH): doublons, mise à jour, export"""
+
+import json
+import sqlite3
+
+import pytest
+
+from support import make_article, make_corpus
+
+import arxiv_full_collector
+from arxiv_full_collector import SIMILAR_DUPLICATE_SCORE, SimilarIndex, export_shards
+
+
+def resubmission(article, arxiv_id, category):
+    """Même article soumis une seconde fois sous un autre identifiant"""
+    return article._replace(arxiv_id=arxiv_id, category=category, categories=category,
+                            link=f"http://arxiv.org/abs/{arxiv_id}",
+                            pdf_link=f"https://arxiv.org/pdf/{arxiv_id}.pdf")
+
+
+def test_resubmission_is_the_closest_neighbour(collector, tmp_path):
+    corpus = make_corpus(60)
+    original = corpus[7]._replace(
+        title='Floer homology of monotone Lagrangian tori in toric surfaces',
+        abstract='We compute the Floer homology of monotone Lagrangian tori '
+                 'in toric del Pezzo surfaces using wall crossing.')
+    collector.save_articles(corpus[:7] + [original] + corpus[8:] + [
+        resubmission(original, '2401.99999', 'math.DG')])
+    assert collector.index_similar() == 61
+
+    related = collector.show_related(original.arxiv_id)
+    score, arxiv_id, _, category, _ = related[0]
+    assert (arxiv_id, category) == ('2401.99999', 'math.DG')
+    assert score >= SIMILAR_DUPLICATE_SCORE
+    assert all(other[0] < SIMILAR_DUPLICATE_SCORE for other in related[1:])
+    assert collector.show_related('9999.99999') is None
+
+    # Listes exportées à côté des shards, ligne à ligne
+    manifest = export_shards(collector.db_path, tmp_path / 'data', related=True)
+    for shard in manifest['shards']:
+        rows = json.loads((tmp_path / 'data' / shard['file']).read_text('utf-8'))
+        lists = json.loads((tmp_path / 'data' / shard['related']).read_text('utf-8'))
+        assert len(lists) == len(rows)
+        for row, neighbours in zip(rows, lists):
+            if row[0] == original.arxiv_id:
+                assert neighbours[0][0] == '2401.99999'
+
+
+def test_index_follows_new_and_changed_articles(collector):
+    collector.save_articles(make_corpus(40))
+    assert collector.writer.index_similar() == (40, 0)
+    assert collector.writer.index_similar() == (0, 0)
+
+    collector.save_articles([make_article('2401.99998', title='Quantum groups at roots of unity')])
+    assert collector.writer.index_similar() == (1, 0)
+
+    # Article modifié: sa signature périmée est remplacée
+    changed = make_article('2401.99998', title='Crystal bases of quantum groups',
+                           updated_at='2024-06-01T00:00:00Z')
+    collector.save_articles([changed])
+    assert collector.writer.index_similar() == (1, 1)
+    conn = sqlite3.connect(collector.db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*), SUM(stale) FROM similar_signatures").fetchone() == (
+            41, 0)
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('numpy', [True, False])
+def test_related_many_matches_related(collector, monkeypatch, numpy):
+    collector.save_articles(make_corpus(120))
+    collector.index_similar()
+    if not numpy:
+        monkeypatch.setattr(arxiv_full_collector, 'np', None)
+
+    conn = sqlite3.connect(collector.db_path)
+    try:
+        similar = SimilarIndex(conn)
+        ids = [row[0] for row in conn.execute("SELECT arxiv_id FROM articles ORDER BY arxiv_id")]
+        ids.append('9999.99999')
+        expected = [[(score, other_id) for score, other_id, *_ in similar.related(arxiv_id, 5) or []]
+                    for arxiv_id in ids]
+        assert any(expected)
+        assert similar.related_many(ids, 5) == expected
+    finally:
+        conn.close()
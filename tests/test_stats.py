@@ -0,0 +1,108 @@
+"""Statistiques agrégées tenues par triggers (init_stats, collection_stats)"""
+
+import sqlite3
+
+from support import make_corpus, query
+
+from arxiv_full_collector import (STATS_MONTH_SQL, SHARD_CATEGORY_SQL, SHARD_YEAR_SQL,
+                                  collection_stats)
+
+
+def assert_stats_match(collector):
+    """Les compteurs tenus par les triggers égalent les GROUP BY"""
+    by_month = query(collector, "SELECT category, year, month, articles FROM stats_by_month "
+                                "ORDER BY 1, 2, 3")
+    expected = query(collector, f'''
+        SELECT {SHARD_CATEGORY_SQL.format('articles')}, {SHARD_YEAR_SQL.format('articles')},
+               {STATS_MONTH_SQL.format('articles')}, COUNT(*)
+        FROM articles GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+    ''')
+    assert by_month == expected
+
+    cross_lists = query(collector, "SELECT category, articles, primary_articles "
+                                   "FROM stats_cross_lists ORDER BY 1")
+    expected = query(collector, '''
+        SELECT category, COUNT(*), SUM(is_primary) FROM article_categories
+        GROUP BY category ORDER BY 1
+    ''')
+    assert cross_lists == expected
+
+    by_year = query(collector, "SELECT category, year, articles FROM stats_by_category_year "
+                               "ORDER BY 1, 2")
+    expected = query(collector, f'''
+        SELECT {SHARD_CATEGORY_SQL.format('articles')}, {SHARD_YEAR_SQL.format('articles')},
+               COUNT(*)
+        FROM articles GROUP BY 1, 2 ORDER BY 1, 2
+    ''')
+    assert by_year == expected
+
+
+def test_stats_triggers_follow_inserts_updates_and_deletes(collector):
+    articles = make_corpus(60)
+    collector.save_articles(articles)
+    assert_stats_match(collector)
+
+    # Nouvelle version: autre catégorie, autre mois, cross-lists différentes
+    moved = [article._replace(category='math.KT', published='2020-07-14',
+                              categories='math.KT math.AG', updated_at='2024-01-01T00:00:00Z')
+             for article in articles[:10]]
+    collector.save_articles(moved)
+    assert_stats_match(collector)
+    assert query(collector, "SELECT articles FROM stats_by_month "
+                            "WHERE category = 'math.KT' AND year = '2020' AND month = '07'") == [(10,)]
+
+    collector.writer.execute("DELETE FROM articles WHERE arxiv_id IN (?, ?, ?)",
+                             (articles[0].arxiv_id, articles[20].arxiv_id, articles[33].arxiv_id))
+    assert_stats_match(collector)
+
+    # Un compteur retombé à zéro disparaît
+    collector.writer.execute("DELETE FROM articles WHERE category = 'math.KT'")
+    assert_stats_match(collector)
+    assert query(collector, "SELECT COUNT(*) FROM stats_by_month WHERE category = 'math.KT'") == [(0,)]
+
+
+def test_collection_stats_reads_the_tables_like_a_full_scan(collector, tmp_path):
+    articles = make_corpus(90)
+    collector.save_articles(articles)
+    collector.save_articles([articles[0]._replace(published=None, arxiv_id='2101.99999')])
+
+    conn = sqlite3.connect(collector.db_path)
+    try:
+        stats = collection_stats(conn)
+    finally:
+        conn.close()
+    assert stats['total'] == 91
+    assert sum(stats['categories'].values()) == sum(stats['years'].values()) == 91
+    assert stats['years']['0000'] == 1
+    assert list(stats['categories'].values()) == sorted(stats['categories'].values(),
+                                                        reverse=True)
+
+    # Même résultat qu'une base sans tables de stats (parcours des articles)
+    conn = sqlite3.connect(tmp_path / 'scan.db')
+    source = sqlite3.connect(collector.db_path)
+    source.backup(conn)
+    source.close()
+    try:
+        conn.execute("DROP VIEW stats_by_category_year")
+        conn.execute("DROP TABLE stats_by_month")
+        conn.execute("DROP TABLE stats_cross_lists")
+        assert collection_stats(conn) == stats
+    finally:
+        conn.close()
+
+
+def test_stats_tables_are_filled_when_created_on_an_existing_base(collector):
+    collector.save_articles(make_corpus(40))
+    collector.writer.execute("DROP VIEW stats_by_category_year")
+    collector.writer.execute("DROP TABLE stats_by_month")
+    collector.writer.execute("DROP TABLE stats_cross_lists")
+
+    # Prochaine ouverture: init_stats recrée les tables et les remplit
+    collector.init_database()
+    assert query(collector, "SELECT SUM(articles) FROM stats_by_month") == [(40,)]
+    assert_stats_match(collector)
+
+    # Tables modifiées à la main: rebuild_stats les remet d'aplomb
+    collector.writer.execute("UPDATE stats_by_month SET articles = 0")
+    assert collector.rebuild_stats() == 40
+    assert_stats_match(collector)
@@ -0,0 +1,101 @@
+"""Identifiants sans version, upsert par updated_at et mise à jour depuis le watermark"""
+
+import re
+
+from support import FakeSession, make_article, query
+
+from arxiv_full_collector import format_submitted_date, parse_api_timestamp
+from fake_arxiv import SyntheticCorpus
+
+UPDATED_RE = re.compile(r'cat:(\S+) AND lastUpdatedDate:\[(\d{12}) TO (\d{12})\]')
+
+
+def test_upsert_keeps_the_newest_version(collector):
+    first = make_article('2301.00001', title='First version', updated_at='2023-01-05T10:00:00Z')
+    collector.save_articles([first])
+    changed = collector.writer.stats['changed']
+
+    # Même updated_at (cache rejoué): la ligne n'est pas réécrite
+    collector.save_articles([first._replace(title='Replayed')])
+    assert query(collector, "SELECT title FROM articles") == [('First version',)]
+    assert collector.writer.stats['changed'] == changed
+
+    # Réponse plus ancienne: ignorée
+    collector.save_articles([first._replace(title='Older', updated_at='2022-12-01T00:00:00Z')])
+    assert query(collector, "SELECT title FROM articles") == [('First version',)]
+
+    # Version plus récente: remplace la ligne et ses catégories
+    second = first._replace(title='Second version', version=2, category='math.DG',
+                            categories='math.DG math.SG', updated_at='2023-03-01T00:00:00Z')
+    collector.save_articles([second])
+    assert query(collector, "SELECT arxiv_id, title, version FROM articles") == [
+        ('2301.00001', 'Second version', 2)]
+    assert query(collector, "SELECT category, is_primary FROM article_categories ORDER BY 1") == [
+        ('math.DG', 1), ('math.SG', 0)]
+
+    # Deux versions dans le même lot: la plus récente gagne
+    third = second._replace(title='Third version', version=3, updated_at='2023-05-01T00:00:00Z')
+    collector.save_articles([third, second._replace(categories='math.DG math.AT',
+                                                    updated_at='2023-04-01T00:00:00Z')])
+    assert query(collector, "SELECT title, version FROM articles") == [('Third version', 3)]
+    assert query(collector, "SELECT category FROM article_categories ORDER BY 1") == [
+        ('math.DG',), ('math.SG',)]
+
+
+def test_legacy_versioned_ids_are_migrated(collector):
+    # Base d'avant SCHEMA_VERSION 1: une ligne par version
+    old = make_article('2301.00007', title='v1', updated_at='2023-01-05T10:00:00Z')
+    collector.save_articles([
+        old._replace(arxiv_id='2301.00007v1', link='http://arxiv.org/abs/2301.00007v1'),
+        old._replace(arxiv_id='2301.00007v2', title='v2', version=None,
+                     updated_at='2023-02-05T10:00:00Z'),
+        make_article('2301.00008', title='Stable')])
+    collector.writer.execute("PRAGMA user_version = 0")
+
+    collector.init_database()
+    assert query(collector, "SELECT arxiv_id, title, version, link FROM articles ORDER BY 1") == [
+        ('2301.00007', 'v2', 2, 'http://arxiv.org/abs/2301.00007'),
+        ('2301.00008', 'Stable', 1, 'http://arxiv.org/abs/2301.00008')]
+    assert query(collector, "SELECT arxiv_id FROM article_categories ORDER BY 1") == [
+        ('2301.00007',), ('2301.00008',)]
+    assert query(collector, "PRAGMA user_version") == [(1,)]
+
+
+def updated_handler(corpus, fail_at=None):
+    """Handler de FakeSession pour les requêtes lastUpdatedDate (tri décroissant);
+    la page d'offset fail_at répond 400"""
+    def handler(url, params, headers):
+        category, low, high = UPDATED_RE.fullmatch(params['search_query']).groups()
+        start = int(params['start'])
+        if start == fail_at:
+            return 400, 'Bad Request', {}
+        indices = sorted((k for k in range(corpus.count)
+                          if corpus.record(k)['categories'][0] == category
+                          and low <= format_submitted_date(corpus.record(k)['dates'][-1]) <= high),
+                         key=lambda k: corpus.record(k)['dates'][-1], reverse=True)
+        page = indices[start:start + int(params['max_results'])]
+        return 200, corpus.feed(page, len(indices), start, params['search_query']), {}
+    return handler
+
+
+def test_update_advances_the_watermark_only_when_complete(collector):
+    corpus = SyntheticCorpus(600, 2021, 2021)
+    newest = max(corpus.record(k)['dates'][-1] for k in range(corpus.count)
+                 if corpus.record(k)['categories'][0] == 'math.DG')
+    collector.set_watermark('math.DG', '2021-01-01T00:00:00Z')
+
+    # Page 2 en erreur: les articles lus sont gardés, pas le watermark
+    collector.session = FakeSession(updated_handler(corpus, fail_at=20))
+    assert collector.update_category('math.DG', batch_size=20) == 20
+    assert collector.get_watermark('math.DG') == '2021-01-01T00:00:00Z'
+
+    collector.session = FakeSession(updated_handler(corpus))
+    saved = collector.update_category('math.DG', batch_size=20)
+    assert saved == query(collector, "SELECT COUNT(*) FROM articles")[0][0] > 40
+    assert parse_api_timestamp(collector.get_watermark('math.DG')) == newest
+
+    # Passage suivant: la requête part du watermark, une seule page
+    collector.session = FakeSession(updated_handler(corpus))
+    collector.update_category('math.DG', batch_size=20)
+    (_, params, _), = collector.session.requests
+    assert UPDATED_RE.fullmatch(params['search_query']).group(2) == format_submitted_date(newest)
@@ -0,0 +1,59 @@
+"""Fenêtres de dates côté serveur (submittedDate) et découpage des fenêtres trop grandes"""
+
+from datetime import datetime, timedelta, timezone
+
+from support import FakeSession, corpus_handler, query
+
+import arxiv_full_collector
+from arxiv_full_collector import build_window_query, month_window, split_window
+from fake_arxiv import QUERY_RE, SyntheticCorpus, parse_submitted
+
+
+def test_month_window_bounds():
+    assert month_window(2024, 2) == (datetime(2024, 2, 1, tzinfo=timezone.utc),
+                                     datetime(2024, 2, 29, 23, 59, tzinfo=timezone.utc))
+    start, end = month_window(2023, 12)
+    assert end == datetime(2023, 12, 31, 23, 59, tzinfo=timezone.utc)
+    assert month_window(2024, 1)[0] == end + timedelta(minutes=1)
+    assert build_window_query('math.DG', start, end) == (
+        'cat:math.DG AND submittedDate:[202312010000 TO 202312312359]')
+
+
+def test_split_window_halves_are_disjoint_and_cover_the_window():
+    window = month_window(2023, 5)
+    windows = [window]
+    for _ in range(12):
+        windows = [half for start, end in windows for half in split_window(start, end)]
+    assert windows[0][0] == window[0] and windows[-1][1] == window[1]
+    for (_, end), (start, _) in zip(windows, windows[1:]):
+        assert start == end + timedelta(minutes=1)
+    assert all(start <= end for start, end in windows)
+
+
+def test_large_month_is_split_into_server_side_windows(collector, monkeypatch):
+    monkeypatch.setattr(arxiv_full_collector, 'API_RESULT_CAP', 300)
+    corpus = SyntheticCorpus(100_000, 2020, 2020)
+    window_start, window_end = month_window(2020, 3)
+    expected = corpus.matching('math.DG', window_start, window_end)
+    assert len(expected) > 1000
+
+    collector.session = FakeSession(corpus_handler(corpus))
+    collector.collect_month('math.DG', 2020, 3)
+
+    assert query(collector, "SELECT COUNT(*) FROM articles") == [(len(expected),)]
+    assert collector.get_progress('math.DG', 2020, 3)['status'] == 'completed'
+
+    # Chaque requête porte une fenêtre incluse dans le mois, jamais la catégorie entière
+    windows = set()
+    for _, params, _ in collector.session.requests:
+        match = QUERY_RE.fullmatch(params['search_query'])
+        start, end = parse_submitted(match.group(2)), parse_submitted(match.group(3))
+        assert window_start <= start <= end <= window_end
+        windows.add((start, end))
+    assert len(windows) > 4
+
+    # Fenêtres découpées puis fenêtres collectées, toutes sous le plafond
+    rows = query(collector, "SELECT total_results, split FROM query_windows")
+    assert any(split for _, split in rows)
+    assert all(total <= 300 for total, split in rows if not split)
+    assert sum(total for total, split in rows if not split) == len(expected)
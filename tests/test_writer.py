@@ -0,0 +1,49 @@
+"""ArticleWriter: lots transactionnels, isolation des lignes refusées, checkpoint"""
+
+from support import make_article, make_corpus, query
+
+
+def test_batch_and_checkpoint_are_written_together(collector):
+    articles = make_corpus(30)
+    progress = collector.progress_row('math.AG', 2021, 5, 30, 'in_progress', next_offset=30)
+    assert collector.save_articles(articles, progress) == 30
+
+    assert query(collector, "SELECT COUNT(*) FROM articles") == [(30,)]
+    assert query(collector, "SELECT COUNT(DISTINCT arxiv_id) FROM article_categories") == [(30,)]
+    checkpoint = collector.get_progress('math.AG', 2021, 5)
+    assert (checkpoint['status'], checkpoint['next_offset'], checkpoint['articles_count']) == (
+        'in_progress', 30, 30)
+    assert collector.writer.stats['rows'] == collector.writer.stats['changed'] == 30
+
+    # Checkpoint seul (page vide): pas d'article, progression à jour
+    collector.save_articles([], collector.progress_row('math.AG', 2021, 5, 30, 'completed'))
+    assert collector.get_progress('math.AG', 2021, 5)['status'] == 'completed'
+
+
+def test_rejected_row_does_not_lose_the_batch(collector):
+    collector.writer.execute('''
+        CREATE TEMP TRIGGER reject_bad_title BEFORE INSERT ON articles
+        WHEN NEW.title = 'bad' BEGIN SELECT RAISE(ABORT, 'rejected'); END
+    ''')
+    articles = make_corpus(12)
+    articles[5] = make_article('2199.99999', title='bad')
+    progress = collector.progress_row('math.DG', 2022, 1, 11, 'in_progress', next_offset=12)
+    collector.save_articles(articles, progress)
+
+    ids = [row[0] for row in query(collector, "SELECT arxiv_id FROM articles ORDER BY 1")]
+    assert ids == sorted(article.arxiv_id for article in articles if article.title != 'bad')
+    assert collector.get_progress('math.DG', 2022, 1)['next_offset'] == 12
+    # Liens écrits pour les seules lignes gardées, vers des auteurs existants
+    assert query(collector, "SELECT COUNT(DISTINCT arxiv_id) FROM article_authors") == [(11,)]
+    assert query(collector, '''
+        SELECT COUNT(*) FROM article_authors
+        WHERE author_id NOT IN (SELECT id FROM authors)
+    ''') == [(0,)]
+
+    # Le lot suivant repasse par le chemin rapide avec les mêmes auteurs
+    collector.save_articles(make_corpus(12, start=100))
+    assert query(collector, "SELECT COUNT(*) FROM articles") == [(23,)]
+    assert query(collector, '''
+        SELECT COUNT(*) FROM article_authors
+        WHERE author_id NOT IN (SELECT id FROM authors)
+    ''') == [(0,)]
@@ -0,0 +1,1091 @@
+// ========================================
+// arXiv Collection Pro - Data Engine (Web Worker)
+// ========================================
+
+// Loading, decoding, filtering and counting run here, off the page's main
+// thread. app.js sends requests carrying an id and gets a reply with the
+// same id (or { id, error }):
+//   { type: 'load', api }                 -> {}, once the dataset is in
+//   { type: 'query', filters, start, end } -> { total, articles } for one page
+//   { type: 'article', articleId }        -> { article }, abstract included, and
+//                                            related: [{ id, title, similarity, link }]
+//   { type: 'export', filters }           -> { articles }, abstracts included
+//   { type: 'stats' }                     -> { stats }, the detailed counts (months,
+//                                            cross-lists...), null without them
+// with filters = { category, year, term }. While loading, the engine also
+// posts { type: 'summary', summary, loading } each time more articles are
+// available; summary = { total, categories, years } (the manifest counts).
+// Articles are sent as plain records, without their abstract in pages.
+// With api (the URL of `arxiv_full_collector.py serve`), nothing is loaded:
+// every request is answered by the read API.
+
+// In-memory dataset (articles.bin / articles.json), indexed as it arrives
+const FILTER_CACHE_SIZE = 32;      // memoized (category, year, term) results
+const SUMMARY_INTERVAL_MS = 250;   // summaries posted while a dataset streams in
+let allArticles = [];
+let positionsByKey = new Map();    // 'category|year' (either may be 'all') -> positions
+let datasetSummary = null;         // { total, categories, years }, same shape as the manifest
+const filterCache = new Map();     // 'category|year|term' -> positions, oldest first
+
+// Sharded dataset (written by `arxiv_full_collector.py export-shards`)
+const DATA_DIR = 'data';
+const COLUMNAR_FILE = 'articles.bin';   // `export --columnar`, tried before articles.json
+const COLUMNAR_BATCH = 20000;      // articles materialized between two summaries
+let manifest = null;               // data/manifest.json, null in legacy mode
+const shardCache = new Map();      // shard file -> Promise<articles>
+const abstractCache = new Map();   // abstract file -> Promise<abstracts>
+const relatedCache = new Map();    // related file -> Promise<[[id, similarity], ...] per shard row>
+const articleById = new Map();     // id -> article, for every loaded shard or article
+let lastResult = null;             // { key, promise } of the last sharded query, reused by its pages
+
+// Links of an article, in the form the collector stores and exports them
+// (article_links in arxiv_full_collector.py)
+const ABS_URL_PREFIX = 'http://arxiv.org/abs/';
+const PDF_URL_PREFIX = 'https://arxiv.org/pdf/';
+
+function articleLinks(id) {
+    return { link: `${ABS_URL_PREFIX}${id}`, pdf: `${PDF_URL_PREFIX}${id}.pdf` };
+}
+
+// Decoded data files, in IndexedDB by path with the hash they were fetched
+// under: reused as long as the manifest lists the same hash
+const CACHE_DB = 'arxiv-collection';
+const CACHE_STORE = 'files';
+let cacheDB = null;                // Promise<IDBDatabase, or null without IndexedDB>
+
+// Read API: pages come by cursor (keyset), not by offset
+const API_QUERY_CACHE = 32;        // queries whose page cursors are kept
+const API_EXPORT_PAGE = 500;       // articles per request when exporting
+let apiBase = null;                // e.g. http://127.0.0.1:8000/api, null without the API
+const apiQueries = new Map();      // 'category|year|term' -> { total, cursors: start -> { prev, next } }
+
+// ========================================
+// MESSAGES
+// ========================================
+
+async function handleEngineMessage(message, post) {
+    try {
+        switch (message.type) {
+            case 'load':
+                await loadArticles(post, message.api);
+                post({ id: message.id });
+                break;
+            case 'query': {
+                if (apiBase) {
+                    post({ id: message.id, ...await apiQuery(message.filters, message.start, message.end) });
+                    break;
+                }
+                const result = await resultFor(message.filters);
+                const articles = await result.getPage(message.start, message.end);
+                post({ id: message.id, total: result.total, articles: articles.map(article => articleRecord(article)) });
+                break;
+            }
+            case 'article':
+                post({ id: message.id, article: await articleDetails(message.articleId) });
+                break;
+            case 'stats':
+                post({ id: message.id, stats: await detailedStats() });
+                break;
+            case 'export': {
+                if (apiBase) {
+                    post({ id: message.id, articles: await apiExport(message.filters) });
+                    break;
+                }
+                const result = await resultFor(message.filters);
+                const articles = await result.getPage(0, result.total);
+                if (manifest) {
+                    await Promise.all(articles.map(loadAbstract));
+                }
+                post({ id: message.id, articles: articles.map(article => articleRecord(article, true)) });
+                break;
+            }
+            default:
+                throw new Error(`Unknown request: ${message.type}`);
+        }
+    } catch (error) {
+        post({ id: message.id, error: error.message });
+    }
+}
+
+// What the page gets: no shard references, abstracts only on request
+function articleRecord(article, withAbstract = false) {
+    const { id, title, authors, category, published, link, pdf } = article;
+    const record = { id, title, authors, category, published, link, pdf };
+    if (withAbstract) record.abstract = article.abstract;
+    return record;
+}
+
+async function articleDetails(articleId) {
+    if (apiBase) {
+        return fetchJSON(`${apiBase}/articles/${encodeURIComponent(articleId)}`);
+    }
+    const article = articleById.get(articleId);
+    if (!article) return null;
+    if (manifest) {
+        const related = await loadRelated(article);
+        try {
+            await loadAbstract(article);
+        } catch (error) {
+            console.error('Failed to load abstract:', error);
+            return { ...articleRecord(article), abstract: 'Abstract unavailable.', related };
+        }
+        return { ...articleRecord(article, true), related };
+    }
+    return articleRecord(article, true);
+}
+
+// Related papers precomputed by `export-shards --related`, in the shape the
+// read API returns them; titles are known only for articles already loaded
+async function loadRelated(article) {
+    const shard = article.shard;
+    if (!shard.related) return [];
+    if (!relatedCache.has(shard.related)) {
+        const promise = fetchDataFile(shard.related, shard.related_hash);
+        promise.catch(() => relatedCache.delete(shard.related));
+        relatedCache.set(shard.related, promise);
+    }
+    try {
+        const lists = await relatedCache.get(shard.related);
+        return (lists[article.position] || []).map(([id, similarity]) => {
+            const other = articleById.get(id);
+            return { id, title: other ? other.title : null, similarity, link: articleLinks(id).link };
+        });
+    } catch (error) {
+        console.error('Failed to load related papers:', error);
+        return [];
+    }
+}
+
+// The collection's aggregate counts (collection_stats in arxiv_full_collector.py):
+// stats.json of the sharded export, or the read API; articles.bin /
+// articles.json only carry what the summary already has
+async function detailedStats() {
+    if (apiBase) return fetchJSON(`${apiBase}/stats`);
+    if (manifest && manifest.stats) return fetchDataFile(manifest.stats.file, manifest.stats.hash);
+    return null;
+}
+
+// ========================================
+// DATA LOADING
+// ========================================
+
+async function loadArticles(post, api) {
+    const publish = loading => post({ type: 'summary', summary: manifest || datasetSummary, loading });
+    
+    if (api) {
+        apiBase = api.replace(/\/+$/, '');
+        datasetSummary = await fetchJSON(`${apiBase}/stats`);
+        publish(false);
+        return;
+    }
+    
+    // Sharded dataset first: only the manifest is needed before the first page
+    try {
+        // Revalidated on every visit: the one request made when nothing changed
+        manifest = await fetchJSON(`${DATA_DIR}/manifest.json`, { cache: 'no-cache' });
+        publish(false);
+        pruneCache();
+        return;
+    } catch (error) {
+        manifest = null;
+        console.log('No sharded dataset, loading articles.json...');
+    }
+    
+    // The page re-renders on each summary: at most one every SUMMARY_INTERVAL_MS
+    let published = 0;
+    const add = articles => {
+        addArticles(articles);
+        if (Date.now() - published >= SUMMARY_INTERVAL_MS) {
+            published = Date.now();
+            publish(true);
+        }
+    };
+    
+    try {
+        // Columnar export: typed arrays over one binary file, no JSON parsing
+        const response = await fetch(COLUMNAR_FILE, { cache: 'no-cache' });
+        if (response.ok) {
+            const table = readColumnar(await response.arrayBuffer());
+            for (let start = 0; start < table.count; start += COLUMNAR_BATCH) {
+                const count = Math.min(COLUMNAR_BATCH, table.count - start);
+                add(Array.from({ length: count }, (_, i) => table.article(start + i)));
+            }
+            publish(false);
+            return;
+        }
+    } catch (error) {
+        console.log('No columnar export, loading articles.json...');
+    }
+    
+    try {
+        // Try to load from articles.json first, showing articles as they arrive
+        const response = await fetch('articles.json', { cache: 'no-cache' });
+        if (response.ok) {
+            await streamJSONArray(response, add);
+        } else {
+            // Load sample data if no JSON file exists
+            add(generateSampleData());
+        }
+    } catch (error) {
+        if (allArticles.length) {
+            console.error('articles.json interrupted:', error);
+        } else {
+            console.log('Loading sample data...');
+            add(generateSampleData());
+        }
+    }
+    publish(false);
+}
+
+// Parses a JSON array of objects while it downloads: complete top-level
+// objects are cut out of the text by tracking strings and nesting, and each
+// network chunk's objects are parsed in a single JSON.parse call
+async function streamJSONArray(response, onBatch) {
+    if (!response.body || typeof TextDecoderStream === 'undefined') {
+        onBatch(await response.json());
+        return;
+    }
+    
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let text = '';
+    let scanned = 0;      // chars of text already scanned
+    let start = 0;        // start of the object being read, depth >= 2
+    let depth = 0;
+    let inString = false;
+    let escaped = false;
+    
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        text += value;
+        
+        const objects = [];
+        for (let i = scanned; i < text.length; i++) {
+            const c = text.charCodeAt(i);
+            if (inString) {
+                if (escaped) escaped = false;
+                else if (c === 0x5C) escaped = true;        // backslash
+                else if (c === 0x22) inString = false;      // "
+            } else if (c === 0x22) {
+                inString = true;
+            } else if (c === 0x7B || c === 0x5B) {          // { [
+                if (++depth === 2) start = i;
+            } else if (c === 0x7D || c === 0x5D) {          // } ]
+                if (--depth === 1) objects.push(text.slice(start, i + 1));
+            }
+        }
+        
+        // Keep only the unfinished object
+        const keep = depth >= 2 ? start : text.length;
+        text = text.slice(keep);
+        start -= keep;
+        scanned = text.length;
+        if (objects.length) onBatch(JSON.parse(`[${objects.join(',')}]`));
+    }
+}
+
+// Appends articles to the in-memory dataset, keeping the positions per
+// category, per year and per (category, year), the id map and the counts
+// shown in the stats, so that changing a filter never walks the whole array
+function addArticles(articles) {
+    if (!datasetSummary) datasetSummary = { total: 0, categories: {}, years: {} };
+    const { categories, years } = datasetSummary;
+    const add = (key, position) => {
+        if (!positionsByKey.has(key)) positionsByKey.set(key, []);
+        positionsByKey.get(key).push(position);
+    };
+    
+    articles.forEach(article => {
+        const position = allArticles.length;
+        allArticles.push(article);
+        // Shards already carry author lists; split the legacy strings once here
+        if (typeof article.authors === 'string') {
+            article.authors = article.authors.split(';').map(name => name.trim()).filter(Boolean);
+        }
+        // Same key as the manifest for articles without a date
+        const year = article.published ? article.published.substring(0, 4) : '0000';
+        articleById.set(article.id, article);
+        categories[article.category] = (categories[article.category] || 0) + 1;
+        years[year] = (years[year] || 0) + 1;
+        add(`${article.category}|${year}`, position);
+        add(`${article.category}|all`, position);
+        add(`all|${year}`, position);
+        add('all|all', position);
+    });
+    
+    datasetSummary.total = allArticles.length;
+    // Memoized results miss the new articles
+    filterCache.clear();
+}
+
+async function fetchJSON(url, options) {
+    const response = await fetch(url, options);
+    if (!response.ok) {
+        throw new Error(`${url}: HTTP ${response.status}`);
+    }
+    return response.json();
+}
+
+// A file of the sharded dataset. With a hash (manifest version 4) its URL
+// never changes content, so sw.js can cache it for good, and the decoded
+// data is kept in IndexedDB for the next visit
+async function fetchDataFile(file, hash) {
+    if (!hash) return fetchJSON(`${DATA_DIR}/${file}`);
+    const cached = await withCacheStore('readonly', store => store.get(file));
+    if (cached && cached.hash === hash) return cached.data;
+    
+    const data = await fetchJSON(`${DATA_DIR}/${file}?v=${hash}`);
+    // Not awaited: a full quota only means the next visit fetches it again
+    withCacheStore('readwrite', store => store.put({ hash, data }, file));
+    return data;
+}
+
+// Reads the columnar export written by ColumnarWriter (arxiv_full_collector.py):
+// a JSON header, then little-endian columns aligned on 8 bytes, each viewed
+// as a typed array over the downloaded buffer without copying it
+const COLUMNAR_TYPES = { '<u4': Uint32Array, '<i4': Int32Array, '<u2': Uint16Array, '|u1': Uint8Array };
+
+function readColumnar(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const decoder = new TextDecoder();
+    if (decoder.decode(bytes.subarray(0, 4)) !== 'ARXC') {
+        throw new Error('Not a columnar export');
+    }
+    const headerSize = new DataView(buffer).getUint32(8, true);
+    const header = JSON.parse(decoder.decode(bytes.subarray(12, 12 + headerSize)));
+    const base = Math.ceil((12 + headerSize) / 8) * 8;
+    const columns = {};
+    for (const [name, spec] of Object.entries(header.columns)) {
+        columns[name] = new COLUMNAR_TYPES[spec.dtype](buffer, base + spec.offset, spec.count);
+    }
+    
+    // Each string column is decoded in one call on first use, then strings are
+    // slices of it: byte offsets are UTF-16 offsets for ASCII text, otherwise
+    // they are converted in one pass over the bytes
+    const decoded = {};
+    const string = (name, i) => {
+        if (!decoded[name]) {
+            const data = columns[`${name}_data`];
+            const text = decoder.decode(data);
+            let units = columns[`${name}_offsets`];
+            if (text.length !== data.length) {
+                const offsets = units;
+                units = new Uint32Array(offsets.length);
+                let unit = 0;
+                for (let k = 0, byte = 0; k < offsets.length; k++) {
+                    for (; byte < offsets[k]; byte++) {
+                        const b = data[byte];
+                        if ((b & 0xC0) !== 0x80) unit += b >= 0xF0 ? 2 : 1;  // 4-byte UTF-8 = surrogate pair
+                    }
+                    units[k] = unit;
+                }
+            }
+            decoded[name] = { text, units };
+        }
+        const { text, units } = decoded[name];
+        return text.slice(units[i], units[i + 1]);
+    };
+    const dates = new Map();   // day number -> 'YYYY-MM-DD', few distinct values
+    const date = days => {
+        if (!dates.has(days)) dates.set(days, new Date(days * 86400000).toISOString().slice(0, 10));
+        return dates.get(days);
+    };
+    // Author names are decoded once, articles only keep indices into them
+    const authorNames = Array.from({ length: header.columns.author_names_offsets.count - 1 },
+        (_, i) => string('author_names', i));
+    
+    return {
+        count: header.count,
+        columns,
+        article(i) {
+            const id = string('id', i);
+            const days = columns.published[i];
+            const authorIds = columns.author_ids.subarray(columns.author_offsets[i], columns.author_offsets[i + 1]);
+            return {
+                id,
+                title: string('title', i),
+                authors: Array.from(authorIds, author => authorNames[author]),
+                abstract: string('abstract', i),
+                category: header.categories[columns.category[i]],
+                published: days === header.date_missing ? null : date(days),
+                ...articleLinks(id)
+            };
+        }
+    };
+}
+
+// A result set the display can page through without holding it all
+function arrayResult(articles) {
+    return {
+        total: articles.length,
+        getPage: async (start, end) => articles.slice(start, end)
+    };
+}
+
+// Same, over positions in allArticles: a page only touches its own articles
+function positionsResult(positions) {
+    return {
+        total: positions.length,
+        getPage: async (start, end) => positions.slice(start, end).map(position => allArticles[position])
+    };
+}
+
+function shardRowToArticle(row, shard, position) {
+    const [id, title, authors, published] = row;
+    return {
+        id,
+        title,
+        authors,
+        published,
+        category: shard.category,
+        ...articleLinks(id),
+        shard,
+        position
+    };
+}
+
+function loadShard(shard) {
+    if (!shardCache.has(shard.file)) {
+        const promise = fetchDataFile(shard.file, shard.hash).then(rows =>
+            rows.map((row, position) => {
+                const article = shardRowToArticle(row, shard, position);
+                articleById.set(article.id, article);
+                return article;
+            })
+        );
+        // A failed fetch must not poison the cache
+        promise.catch(() => shardCache.delete(shard.file));
+        shardCache.set(shard.file, promise);
+    }
+    return shardCache.get(shard.file);
+}
+
+// The n-th abstract file of a shard
+function loadAbstractChunk(shard, n) {
+    const file = shard.abstracts[n];
+    if (!abstractCache.has(file)) {
+        const promise = fetchDataFile(file, shard.abstract_hashes && shard.abstract_hashes[n]);
+        promise.catch(() => abstractCache.delete(file));
+        abstractCache.set(file, promise);
+    }
+    return abstractCache.get(file);
+}
+
+async function loadAbstract(article) {
+    if (article.abstract === undefined) {
+        const chunkSize = manifest.abstract_chunk_size;
+        const abstracts = await loadAbstractChunk(article.shard, Math.floor(article.position / chunkSize));
+        article.abstract = abstracts[article.position % chunkSize] || '';
+    }
+    return article.abstract;
+}
+
+async function loadShardWithAbstracts(shard) {
+    const articles = await loadShard(shard);
+    const chunks = await Promise.all(shard.abstracts.map((file, n) => loadAbstractChunk(shard, n)));
+    const chunkSize = manifest.abstract_chunk_size;
+    articles.forEach((article, position) => {
+        const chunk = chunks[Math.floor(position / chunkSize)];
+        article.abstract = chunk[position % chunkSize] || '';
+    });
+    return articles;
+}
+
+function selectedShards(category, year) {
+    // The manifest lists shards newest year first
+    return manifest.shards.filter(shard =>
+        (category === 'all' || shard.category === category) &&
+        (year === 'all' || shard.year === year)
+    );
+}
+
+// Pages through the selected shards without loading them all: a page only
+// fetches the shards of the year(s) it overlaps, counts come from the manifest
+function shardedResult(shards) {
+    const groups = [];
+    shards.forEach(shard => {
+        const last = groups[groups.length - 1];
+        if (last && last.year === shard.year) {
+            last.shards.push(shard);
+            last.count += shard.count;
+        } else {
+            groups.push({ year: shard.year, shards: [shard], count: shard.count, articles: null });
+        }
+    });
+    
+    async function loadGroup(group) {
+        if (!group.articles) {
+            const parts = await Promise.all(group.shards.map(loadShard));
+            group.articles = parts.length === 1 ? parts[0] :
+                parts.flat().sort((a, b) => (b.published || '').localeCompare(a.published || ''));
+        }
+        return group.articles;
+    }
+    
+    return {
+        total: groups.reduce((sum, group) => sum + group.count, 0),
+        getPage: async (start, end) => {
+            const page = [];
+            let offset = 0;
+            for (const group of groups) {
+                if (offset >= end) break;
+                if (offset + group.count > start) {
+                    const articles = await loadGroup(group);
+                    page.push(...articles.slice(Math.max(start - offset, 0), end - offset));
+                }
+                offset += group.count;
+            }
+            return page;
+        }
+    };
+}
+
+// Without an index, search has to scan every selected shard, abstracts included
+async function searchShards(shards, term) {
+    const pattern = searchPattern(term);
+    const parts = await Promise.all(shards.map(loadShardWithAbstracts));
+    const matches = parts.flat().filter(article => matchesSearch(article, pattern));
+    if (shards.length > 1) {
+        matches.sort((a, b) => (b.published || '').localeCompare(a.published || ''));
+    }
+    return arrayResult(matches);
+}
+
+function generateSampleData() {
+    const categories = ['math.DG', 'math.SG', 'math-ph', 'math.AG', 'math.QA', 'math.RT'];
+    const sampleArticles = [];
+    
+    for (let i = 0; i < 500; i++) {
+        const year = 2000 + Math.floor(Math.random() * 25);
+        const month = Math.floor(Math.random() * 12) + 1;
+        const day = Math.floor(Math.random() * 28) + 1;
+        const category = categories[Math.floor(Math.random() * categories.length)];
+        const id = `${year}${String(month).padStart(2, '0')}${String(day).padStart(2, '0')}.${String(i).padStart(5, '0')}`;
+        
+        sampleArticles.push({
+            id,
+            title: `Research Article ${i + 1}: Advanced Studies in ${category}`,
+            authors: `Author ${i % 10 + 1}; Collaborator ${i % 5 + 1}; Researcher ${i % 3 + 1}`,
+            abstract: `This paper explores fundamental aspects of ${category} with applications to modern mathematical physics. We present novel approaches and theoretical frameworks.`,
+            category: category,
+            published: `${year}-${String(month).padStart(2, '0')}-${String(day).padStart(2, '0')}`,
+            ...articleLinks(id)
+        });
+    }
+    
+    return sampleArticles.sort((a, b) => b.published.localeCompare(a.published));
+}
+
+// ========================================
+// SEARCH INDEX
+// ========================================
+
+// Inverted index written by `export-shards`: sorted terms split into files,
+// postings stored as delta-encoded article numbers carrying a term weight.
+// Shards rewritten by incremental exports are numbered after the base index
+// and indexed in a second, smaller set of files (manifest.index.delta).
+const PREFIX_EXPANSION = 32;     // max index terms the last (prefix) word expands to
+const RANK_WINDOW = 1000;        // results ranked up front, deeper pages sort the rest
+const TERM_CACHE_SIZE = 64;      // decoded posting lists kept between searches
+const BM25_K1 = 1.2;
+const indexCache = new Map();    // index file -> Promise<{term: postings}>
+const blockTerms = new WeakMap(); // loaded index file -> its terms, sorted
+const termCache = new Map();     // term -> { docs, scores }, oldest first
+let stopwords = null;
+let shardsByDoc = null;
+
+// Same rules as tokenize() in arxiv_full_collector.py
+function tokenize(text) {
+    if (!stopwords) stopwords = new Set(manifest.index.stopwords);
+    const tokens = text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase().match(/[a-z0-9]+/g) || [];
+    return tokens.filter(token => token.length >= manifest.index.min_token_length && !stopwords.has(token));
+}
+
+function loadIndexFile({ file, hash }) {
+    if (!indexCache.has(file)) {
+        const promise = fetchDataFile(file, hash);
+        promise.catch(() => indexCache.delete(file));
+        indexCache.set(file, promise);
+    }
+    return indexCache.get(file);
+}
+
+// Files cover contiguous term ranges: start at the last file whose first
+// term is <= term, and for a prefix keep going while files start with it
+function indexFilesFor(files, term, isPrefix) {
+    if (files.length === 0) return [];
+    let lo = 0;
+    let hi = files.length - 1;
+    while (lo < hi) {
+        const mid = (lo + hi + 1) >> 1;
+        if (files[mid].first <= term) lo = mid; else hi = mid - 1;
+    }
+    let end = lo + 1;
+    while (isPrefix && end < files.length && files[end].first.startsWith(term)) end++;
+    return files.slice(lo, end);
+}
+
+// Each posting is (article delta << weight_bits) | weight of the term in the
+// article. parts: the term's lists in the base then delta index; delta
+// articles all come after the base ones, so the decoded lists stay sorted.
+function termScores(term, parts) {
+    if (termCache.has(term)) {
+        const cached = termCache.get(term);
+        termCache.delete(term);
+        termCache.set(term, cached);
+        return cached;
+    }
+    
+    const df = parts.reduce((sum, postings) => sum + postings.length, 0);
+    const idf = Math.log(1 + (manifest.index.docs - df + 0.5) / (df + 0.5));
+    const weightMask = (1 << manifest.index.weight_bits) - 1;
+    const docs = new Int32Array(df);
+    const scores = new Float64Array(df);
+    let i = 0;
+    parts.forEach(postings => {
+        let doc = 0;
+        for (let k = 0; k < postings.length; k++, i++) {
+            const weight = postings[k] & weightMask;
+            doc += (postings[k] - weight) / (weightMask + 1);
+            docs[i] = doc;
+            scores[i] = idf * weight * (BM25_K1 + 1) / (weight + BM25_K1);
+        }
+    });
+    
+    termCache.set(term, { docs, scores });
+    if (termCache.size > TERM_CACHE_SIZE) {
+        termCache.delete(termCache.keys().next().value);
+    }
+    return termCache.get(term);
+}
+
+// Completions of a prefix in one index file, by binary search in its sorted
+// terms (a file of rare terms can hold tens of thousands of them)
+function termsWithPrefix(block, prefix) {
+    if (!blockTerms.has(block)) blockTerms.set(block, Object.keys(block).sort());
+    const terms = blockTerms.get(block);
+    let lo = 0;
+    let hi = terms.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (terms[mid] < prefix) lo = mid + 1; else hi = mid;
+    }
+    let end = lo;
+    while (end < terms.length && terms[end].startsWith(prefix)) end++;
+    return terms.slice(lo, end);
+}
+
+// Sorted docs + scores for one query word (an exact term, or a prefix)
+async function wordPostings(word, isPrefix) {
+    const segments = [manifest.index.files, manifest.index.delta ? manifest.index.delta.files : []];
+    const blocks = await Promise.all(segments.map(files =>
+        Promise.all(indexFilesFor(files, word, isPrefix).map(loadIndexFile))));
+    // term -> its posting lists, base segment first
+    const parts = new Map();
+    blocks.forEach(segment => segment.forEach(block => {
+        for (const term of isPrefix ? termsWithPrefix(block, word) : [word]) {
+            if (block[term]) {
+                if (!parts.has(term)) parts.set(term, []);
+                parts.get(term).push(block[term]);
+            }
+        }
+    }));
+    let terms = [...parts.keys()];
+    
+    if (terms.length === 0) return { docs: new Int32Array(0), scores: new Float64Array(0) };
+    if (terms.length === 1) return termScores(terms[0], parts.get(terms[0]));
+    
+    // Prefix: union of the most frequent completions, best score per article,
+    // accumulated in one dense array rather than a Map
+    const df = new Map(terms.map(term =>
+        [term, parts.get(term).reduce((sum, postings) => sum + postings.length, 0)]));
+    terms = terms.sort((a, b) => df.get(b) - df.get(a)).slice(0, PREFIX_EXPANSION);
+    const best = new Float64Array(manifest.index.docs);
+    terms.forEach(term => {
+        const { docs, scores } = termScores(term, parts.get(term));
+        for (let i = 0; i < docs.length; i++) {
+            if (scores[i] > best[docs[i]]) best[docs[i]] = scores[i];
+        }
+    });
+    let count = 0;
+    for (let doc = 0; doc < best.length; doc++) {
+        if (best[doc] > 0) count++;
+    }
+    const docs = new Int32Array(count);
+    const scores = new Float64Array(count);
+    for (let doc = 0, i = 0; doc < best.length; doc++) {
+        if (best[doc] > 0) {
+            docs[i] = doc;
+            scores[i++] = best[doc];
+        }
+    }
+    return { docs, scores };
+}
+
+// First position >= from where array[position] >= value, probing forward
+// exponentially: intersecting a short list with a long one skips most of it
+function gallop(array, value, from) {
+    let lo = from;
+    let hi = from;
+    let step = 1;
+    while (hi < array.length && array[hi] < value) {
+        lo = hi + 1;
+        hi += step;
+        step *= 2;
+    }
+    hi = Math.min(hi, array.length);
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (array[mid] < value) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+}
+
+// AND of all words, shortest posting list first, summing scores
+function intersectPostings(lists) {
+    lists.sort((a, b) => a.docs.length - b.docs.length);
+    let { docs, scores } = lists[0];
+    for (let k = 1; k < lists.length && docs.length; k++) {
+        const other = lists[k];
+        const keptDocs = new Int32Array(docs.length);
+        const keptScores = new Float64Array(docs.length);
+        let kept = 0;
+        let j = 0;
+        for (let i = 0; i < docs.length; i++) {
+            j = gallop(other.docs, docs[i], j);
+            if (j === other.docs.length) break;
+            if (other.docs[j] === docs[i]) {
+                keptDocs[kept] = docs[i];
+                keptScores[kept++] = scores[i] + other.scores[j];
+            }
+        }
+        docs = keptDocs.subarray(0, kept);
+        scores = keptScores.subarray(0, kept);
+    }
+    return { docs, scores };
+}
+
+function shardForDoc(doc) {
+    if (!shardsByDoc) shardsByDoc = [...manifest.shards].sort((a, b) => a.doc_base - b.doc_base);
+    let lo = 0;
+    let hi = shardsByDoc.length - 1;
+    while (lo < hi) {
+        const mid = (lo + hi + 1) >> 1;
+        if (shardsByDoc[mid].doc_base <= doc) lo = mid; else hi = mid - 1;
+    }
+    return shardsByDoc[lo];
+}
+
+async function articleForDoc(doc) {
+    const shard = shardForDoc(doc);
+    const articles = await loadShard(shard);
+    return articles[doc - shard.doc_base];
+}
+
+// Positions of the matches in the selected shards. Docs are sorted and each
+// shard is a contiguous doc range, so this is a single merge pass. Numbers
+// left behind by rewritten shards belong to no shard and are dropped here.
+function selectedPositions(docs, shards) {
+    if (shards.length === manifest.shards.length && manifest.total === manifest.index.docs) {
+        const positions = new Int32Array(docs.length);
+        for (let i = 0; i < positions.length; i++) positions[i] = i;
+        return positions;
+    }
+    
+    const positions = [];
+    const ranges = [...shards].sort((a, b) => a.doc_base - b.doc_base);
+    let r = 0;
+    for (let i = 0; i < docs.length && r < ranges.length; i++) {
+        while (r < ranges.length && docs[i] >= ranges[r].doc_base + ranges[r].count) r++;
+        if (r < ranges.length && docs[i] >= ranges[r].doc_base) positions.push(i);
+    }
+    return Int32Array.from(positions);
+}
+
+// The best `limit` positions by score (ties: lower doc first), via a
+// bounded min-heap so a broad query does not sort every match
+function topPositions(positions, docs, scores, limit) {
+    const better = (a, b) => scores[a] > scores[b] || (scores[a] === scores[b] && docs[a] < docs[b]);
+    if (positions.length <= limit) {
+        return Array.from(positions).sort((a, b) => (better(a, b) ? -1 : better(b, a) ? 1 : 0));
+    }
+    
+    const heap = [];
+    const siftDown = (i) => {
+        for (;;) {
+            const left = 2 * i + 1;
+            const right = left + 1;
+            let worst = i;
+            if (left < heap.length && better(heap[worst], heap[left])) worst = left;
+            if (right < heap.length && better(heap[worst], heap[right])) worst = right;
+            if (worst === i) return;
+            [heap[i], heap[worst]] = [heap[worst], heap[i]];
+            i = worst;
+        }
+    };
+    for (const position of positions) {
+        if (heap.length < limit) {
+            heap.push(position);
+            for (let i = heap.length - 1; i > 0;) {
+                const parent = (i - 1) >> 1;
+                if (!better(heap[parent], heap[i])) break;
+                [heap[i], heap[parent]] = [heap[parent], heap[i]];
+                i = parent;
+            }
+        } else if (scores[position] >= scores[heap[0]] && better(position, heap[0])) {
+            heap[0] = position;
+            siftDown(0);
+        }
+    }
+    return heap.sort((a, b) => (better(a, b) ? -1 : 1));
+}
+
+// Ranked search through the index; only the shards of the page shown are fetched
+async function searchIndex(shards, term) {
+    const words = tokenize(term);
+    if (words.length === 0) return arrayResult([]);
+    
+    // The last word is matched as a prefix while the user is still typing it
+    const lists = await Promise.all(words.map((word, i) =>
+        wordPostings(word, i === words.length - 1 && word.length >= 3)));
+    const { docs, scores } = intersectPostings(lists);
+    
+    const positions = selectedPositions(docs, shards);
+    let ranked = topPositions(positions, docs, scores, RANK_WINDOW);
+    
+    return {
+        total: positions.length,
+        getPage: (start, end) => {
+            if (end > ranked.length && ranked.length < positions.length) {
+                ranked = topPositions(positions, docs, scores, positions.length);
+            }
+            return Promise.all(ranked.slice(start, end).map(position => articleForDoc(docs[position])));
+        }
+    };
+}
+
+// ========================================
+// OFFLINE CACHE
+// ========================================
+
+function openCache() {
+    if (!cacheDB) {
+        cacheDB = new Promise(resolve => {
+            if (typeof indexedDB === 'undefined') {
+                resolve(null);
+                return;
+            }
+            const request = indexedDB.open(CACHE_DB, 1);
+            request.onupgradeneeded = () => {
+                // Indexed by hash so that pruning reads keys, not the data
+                request.result.createObjectStore(CACHE_STORE).createIndex('hash', 'hash');
+            };
+            request.onsuccess = () => resolve(request.result);
+            // Private browsing and the like: everything is fetched each time
+            request.onerror = () => resolve(null);
+        });
+    }
+    return cacheDB;
+}
+
+// Runs one request on the cache store, resolves with its result
+// (undefined on any failure: the cache is never required)
+async function withCacheStore(mode, makeRequest) {
+    const db = await openCache();
+    if (!db) return undefined;
+    return new Promise(resolve => {
+        try {
+            const request = makeRequest(db.transaction(CACHE_STORE, mode).objectStore(CACHE_STORE));
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => resolve(undefined);
+        } catch (error) {
+            resolve(undefined);
+        }
+    });
+}
+
+// Every file of the manifest with its hash
+function manifestFiles() {
+    const files = new Map();
+    manifest.shards.forEach(shard => {
+        files.set(shard.file, shard.hash);
+        shard.abstracts.forEach((file, n) => files.set(file, shard.abstract_hashes && shard.abstract_hashes[n]));
+        if (shard.related) files.set(shard.related, shard.related_hash);
+    });
+    if (manifest.index) {
+        const delta = manifest.index.delta ? manifest.index.delta.files : [];
+        [...manifest.index.files, ...delta].forEach(f => files.set(f.file, f.hash));
+    }
+    if (manifest.stats) files.set(manifest.stats.file, manifest.stats.hash);
+    return files;
+}
+
+// Drops cached files the manifest no longer lists, or lists with another hash
+function pruneCache() {
+    const files = manifestFiles();
+    withCacheStore('readwrite', store => {
+        const request = store.index('hash').openKeyCursor();
+        request.addEventListener('success', () => {
+            const cursor = request.result;
+            if (!cursor) return;
+            if (files.get(cursor.primaryKey) !== cursor.key) {
+                store.delete(cursor.primaryKey);
+            }
+            cursor.continue();
+        });
+        return request;
+    });
+}
+
+// ========================================
+// READ API
+// ========================================
+
+function apiParams({ category, year, term }) {
+    const params = new URLSearchParams();
+    if (category !== 'all') params.set('category', category);
+    if (year !== 'all') params.set('year', year);
+    if (term) params.set('q', ftsQuery(term));
+    return params;
+}
+
+// The search box as FTS5 terms: each word quoted, the last one a prefix
+// since the page searches as you type
+function ftsQuery(term) {
+    const words = term.split(/\s+/).filter(Boolean);
+    return words.map((word, i) => `"${word.replace(/"/g, '""')}"${i === words.length - 1 ? '*' : ''}`).join(' ');
+}
+
+// One page of a query. The API pages by cursor: the next page starts after
+// the last article of the previous one, so a page is reached from a
+// neighbouring page already fetched (or from the end, for the last page)
+async function apiQuery(filters, start, end) {
+    const key = `${filters.category}|${filters.year}|${filters.term}`;
+    let query = apiQueries.get(key);
+    if (!query) {
+        query = { total: null, cursors: new Map() };
+        apiQueries.set(key, query);
+        if (apiQueries.size > API_QUERY_CACHE) {
+            apiQueries.delete(apiQueries.keys().next().value);
+        }
+    }
+    
+    const size = end - start;
+    const params = apiParams(filters);
+    params.set('limit', size);
+    const previous = query.cursors.get(start - size);
+    const following = query.cursors.get(start + size);
+    if (start > 0) {
+        if (previous && previous.next) {
+            params.set('after', previous.next);
+        } else if (following && following.prev) {
+            params.set('before', following.prev);
+        } else if (query.total !== null && end >= query.total) {
+            params.set('last', '1');
+            params.set('limit', Math.max(1, query.total - start));
+        } else {
+            // No neighbour yet: walk from the closest page already fetched
+            await apiQuery(filters, start - size, start);
+            return apiQuery(filters, start, end);
+        }
+    }
+    
+    const page = await fetchJSON(`${apiBase}/articles?${params}`);
+    query.total = page.total;
+    query.cursors.set(start, { prev: page.prev, next: page.next });
+    return { total: page.total, articles: page.articles };
+}
+
+async function apiExport(filters) {
+    const articles = [];
+    const params = apiParams(filters);
+    params.set('limit', API_EXPORT_PAGE);
+    params.set('abstract', '1');
+    for (;;) {
+        const page = await fetchJSON(`${apiBase}/articles?${params}`);
+        articles.push(...page.articles);
+        if (!page.next) return articles;
+        params.set('after', page.next);
+    }
+}
+
+// ========================================
+// FILTERING
+// ========================================
+
+// The result set for { category, year, term }, in whichever dataset is loaded
+function resultFor({ category, year, term }) {
+    if (!manifest) {
+        return positionsResult(filterPositions(category, year, term));
+    }
+    
+    // Sharded results load their shards page by page: keep the last one for
+    // the following pages of the same query
+    const key = `${category}|${year}|${term}`;
+    if (!lastResult || lastResult.key !== key) {
+        const shards = selectedShards(category, year);
+        let promise;
+        if (!term) {
+            promise = Promise.resolve(shardedResult(shards));
+        } else if (manifest.index) {
+            promise = searchIndex(shards, term);
+        } else {
+            promise = searchShards(shards, term);
+        }
+        // A failed load must not stick to the query
+        promise.catch(() => {
+            if (lastResult && lastResult.key === key) lastResult = null;
+        });
+        lastResult = { key, promise };
+    }
+    return lastResult.promise;
+}
+
+// Case-insensitive, without lowercasing every title and abstract it is tested on
+function searchPattern(term) {
+    return new RegExp(term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&'), 'i');
+}
+
+function matchesSearch(article, pattern) {
+    return pattern.test(article.title) || pattern.test(article.abstract);
+}
+
+// Positions matching the filters. Without a search term this is a list
+// built at load; searches are memoized, and a longer term only scans the
+// matches of a shorter one already cached for the same category/year.
+function filterPositions(category, year, term) {
+    const scope = `${category}|${year}`;
+    const base = positionsByKey.get(scope) || [];
+    if (!term) return base;
+    
+    const key = `${scope}|${term}`;
+    if (filterCache.has(key)) {
+        const cached = filterCache.get(key);
+        filterCache.delete(key);
+        filterCache.set(key, cached);
+        return cached;
+    }
+    
+    let candidates = base;
+    for (let length = term.length - 1; length > 0; length--) {
+        const shorter = filterCache.get(`${scope}|${term.substring(0, length)}`);
+        if (shorter) {
+            candidates = shorter;
+            break;
+        }
+    }
+    const pattern = searchPattern(term);
+    const positions = candidates.filter(position => matchesSearch(allArticles[position], pattern));
+    
+    filterCache.set(key, positions);
+    if (filterCache.size > FILTER_CACHE_SIZE) {
+        filterCache.delete(filterCache.keys().next().value);
+    }
+    return positions;
+}
+
+// Worker entry point. Without Worker support app.js loads this file as a
+// plain script and calls handleEngineMessage() itself.
+if (typeof importScripts === 'function') {
+    self.onmessage = (e) => handleEngineMessage(e.data, message => self.postMessage(message));
+}